@@ -1,5 +1,6 @@
 """Minimal ai_secretary namespace for Ollama integration."""
 
+from .circuit_breaker import CircuitOpenError
 from .ollama_client import OllamaClient
 
-__all__ = ["OllamaClient"]
+__all__ = ["CircuitOpenError", "OllamaClient"]
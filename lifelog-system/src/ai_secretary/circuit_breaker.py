@@ -0,0 +1,239 @@
+"""
+Circuit breaker for the shared Ollama endpoint.
+
+Ollama が落ちている・固まっている間に各記事で OLLAMA_TIMEOUT まで待ち続けないよう、
+連続失敗が閾値に達したら呼び出しを即座に失敗させる。
+遮断中はバックグラウンドで /api/tags をポーリングし、応答が戻れば自動で再開する。
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from datetime import UTC, datetime
+from typing import Any, Callable, Dict, Optional
+
+import requests
+
+from .ollama_transport import get_session
+
+logger = logging.getLogger(__name__)
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """ブレーカーが開いているため Ollama 呼び出しを行わなかったときの例外。"""
+
+
+def is_breaker_failure(exc: BaseException) -> bool:
+    """Ollama 側の障害とみなす例外か（4xx はリクエスト側の問題なので数えない）。"""
+    if isinstance(exc, requests.HTTPError):
+        response = exc.response
+        return response is None or response.status_code >= 500
+    return isinstance(exc, requests.RequestException)
+
+
+class CircuitBreaker:
+    """連続失敗で開き、ヘルスプローブの成功で閉じるブレーカー。"""
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        failure_threshold: int | None = None,
+        reset_timeout: float | None = None,
+        probe: Optional[Callable[[], bool]] = None,
+        probe_interval: float | None = None,
+    ) -> None:
+        self.name = name
+        self.failure_threshold = max(
+            1, failure_threshold or int(os.getenv("OLLAMA_BREAKER_THRESHOLD", "3"))
+        )
+        self.reset_timeout = (
+            reset_timeout
+            if reset_timeout is not None
+            else float(os.getenv("OLLAMA_BREAKER_RESET_SECONDS", "300"))
+        )
+        self.probe_interval = (
+            probe_interval
+            if probe_interval is not None
+            else float(os.getenv("OLLAMA_BREAKER_PROBE_SECONDS", "15"))
+        )
+        self._probe = probe
+        self._lock = threading.Lock()
+        self._state = STATE_CLOSED
+        self._consecutive_failures = 0
+        self._opened_at: Optional[float] = None
+        self._opened_at_iso: Optional[str] = None
+        self._last_error: Optional[str] = None
+        self._probe_thread: Optional[threading.Thread] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def is_open(self) -> bool:
+        """呼び出しを試みても即失敗する状態か（half-open の試行枠が空いていれば False）。"""
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == STATE_OPEN:
+                return True
+            return self._state == STATE_HALF_OPEN and self._trial_in_flight
+
+    def allow_request(self) -> bool:
+        """呼び出し可否を返す。half-open では 1 件だけ試行を許可する。"""
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == STATE_CLOSED:
+                return True
+            if self._state == STATE_HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def check(self) -> None:
+        """呼び出し不可なら CircuitOpenError を送出する。"""
+        if not self.allow_request():
+            raise CircuitOpenError(
+                f"Ollama circuit '{self.name}' is open"
+                f" (last_error={self._last_error or 'unknown'})"
+            )
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state != STATE_CLOSED:
+                logger.info("Ollama circuit '%s' closed", self.name)
+            self._state = STATE_CLOSED
+            self._consecutive_failures = 0
+            self._opened_at = None
+            self._opened_at_iso = None
+            self._trial_in_flight = False
+
+    def record_failure(self, exc: BaseException | None = None) -> None:
+        with self._lock:
+            self._last_error = str(exc) if exc else self._last_error
+            self._consecutive_failures += 1
+            self._trial_in_flight = False
+            should_open = (
+                self._state == STATE_HALF_OPEN
+                or self._consecutive_failures >= self.failure_threshold
+            )
+            if not should_open:
+                return
+            if self._state != STATE_OPEN:
+                logger.warning(
+                    "Ollama circuit '%s' opened after %d consecutive failure(s): %s",
+                    self.name,
+                    self._consecutive_failures,
+                    self._last_error,
+                )
+            self._state = STATE_OPEN
+            self._opened_at = time.monotonic()
+            self._opened_at_iso = datetime.now(UTC).isoformat()
+        self._start_probe()
+
+    def record_exception(self, exc: BaseException) -> None:
+        """呼び出し失敗を分類して記録する（Ollama 側の障害のみ失敗として数える）。"""
+        if is_breaker_failure(exc):
+            self.record_failure(exc)
+        else:
+            # 応答自体は返ってきているので、half-open の試行枠を解放して閉じる
+            self.record_success()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            self._maybe_half_open()
+            return {
+                "name": self.name,
+                "state": self._state,
+                "consecutive_failures": self._consecutive_failures,
+                "failure_threshold": self.failure_threshold,
+                "opened_at": self._opened_at_iso,
+                "last_error": self._last_error,
+            }
+
+    def reset(self) -> None:
+        self.record_success()
+        with self._lock:
+            self._last_error = None
+
+    def _maybe_half_open(self) -> None:
+        # プローブが無い・失敗し続けている場合でも reset_timeout 経過後は試行を許可する
+        if (
+            self._state == STATE_OPEN
+            and self._opened_at is not None
+            and time.monotonic() - self._opened_at >= self.reset_timeout
+        ):
+            self._state = STATE_HALF_OPEN
+            self._trial_in_flight = False
+
+    def _start_probe(self) -> None:
+        if self._probe is None:
+            return
+        with self._lock:
+            if self._probe_thread is not None and self._probe_thread.is_alive():
+                return
+            self._probe_thread = threading.Thread(
+                target=self._probe_loop, name=f"ollama-breaker-probe-{self.name}", daemon=True
+            )
+            self._probe_thread.start()
+
+    def _probe_loop(self) -> None:
+        while True:
+            time.sleep(self.probe_interval)
+            with self._lock:
+                if self._state == STATE_CLOSED:
+                    return
+            try:
+                healthy = bool(self._probe())
+            except Exception:  # noqa: BLE001
+                healthy = False
+            if healthy:
+                logger.info("Ollama circuit '%s' probe succeeded", self.name)
+                self.record_success()
+                return
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def _tags_probe(base_url: str) -> Callable[[], bool]:
+    def _probe() -> bool:
+        resp = get_session(base_url).get(f"{base_url}/api/tags", timeout=5)
+        return resp.status_code == 200
+
+    return _probe
+
+
+def get_breaker(base_url: str) -> CircuitBreaker:
+    """base_url ごとに共有するブレーカーを返す（Ollama インスタンス単位で状態を持つ）。"""
+    key = base_url.rstrip("/")
+    with _breakers_lock:
+        breaker = _breakers.get(key)
+        if breaker is None:
+            breaker = CircuitBreaker(key, probe=_tags_probe(key))
+            _breakers[key] = breaker
+        return breaker
+
+
+def breaker_snapshots() -> Dict[str, Dict[str, Any]]:
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.snapshot() for breaker in breakers}
+
+
+def reset_breakers() -> None:
+    """全ブレーカーを閉じて登録を破棄する（テスト・手動復旧用）。"""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+        _breakers.clear()
+    for breaker in breakers:
+        breaker.reset()
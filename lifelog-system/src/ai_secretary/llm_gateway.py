@@ -0,0 +1,205 @@
+"""
+Process-wide LLM request gateway.
+
+単一のローカル Ollama を chat / 分析パイプライン / 要約 worker / レポート生成で共有するため、
+優先度つきの待ち行列と同時実行数の上限でリクエストを調停する。
+
+優先度（小さいほど優先）:
+- INTERACTIVE: /api/chat などユーザーが応答を待っている呼び出し
+- ON_DEMAND:   ユーザー操作で起動したレポート生成
+- BACKGROUND:  スケジュール実行の worker
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+_SAMPLE_LIMIT = 200
+
+
+class LLMPriority(IntEnum):
+    INTERACTIVE = 0
+    ON_DEMAND = 1
+    BACKGROUND = 2
+
+
+# caller 名から既定の優先度を決める。未登録の caller は BACKGROUND 扱い。
+DEFAULT_CALLER_PRIORITIES: Dict[str, LLMPriority] = {
+    "chat_api": LLMPriority.INTERACTIVE,
+    "entry_ai_edit": LLMPriority.INTERACTIVE,
+    "news_generate_report": LLMPriority.ON_DEMAND,
+}
+
+_context_caller: ContextVar[Optional[str]] = ContextVar("llm_caller", default=None)
+_context_priority: ContextVar[Optional[LLMPriority]] = ContextVar("llm_priority", default=None)
+
+
+@contextmanager
+def llm_request_context(
+    *, caller: str | None = None, priority: LLMPriority | None = None
+) -> Iterator[None]:
+    """ブロック内の LLM 呼び出しに caller / 優先度を付与する（スレッド・タスク単位）。"""
+    caller_token = _context_caller.set(caller) if caller is not None else None
+    priority_token = _context_priority.set(priority) if priority is not None else None
+    try:
+        yield
+    finally:
+        if priority_token is not None:
+            _context_priority.reset(priority_token)
+        if caller_token is not None:
+            _context_caller.reset(caller_token)
+
+
+def current_caller() -> Optional[str]:
+    return _context_caller.get()
+
+
+def resolve_priority(caller: str, priority: LLMPriority | None = None) -> LLMPriority:
+    """明示指定 → llm_request_context → caller 既定値の順に優先度を決める。"""
+    if priority is not None:
+        return LLMPriority(priority)
+    context_priority = _context_priority.get()
+    if context_priority is not None:
+        return context_priority
+    return DEFAULT_CALLER_PRIORITIES.get(caller, LLMPriority.BACKGROUND)
+
+
+@dataclass
+class LLMTicket:
+    """待ち行列に入った 1 リクエスト。"""
+
+    caller: str
+    priority: LLMPriority
+    seq: int
+    enqueued_at: float = field(default_factory=time.monotonic)
+    started_at: Optional[float] = None
+    preempted: bool = False
+
+
+def _percentile(samples: deque[float], ratio: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(int(round(ratio * (len(ordered) - 1))), len(ordered) - 1)
+    return round(ordered[index], 3)
+
+
+class _CallerStats:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.preemptions = 0
+        self.wait_ms: deque[float] = deque(maxlen=_SAMPLE_LIMIT)
+        self.run_ms: deque[float] = deque(maxlen=_SAMPLE_LIMIT)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "preemptions": self.preemptions,
+            "avg_wait_ms": round(sum(self.wait_ms) / len(self.wait_ms), 3) if self.wait_ms else 0.0,
+            "p95_wait_ms": _percentile(self.wait_ms, 0.95),
+            "avg_run_ms": round(sum(self.run_ms) / len(self.run_ms), 3) if self.run_ms else 0.0,
+            "p95_run_ms": _percentile(self.run_ms, 0.95),
+        }
+
+
+class LLMGateway:
+    """優先度順に LLM 実行枠を払い出すスレッドセーフなゲートウェイ。"""
+
+    def __init__(self, max_concurrency: int | None = None) -> None:
+        self._cond = threading.Condition()
+        self._max_concurrency = max(
+            1, max_concurrency or int(os.getenv("OLLAMA_MAX_CONCURRENCY", "1"))
+        )
+        self._seq = itertools.count()
+        self._waiting: list[tuple[int, int, LLMTicket]] = []
+        self._active: Dict[int, LLMTicket] = {}
+        self._stats: Dict[str, _CallerStats] = {}
+
+    @property
+    def max_concurrency(self) -> int:
+        return self._max_concurrency
+
+    def configure(self, max_concurrency: int) -> None:
+        """同時実行数の上限を変更する。待機中のリクエストにも即時反映される。"""
+        with self._cond:
+            self._max_concurrency = max(1, int(max_concurrency))
+            self._cond.notify_all()
+
+    def acquire(self, caller: str, priority: LLMPriority | None = None) -> LLMTicket:
+        """実行枠が空き、かつ自分が待ち行列の先頭になるまでブロックする。"""
+        ticket = LLMTicket(
+            caller=caller, priority=resolve_priority(caller, priority), seq=next(self._seq)
+        )
+        with self._cond:
+            heapq.heappush(self._waiting, (int(ticket.priority), ticket.seq, ticket))
+            while not (len(self._active) < self._max_concurrency and self._waiting[0][2] is ticket):
+                self._cond.wait()
+            heapq.heappop(self._waiting)
+            ticket.started_at = time.monotonic()
+            self._active[ticket.seq] = ticket
+            # 後続の待機者も空き枠があれば進めるようにする
+            self._cond.notify_all()
+        return ticket
+
+    def release(self, ticket: LLMTicket) -> None:
+        finished_at = time.monotonic()
+        with self._cond:
+            self._active.pop(ticket.seq, None)
+            stats = self._stats.setdefault(ticket.caller, _CallerStats())
+            stats.calls += 1
+            stats.preemptions += int(ticket.preempted)
+            started_at = ticket.started_at or finished_at
+            stats.wait_ms.append((started_at - ticket.enqueued_at) * 1000)
+            stats.run_ms.append((finished_at - started_at) * 1000)
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, caller: str, priority: LLMPriority | None = None) -> Iterator[LLMTicket]:
+        """`with gateway.slot(caller):` の間だけ実行枠を保持する。"""
+        ticket = self.acquire(caller, priority)
+        try:
+            yield ticket
+        finally:
+            self.release(ticket)
+
+    def should_yield(self, ticket: LLMTicket) -> bool:
+        """より高い優先度のリクエストが枠待ちしていれば True（実行中の処理を譲るべき）。"""
+        with self._cond:
+            if not self._waiting or len(self._active) < self._max_concurrency:
+                return False
+            return self._waiting[0][0] < int(ticket.priority)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """caller ごとの待ち時間・実行時間と現在のキュー状態を返す。"""
+        with self._cond:
+            return {
+                "max_concurrency": self._max_concurrency,
+                "active": [
+                    {"caller": t.caller, "priority": t.priority.name} for t in self._active.values()
+                ],
+                "waiting": [
+                    {"caller": t.caller, "priority": t.priority.name}
+                    for _, _, t in sorted(self._waiting)
+                ],
+                "callers": {name: stats.to_dict() for name, stats in self._stats.items()},
+            }
+
+    def reset_stats(self) -> None:
+        with self._cond:
+            self._stats.clear()
+
+
+llm_gateway = LLMGateway()
@@ -0,0 +1,117 @@
+"""
+Per-stage model routing for the shared Ollama endpoint.
+
+全記事に走る Stage1 のスコアリング（triage）や毎時要約は小さく速いモデルで回し、
+深掘り調査や最終レポートだけ大きいモデルを使うため、ステージごとにモデルを切り替える。
+
+モデルの決まり方:
+    OllamaClient(model=...) の明示指定
+    → OLLAMA_MODEL_<STAGE>（例: OLLAMA_MODEL_TRIAGE）
+    → OLLAMA_MODEL
+    → 既定モデル
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional
+
+DEFAULT_MODEL = "qwen3.5:9b"
+
+STAGE_TRIAGE = "triage"
+STAGE_DEEP_RESEARCH = "deep_research"
+STAGE_REPORT = "report"
+STAGE_HOURLY_SUMMARY = "hourly_summary"
+
+_SAMPLE_LIMIT = 200
+
+_context_stage: ContextVar[Optional[str]] = ContextVar("llm_stage", default=None)
+
+
+@contextmanager
+def llm_stage(stage: str) -> Iterator[None]:
+    """ブロック内で生成する OllamaClient のステージ（＝使うモデル）を指定する。"""
+    token = _context_stage.set(stage)
+    try:
+        yield
+    finally:
+        _context_stage.reset(token)
+
+
+def current_stage() -> Optional[str]:
+    return _context_stage.get()
+
+
+def stage_env_var(stage: str) -> str:
+    return f"OLLAMA_MODEL_{stage.upper()}"
+
+
+def resolve_model(stage: str | None = None, model: str | None = None) -> str:
+    """明示指定 → ステージ別の環境変数 → OLLAMA_MODEL → 既定値の順にモデルを決める。"""
+    if model:
+        return model
+    stage = stage or current_stage()
+    if stage:
+        routed = os.getenv(stage_env_var(stage))
+        if routed:
+            return routed
+    return os.getenv("OLLAMA_MODEL", DEFAULT_MODEL)
+
+
+def _percentile(samples: deque[float], ratio: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(int(round(ratio * (len(ordered) - 1))), len(ordered) - 1)
+    return round(ordered[index], 3)
+
+
+class StageUsageRecorder:
+    """ステージごとの呼び出し回数・モデル内訳・レイテンシをスレッドセーフに集計する。"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._stages: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, stage: str, model: str, latency_ms: float, *, ok: bool = True) -> None:
+        with self._lock:
+            stats = self._stages.setdefault(
+                stage,
+                {
+                    "calls": 0,
+                    "errors": 0,
+                    "models": {},
+                    "total_ms": 0.0,
+                    "latency_ms": deque(maxlen=_SAMPLE_LIMIT),
+                },
+            )
+            stats["calls"] += 1
+            stats["errors"] += int(not ok)
+            stats["models"][model] = stats["models"].get(model, 0) + 1
+            stats["total_ms"] += latency_ms
+            stats["latency_ms"].append(latency_ms)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                stage: {
+                    "calls": stats["calls"],
+                    "errors": stats["errors"],
+                    "models": dict(stats["models"]),
+                    "total_seconds": round(stats["total_ms"] / 1000, 3),
+                    "avg_ms": round(stats["total_ms"] / max(stats["calls"], 1), 3),
+                    "p95_ms": _percentile(stats["latency_ms"], 0.95),
+                }
+                for stage, stats in self._stages.items()
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stages.clear()
+
+
+stage_usage = StageUsageRecorder()
@@ -10,13 +10,26 @@ from __future__ import annotations
 import json
 import logging
 import os
+import time
 from typing import Any, Dict, Optional
 
-import requests
+from .circuit_breaker import CircuitOpenError, get_breaker
+from .llm_gateway import LLMPriority, LLMTicket, current_caller, llm_gateway
+from .model_routing import current_stage, resolve_model, stage_usage
+from .ollama_transport import (
+    OllamaTimings,
+    get_session,
+    record_timings,
+    resolve_keep_alive,
+    warmup_model,
+)
 
 logger = logging.getLogger(__name__)
 server_logger = logging.getLogger("uvicorn.error")
 
+# 優先度の高いリクエストに譲って生成をやり直す回数の上限（バックグラウンド処理の飢餓防止）
+_MAX_PREEMPTIONS = 3
+
 
 class OllamaClient:
     """Minimal client for Ollama's /api/generate endpoint."""
@@ -26,15 +39,22 @@ class OllamaClient:
         base_url: str | None = None,
         model: str | None = None,
         timeout: int | None = None,
+        keep_alive: str | None = None,
     ) -> None:
         # 環境変数からbase_urlを取得、なければデフォルト値を使用
         self.base_url = (base_url or os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")).rstrip(
             "/"
         )
-        # 環境変数からモデルを取得、なければデフォルト値を使用
-        self.model = model or os.getenv("OLLAMA_MODEL", "qwen3.5:9b")
+        # 明示指定 → ステージ別の OLLAMA_MODEL_<STAGE> → OLLAMA_MODEL → デフォルト値
+        self.stage = current_stage()
+        self.model = resolve_model(self.stage, model)
         # 環境変数からタイムアウトを取得、なければデフォルト180秒
         self.timeout = timeout or int(os.getenv("OLLAMA_TIMEOUT", "180"))
+        # モデルをメモリに保持する時間（毎時ジョブ間のアンロードによるコールドロードを防ぐ）
+        self.keep_alive = resolve_keep_alive(keep_alive)
+        self.session = get_session(self.base_url)
+        self.breaker = get_breaker(self.base_url)
+        self.last_timings: Optional[OllamaTimings] = None
 
     def generate(
         self,
@@ -45,6 +65,7 @@ class OllamaClient:
         caller: str | None = None,
         purpose: str = "generate",
         context: Optional[Dict[str, Any]] = None,
+        priority: LLMPriority | None = None,
     ) -> str:
         """
         Call Ollama and return the concatenated response text.
@@ -53,8 +74,23 @@ class OllamaClient:
             prompt: user prompt
             system: system prompt
             options: model options (passed as-is)
+            priority: gateway priority (defaults to the caller's class)
+
+        Lower-priority calls stream through the shared LLM gateway and abort
+        their generation when a higher-priority request is waiting for a slot;
+        the prompt is then retried once the slot becomes free again. The check
+        runs once per streamed line, so a call cannot yield while Ollama is
+        still evaluating the prompt (before the first token arrives).
+
+        Raises:
+            CircuitOpenError: the shared circuit breaker for this Ollama
+                instance is open, so no request was sent.
         """
-        payload: Dict[str, Any] = {"model": self.model, "prompt": prompt}
+        payload: Dict[str, Any] = {
+            "model": self.model,
+            "prompt": prompt,
+            "keep_alive": self.keep_alive,
+        }
         if system:
             payload["system"] = system
         if options:
@@ -62,7 +98,9 @@ class OllamaClient:
 
         url = f"{self.base_url}/api/generate"
         logger.debug("Calling Ollama at %s", url)
-        effective_caller = caller or os.getenv("TIMELINE_LLM_CALLER", "lifelog_system")
+        effective_caller = (
+            caller or current_caller() or os.getenv("TIMELINE_LLM_CALLER", "lifelog_system")
+        )
         effective_purpose = os.getenv("TIMELINE_LLM_PURPOSE", purpose)
         log_payload: Dict[str, Any] = {
             "event": "llm_call",
@@ -77,20 +115,96 @@ class OllamaClient:
             "llm_call %s", json.dumps(log_payload, ensure_ascii=False, sort_keys=True)
         )
 
-        resp = requests.post(url, json=payload, stream=True, timeout=self.timeout)
+        stage = current_stage() or self.stage or "default"
+        started = time.perf_counter()
+        try:
+            text = self._generate_via_gateway(url, payload, effective_caller, priority)
+        except CircuitOpenError:
+            raise
+        except Exception:
+            stage_usage.record(stage, self.model, (time.perf_counter() - started) * 1000, ok=False)
+            raise
+        stage_usage.record(stage, self.model, (time.perf_counter() - started) * 1000)
+        return text
+
+    def _generate_via_gateway(
+        self,
+        url: str,
+        payload: Dict[str, Any],
+        caller: str,
+        priority: LLMPriority | None,
+    ) -> str:
+        for attempt in range(_MAX_PREEMPTIONS + 1):
+            self.breaker.check()
+            with llm_gateway.slot(caller, priority) as ticket:
+                allow_yield = (
+                    attempt < _MAX_PREEMPTIONS and ticket.priority > LLMPriority.INTERACTIVE
+                )
+                try:
+                    text = self._stream_generate(url, payload, ticket, caller, allow_yield)
+                except Exception as exc:
+                    self.breaker.record_exception(exc)
+                    raise
+                self.breaker.record_success()
+            if not ticket.preempted:
+                return text
+            logger.info(
+                "Yielded Ollama slot to higher-priority request (caller=%s, attempt=%d)",
+                caller,
+                attempt + 1,
+            )
+        return ""
+
+    def _stream_generate(
+        self,
+        url: str,
+        payload: Dict[str, Any],
+        ticket: LLMTicket,
+        caller: str,
+        allow_yield: bool,
+    ) -> str:
+        """
+        ストリーミングで生成し、本文を連結して返す.
+
+        allow_yield のときは行を受け取るたびに should_yield を見て、譲るべきなら接続を閉じて
+        ticket.preempted を立てる。最初のトークンが届くまで（プロンプト評価中）は行が来ないので
+        譲れない。
+        """
+        resp = self.session.post(url, json=payload, stream=True, timeout=self.timeout)
         resp.raise_for_status()
 
         output_parts: list[str] = []
-        for line in resp.iter_lines(decode_unicode=True):
-            if not line:
-                continue
-            try:
-                chunk = json.loads(line)
-            except json.JSONDecodeError:
-                continue
-            if "response" in chunk:
-                output_parts.append(chunk["response"])
-            if chunk.get("done"):
-                break
+        try:
+            for line in resp.iter_lines(decode_unicode=True):
+                if allow_yield and llm_gateway.should_yield(ticket):
+                    # 接続を閉じると Ollama 側の生成も打ち切られる
+                    ticket.preempted = True
+                    return ""
+                if not line:
+                    continue
+                try:
+                    chunk = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if "response" in chunk:
+                    output_parts.append(chunk["response"])
+                if chunk.get("done"):
+                    self.last_timings = record_timings(chunk, model=self.model, caller=caller)
+                    break
+        finally:
+            resp.close()
 
         return "".join(output_parts).strip()
+
+    def is_available(self) -> bool:
+        """ブレーカーが閉じていて呼び出しを試みられる状態か。"""
+        return not self.breaker.is_open()
+
+    def warmup(self) -> Optional[OllamaTimings]:
+        """モデルを事前ロードし、keep_alive の間メモリに保持させる。"""
+        return warmup_model(
+            self.base_url,
+            self.model,
+            keep_alive=self.keep_alive,
+            timeout=self.timeout,
+        )
@@ -0,0 +1,224 @@
+"""
+Shared HTTP layer for Ollama clients.
+
+lifelog-system の OllamaClient と timeline-app の OllamaClient が同じプロセス内で
+共有する接続プール・keep_alive 設定・生成タイミング統計をまとめる。
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, datetime
+from typing import Any, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_KEEP_ALIVE = "30m"
+# load_duration がこの値を超えたらモデルのコールドロードとみなす
+COLD_LOAD_THRESHOLD_MS = 500.0
+_POOL_MAXSIZE = 8
+_RECENT_LIMIT = 20
+
+_sessions: Dict[str, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(base_url: str) -> requests.Session:
+    """base_url ごとに共有する requests.Session を返す（TCP 接続を再利用する）。"""
+    key = base_url.rstrip("/")
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=_POOL_MAXSIZE)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _sessions[key] = session
+        return session
+
+
+def close_sessions() -> None:
+    """共有セッションをすべて閉じる（プロセス終了時・テスト用）。"""
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+
+def resolve_keep_alive(keep_alive: str | None = None) -> str:
+    """明示値 → OLLAMA_KEEP_ALIVE → 既定値の順に keep_alive を決める。"""
+    return keep_alive or os.getenv("OLLAMA_KEEP_ALIVE", DEFAULT_KEEP_ALIVE)
+
+
+def _ns_to_ms(value: Any) -> float:
+    try:
+        return round(float(value) / 1_000_000, 3)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+@dataclass
+class OllamaTimings:
+    """Ollama の最終チャンク（done=true）に含まれる処理時間。単位はミリ秒。"""
+
+    model: str
+    caller: str
+    total_ms: float = 0.0
+    load_ms: float = 0.0
+    prompt_eval_count: int = 0
+    prompt_eval_ms: float = 0.0
+    eval_count: int = 0
+    eval_ms: float = 0.0
+    recorded_at: str = field(default_factory=lambda: datetime.now(UTC).isoformat())
+
+    @property
+    def cold_start(self) -> bool:
+        return self.load_ms >= COLD_LOAD_THRESHOLD_MS
+
+    @property
+    def eval_tokens_per_second(self) -> float:
+        if self.eval_ms <= 0:
+            return 0.0
+        return round(self.eval_count / (self.eval_ms / 1000), 2)
+
+    def to_dict(self) -> Dict[str, Any]:
+        payload = asdict(self)
+        payload["cold_start"] = self.cold_start
+        payload["eval_tokens_per_second"] = self.eval_tokens_per_second
+        return payload
+
+
+def parse_timings(chunk: Dict[str, Any], *, model: str, caller: str) -> Optional[OllamaTimings]:
+    """最終チャンクからタイミング情報を取り出す。含まれていなければ None。"""
+    if not isinstance(chunk, dict) or "total_duration" not in chunk:
+        return None
+    return OllamaTimings(
+        model=str(chunk.get("model") or model),
+        caller=caller,
+        total_ms=_ns_to_ms(chunk.get("total_duration")),
+        load_ms=_ns_to_ms(chunk.get("load_duration")),
+        prompt_eval_count=int(chunk.get("prompt_eval_count") or 0),
+        prompt_eval_ms=_ns_to_ms(chunk.get("prompt_eval_duration")),
+        eval_count=int(chunk.get("eval_count") or 0),
+        eval_ms=_ns_to_ms(chunk.get("eval_duration")),
+    )
+
+
+class TimingRecorder:
+    """caller ごとの Ollama タイミング統計をスレッドセーフに集計する。"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._by_caller: Dict[str, Dict[str, Any]] = {}
+        self._recent: deque[OllamaTimings] = deque(maxlen=_RECENT_LIMIT)
+
+    def record(self, timings: OllamaTimings) -> None:
+        with self._lock:
+            stats = self._by_caller.setdefault(
+                timings.caller,
+                {
+                    "calls": 0,
+                    "cold_starts": 0,
+                    "load_ms_total": 0.0,
+                    "prompt_eval_ms_total": 0.0,
+                    "eval_ms_total": 0.0,
+                    "total_ms_total": 0.0,
+                },
+            )
+            stats["calls"] += 1
+            stats["cold_starts"] += int(timings.cold_start)
+            stats["load_ms_total"] += timings.load_ms
+            stats["prompt_eval_ms_total"] += timings.prompt_eval_ms
+            stats["eval_ms_total"] += timings.eval_ms
+            stats["total_ms_total"] += timings.total_ms
+            stats["last"] = timings.to_dict()
+            self._recent.append(timings)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """health 表示用に caller 別の平均値と直近の記録を返す。"""
+        with self._lock:
+            callers: Dict[str, Any] = {}
+            for caller, stats in self._by_caller.items():
+                calls = max(stats["calls"], 1)
+                callers[caller] = {
+                    "calls": stats["calls"],
+                    "cold_starts": stats["cold_starts"],
+                    "avg_load_ms": round(stats["load_ms_total"] / calls, 3),
+                    "avg_prompt_eval_ms": round(stats["prompt_eval_ms_total"] / calls, 3),
+                    "avg_eval_ms": round(stats["eval_ms_total"] / calls, 3),
+                    "avg_total_ms": round(stats["total_ms_total"] / calls, 3),
+                    "last": stats.get("last"),
+                }
+            return {
+                "callers": callers,
+                "recent": [item.to_dict() for item in self._recent],
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._by_caller.clear()
+            self._recent.clear()
+
+
+timing_recorder = TimingRecorder()
+
+
+def record_timings(chunk: Dict[str, Any], *, model: str, caller: str) -> Optional[OllamaTimings]:
+    """最終チャンクのタイミングを集計へ反映し、コールドロードを警告ログに残す。"""
+    timings = parse_timings(chunk, model=model, caller=caller)
+    if timings is None:
+        return None
+    timing_recorder.record(timings)
+    if timings.cold_start:
+        logger.warning(
+            "Ollama cold load detected: model=%s caller=%s load_ms=%.1f",
+            timings.model,
+            caller,
+            timings.load_ms,
+        )
+    return timings
+
+
+def warmup_model(
+    base_url: str,
+    model: str,
+    *,
+    keep_alive: str | None = None,
+    timeout: float = 180,
+    caller: str = "warmup",
+) -> Optional[OllamaTimings]:
+    """
+    空プロンプトで /api/generate を呼び、モデルをメモリへ載せておく.
+
+    Ollama は prompt が空の場合ロードだけ行って done を返す。
+    失敗しても呼び出し元を止めないよう例外は握りつぶしてログに残す。
+    """
+    payload = {
+        "model": model,
+        "prompt": "",
+        "stream": False,
+        "keep_alive": resolve_keep_alive(keep_alive),
+    }
+    try:
+        resp = get_session(base_url).post(
+            f"{base_url.rstrip('/')}/api/generate", json=payload, timeout=timeout
+        )
+        resp.raise_for_status()
+        body = resp.json()
+    except (requests.RequestException, ValueError) as exc:
+        logger.warning("Ollama warmup failed for model=%s: %s", model, exc)
+        return None
+    timings = record_timings(body, model=model, caller=caller)
+    logger.info(
+        "Ollama warmup completed: model=%s load_ms=%s",
+        model,
+        timings.load_ms if timings else "n/a",
+    )
+    return timings
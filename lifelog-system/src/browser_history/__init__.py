@@ -4,6 +4,13 @@ Browser history import module.
 This module provides functionality to import browser history from various browsers.
 """
 
-from .importer import BraveHistoryImporter
+from .importer import BraveHistoryImporter, BrowserHistoryImporter
+from .sources import BrowserSource, discover_profiles, register_browser
 
-__all__ = ["BraveHistoryImporter"]
+__all__ = [
+    "BraveHistoryImporter",
+    "BrowserHistoryImporter",
+    "BrowserSource",
+    "discover_profiles",
+    "register_browser",
+]
@@ -1,29 +1,96 @@
-"""Brave browser history importer."""
+"""
+Browser history importers.
+
+BraveHistoryImporter は Brave の History を 1 つ取り込む（手動インポート用）。
+BrowserHistoryImporter は登録済みの全ブラウザ・全プロファイル（sources.py）を
+並行して読み取り、1 つの writer でまとめて browser_history に書き込む。
+"""
 
 from __future__ import annotations
 
 import logging
-import shutil
+import queue
 import sqlite3
-from datetime import datetime, timezone
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional
 
 from .models import BrowserHistoryEntry
 from .repository import BrowserHistoryRepository
+from .sources import (
+    BATCH_SIZE,
+    CHROMIUM,
+    CHROMIUM_EPOCH,
+    BrowserProfile,
+    discover_profiles,
+    from_microseconds,
+    to_microseconds,
+)
 
 logger = logging.getLogger(__name__)
 
+# 読み取りスレッドの終了を writer に知らせる目印
+_DONE = object()
+
+
+def _is_lock_error(exc: Exception) -> bool:
+    return isinstance(exc, sqlite3.OperationalError) and "database is locked" in str(exc).lower()
 
-# Cloudflare challenge・読み込み中ページ等のノイズタイトルパターン
-_NOISE_TITLE_PATTERNS = (
-    "しばらくお待ちください",
-    "Just a moment",
-    "Attention Required",
-    "Please wait",
-    "Checking your browser",
-    "DDoS protection",
-)
+
+class HistoryBatchWriter:
+    """
+    履歴バッチの共有 writer
+
+    読み取ったバッチ（古い順）を browser_history にまとめて書き込み、インポート元
+    （履歴 DB のパス）ごとに追加件数と最新の訪問時刻を集計する。log_imports で
+    browser_import_log に記録した最新の訪問時刻が、次回のインポート元ごとの基準時刻になる。
+
+    DB ロックでバッチを書けなかったインポート元は、以降のバッチを書いても最新の訪問時刻を
+    進めない。基準時刻は途切れずに書き込めた範囲の末尾に留まり、次回そこから読み直す。
+    """
+
+    def __init__(self, repository: BrowserHistoryRepository):
+        self.repository = repository
+        self.counts: Dict[str, int] = {}
+        self.skipped: Dict[str, int] = {}
+        self._latest: Dict[str, datetime] = {}
+
+    def write(self, source_path: str, batch: List[BrowserHistoryEntry]) -> int:
+        """バッチを書き込み、新規に追加した件数を返す（DB ロックで書けなければ 0）"""
+        try:
+            added = self.repository.add_entries(batch)
+        except sqlite3.OperationalError as exc:
+            if _is_lock_error(exc):
+                logger.warning("Skipped %d browser history entries due DB lock", len(batch))
+                self.skipped[source_path] = self.skipped.get(source_path, 0) + len(batch)
+                return 0
+            raise
+
+        self.counts[source_path] = self.counts.get(source_path, 0) + added
+        # 重複でない行があったバッチのみ最新の訪問時刻を記録（書けなかったバッチより後は除く）
+        if added and source_path not in self.skipped:
+            newest = max(entry.visit_time for entry in batch)
+            if source_path not in self._latest or newest > self._latest[source_path]:
+                self._latest[source_path] = newest
+        return added
+
+    def log_imports(self) -> None:
+        """追加があったインポート元ごとにインポートログを記録"""
+        for source_path, count in self.counts.items():
+            if count <= 0:
+                continue
+            latest = self._latest.get(source_path)
+            try:
+                self.repository.log_import(
+                    source_path, count, latest.isoformat() if latest else None
+                )
+            except sqlite3.OperationalError as exc:
+                if _is_lock_error(exc):
+                    logger.warning("Skipped import log write due DB lock")
+                else:
+                    raise
 
 
 class BraveHistoryImporter:
@@ -55,9 +122,20 @@ class BraveHistoryImporter:
         Returns:
             Pythonのdatetimeオブジェクト
         """
-        # マイクロ秒を秒に変換し、Unixエポックからのオフセットを引く
-        unix_timestamp = (chromium_timestamp / 1_000_000) - BraveHistoryImporter.UNIX_EPOCH_OFFSET
-        return datetime.fromtimestamp(unix_timestamp, tz=timezone.utc)
+        return from_microseconds(chromium_timestamp, CHROMIUM_EPOCH)
+
+    @staticmethod
+    def datetime_to_chromium(value: datetime) -> int:
+        """
+        datetimeをChromiumタイムスタンプ（マイクロ秒）に変換
+
+        Args:
+            value: 変換する日時（naive は UTC とみなす）
+
+        Returns:
+            1601年1月1日からのマイクロ秒
+        """
+        return to_microseconds(value, CHROMIUM_EPOCH)
 
     def find_brave_history_path(self) -> Optional[Path]:
         """
@@ -101,9 +179,12 @@ class BraveHistoryImporter:
         """
         Brave履歴をインポート
 
+        Historyファイルはコピーせずに読み取り専用で開き、since 以降の訪問だけを
+        古い順に BATCH_SIZE 件ずつまとめて書き込む。
+
         Args:
             brave_history_path: Historyファイルのパス（Noneで自動検出）
-            limit: インポート件数上限
+            limit: インポート件数上限（古い方から数え、残りは次回のインポートで読む）
             since: この日時以降のみインポート
 
         Returns:
@@ -124,54 +205,34 @@ class BraveHistoryImporter:
             if not brave_history_path.exists():
                 raise FileNotFoundError(f"Brave History file not found: {brave_history_path}")
 
-        # 一時コピー作成（ブラウザ起動中のロック回避）
-        temp_copy = Path("/tmp/brave_history_temp.db")
-        try:
-            shutil.copy(brave_history_path, temp_copy)
-        except Exception as e:
-            raise IOError(f"Failed to copy History file: {e}") from e
+        writer = HistoryBatchWriter(self.repository)
+        source_path = str(brave_history_path)
+        for batch in self._iter_brave_history(brave_history_path, limit, since):
+            writer.write(source_path, batch)
+        writer.log_imports()
+        return writer.counts.get(source_path, 0)
 
-        try:
-            entries = self._read_brave_history(temp_copy, limit, since)
-            imported_count = 0
-            last_visit_time = None
-
-            for entry in entries:
-                try:
-                    added_entry = self.repository.add_entry(entry)
-                except sqlite3.OperationalError as exc:
-                    if "database is locked" in str(exc).lower():
-                        logger.warning("Skipped browser history entry due DB lock: %s", entry.url)
-                        continue
-                    raise
+    def _iter_brave_history(
+        self,
+        db_path: Path,
+        limit: Optional[int] = None,
+        since: Optional[datetime] = None,
+        batch_size: int = BATCH_SIZE,
+    ) -> Iterator[List[BrowserHistoryEntry]]:
+        """
+        Brave履歴データベースから履歴をバッチ単位で読み取る
 
-                # 重複でない場合のみカウント
-                if added_entry is not None:
-                    imported_count += 1
-
-                    # 最新の訪問時刻を記録
-                    if last_visit_time is None or entry.visit_time > last_visit_time:
-                        last_visit_time = entry.visit_time
-
-            # インポートログを記録
-            if imported_count > 0:
-                try:
-                    self.repository.log_import(
-                        str(brave_history_path),
-                        imported_count,
-                        last_visit_time.isoformat() if last_visit_time else None,
-                    )
-                except sqlite3.OperationalError as exc:
-                    if "database is locked" in str(exc).lower():
-                        logger.warning("Skipped import log write due DB lock")
-                    else:
-                        raise
-
-            return imported_count
+        Args:
+            db_path: 履歴データベースのパス（親ディレクトリ名をプロファイル名とする）
+            limit: 取得件数上限
+            since: この日時以降のみ取得
+            batch_size: 1 バッチの件数
 
-        finally:
-            # 一時ファイル削除
-            temp_copy.unlink(missing_ok=True)
+        Yields:
+            履歴エントリのリスト（古い順）
+        """
+        profile = db_path.parent.name
+        return CHROMIUM.iter_batches(db_path, "brave", profile, limit, since, batch_size)
 
     def _read_brave_history(
         self,
@@ -190,63 +251,115 @@ class BraveHistoryImporter:
         Returns:
             履歴エントリのリスト
         """
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-
-        # クエリ構築
-        query = """
-            SELECT
-                v.id as visit_id,
-                u.id as url_id,
-                u.url,
-                u.title,
-                v.visit_time,
-                v.transition,
-                u.visit_count
-            FROM visits v
-            JOIN urls u ON v.url = u.id
-            ORDER BY v.visit_time DESC
-        """
+        return [
+            entry for batch in self._iter_brave_history(db_path, limit, since) for entry in batch
+        ]
 
-        if limit:
-            query += f" LIMIT {limit}"
 
-        try:
-            cursor.execute(query)
-            rows = cursor.fetchall()
-        finally:
-            conn.close()
+class BrowserHistoryImporter:
+    """
+    複数ブラウザ・複数プロファイルの履歴インポーター
 
-        # データ変換
-        entries = []
-        for row in rows:
-            visit_id, url_id, url, title, visit_time, transition, visit_count = row
+    プロファイルごとに読み取りスレッドを割り当て、browser_import_log に記録した
+    プロファイルごとの最新の訪問時刻以降だけを読む。書き込みは呼び出し元スレッドの
+    HistoryBatchWriter 1 つに集約し、SQLite の書き込みロックを奪い合わないようにする。
+    """
 
-            # タイムスタンプ変換
-            dt = self.chromium_to_datetime(visit_time)
+    def __init__(
+        self,
+        repository: Optional[BrowserHistoryRepository] = None,
+        max_workers: int = 4,
+    ):
+        """
+        Args:
+            repository: BrowserHistoryRepositoryインスタンス
+            max_workers: 同時に読み取るプロファイル数
+        """
+        self.repository = repository or BrowserHistoryRepository()
+        self.max_workers = max(1, max_workers)
+        self.errors: Dict[str, str] = {}
 
-            # since フィルタ（since が naive なら UTC-aware に統一して比較）
-            if since:
-                since_aware = (
-                    since if since.tzinfo is not None else since.replace(tzinfo=timezone.utc)
-                )
-                if dt < since_aware:
-                    continue
+    def import_all(
+        self,
+        browsers: Optional[Iterable[str]] = None,
+        profiles: Optional[Iterable[BrowserProfile]] = None,
+        limit: Optional[int] = None,
+    ) -> Dict[str, int]:
+        """
+        全プロファイルの履歴を並行してインポート
 
-            # ノイズタイトルをスキップ（Cloudflare challenge / 読み込み中ページ等）
-            if title and any(p in title for p in _NOISE_TITLE_PATTERNS):
-                continue
+        読み取りに失敗したプロファイル、DB ロックでバッチを書けなかったプロファイルは
+        errors に記録する。どちらも基準時刻は途切れずに書き込めた範囲の末尾までしか進めず、
+        残りは次回のインポートで読み直す。
 
-            entry = BrowserHistoryEntry(
-                url=url,
-                title=title,
-                visit_time=dt,
-                visit_count=visit_count,
-                transition_type=transition,
-                brave_url_id=url_id,
-                brave_visit_id=visit_id,
-            )
+        Args:
+            browsers: 対象のブラウザ名（Noneで登録済みの全ブラウザ）
+            profiles: 対象のプロファイル（Noneで discover_profiles の結果）
+            limit: プロファイルごとのインポート件数上限（古い方から数える）
 
-            entries.append(entry)
+        Returns:
+            プロファイル（browser/profile）ごとのインポート件数
+        """
+        targets = list(profiles) if profiles is not None else discover_profiles(browsers)
+        self.errors = {}
+        if not targets:
+            return {}
+
+        writer = HistoryBatchWriter(self.repository)
+        batches: queue.Queue = queue.Queue(maxsize=self.max_workers * 2)
+        stop = threading.Event()
+        with ThreadPoolExecutor(
+            max_workers=min(self.max_workers, len(targets)),
+            thread_name_prefix="browser-history",
+        ) as pool:
+            for profile in targets:
+                pool.submit(self._read_profile, profile, limit, batches, stop)
+            try:
+                remaining = len(targets)
+                while remaining:
+                    item = batches.get()
+                    if item is _DONE:
+                        remaining -= 1
+                        continue
+                    profile, batch = item
+                    writer.write(str(profile.history_path), batch)
+            finally:
+                # writer が例外で抜けたときに読み取りスレッドを止める
+                stop.set()
+        writer.log_imports()
+        for profile in targets:
+            skipped = writer.skipped.get(str(profile.history_path))
+            if skipped:
+                self.errors.setdefault(profile.key, f"skipped {skipped} entries due to DB lock")
+        return {profile.key: writer.counts.get(str(profile.history_path), 0) for profile in targets}
+
+    def _read_profile(
+        self,
+        profile: BrowserProfile,
+        limit: Optional[int],
+        batches: queue.Queue,
+        stop: threading.Event,
+    ) -> None:
+        try:
+            since = self.repository.get_import_watermark(str(profile.history_path))
+            for batch in profile.engine.iter_batches(
+                profile.history_path, profile.browser, profile.profile, limit, since
+            ):
+                if not self._offer(batches, (profile, batch), stop):
+                    return
+        except (sqlite3.Error, OSError) as exc:
+            logger.warning("Failed to read browser history %s: %s", profile.history_path, exc)
+            self.errors[profile.key] = str(exc)
+        finally:
+            self._offer(batches, _DONE, stop)
 
-        return entries
+    @staticmethod
+    def _offer(batches: queue.Queue, item: object, stop: threading.Event) -> bool:
+        """writer が止まっていなければ item を渡す（止まっていれば False）"""
+        while not stop.is_set():
+            try:
+                batches.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
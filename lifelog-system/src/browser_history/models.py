@@ -19,10 +19,12 @@ class BrowserHistoryEntry:
         visit_count: 訪問回数（Braveの累積カウント）
         transition_type: 遷移タイプ（0=リンク、1=手入力、等）
         source_browser: ブラウザ種別（brave, chrome, firefox等）
-        brave_url_id: 元のurls.id（デバッグ用）
-        brave_visit_id: 元のvisits.id（デバッグ用）
+        source_profile: ブラウザのプロファイル名（Default, Profile 1 等）
+        brave_url_id: 元のurls.id（Firefox は moz_places.id。デバッグ用）
+        brave_visit_id: 元のvisits.id（Firefox は moz_historyvisits.id。重複排除に使う）
         id: データベースの主キー（保存後に設定）
         imported_at: インポート日時（保存後に設定）
+        domain: URL のドメイン（小文字・www. なし。保存後に設定）
     """
 
     url: str
@@ -31,10 +33,12 @@ class BrowserHistoryEntry:
     visit_count: int = 1
     transition_type: int = 0
     source_browser: str = "brave"
+    source_profile: str = "Default"
     brave_url_id: Optional[int] = None
     brave_visit_id: Optional[int] = None
     id: Optional[int] = None
     imported_at: Optional[datetime] = None
+    domain: Optional[str] = None
 
     def to_dict(self) -> dict:
         """辞書形式に変換（JSON出力用）"""
@@ -46,5 +50,7 @@ class BrowserHistoryEntry:
             "visit_count": self.visit_count,
             "transition_type": self.transition_type,
             "source_browser": self.source_browser,
+            "source_profile": self.source_profile,
+            "domain": self.domain,
             "imported_at": self.imported_at.isoformat() if self.imported_at else None,
         }
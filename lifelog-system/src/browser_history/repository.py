@@ -7,12 +7,49 @@ import sqlite3
 from contextlib import contextmanager
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Generator, List, Optional
+from typing import Generator, Iterable, List, Optional
+from urllib.parse import urlsplit
 
+from src.common import fts
+from src.common.change_counter import ensure_change_counter
 from src.common.db_mixin import SqliteLockRetryMixin, apply_wal_pragmas
+from src.common.epoch import ensure_epoch_ms_column, to_epoch_ms
 
 from .models import BrowserHistoryEntry
 
+# タイトル一致を URL 一致より重く評価する
+_RANK_WEIGHTS = {"title": 5.0, "url": 1.0}
+# ヒットがこの件数未満の語は「まれな語」とみなし、全文検索インデックスから候補を引く。
+# それ以上の語は新しい順に LIKE で走査してもすぐ件数が埋まるので、インデックス順の走査に任せる
+_SELECTIVE_HITS = 5000
+
+
+def extract_domain(url: Optional[str]) -> Optional[str]:
+    """URL からドメイン（小文字・www. なし）を取り出す。取り出せなければ None。"""
+    if not url:
+        return None
+    try:
+        host = urlsplit(url).hostname
+    except ValueError:
+        return None
+    if not host:
+        return None
+    host = host.lower().rstrip(".")
+    return host[4:] if host.startswith("www.") else host
+
+
+def _utc_ms(value: str) -> int:
+    """日付・日時の文字列を UTC epoch ミリ秒にする（visit_time と同じく naive は UTC とみなす）。"""
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return to_epoch_ms(parsed)
+
+
+def _end_of_day_ms(date: str) -> int:
+    """end_date（YYYY-MM-DD、その日を含む）の翌日 0 時の UTC epoch ミリ秒。"""
+    return _utc_ms(date[:10]) + 86_400_000
+
 
 class BrowserHistoryRepository(SqliteLockRetryMixin):
     """
@@ -54,74 +91,322 @@ class BrowserHistoryRepository(SqliteLockRetryMixin):
     def _ensure_tables(self) -> None:
         """テーブルを作成（存在しない場合）"""
         with self._connect() as conn:
-            # browser_historyテーブル
+            self._migrate_legacy_table(conn)
+            self._create_tables(conn)
+            self._ensure_visit_time_ms(conn)
+            # 締まった日のスナップショットの無効化判定用（保持期間の削除を数える）
+            ensure_change_counter(conn, "browser_visits", "visit_time_ms")
+            self._create_compat_view(conn)
+            fts.create_external_fts(conn, "browser_urls_fts", "browser_urls", ("title", "url"))
+
+            # browser_import_logテーブル
             conn.execute(
                 """
-                CREATE TABLE IF NOT EXISTS browser_history (
+                CREATE TABLE IF NOT EXISTS browser_import_log (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    url TEXT NOT NULL,
-                    title TEXT,
-                    visit_time TEXT NOT NULL,
-                    visit_count INTEGER DEFAULT 1,
-                    transition_type INTEGER,
-                    source_browser TEXT DEFAULT 'brave',
+                    source_path TEXT NOT NULL,
                     imported_at TEXT NOT NULL,
-                    brave_url_id INTEGER,
-                    brave_visit_id INTEGER
+                    record_count INTEGER,
+                    last_visit_time TEXT,
+                    status TEXT DEFAULT 'success'
                 )
                 """
             )
-
-            # インデックス作成
             conn.execute(
                 """
-                CREATE INDEX IF NOT EXISTS idx_browser_history_url
-                ON browser_history(url)
+                CREATE INDEX IF NOT EXISTS idx_import_log_source
+                ON browser_import_log(source_path)
                 """
             )
-            conn.execute(
-                """
-                CREATE INDEX IF NOT EXISTS idx_browser_history_visit_time
-                ON browser_history(visit_time DESC)
-                """
+
+            conn.commit()
+
+    @staticmethod
+    def _create_tables(conn: sqlite3.Connection) -> None:
+        """browser_urls / browser_visits とインデックスを作成（存在しない場合）"""
+        # URL ごとの情報（ディメンション）
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS browser_urls (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                url TEXT NOT NULL UNIQUE,
+                domain TEXT,
+                title TEXT,
+                visit_count INTEGER DEFAULT 1,
+                last_visit_time TEXT
             )
-            conn.execute(
-                """
-                CREATE INDEX IF NOT EXISTS idx_browser_history_title
-                ON browser_history(title)
-                """
+            """
+        )
+        # 訪問ごとの記録（ファクト）。URL とタイトルは url_id で引く
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS browser_visits (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                url_id INTEGER NOT NULL REFERENCES browser_urls(id),
+                visit_time TEXT NOT NULL,
+                transition_type INTEGER,
+                source_browser TEXT DEFAULT 'brave',
+                source_profile TEXT NOT NULL DEFAULT 'Default',
+                imported_at TEXT NOT NULL,
+                brave_url_id INTEGER,
+                brave_visit_id INTEGER
             )
+            """
+        )
+
+        # インデックス作成
+        conn.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_browser_urls_domain
+            ON browser_urls(domain)
+            """
+        )
+        conn.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_browser_visits_url_time
+            ON browser_visits(url_id, visit_time DESC)
+            """
+        )
+        # 重複排除用のユニークインデックス。visits.id はプロファイルごとの連番なので
+        # source_browser + source_profile + brave_visit_id で一意にする
+        conn.execute(
+            """
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_browser_visits_unique_profile_visit
+            ON browser_visits(source_browser, source_profile, brave_visit_id)
+            WHERE brave_visit_id IS NOT NULL
+            """
+        )
 
-            # 重複排除用のユニークインデックス（source_browser + brave_visit_id）
+    @staticmethod
+    def _ensure_visit_time_ms(conn: sqlite3.Connection) -> None:
+        """
+        visit_time の隣に UTC epoch ミリ秒の visit_time_ms を用意する.
+
+        期間の絞り込みと新しい順の走査は visit_time_ms + url_id の索引で行う
+        （TEXT の visit_time の索引は置き換える）。
+        """
+        ensure_epoch_ms_column(conn, "browser_visits", "visit_time", index=False)
+        conn.execute("DROP INDEX IF EXISTS idx_browser_visits_visit_time")
+        conn.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_browser_visits_visit_time_ms
+            ON browser_visits(visit_time_ms DESC, url_id)
+            """
+        )
+
+    @staticmethod
+    def _create_compat_view(conn: sqlite3.Connection) -> None:
+        """
+        正規化前の browser_history と同じ列を返す互換ビューを作成する.
+
+        既存の読み取り側（日次レポート、時間別サマリー、timeline の同期等）はこのビューを
+        そのまま読む。title と visit_count は URL ごとの最新値になる。
+        INSERT / DELETE は INSTEAD OF トリガーで正規化テーブルに振り分ける。
+        """
+        # visit_time_ms を持たない古いビューは作り直す（トリガーもビューと一緒に消える）
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(browser_history)")}
+        if columns and "visit_time_ms" not in columns:
+            conn.execute("DROP VIEW browser_history")
+        conn.execute(
+            """
+            CREATE VIEW IF NOT EXISTS browser_history AS
+            SELECT
+                v.id, u.url, u.title, v.visit_time, u.visit_count, v.transition_type,
+                v.source_browser, v.imported_at, v.brave_url_id, v.brave_visit_id,
+                u.domain, v.source_profile, v.url_id, v.visit_time_ms
+            FROM browser_visits v
+            JOIN browser_urls u ON u.id = v.url_id
+            """
+        )
+        conn.execute(
+            """
+            CREATE TRIGGER IF NOT EXISTS browser_history_insert
+            INSTEAD OF INSERT ON browser_history BEGIN
+                INSERT INTO browser_urls (url, domain, title, visit_count, last_visit_time)
+                VALUES (
+                    new.url, new.domain, new.title, COALESCE(new.visit_count, 1), new.visit_time
+                )
+                ON CONFLICT(url) DO UPDATE SET
+                    title = COALESCE(excluded.title, title),
+                    visit_count = excluded.visit_count,
+                    last_visit_time = excluded.last_visit_time
+                WHERE excluded.last_visit_time >= COALESCE(last_visit_time, '');
+                INSERT OR IGNORE INTO browser_visits (
+                    url_id, visit_time, transition_type, source_browser, source_profile,
+                    imported_at, brave_url_id, brave_visit_id
+                )
+                SELECT
+                    id, new.visit_time, new.transition_type,
+                    COALESCE(new.source_browser, 'brave'),
+                    COALESCE(new.source_profile, 'Default'),
+                    new.imported_at, new.brave_url_id, new.brave_visit_id
+                FROM browser_urls WHERE url = new.url;
+            END
+            """
+        )
+        conn.execute(
+            """
+            CREATE TRIGGER IF NOT EXISTS browser_history_delete
+            INSTEAD OF DELETE ON browser_history BEGIN
+                DELETE FROM browser_visits WHERE id = old.id;
+            END
+            """
+        )
+
+    def _migrate_legacy_table(self, conn: sqlite3.Connection) -> None:
+        """
+        訪問ごとに URL とタイトルを持つ旧 browser_history テーブルを正規化テーブルに移す.
+
+        visit id（browser_history.id）はそのまま引き継ぐ。URL ごとの title / visit_count は
+        最新の訪問の値とする。移行後に旧テーブルと旧全文検索インデックスを削除し、
+        同名の互換ビューに置き換える。
+        """
+        if not self._is_legacy_table(conn):
+            return
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # 別プロセスが先に移行した場合
+            if not self._is_legacy_table(conn):
+                conn.rollback()
+                return
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(browser_history)")}
+            profile = "source_profile" if "source_profile" in columns else "'Default'"
+            conn.create_function("extract_domain", 1, extract_domain, deterministic=True)
+            self._create_tables(conn)
+            # 集約関数 MAX と同じ行の title / visit_count が選ばれる（SQLite の bare column）
             conn.execute(
                 """
-                CREATE UNIQUE INDEX IF NOT EXISTS idx_browser_history_unique_visit
-                ON browser_history(source_browser, brave_visit_id)
-                WHERE brave_visit_id IS NOT NULL
+                INSERT INTO browser_urls (url, domain, title, visit_count, last_visit_time)
+                SELECT url, extract_domain(url), title, visit_count, MAX(visit_time)
+                FROM browser_history
+                GROUP BY url
                 """
             )
-
-            # browser_import_logテーブル
             conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS browser_import_log (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    source_path TEXT NOT NULL,
-                    imported_at TEXT NOT NULL,
-                    record_count INTEGER,
-                    last_visit_time TEXT,
-                    status TEXT DEFAULT 'success'
+                f"""
+                INSERT OR IGNORE INTO browser_visits (
+                    id, url_id, visit_time, transition_type, source_browser, source_profile,
+                    imported_at, brave_url_id, brave_visit_id
                 )
+                SELECT
+                    h.id, u.id, h.visit_time, h.transition_type,
+                    COALESCE(h.source_browser, 'brave'), COALESCE({profile}, 'Default'),
+                    h.imported_at, h.brave_url_id, h.brave_visit_id
+                FROM browser_history h
+                JOIN browser_urls u ON u.url = h.url
+                ORDER BY h.id
                 """
             )
+            conn.execute("DROP TABLE IF EXISTS browser_history_fts")
+            conn.execute("DROP TABLE browser_history")
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+
+    @staticmethod
+    def _is_legacy_table(conn: sqlite3.Connection) -> bool:
+        return (
             conn.execute(
-                """
-                CREATE INDEX IF NOT EXISTS idx_import_log_source
-                ON browser_import_log(source_path)
-                """
-            )
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'browser_history'"
+            ).fetchone()
+            is not None
+        )
 
-            conn.commit()
+    def has_fulltext_index(self) -> bool:
+        """browser_urls の全文検索インデックスが使えるかを返す。"""
+        cached = getattr(self, "_fulltext_available", None)
+        if cached is None:
+            with self._connect() as conn:
+                cached = fts.table_exists(conn, "browser_urls_fts")
+            self._fulltext_available = cached
+        return cached
+
+    def rebuild_fulltext_index(self) -> int:
+        """
+        全文検索インデックスを browser_urls から作り直す.
+
+        Returns:
+            インデックス対象の URL 数（インデックスが使えない場合は 0）
+        """
+        if not self.has_fulltext_index():
+            return 0
+
+        def _op() -> int:
+            with self._connect() as conn:
+                fts.rebuild_fts(conn, "browser_urls_fts")
+                conn.commit()
+                return conn.execute("SELECT COUNT(*) FROM browser_urls").fetchone()[0]
+
+        return self._run_with_lock_retry(_op)
+
+    @staticmethod
+    def _upsert_urls(conn: sqlite3.Connection, entries: List[BrowserHistoryEntry]) -> None:
+        """
+        エントリの URL を browser_urls に登録する.
+
+        既存の URL は、より新しい訪問のときだけ title / visit_count を更新する。
+        """
+        latest: dict = {}
+        for entry in entries:
+            current = latest.get(entry.url)
+            if current is None or entry.visit_time > current.visit_time:
+                latest[entry.url] = entry
+        rows = [
+            {
+                "url": entry.url,
+                "domain": extract_domain(entry.url),
+                "title": entry.title,
+                "visit_count": entry.visit_count,
+                "visit_time": entry.visit_time.isoformat(),
+            }
+            for entry in latest.values()
+        ]
+        conn.executemany(
+            """
+            INSERT OR IGNORE INTO browser_urls (url, domain, title, visit_count, last_visit_time)
+            VALUES (:url, :domain, :title, :visit_count, :visit_time)
+            """,
+            rows,
+        )
+        conn.executemany(
+            """
+            UPDATE browser_urls SET visit_count = :visit_count, last_visit_time = :visit_time
+            WHERE url = :url AND last_visit_time < :visit_time
+            """,
+            rows,
+        )
+        # title を SET すると全文検索インデックスの同期トリガーが動くので、変わったときだけ更新する
+        conn.executemany(
+            """
+            UPDATE browser_urls SET title = :title
+            WHERE url = :url AND last_visit_time = :visit_time
+              AND :title IS NOT NULL AND title IS NOT :title
+            """,
+            rows,
+        )
+
+    @staticmethod
+    def _visit_row(entry: BrowserHistoryEntry, imported_at: str) -> tuple:
+        return (
+            entry.visit_time.isoformat(),
+            entry.transition_type,
+            entry.source_browser,
+            entry.source_profile,
+            imported_at,
+            entry.brave_url_id,
+            entry.brave_visit_id,
+            entry.url,
+        )
+
+    # url_id は URL から引く（_upsert_urls の後に実行する）
+    _INSERT_VISIT_SQL = """
+        INSERT OR IGNORE INTO browser_visits (
+            url_id, visit_time, transition_type, source_browser, source_profile,
+            imported_at, brave_url_id, brave_visit_id
+        )
+        SELECT id, ?, ?, ?, ?, ?, ?, ? FROM browser_urls WHERE url = ?
+    """
 
     def add_entry(self, entry: BrowserHistoryEntry) -> Optional[BrowserHistoryEntry]:
         """
@@ -137,38 +422,68 @@ class BrowserHistoryRepository(SqliteLockRetryMixin):
 
         def _op() -> Optional[BrowserHistoryEntry]:
             with self._connect() as conn:
-                try:
-                    cursor = conn.execute(
-                        """
-                        INSERT INTO browser_history (
-                            url, title, visit_time, visit_count,
-                            transition_type, source_browser, imported_at,
-                            brave_url_id, brave_visit_id
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        """,
-                        (
-                            entry.url,
-                            entry.title,
-                            entry.visit_time.isoformat(),
-                            entry.visit_count,
-                            entry.transition_type,
-                            entry.source_browser,
-                            now,
-                            entry.brave_url_id,
-                            entry.brave_visit_id,
-                        ),
-                    )
-                    entry.id = cursor.lastrowid
-                    entry.imported_at = datetime.fromisoformat(now)
-                    conn.commit()
-                    return entry
-                except sqlite3.IntegrityError:
+                self._upsert_urls(conn, [entry])
+                cursor = conn.execute(self._INSERT_VISIT_SQL, self._visit_row(entry, now))
+                conn.commit()
+                if not cursor.rowcount:
                     # 重複エントリは無視
-                    conn.rollback()
                     return None
+                entry.id = cursor.lastrowid
+                entry.domain = extract_domain(entry.url)
+                entry.imported_at = datetime.fromisoformat(now)
+                return entry
 
         return self._run_with_lock_retry(_op)
 
+    def add_entries(self, entries: Iterable[BrowserHistoryEntry]) -> int:
+        """
+        履歴エントリをまとめて追加（重複は無視）
+
+        1 回の接続・1 トランザクションの executemany で書き込む。
+        戻り値のエントリに id は設定しない。
+
+        Args:
+            entries: 追加するエントリ
+
+        Returns:
+            新規に追加した件数
+        """
+        batch = list(entries)
+        if not batch:
+            return 0
+        now = datetime.now(timezone.utc).isoformat()
+
+        def _op() -> int:
+            with self._connect() as conn:
+                self._upsert_urls(conn, batch)
+                cursor = conn.executemany(
+                    self._INSERT_VISIT_SQL, [self._visit_row(entry, now) for entry in batch]
+                )
+                conn.commit()
+                return max(cursor.rowcount, 0)
+
+        return self._run_with_lock_retry(_op)
+
+    def get_latest_visit_time(self, source_browser: Optional[str] = None) -> Optional[datetime]:
+        """
+        取り込み済みの最新の訪問時刻を返す（差分インポートの基準時刻）
+
+        Args:
+            source_browser: ブラウザ種別で絞り込む（Noneで全体）
+
+        Returns:
+            最新の訪問時刻（履歴が無い場合None）
+        """
+        query = "SELECT visit_time FROM browser_visits"
+        params: list = []
+        if source_browser:
+            query += " WHERE source_browser = ?"
+            params.append(source_browser)
+        query += " ORDER BY visit_time_ms DESC LIMIT 1"
+        with self._connect() as conn:
+            row = conn.execute(query, params).fetchone()
+        return datetime.fromisoformat(row[0]) if row and row[0] else None
+
     def get_entry(self, entry_id: int) -> Optional[BrowserHistoryEntry]:
         """
         IDで履歴エントリを取得
@@ -193,6 +508,7 @@ class BrowserHistoryRepository(SqliteLockRetryMixin):
         end_date: Optional[str] = None,
         url_pattern: Optional[str] = None,
         limit: int = 100,
+        domain: Optional[str] = None,
     ) -> List[BrowserHistoryEntry]:
         """
         履歴を取得
@@ -200,8 +516,9 @@ class BrowserHistoryRepository(SqliteLockRetryMixin):
         Args:
             start_date: 開始日（YYYY-MM-DD形式）
             end_date: 終了日（YYYY-MM-DD形式）
-            url_pattern: URLパターン（LIKE検索）
+            url_pattern: URLパターン（部分一致。3 文字以上なら全文検索インデックスを使う）
             limit: 取得件数上限
+            domain: ドメインで絞り込む（www. の有無は区別しない）
 
         Returns:
             履歴エントリのリスト（新しい順）
@@ -209,19 +526,31 @@ class BrowserHistoryRepository(SqliteLockRetryMixin):
         query = "SELECT * FROM browser_history WHERE 1=1"
         params = []
 
+        if domain:
+            query += " AND domain = ?"
+            params.append(extract_domain(f"http://{domain}") or domain.lower())
+
         if start_date:
-            query += " AND visit_time >= ?"
-            params.append(start_date)
+            query += " AND visit_time_ms >= ?"
+            params.append(_utc_ms(start_date))
 
         if end_date:
-            query += " AND visit_time <= ?"
-            params.append(f"{end_date}T23:59:59")
+            query += " AND visit_time_ms < ?"
+            params.append(_end_of_day_ms(end_date))
 
         if url_pattern:
-            query += " AND url LIKE ?"
-            params.append(f"%{url_pattern}%")
+            match = fts.phrase(url_pattern, column="url")
+            if self._use_fulltext(url_pattern) and self._is_selective(match):
+                query += (
+                    " AND url_id IN (SELECT rowid FROM browser_urls_fts"
+                    " WHERE browser_urls_fts MATCH ?)"
+                )
+                params.append(match)
+            else:
+                query += " AND url LIKE ?"
+                params.append(f"%{url_pattern}%")
 
-        query += " ORDER BY visit_time DESC LIMIT ?"
+        query += " ORDER BY visit_time_ms DESC LIMIT ?"
         params.append(limit)
 
         with self._connect() as conn:
@@ -229,48 +558,192 @@ class BrowserHistoryRepository(SqliteLockRetryMixin):
 
         return [self._row_to_entry(row) for row in rows]
 
-    def search_history(self, query: str, limit: int = 50) -> List[BrowserHistoryEntry]:
+    def search_history(
+        self,
+        query: str,
+        limit: int = 50,
+        domain: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+    ) -> List[BrowserHistoryEntry]:
         """
         履歴を検索（URL/タイトル）
 
+        一致した履歴のうち新しい fts.RANK_WINDOW 件を候補とし、BM25（タイトル一致を優先）の
+        順に返す。候補は全文検索インデックスから引くが、ドメイン指定時にヒットの多い語は
+        domain インデックスを新しい順に走査する方が速いので LIKE で引く。
+
         Args:
             query: 検索クエリ
             limit: 取得件数上限
+            domain: ドメインで絞り込む
+            start_date: 開始日（YYYY-MM-DD形式）
+            end_date: 終了日（YYYY-MM-DD形式）
 
         Returns:
             マッチした履歴エントリのリスト
         """
+        match = fts.phrase(query)
+        use_fts = self._use_fulltext(query) and (domain is None or self._is_selective(match))
+        conditions = []
+        params: list = []
+
+        if use_fts:
+            # 一致する URL が多い語は、URL ごとの訪問を集めて並べ替えるより visit_time_ms の
+            # インデックスを新しい順に走査して窓が埋まれば止める方が速い（+ で url_id の索引を外す）
+            column = "h.url_id" if self._is_selective(match) else "+h.url_id"
+            conditions.append(
+                f"{column} IN (SELECT rowid FROM browser_urls_fts WHERE browser_urls_fts MATCH ?)"
+            )
+            params.append(match)
+        else:
+            conditions.append("(h.url LIKE ? OR h.title LIKE ?)")
+            params.extend([f"%{query}%", f"%{query}%"])
+
+        if domain:
+            conditions.append("h.domain = ?")
+            params.append(extract_domain(f"http://{domain}") or domain.lower())
+
+        if start_date:
+            conditions.append("h.visit_time_ms >= ?")
+            params.append(_utc_ms(start_date))
+
+        if end_date:
+            conditions.append("h.visit_time_ms < ?")
+            params.append(_end_of_day_ms(end_date))
+
+        where_clause = " AND ".join(conditions)
+        # 一致する URL（全文検索インデックスは URL 単位）の訪問を新しい順に窓の件数まで読む
+        sql = f"""
+            SELECT h.* FROM browser_history h
+            WHERE {where_clause}
+            ORDER BY h.visit_time_ms DESC
+            LIMIT ?
+        """
+        params.append(fts.RANK_WINDOW)
+
         with self._connect() as conn:
-            rows = conn.execute(
-                """
-                SELECT * FROM browser_history
-                WHERE url LIKE ? OR title LIKE ?
-                ORDER BY visit_time DESC
-                LIMIT ?
-                """,
-                (f"%{query}%", f"%{query}%", limit),
-            ).fetchall()
+            rows = conn.execute(sql, params).fetchall()
 
-        return [self._row_to_entry(row) for row in rows]
+        ranked = fts.rank_by_bm25(rows, query, _RANK_WEIGHTS)
+        return [self._row_to_entry(row) for row in ranked[:limit]]
+
+    def _is_selective(self, match: str) -> bool:
+        """MATCH する URL が _SELECTIVE_HITS 件未満か（インデックス未使用時は False）。"""
+        if not self.has_fulltext_index():
+            return False
+        with self._connect() as conn:
+            hits = fts.count_matches(conn, "browser_urls_fts", match, _SELECTIVE_HITS)
+        return hits < _SELECTIVE_HITS
+
+    def _use_fulltext(self, query: Optional[str]) -> bool:
+        # trigram は 3 文字未満の語を検索できないので LIKE に任せる
+        return fts.is_searchable(query) and self.has_fulltext_index()
 
     def delete_old_entries(self, before_date: str) -> int:
         """
         指定日時より古いエントリを削除
 
+        訪問が残っていない URL も browser_urls から削除する。
+
         Args:
             before_date: この日時より前のエントリを削除（YYYY-MM-DD形式）
 
         Returns:
             削除件数
         """
+
+        def _op() -> int:
+            with self._connect() as conn:
+                cursor = conn.execute(
+                    "DELETE FROM browser_visits WHERE visit_time_ms < ?", (_utc_ms(before_date),)
+                )
+                deleted_count = cursor.rowcount
+                conn.execute(
+                    """
+                    DELETE FROM browser_urls
+                    WHERE NOT EXISTS (
+                        SELECT 1 FROM browser_visits v WHERE v.url_id = browser_urls.id
+                    )
+                    """
+                )
+                conn.commit()
+                return deleted_count
+
+        return self._run_with_lock_retry(_op)
+
+    def count_by_domain(
+        self,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        limit: int = 20,
+    ) -> List[tuple]:
+        """
+        ドメイン別の訪問数を集計
+
+        期間指定時は visit_time_ms + url_id の索引だけで訪問を数え、ドメインは URL 表から引く。
+
+        Args:
+            start_date: 開始日（YYYY-MM-DD形式）
+            end_date: 終了日（YYYY-MM-DD形式）
+            limit: 取得件数上限
+
+        Returns:
+            (ドメイン, 訪問数) のリスト（訪問数の多い順）
+        """
+        where, params = self._date_range_clause(start_date, end_date)
         with self._connect() as conn:
-            cursor = conn.execute(
-                "DELETE FROM browser_history WHERE visit_time < ?", (before_date,)
-            )
-            deleted_count = cursor.rowcount
-            conn.commit()
+            rows = conn.execute(
+                f"""
+                SELECT u.domain, COUNT(*) AS visits
+                FROM browser_visits v
+                JOIN browser_urls u ON u.id = v.url_id
+                {where}
+                GROUP BY u.domain
+                ORDER BY visits DESC
+                LIMIT ?
+                """,
+                [*params, limit],
+            ).fetchall()
+        return [(row[0], row[1]) for row in rows]
+
+    def count_by_hour(self, date: str) -> List[tuple]:
+        """
+        指定日の時間帯別の訪問数を集計（visit_time の時刻で数える）
+
+        Args:
+            date: 日付（YYYY-MM-DD形式）
+
+        Returns:
+            (時 "HH", 訪問数) のリスト（時刻順、訪問の無い時間帯は含まない）
+        """
+        where, params = self._date_range_clause(date, date)
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"""
+                SELECT substr(visit_time, 12, 2) AS hour, COUNT(*)
+                FROM browser_visits
+                {where}
+                GROUP BY hour
+                ORDER BY hour
+                """,
+                params,
+            ).fetchall()
+        return [(row[0], row[1]) for row in rows]
 
-        return deleted_count
+    @staticmethod
+    def _date_range_clause(start_date: Optional[str], end_date: Optional[str]) -> tuple:
+        # list_history と同じ境界。visit_time_ms のインデックスで範囲を絞る
+        conditions = []
+        params: list = []
+        if start_date:
+            conditions.append("visit_time_ms >= ?")
+            params.append(_utc_ms(start_date))
+        if end_date:
+            conditions.append("visit_time_ms < ?")
+            params.append(_end_of_day_ms(end_date))
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return where, params
 
     def log_import(
         self, source_path: str, record_count: int, last_visit_time: Optional[str] = None
@@ -299,6 +772,26 @@ class BrowserHistoryRepository(SqliteLockRetryMixin):
 
         self._run_with_lock_retry(_op)
 
+    def get_import_watermark(self, source_path: str) -> Optional[datetime]:
+        """
+        インポート元ごとの最新の訪問時刻を返す（差分インポートの基準時刻）
+
+        Args:
+            source_path: インポート元パス（log_import に渡したもの）
+
+        Returns:
+            取り込み済みの最新の訪問時刻（インポート履歴が無い場合None）
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                """
+                SELECT MAX(last_visit_time) FROM browser_import_log
+                WHERE source_path = ? AND status = 'success'
+                """,
+                (source_path,),
+            ).fetchone()
+        return datetime.fromisoformat(row[0]) if row and row[0] else None
+
     def _row_to_entry(self, row: sqlite3.Row) -> BrowserHistoryEntry:
         """SQLiteの行をBrowserHistoryEntryに変換"""
         return BrowserHistoryEntry(
@@ -309,7 +802,9 @@ class BrowserHistoryRepository(SqliteLockRetryMixin):
             visit_count=row["visit_count"],
             transition_type=row["transition_type"],
             source_browser=row["source_browser"],
+            source_profile=row["source_profile"] if "source_profile" in row.keys() else "Default",
             brave_url_id=row["brave_url_id"],
             brave_visit_id=row["brave_visit_id"],
             imported_at=datetime.fromisoformat(row["imported_at"]),
+            domain=row["domain"] if "domain" in row.keys() else None,
         )
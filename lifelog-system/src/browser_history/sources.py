@@ -0,0 +1,328 @@
+"""
+ブラウザ履歴ソースのレジストリ
+
+ブラウザごとの履歴 DB の場所（ユーザーデータディレクトリ）と形式（エンジン）を登録し、
+見つかったプロファイルをすべて列挙する。エンジンは Chromium 系（History）と
+Firefox（places.sqlite）に対応し、履歴 DB から訪問をバッチ単位で読み取る。
+"""
+
+from __future__ import annotations
+
+import contextlib
+import logging
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+from .models import BrowserHistoryEntry
+
+logger = logging.getLogger(__name__)
+
+# Chromium タイムスタンプの起点（1601年1月1日 UTC）
+CHROMIUM_EPOCH = datetime(1601, 1, 1, tzinfo=timezone.utc)
+UNIX_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+# 履歴 DB から読み取り、まとめて書き込む件数
+BATCH_SIZE = 500
+
+# Cloudflare challenge・読み込み中ページ等のノイズタイトルパターン
+NOISE_TITLE_PATTERNS = (
+    "しばらくお待ちください",
+    "Just a moment",
+    "Attention Required",
+    "Please wait",
+    "Checking your browser",
+    "DDoS protection",
+)
+
+# プロファイルとして扱わない Chromium のユーザーデータ配下のディレクトリ
+_SKIP_PROFILE_DIRS = {"System Profile", "Guest Profile"}
+# WSL から見た Windows 側のユーザーディレクトリのうち、実ユーザーでないもの
+_SKIP_WINDOWS_USERS = {"All Users", "Default", "Default User", "Public"}
+
+
+def to_microseconds(value: datetime, epoch: datetime) -> int:
+    """epoch からのマイクロ秒に変換する（naive は UTC とみなす）。"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return (value - epoch) // timedelta(microseconds=1)
+
+
+def from_microseconds(microseconds: int, epoch: datetime) -> datetime:
+    """epoch からのマイクロ秒を UTC の datetime に変換する。"""
+    # float を経由するとマイクロ秒の桁が丸まるので timedelta で足す
+    return epoch + timedelta(microseconds=microseconds)
+
+
+def is_noise_title(title: Optional[str]) -> bool:
+    return bool(title) and any(pattern in title for pattern in NOISE_TITLE_PATTERNS)
+
+
+def open_history_db(db_path: Path) -> sqlite3.Connection:
+    """
+    ブラウザの履歴 DB を読み取り専用で開く.
+
+    ブラウザ起動中はファイルがロックされているため、まず immutable=1 で
+    ロックもジャーナルも見ずに直接読む（コピー不要）。開けない場合は
+    オンラインバックアップ API でメモリ上に複製して読む。
+    """
+    uri = db_path.resolve().as_uri()
+    conn = sqlite3.connect(f"{uri}?mode=ro&immutable=1", uri=True)
+    try:
+        conn.execute("SELECT 1 FROM sqlite_master LIMIT 1")
+        return conn
+    except sqlite3.DatabaseError as exc:
+        conn.close()
+        logger.debug("Falling back to backup API for %s: %s", db_path, exc)
+
+    memory = sqlite3.connect(":memory:")
+    try:
+        with contextlib.closing(sqlite3.connect(f"{uri}?mode=ro", uri=True)) as source:
+            source.backup(memory)
+    except sqlite3.Error:
+        memory.close()
+        raise
+    return memory
+
+
+@dataclass(frozen=True)
+class HistoryEngine:
+    """
+    履歴 DB の形式
+
+    Attributes:
+        name: エンジン名（chromium, firefox）
+        history_file: プロファイルディレクトリ内の履歴 DB のファイル名
+        visits_query: 訪問を読み取る SELECT（WHERE / ORDER BY は付けない）
+        time_column: 訪問時刻の列（インデックスのある列）
+        epoch: 訪問時刻（マイクロ秒）の起点
+    """
+
+    name: str
+    history_file: str
+    visits_query: str
+    time_column: str
+    epoch: datetime
+
+    def iter_batches(
+        self,
+        db_path: Path,
+        source_browser: str,
+        source_profile: str,
+        limit: Optional[int] = None,
+        since: Optional[datetime] = None,
+        batch_size: int = BATCH_SIZE,
+    ) -> Iterator[List[BrowserHistoryEntry]]:
+        """
+        履歴 DB から訪問をバッチ単位で読み取る.
+
+        since は訪問時刻のインデックスで絞り込むので、新しい訪問が無ければ
+        1 行も読まずに終わる。ノイズタイトルの訪問は除く。古い順に読むので、途中で
+        止まったり limit で打ち切ったりしても、取り込めたのは since から途切れない範囲になる。
+
+        Yields:
+            履歴エントリのリスト（古い順）
+        """
+        query = self.visits_query
+        params: list = []
+        if since:
+            query += f" WHERE {self.time_column} >= ?"
+            params.append(to_microseconds(since, self.epoch))
+        query += f" ORDER BY {self.time_column}"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        with contextlib.closing(open_history_db(db_path)) as conn:
+            cursor = conn.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                batch = [
+                    BrowserHistoryEntry(
+                        url=url,
+                        title=title,
+                        visit_time=from_microseconds(visit_time, self.epoch),
+                        visit_count=visit_count or 1,
+                        transition_type=transition,
+                        source_browser=source_browser,
+                        source_profile=source_profile,
+                        brave_url_id=url_id,
+                        brave_visit_id=visit_id,
+                    )
+                    for visit_id, url_id, url, title, visit_time, transition, visit_count in rows
+                    if not is_noise_title(title)
+                ]
+                if batch:
+                    yield batch
+
+
+CHROMIUM = HistoryEngine(
+    name="chromium",
+    history_file="History",
+    visits_query="""
+        SELECT v.id, u.id, u.url, u.title, v.visit_time, v.transition, u.visit_count
+        FROM visits v
+        JOIN urls u ON v.url = u.id
+    """,
+    time_column="v.visit_time",
+    epoch=CHROMIUM_EPOCH,
+)
+
+# Firefox の visit_type は Chromium の transition と値の意味が異なる（そのまま保存する）
+FIREFOX = HistoryEngine(
+    name="firefox",
+    history_file="places.sqlite",
+    visits_query="""
+        SELECT v.id, p.id, p.url, p.title, v.visit_date, v.visit_type, p.visit_count
+        FROM moz_historyvisits v
+        JOIN moz_places p ON v.place_id = p.id
+    """,
+    time_column="v.visit_date",
+    epoch=UNIX_EPOCH,
+)
+
+
+@dataclass(frozen=True)
+class BrowserSource:
+    """
+    登録済みのブラウザ
+
+    Attributes:
+        name: source_browser として保存する名前
+        engine: 履歴 DB の形式
+        data_dirs: ホームディレクトリからのユーザーデータディレクトリの相対パス候補
+    """
+
+    name: str
+    engine: HistoryEngine
+    data_dirs: Sequence[str]
+
+
+@dataclass(frozen=True)
+class BrowserProfile:
+    """見つかったプロファイル（履歴 DB 1 つ）"""
+
+    browser: str
+    profile: str
+    history_path: Path
+    engine: HistoryEngine
+
+    @property
+    def key(self) -> str:
+        return f"{self.browser}/{self.profile}"
+
+
+BROWSER_SOURCES: Dict[str, BrowserSource] = {}
+
+
+def register_browser(source: BrowserSource) -> None:
+    """ブラウザを登録する（同名は上書き）。"""
+    BROWSER_SOURCES[source.name] = source
+
+
+for _source in (
+    BrowserSource(
+        "brave",
+        CHROMIUM,
+        (
+            "AppData/Local/BraveSoftware/Brave-Browser/User Data",
+            ".config/BraveSoftware/Brave-Browser",
+            "Library/Application Support/BraveSoftware/Brave-Browser",
+        ),
+    ),
+    BrowserSource(
+        "chrome",
+        CHROMIUM,
+        (
+            "AppData/Local/Google/Chrome/User Data",
+            ".config/google-chrome",
+            "Library/Application Support/Google/Chrome",
+        ),
+    ),
+    BrowserSource(
+        "chromium",
+        CHROMIUM,
+        (
+            "AppData/Local/Chromium/User Data",
+            ".config/chromium",
+            "Library/Application Support/Chromium",
+        ),
+    ),
+    BrowserSource(
+        "edge",
+        CHROMIUM,
+        (
+            "AppData/Local/Microsoft/Edge/User Data",
+            ".config/microsoft-edge",
+            "Library/Application Support/Microsoft Edge",
+        ),
+    ),
+    BrowserSource(
+        "firefox",
+        FIREFOX,
+        (
+            "AppData/Roaming/Mozilla/Firefox/Profiles",
+            ".mozilla/firefox",
+            "Library/Application Support/Firefox/Profiles",
+        ),
+    ),
+):
+    register_browser(_source)
+
+
+def default_home_dirs() -> List[Path]:
+    """履歴を探すホームディレクトリ（自分のホームと、WSL から見た Windows 側のユーザー）"""
+    homes = [Path.home()]
+    wsl_users = Path("/mnt/c/Users")
+    if wsl_users.exists():
+        homes.extend(
+            user_dir
+            for user_dir in sorted(wsl_users.iterdir())
+            if user_dir.name not in _SKIP_WINDOWS_USERS and user_dir.is_dir()
+        )
+    return homes
+
+
+def discover_profiles(
+    browsers: Optional[Iterable[str]] = None,
+    home_dirs: Optional[Iterable[Path]] = None,
+) -> List[BrowserProfile]:
+    """
+    登録済みブラウザの全プロファイルを列挙する.
+
+    Args:
+        browsers: 対象のブラウザ名（Noneで登録済みの全ブラウザ）
+        home_dirs: 探すホームディレクトリ（Noneで default_home_dirs）
+
+    Returns:
+        履歴 DB が存在するプロファイルのリスト
+    """
+    names = list(browsers) if browsers is not None else list(BROWSER_SOURCES)
+    homes = list(home_dirs) if home_dirs is not None else default_home_dirs()
+    profiles: List[BrowserProfile] = []
+    seen: set = set()
+    for name in names:
+        source = BROWSER_SOURCES.get(name)
+        if source is None:
+            logger.warning("Unknown browser source: %s", name)
+            continue
+        for home in homes:
+            for data_dir in source.data_dirs:
+                root = home / data_dir
+                if not root.is_dir():
+                    continue
+                for profile_dir in sorted(root.iterdir()):
+                    history_path = profile_dir / source.engine.history_file
+                    if profile_dir.name in _SKIP_PROFILE_DIRS or not history_path.is_file():
+                        continue
+                    resolved = history_path.resolve()
+                    if resolved in seen:
+                        continue
+                    seen.add(resolved)
+                    profiles.append(
+                        BrowserProfile(name, profile_dir.name, history_path, source.engine)
+                    )
+    return profiles
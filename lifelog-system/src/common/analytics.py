@@ -0,0 +1,165 @@
+"""
+lifelog.db と ai_secretary.db を横断する読み取り専用の分析用接続
+
+両 DB を読み取り専用で ATTACH した接続を作り、DB をまたぐ TEMP ビューを定義する。
+活動とブラウジングの突き合わせや時間別の集計を、接続を分けて Python で結合せずに
+SQLite の 1 回のクエリで行える。スキーマ名を付けないテーブル名は ATTACH した DB から
+解決されるので、どちらかの DB 用のクエリもそのまま実行できる。
+
+ビュー（時刻はいずれもローカル時刻の "YYYY-MM-DD HH:00" を hour 列に持つ）:
+- activity_by_hour : 活動インターバル 1 件 = 1 行（開始時刻の時間帯に数える）
+- browsing_by_hour : ブラウザの訪問 1 件 = 1 行（visit_time は UTC）
+- hourly_overview  : 時間帯ごとの活動時間とブラウジング件数（全期間）
+"""
+
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Generator, Optional
+
+from src.common.epoch import to_epoch_ms
+
+LIFELOG_SCHEMA = "lifelog"
+INFO_SCHEMA = "info"
+
+_VIEWS_SQL = """
+CREATE TEMP VIEW activity_by_hour AS
+SELECT
+    i.start_ts,
+    i.start_ts_ms,
+    i.end_ts,
+    -- lifelog の時刻はローカル時刻。オフセット付きでも壁時計の値で時間帯を決める
+    strftime('%Y-%m-%d %H:00', substr(i.start_ts, 1, 19)) AS hour,
+    a.process_name,
+    i.domain,
+    i.is_idle,
+    COALESCE(i.duration_seconds, 0) AS duration_seconds
+FROM lifelog.activity_intervals i
+JOIN lifelog.apps a ON a.app_id = i.app_id;
+
+CREATE TEMP VIEW browsing_by_hour AS
+SELECT
+    v.visit_time,
+    v.visit_time_ms,
+    strftime('%Y-%m-%d %H:00', v.visit_time, 'localtime') AS hour,
+    u.url,
+    u.domain,
+    u.title,
+    v.source_browser,
+    v.source_profile
+FROM info.browser_visits v
+JOIN info.browser_urls u ON u.id = v.url_id;
+"""
+
+_HOURLY_OVERVIEW_SQL = """
+WITH activity AS (
+    SELECT
+        hour,
+        SUM(CASE WHEN is_idle THEN 0 ELSE duration_seconds END) AS active_seconds,
+        SUM(CASE WHEN is_idle THEN duration_seconds ELSE 0 END) AS idle_seconds,
+        COUNT(*) AS intervals
+    FROM activity_by_hour
+    {activity_where}
+    GROUP BY hour
+),
+browsing AS (
+    SELECT
+        hour,
+        COUNT(*) AS visits,
+        COUNT(DISTINCT url) AS urls,
+        COUNT(DISTINCT domain) AS domains
+    FROM browsing_by_hour
+    {browsing_where}
+    GROUP BY hour
+),
+hours AS (
+    SELECT hour FROM activity
+    UNION
+    SELECT hour FROM browsing
+)
+SELECT
+    h.hour,
+    COALESCE(a.active_seconds, 0) AS active_seconds,
+    COALESCE(a.idle_seconds, 0) AS idle_seconds,
+    COALESCE(a.intervals, 0) AS intervals,
+    COALESCE(b.visits, 0) AS visits,
+    COALESCE(b.urls, 0) AS urls,
+    COALESCE(b.domains, 0) AS domains
+FROM hours h
+LEFT JOIN activity a ON a.hour = h.hour
+LEFT JOIN browsing b ON b.hour = h.hour
+"""
+
+
+def _read_only_uri(db_path: Path) -> str:
+    return f"{Path(db_path).resolve().as_uri()}?mode=ro"
+
+
+def connect_analytics(lifelog_db_path: Path, info_db_path: Path) -> sqlite3.Connection:
+    """
+    両 DB を読み取り専用で ATTACH した接続を開く.
+
+    lifelog.db は "lifelog"、ai_secretary.db は "info" のスキーマ名で参照できる。
+    接続は query_only で、書き込みは失敗する。
+
+    Raises:
+        sqlite3.OperationalError: どちらかの DB が開けない場合
+    """
+    conn = sqlite3.connect("file::memory:", uri=True, timeout=30.0)
+    try:
+        conn.execute(f"ATTACH DATABASE ? AS {LIFELOG_SCHEMA}", (_read_only_uri(lifelog_db_path),))
+        conn.execute(f"ATTACH DATABASE ? AS {INFO_SCHEMA}", (_read_only_uri(info_db_path),))
+        conn.executescript(_VIEWS_SQL)
+        overview = _HOURLY_OVERVIEW_SQL.format(activity_where="", browsing_where="")
+        conn.execute(f"CREATE TEMP VIEW hourly_overview AS {overview}")
+        conn.execute("PRAGMA query_only = ON")
+    except sqlite3.Error:
+        conn.close()
+        raise
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+@contextmanager
+def analytics_connection(
+    lifelog_db_path: Path, info_db_path: Path
+) -> Generator[sqlite3.Connection, None, None]:
+    """connect_analytics の接続を開いて閉じるコンテキストマネージャ。"""
+    conn = connect_analytics(lifelog_db_path, info_db_path)
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+def hourly_overview(
+    conn: sqlite3.Connection,
+    start: datetime,
+    end: Optional[datetime] = None,
+) -> list[dict[str, Any]]:
+    """
+    [start, end) の時間帯ごとの活動時間とブラウジング件数を返す.
+
+    hourly_overview ビューと同じ集計を、活動は start_ts_ms、訪問は visit_time_ms の
+    インデックスで範囲を絞ってから行う（どちらも UTC epoch ミリ秒なので境界は共通）。
+
+    Args:
+        conn: connect_analytics の接続
+        start: 開始時刻（naive はローカル時刻とみなす）
+        end: 終了時刻（Noneで現在時刻）
+
+    Returns:
+        hour の昇順の辞書リスト（hour, active_seconds, idle_seconds, intervals,
+        visits, urls, domains）
+    """
+    end = end or datetime.now()
+    sql = _HOURLY_OVERVIEW_SQL.format(
+        activity_where="WHERE start_ts_ms >= :start AND start_ts_ms < :end",
+        browsing_where="WHERE visit_time_ms >= :start AND visit_time_ms < :end",
+    )
+    rows = conn.execute(
+        sql + " ORDER BY h.hour",
+        {"start": to_epoch_ms(start), "end": to_epoch_ms(end)},
+    ).fetchall()
+    return [dict(row) for row in rows]
@@ -0,0 +1,102 @@
+"""
+テーブル・日付ごとの更新・削除カウンタ
+
+table_changes テーブルに（テーブル, 日付）ごとの行を持ち、既存行の UPDATE / DELETE のたびに
+トリガーがその行の日付（UPDATE は変更前後の両方）の値を 1 増やす。追加は MAX(id) で追えるが、
+書き換えや削除は ID に現れないので、キャッシュの有効性（DailyReportDataAggregator の
+スナップショット）は対象日のカウンタの変化で判定する。ほかの日の行の変更は影響しない。
+
+日付は取得側の絞り込みと同じ規則で決める。_ms 列（UTC epoch ミリ秒）はローカル時刻の日付、
+ISO 形式の列は先頭 10 文字。
+
+トリガーが見る列には日付の列以外の <列名>_ms を含めない。_ms 列はトリガーが INSERT 直後に
+埋めるので、含めると追加のたびに数えてしまう。日付の列が _ms 列なら、変更前が NULL の
+更新（INSERT 直後の埋め込み）は数えない。
+"""
+
+import sqlite3
+
+_COUNTER_TABLE = "table_changes"
+
+
+def _ensure_trigger(conn: sqlite3.Connection, name: str, sql: str) -> None:
+    """name のトリガーが sql と異なれば作り直す（列が増えたテーブルに追従する）。"""
+    row = conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = ?", (name,)
+    ).fetchone()
+    if row is not None and row[0] == sql:
+        return
+    conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+    conn.execute(sql)
+
+
+def _ensure_counter_table(conn: sqlite3.Connection) -> None:
+    """カウンタ表を用意する（テーブル単位だった旧形式は作り直す）。"""
+    columns = {row[1] for row in conn.execute(f"PRAGMA table_info({_COUNTER_TABLE})")}
+    if columns and "day" not in columns:
+        # 旧形式の累計はどの日にも対応しない。保存済みのスナップショットは一度だけ作り直される
+        conn.execute(f"DROP TABLE {_COUNTER_TABLE}")
+    conn.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {_COUNTER_TABLE} (
+            name TEXT NOT NULL,
+            day TEXT NOT NULL,
+            value INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (name, day)
+        ) WITHOUT ROWID
+        """
+    )
+
+
+def _day_sql(expr: str, day_column: str) -> str:
+    """day_column の値 expr をカウンタの日付（YYYY-MM-DD）にする SQL 式。"""
+    if day_column.endswith("_ms"):
+        return f"date({expr} / 1000, 'unixepoch', 'localtime')"
+    return f"substr({expr}, 1, 10)"
+
+
+def _bump_sql(table: str, days: list[str]) -> str:
+    """days の日付（NULL は除く）のカウンタを 1 増やす文。"""
+    selects = " UNION ".join(f"SELECT {day} AS day" for day in days)
+    return (
+        f"INSERT INTO {_COUNTER_TABLE} (name, day, value) "
+        f"SELECT '{table}', day, 1 FROM ({selects}) WHERE day IS NOT NULL "
+        f"ON CONFLICT (name, day) DO UPDATE SET value = value + 1;"
+    )
+
+
+def ensure_change_counter(conn: sqlite3.Connection, table: str, day_column: str) -> None:
+    """table の UPDATE / DELETE を day_column の日付ごとに数えるカウンタとトリガーを用意する。"""
+    _ensure_counter_table(conn)
+
+    columns = [
+        row[1]
+        for row in conn.execute(f"PRAGMA table_info({table})")
+        if row[1] == day_column or not row[1].endswith("_ms")
+    ]
+    old_day = _day_sql(f"old.{day_column}", day_column)
+    new_day = _day_sql(f"new.{day_column}", day_column)
+    when = f"WHEN old.{day_column} IS NOT NULL " if day_column.endswith("_ms") else ""
+    _ensure_trigger(
+        conn,
+        f"{table}_changes_au",
+        f"CREATE TRIGGER {table}_changes_au AFTER UPDATE OF {', '.join(columns)} ON {table} "
+        f"{when}BEGIN {_bump_sql(table, [old_day, new_day])} END",
+    )
+    _ensure_trigger(
+        conn,
+        f"{table}_changes_ad",
+        f"CREATE TRIGGER {table}_changes_ad AFTER DELETE ON {table} "
+        f"BEGIN {_bump_sql(table, [old_day])} END",
+    )
+
+
+def change_count(conn: sqlite3.Connection, table: str, day: str) -> int:
+    """table の day（YYYY-MM-DD）の行の UPDATE / DELETE の累計回数（カウンタが無ければ 0）。"""
+    try:
+        row = conn.execute(
+            f"SELECT value FROM {_COUNTER_TABLE} WHERE name = ? AND day = ?", (table, day)
+        ).fetchone()
+    except sqlite3.OperationalError:
+        return 0
+    return int(row[0]) if row else 0
@@ -0,0 +1,82 @@
+"""
+UTC epoch ミリ秒の時刻列
+
+時刻列は ISO 形式の TEXT で、naive なローカル時刻・+00:00 / Z 付き・マイクロ秒の有無が
+混在している。TEXT 列の隣に UTC epoch ミリ秒の INTEGER 列（<列名>_ms）を持たせてインデックスを張り、
+範囲検索は整数のインデックスシークで行う。
+
+_ms 列はトリガーが INSERT / UPDATE 時に TEXT 列から埋めるので、書き込み側は TEXT 列だけを
+書けばよい（どの経路で書かれた行も同じ規則で変換される）。
+"""
+
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Union
+
+UNIX_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MILLISECOND = timedelta(milliseconds=1)
+
+
+def epoch_ms_sql(expr: str) -> str:
+    """
+    ISO 形式の時刻を UTC epoch ミリ秒にする SQL 式.
+
+    'utc' 修飾子は naive な値をローカル時刻とみなして UTC に直し、タイムゾーン付きの値は
+    そのまま扱う。解釈できない値は NULL になる。
+    """
+    return f"CAST(ROUND((julianday({expr}, 'utc') - 2440587.5) * 86400000) AS INTEGER)"
+
+
+def to_epoch_ms(value: Union[datetime, str]) -> int:
+    """datetime（naive はローカル時刻）または ISO 文字列を UTC epoch ミリ秒にする。"""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is None:
+        value = value.astimezone()
+    return round((value - UNIX_EPOCH) / _MILLISECOND)
+
+
+def from_epoch_ms(value: Optional[int]) -> Optional[datetime]:
+    """UTC epoch ミリ秒を UTC の datetime にする。"""
+    if value is None:
+        return None
+    return UNIX_EPOCH + timedelta(milliseconds=value)
+
+
+def ensure_epoch_ms_column(
+    conn: sqlite3.Connection, table: str, column: str, index: bool = True
+) -> str:
+    """
+    table.column の隣に UTC epoch ミリ秒の列を用意する.
+
+    列が無ければ追加して既存行を埋め（初回のみ）、以降の INSERT と column の UPDATE で
+    埋めるトリガーを作成する。index=True なら _ms 列の単独インデックスも作る。
+
+    Returns:
+        _ms 列の名前
+    """
+    ms_column = f"{column}_ms"
+    columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    if ms_column not in columns:
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {ms_column} INTEGER")
+        conn.execute(f"UPDATE {table} SET {ms_column} = {epoch_ms_sql(column)}")
+
+    fill = (
+        f"UPDATE {table} SET {ms_column} = {epoch_ms_sql('new.' + column)} "
+        f"WHERE rowid = new.rowid;"
+    )
+    conn.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {table}_{ms_column}_ai
+        AFTER INSERT ON {table} WHEN new.{ms_column} IS NULL BEGIN {fill} END
+        """
+    )
+    conn.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {table}_{ms_column}_au
+        AFTER UPDATE OF {column} ON {table} BEGIN {fill} END
+        """
+    )
+    if index:
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_{ms_column} ON {table}({ms_column})")
+    return ms_column
@@ -0,0 +1,176 @@
+"""
+SQLite FTS5 共通ユーティリティ
+
+既存テーブルを content に指定した外部コンテンツ型 FTS5 テーブル（trigram トークナイザ）の
+作成・トリガー同期と、検索クエリ組み立ての補助を提供する。
+日本語は空白で分かち書きされないため、文字 3-gram で部分一致検索できる trigram を使う。
+"""
+
+import sqlite3
+from typing import Any, Mapping, Sequence
+
+# trigram は 3 文字未満の語を検索できない
+MIN_QUERY_LENGTH = 3
+
+# BM25 で並べ替えるのは新しい順にこの件数までのヒットに限る。
+# 大半の行に含まれる語でもスコア計算が全ヒットに及ばず、検索が数ミリ秒で返る
+RANK_WINDOW = 1000
+
+# BM25 のパラメータ（FTS5 の bm25() と同じ既定値）
+_BM25_K1 = 1.2
+_BM25_B = 0.75
+
+
+def table_exists(conn: sqlite3.Connection, name: str) -> bool:
+    return (
+        conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+        ).fetchone()
+        is not None
+    )
+
+
+def create_external_fts(
+    conn: sqlite3.Connection,
+    fts_table: str,
+    source_table: str,
+    columns: Sequence[str],
+    rowid_column: str = "id",
+) -> bool:
+    """
+    source_table の columns を対象にした FTS5 テーブルと同期トリガーを作成する.
+
+    作成時に既存行を取り込む。既に存在する場合は何もしない。
+
+    Returns:
+        FTS5 テーブルが使える状態なら True（FTS5 / trigram 非対応の SQLite では False）
+    """
+    if table_exists(conn, fts_table):
+        return True
+    column_list = ", ".join(columns)
+    try:
+        conn.execute(
+            f"""
+            CREATE VIRTUAL TABLE {fts_table} USING fts5(
+                {column_list},
+                content='{source_table}',
+                content_rowid='{rowid_column}',
+                tokenize='trigram'
+            )
+            """
+        )
+    except sqlite3.OperationalError:
+        return False
+
+    new_values = ", ".join(f"new.{column}" for column in columns)
+    old_values = ", ".join(f"old.{column}" for column in columns)
+    insert_new = (
+        f"INSERT INTO {fts_table} (rowid, {column_list}) "
+        f"VALUES (new.{rowid_column}, {new_values});"
+    )
+    delete_old = (
+        f"INSERT INTO {fts_table} ({fts_table}, rowid, {column_list}) "
+        f"VALUES ('delete', old.{rowid_column}, {old_values});"
+    )
+    for trigger in (
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {fts_table}_ai AFTER INSERT ON {source_table} BEGIN
+            {insert_new}
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {fts_table}_ad AFTER DELETE ON {source_table} BEGIN
+            {delete_old}
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {fts_table}_au
+        AFTER UPDATE OF {column_list} ON {source_table} BEGIN
+            {delete_old}
+            {insert_new}
+        END
+        """,
+    ):
+        conn.execute(trigger)
+    conn.execute(f"INSERT INTO {fts_table} ({fts_table}) VALUES ('rebuild')")
+    return True
+
+
+def rebuild_fts(conn: sqlite3.Connection, fts_table: str) -> None:
+    """FTS5 テーブルを content テーブルから作り直して最適化する。"""
+    conn.execute(f"INSERT INTO {fts_table} ({fts_table}) VALUES ('rebuild')")
+    conn.execute(f"INSERT INTO {fts_table} ({fts_table}) VALUES ('optimize')")
+
+
+def phrase(query: str, column: str | None = None) -> str:
+    """
+    検索語全体を 1 つのフレーズとする MATCH 式を返す（LIKE と同じ部分一致の意味になる）.
+
+    column を指定するとその列だけを検索する。
+    """
+    quoted = '"' + query.strip().replace('"', '""') + '"'
+    return f"{{{column}}} : {quoted}" if column else quoted
+
+
+def is_searchable(query: str | None) -> bool:
+    return bool(query) and len(query.strip()) >= MIN_QUERY_LENGTH
+
+
+def rank_window_floor(fts_table: str, from_clause: str, where_clause: str) -> str:
+    """
+    ヒットのうち新しい RANK_WINDOW 件に絞る rowid 下限条件（FTS5 に押し込まれる）.
+
+    from_clause / where_clause は外側の検索と同じものを渡す（パラメータは 2 回分必要）。
+    """
+    return f"""{fts_table}.rowid >= (
+        SELECT COALESCE(MIN(rowid), 0) FROM (
+            SELECT {fts_table}.rowid AS rowid FROM {from_clause}
+            WHERE {where_clause}
+            ORDER BY {fts_table}.rowid DESC
+            LIMIT {RANK_WINDOW}
+        )
+    )"""
+
+
+def count_matches(conn: sqlite3.Connection, fts_table: str, match: str, cap: int) -> int:
+    """MATCH のヒット数を cap で打ち切って数える（ヒットが多い語を安く判定する）。"""
+    return conn.execute(
+        f"""
+        SELECT COUNT(*) FROM (
+            SELECT rowid FROM {fts_table} WHERE {fts_table} MATCH ? LIMIT ?
+        )
+        """,
+        (match, cap),
+    ).fetchone()[0]
+
+
+def rank_by_bm25(
+    rows: Sequence[Mapping[str, Any]], query: str, weights: Mapping[str, float]
+) -> list[Mapping[str, Any]]:
+    """
+    候補行を検索語 1 フレーズの BM25 で並べ替える（安定ソートなので同点は元の順を保つ）.
+
+    単一フレーズでは IDF が全行で共通なので、候補の中だけで計算しても FTS5 の bm25() と
+    ほぼ同じ順位になる（列の平均長を候補から求める点だけが異なる）。
+    FTS5 の bm25() は IDF のために全ヒットを走査するので、ヒットが多い語ではこちらが速い。
+    """
+    needle = query.strip().lower()
+    if not rows or not needle:
+        return list(rows)
+    avg_len = {
+        column: max(sum(len(row[column] or "") for row in rows) / len(rows), 1.0)
+        for column in weights
+    }
+
+    def _score(row: Mapping[str, Any]) -> float:
+        score = 0.0
+        for column, weight in weights.items():
+            text = (row[column] or "").lower()
+            tf = text.count(needle)
+            if not tf:
+                continue
+            norm = 1 - _BM25_B + _BM25_B * len(text) / avg_len[column]
+            score += weight * tf * (_BM25_K1 + 1) / (tf + _BM25_K1 * norm)
+        return score
+
+    return sorted(rows, key=_score, reverse=True)
@@ -10,16 +10,26 @@
 from __future__ import annotations
 
 import contextlib
+import heapq
+import itertools
+import logging
 import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from operator import itemgetter
 from pathlib import Path
-from typing import List, Dict, Any, Optional
-from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from dataclasses import dataclass, field, fields
 
+from src.common.change_counter import change_count
+from src.common.epoch import to_epoch_ms
 from src.lifelog.database.db_manager import DatabaseManager
 from src.browser_history.repository import BrowserHistoryRepository
 from src.info_collector.repository import InfoCollectorRepository
 
+logger = logging.getLogger(__name__)
+
 
 @dataclass
 class UnifiedTimelineEntry:
@@ -34,6 +44,9 @@ class UnifiedTimelineEntry:
     importance_score: Optional[float] = None
 
 
+_TIMELINE_FIELDS = tuple(f.name for f in fields(UnifiedTimelineEntry))
+
+
 @dataclass
 class DailyReportData:
     """デイリーレポート用統合データ"""
@@ -46,6 +59,23 @@ class DailyReportData:
     deep_research: List[dict]
     theme_reports: List[dict]
     timeline: List[dict]
+    # ソースごとの取得時間（秒）
+    timings: Dict[str, float] = field(default_factory=dict)
+
+
+# スナップショットのウォーターマークを取るソースごとの（DB, テーブル, 日付の列）。
+# _ms で終わる列は UTC epoch ミリ秒、それ以外は ISO 形式の文字列
+# ウォーターマークはソースごとの最大 ID と、<ソース名>.changes に対象日の行の
+# UPDATE / DELETE の累計回数
+_SNAPSHOT_SOURCES: Dict[str, Tuple[str, str, str]] = {
+    "lifelog_data": ("lifelog", "activity_intervals", "start_ts_ms"),
+    "events": ("lifelog", "system_events", "event_timestamp_ms"),
+    "browser_history": ("info", "browser_visits", "visit_time_ms"),
+    "article_analyses": ("info", "article_analysis", "analyzed_at_ms"),
+    "deep_research": ("info", "deep_research", "researched_at"),
+    "theme_reports": ("info", "reports", "report_date"),
+}
+_CHANGES_SUFFIX = ".changes"
 
 
 class DailyReportDataAggregator:
@@ -55,21 +85,21 @@ class DailyReportDataAggregator:
     各データソースからデータを取得し、統合データとして提供する。
     """
 
-    def __init__(self, lifelog_db_path: Path, info_db_path: Path):
+    def __init__(self, lifelog_db_path: Path, info_db_path: Path, max_workers: int = 6):
         """
         Args:
             lifelog_db_path: ライフログデータベースのパス（lifelog.db）
             info_db_path: 情報収集データベースのパス（ai_secretary.db）
+            max_workers: データソースを並行に取得するスレッド数（1で逐次）
         """
         self.lifelog_db_path = lifelog_db_path
         self.info_db_path = info_db_path
+        self.max_workers = max_workers
 
-        # データベース接続の初期化
+        # スキーマの作成・マイグレーション（取得は読み取り専用接続で行う）
         self.lifelog_db = DatabaseManager(str(lifelog_db_path))
         self.info_db = InfoCollectorRepository(str(info_db_path))
         self.browser_repo = BrowserHistoryRepository(info_db_path)
-        # info_db_pathを文字列として保存（ブラウザ履歴取得で使用）
-        self.info_db_path_str = str(info_db_path)
 
     def close(self) -> None:
         """データベース接続をクローズ."""
@@ -85,51 +115,197 @@ class DailyReportDataAggregator:
         self,
         date: str,
         detail_level: str = "summary",  # 'summary', 'detailed', 'full'
+        use_snapshot: bool = True,
     ) -> DailyReportData:
         """
         指定日のデータを集約
 
+        各データソースは互いに独立なので、ソースごとに読み取り専用接続を開いて並行に取得する。
+        所要時間は最も遅いソースで決まり、ソースごとの取得時間は timings に入る。
+
+        締まった日（前日以前）は取得した行をスナップショットとして保存し、次回からは
+        取得し直さずに使う。スナップショットの後にその日のデータが届いたか、その日の行が
+        書き換え・削除されていれば取得し直す。
+
         Args:
             date: 日付文字列（YYYY-MM-DD）
             detail_level: 詳細度（'summary', 'detailed', 'full'）
+            use_snapshot: Falseでスナップショットを読み書きせずに取得する
 
         Returns:
             DailyReportData: 統合データ
         """
-        # 1. ライフログデータ取得
-        lifelog_data = self._get_lifelog_data(date)
+        closed = use_snapshot and date < datetime.now().strftime("%Y-%m-%d")
+        if closed:
+            # 取得前に記録するので、取得中に届いた行は次回の検出対象になる
+            watermarks = self._source_watermarks(date)
+            cached = self._load_snapshot(date, watermarks)
+            if cached is not None:
+                return cached
+
+        results, timings = self._fetch_sources(date)
+        if closed:
+            self.info_db.save_daily_snapshot(date, watermarks, results)
+        return self._assemble(date, results, timings)
+
+    def _fetch_sources(self, date: str) -> Tuple[Dict[str, List[Dict[str, Any]]], Dict[str, float]]:
+        """全ソースを並行に取得し、ソースごとの行と取得時間（秒）を返す。"""
+        fetchers: Dict[str, Callable[[str], List[Dict[str, Any]]]] = {
+            "lifelog_data": self._get_lifelog_data,
+            "events": self._get_events,
+            "browser_history": self._get_browser_history,
+            "article_analyses": self._get_article_analyses,
+            "deep_research": self._get_deep_research,
+            "theme_reports": self._get_theme_reports,
+        }
+        results: Dict[str, List[Dict[str, Any]]] = {}
+        timings: Dict[str, float] = {}
+
+        def _timed(name: str) -> List[Dict[str, Any]]:
+            started = time.perf_counter()
+            try:
+                return fetchers[name](date)
+            finally:
+                timings[name] = time.perf_counter() - started
+
+        with ThreadPoolExecutor(
+            max_workers=max(1, min(self.max_workers, len(fetchers))),
+            thread_name_prefix="report-aggregate",
+        ) as pool:
+            futures = {name: pool.submit(_timed, name) for name in fetchers}
+            for name, future in futures.items():
+                results[name] = future.result()
+
+        logger.debug(
+            "Aggregated %s: %s",
+            date,
+            ", ".join(f"{name}={timings[name] * 1000:.1f}ms" for name in fetchers),
+        )
+        return results, {name: timings[name] for name in fetchers}
 
-        # 2. イベント情報取得
-        events = self._get_events(date)
+    def _assemble(
+        self,
+        date: str,
+        results: Dict[str, List[Dict[str, Any]]],
+        timings: Dict[str, float],
+    ) -> DailyReportData:
+        # 時系列統合
+        timeline = self._build_unified_timeline(
+            results["lifelog_data"],
+            results["events"],
+            results["browser_history"],
+            results["article_analyses"],
+            results["deep_research"],
+            date,
+        )
+        return DailyReportData(report_date=date, timeline=timeline, timings=timings, **results)
 
-        # 3. ブラウザ履歴取得
-        browser_history = self._get_browser_history(date)
+    def _source_watermarks(self, date: str) -> Dict[str, int]:
+        """
+        ソーステーブルごとの最大 ID と、指定日の行の UPDATE / DELETE の累計回数.
 
-        # 4. 記事分析結果取得
-        article_analyses = self._get_article_analyses(date)
+        どちらも rowid の末尾とカウンタの 1 行を見るだけなので件数によらず一定。
+        """
+        watermarks: Dict[str, int] = {}
+        for db_name, db_path in (("lifelog", self.lifelog_db_path), ("info", self.info_db_path)):
+            with self._read_only(db_path) as conn:
+                for name, (source_db, table, _) in _SNAPSHOT_SOURCES.items():
+                    if source_db == db_name:
+                        row = conn.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}").fetchone()
+                        watermarks[name] = int(row[0])
+                        watermarks[name + _CHANGES_SUFFIX] = change_count(conn, table, date)
+        return watermarks
+
+    def _load_snapshot(self, date: str, watermarks: Dict[str, int]) -> Optional[DailyReportData]:
+        """
+        指定日のスナップショットが有効なら DailyReportData にして返す.
 
-        # 5. 深掘り調査結果取得
-        deep_research = self._get_deep_research(date)
+        保存時より ID が進んだソースは、増えた行（ID の範囲）にその日の行があるかだけを見る。
+        無ければウォーターマークを進めてスナップショットを使い、あれば None を返す
+        （ID が戻っている場合も作り直す）。既存行の書き換え・削除は ID に現れないので、
+        その日の行の UPDATE / DELETE の累計回数が保存時と異なるソースがあれば作り直す。
+        """
+        started = time.perf_counter()
+        snapshot = self.info_db.get_daily_snapshot(date)
+        if snapshot is None:
+            return None
 
-        # 6. テーマレポート取得
-        theme_reports = self._get_theme_reports(date)
+        stored = snapshot["watermarks"]
+        advanced = {}
+        for name, current in watermarks.items():
+            previous = stored.get(name)
+            if previous is None or current < previous:
+                return None
+            if name.endswith(_CHANGES_SUFFIX):
+                if current != previous:
+                    logger.info("Source rows changed since snapshot of %s, rebuilding", date)
+                    return None
+                continue
+            if current > previous:
+                advanced[name] = previous
 
-        # 7. 時系列統合
-        timeline = self._build_unified_timeline(
-            lifelog_data, events, browser_history, article_analyses, deep_research, date
-        )
+        if advanced:
+            if self._has_late_rows(date, advanced):
+                logger.info("Late data arrived for %s, rebuilding snapshot", date)
+                return None
+            self.info_db.advance_daily_snapshot(date, watermarks)
 
-        return DailyReportData(
-            report_date=date,
-            lifelog_data=lifelog_data,
-            events=events,
-            browser_history=browser_history,
-            article_analyses=article_analyses,
-            deep_research=deep_research,
-            theme_reports=theme_reports,
-            timeline=timeline,
+        return self._assemble(
+            date, snapshot["sources"], {"snapshot": time.perf_counter() - started}
         )
 
+    def _has_late_rows(self, date: str, after_ids: Dict[str, int]) -> bool:
+        """after_ids より後に追加された行に指定日の行があるか。"""
+        day, day_ms = self._day_range(date), self._day_range_ms(date)
+        for db_name, db_path in (("lifelog", self.lifelog_db_path), ("info", self.info_db_path)):
+            with self._read_only(db_path) as conn:
+                for name, after_id in after_ids.items():
+                    source_db, table, column = _SNAPSHOT_SOURCES[name]
+                    if source_db != db_name:
+                        continue
+                    row = conn.execute(
+                        f"SELECT 1 FROM {table} WHERE id > ? AND {column} >= ? AND {column} < ? "
+                        "LIMIT 1",
+                        (after_id, *(day_ms if column.endswith("_ms") else day)),
+                    ).fetchone()
+                    if row:
+                        return True
+        return False
+
+    @staticmethod
+    def _day_range(date: str) -> Tuple[str, str]:
+        """
+        指定日の半開区間 [date, 翌日) を返す.
+
+        時刻列は ISO 形式の文字列なので、日付文字列との大小比較で日付の範囲になる。
+        DATE(col) = ? と違って時刻列のインデックスで範囲検索できる。
+        """
+        start = datetime.strptime(date, "%Y-%m-%d")
+        return start.strftime("%Y-%m-%d"), (start + timedelta(days=1)).strftime("%Y-%m-%d")
+
+    @staticmethod
+    def _day_range_ms(date: str) -> Tuple[int, int]:
+        """
+        指定日（ローカル時刻）の半開区間 [date, 翌日) を UTC epoch ミリ秒で返す.
+
+        _ms 列は書式やタイムゾーンの混在によらず同じ時刻なら同じ値なので、
+        UTC で保存されたブラウザ履歴もローカル時刻の日付で絞り込める。
+        """
+        start = datetime.strptime(date, "%Y-%m-%d")
+        return to_epoch_ms(start), to_epoch_ms(start + timedelta(days=1))
+
+    @staticmethod
+    @contextlib.contextmanager
+    def _read_only(db_path: Path) -> Iterator[sqlite3.Connection]:
+        """読み取り専用の接続（スレッドごとに開いて閉じる）。"""
+        uri = Path(db_path).resolve().as_uri()
+        conn = sqlite3.connect(f"{uri}?mode=ro", uri=True, timeout=30.0)
+        try:
+            conn.row_factory = sqlite3.Row
+            yield conn
+        finally:
+            conn.close()
+
     def _get_lifelog_data(self, date: str) -> List[Dict[str, Any]]:
         """
         ライフログデータ取得
@@ -140,31 +316,28 @@ class DailyReportDataAggregator:
         Returns:
             ライフログデータのリスト
         """
-        # 日付文字列をそのまま使用（SQLiteのDATE()関数で比較）
-        conn = self.lifelog_db._get_connection()
-        cursor = conn.cursor()
-
-        # 活動インターバルを取得（DATE()関数で日付比較）
-        cursor.execute(
-            """
-            SELECT
-                i.start_ts,
-                i.end_ts,
-                a.process_name,
-                i.window_hash,
-                i.domain,
-                i.is_idle,
-                i.duration_seconds
-            FROM activity_intervals i
-            JOIN apps a ON i.app_id = a.app_id
-            WHERE DATE(i.start_ts) = ?
-            ORDER BY i.start_ts
-            """,
-            (date,),
-        )
+        with self._read_only(self.lifelog_db_path) as conn:
+            # 活動インターバルを取得（start_ts_ms のインデックスで範囲検索）
+            rows = conn.execute(
+                """
+                SELECT
+                    i.start_ts,
+                    i.end_ts,
+                    a.process_name,
+                    i.window_hash,
+                    i.domain,
+                    i.is_idle,
+                    i.duration_seconds
+                FROM activity_intervals i
+                JOIN apps a ON i.app_id = a.app_id
+                WHERE i.start_ts_ms >= ? AND i.start_ts_ms < ?
+                ORDER BY i.start_ts_ms
+                """,
+                self._day_range_ms(date),
+            ).fetchall()
 
         intervals = []
-        for row in cursor.fetchall():
+        for row in rows:
             start_ts = self._parse_datetime(row["start_ts"])
             end_ts = self._parse_datetime(row["end_ts"])
 
@@ -194,21 +367,24 @@ class DailyReportDataAggregator:
 
     def _get_events(self, date: str) -> List[Dict[str, Any]]:
         """
-        イベント情報取得
+        イベント情報取得（中重要度以上）
 
         Args:
             date: 日付文字列（YYYY-MM-DD）
 
         Returns:
             イベントデータのリスト
-
-        注意: DatabaseManager.get_events_by_date_range() メソッドが実装される必要があります
         """
-        start = datetime.strptime(date, "%Y-%m-%d")
-        end = start + timedelta(days=1)
-
-        # イベント情報を取得（中重要度以上）
-        return self.lifelog_db.get_events_by_date_range(start, end, min_severity=50)  # 中重要度以上
+        with self._read_only(self.lifelog_db_path) as conn:
+            rows = conn.execute(
+                """
+                SELECT * FROM system_events
+                WHERE event_timestamp_ms >= ? AND event_timestamp_ms < ? AND severity >= ?
+                ORDER BY event_timestamp_ms DESC
+                """,
+                (*self._day_range_ms(date), 50),
+            ).fetchall()
+        return [dict(row) for row in rows]
 
     def _get_browser_history(self, date: str) -> List[Dict[str, Any]]:
         """
@@ -220,33 +396,28 @@ class DailyReportDataAggregator:
         Returns:
             ブラウザ履歴データのリスト
         """
-        # 直接SQLクエリで指定日の履歴を取得（DATE()関数を使用）
-        with contextlib.closing(sqlite3.connect(self.info_db_path_str)) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.execute(
+        with self._read_only(self.info_db_path) as conn:
+            rows = conn.execute(
                 """
                 SELECT url, title, visit_time, visit_count, source_browser
                 FROM browser_history
-                WHERE DATE(visit_time) = ?
-                ORDER BY visit_time DESC
+                WHERE visit_time_ms >= ? AND visit_time_ms < ?
+                ORDER BY visit_time_ms DESC
                 LIMIT 1000
                 """,
-                (date,),
-            )
+                self._day_range_ms(date),
+            ).fetchall()
 
-            history = []
-            for row in cursor.fetchall():
-                history.append(
-                    {
-                        "visit_time": row["visit_time"],
-                        "title": row["title"],
-                        "url": row["url"],
-                        "visit_count": row["visit_count"],
-                        "source_browser": row["source_browser"],
-                    }
-                )
-
-            return history
+        return [
+            {
+                "visit_time": row["visit_time"],
+                "title": row["title"],
+                "url": row["url"],
+                "visit_count": row["visit_count"],
+                "source_browser": row["source_browser"],
+            }
+            for row in rows
+        ]
 
     def _get_article_analyses(self, date: str) -> List[Dict[str, Any]]:
         """
@@ -258,16 +429,18 @@ class DailyReportDataAggregator:
         Returns:
             記事分析結果のリスト
         """
-        start = datetime.strptime(date, "%Y-%m-%d")
-        since = start.isoformat()
-
-        rows = self.info_db.fetch_recent_analysis(since)
-        end = start + timedelta(days=1)
-
-        # 指定日の範囲に限定
-        return [
-            row for row in rows if (ts := self._parse_datetime(row.get("analyzed_at"))) and ts < end
-        ]
+        with self._read_only(self.info_db_path) as conn:
+            rows = conn.execute(
+                """
+                SELECT a.*, c.title, c.url
+                FROM article_analysis a
+                JOIN collected_info c ON a.article_id = c.id
+                WHERE a.analyzed_at_ms >= ? AND a.analyzed_at_ms < ?
+                ORDER BY a.analyzed_at_ms DESC
+                """,
+                self._day_range_ms(date),
+            ).fetchall()
+        return [dict(row) for row in rows]
 
     def _get_deep_research(self, date: str) -> List[Dict[str, Any]]:
         """
@@ -279,17 +452,18 @@ class DailyReportDataAggregator:
         Returns:
             深掘り調査結果のリスト
         """
-        start = datetime.strptime(date, "%Y-%m-%d")
-        since = start.isoformat()
-
-        rows = self.info_db.fetch_recent_deep_research(since)
-        end = start + timedelta(days=1)
-        return [
-            row
-            for row in rows
-            if (ts := self._parse_datetime(row.get("researched_at") or row.get("created_at")))
-            and ts < end
-        ]
+        with self._read_only(self.info_db_path) as conn:
+            rows = conn.execute(
+                """
+                SELECT d.*, a.summary AS theme
+                FROM deep_research d
+                JOIN article_analysis a ON d.article_id = a.article_id
+                WHERE d.researched_at >= ? AND d.researched_at < ?
+                ORDER BY d.researched_at DESC
+                """,
+                self._day_range(date),
+            ).fetchall()
+        return [dict(row) for row in rows]
 
     def _get_theme_reports(self, date: str) -> List[Dict[str, Any]]:
         """
@@ -301,9 +475,16 @@ class DailyReportDataAggregator:
         Returns:
             テーマレポートのリスト
         """
-        if hasattr(self.info_db, "fetch_reports_by_date"):
-            return self.info_db.fetch_reports_by_date(date, category="theme")
-        return []
+        with self._read_only(self.info_db_path) as conn:
+            rows = conn.execute(
+                """
+                SELECT * FROM reports
+                WHERE report_date = ? AND category = ?
+                ORDER BY created_at DESC
+                """,
+                (date, "theme"),
+            ).fetchall()
+        return [dict(row) for row in rows]
 
     def _build_unified_timeline(
         self,
@@ -313,6 +494,8 @@ class DailyReportDataAggregator:
         article_analyses: List[Dict],
         deep_research: List[Dict],
         date: str,
+        limit: Optional[int] = None,
+        offset: int = 0,
     ) -> List[dict]:
         """
         統合時系列を構築
@@ -324,107 +507,174 @@ class DailyReportDataAggregator:
             article_analyses: 記事分析結果
             deep_research: 深掘り調査結果
             date: 日付文字列
+            limit: 返す最大件数（Noneですべて）
+            offset: 先頭から読み飛ばす件数
 
         Returns:
             統合時系列エントリのリスト（時系列でソート済み）
         """
-        timeline: list[UnifiedTimelineEntry] = []
-
-        # ライフログデータを時系列エントリに変換
-        for entry in lifelog_data:
-            ts = self._parse_datetime(entry.get("timestamp") or entry.get("start_ts"))
-            if not ts:
-                continue
-            timeline.append(
-                UnifiedTimelineEntry(
-                    timestamp=ts,
-                    source_type="lifelog",
-                    category="activity",
-                    title=entry.get("process_name", "Unknown"),
-                    description=entry.get("window_hash", "") or "",
-                    metadata=entry,
-                    importance_score=None,
-                )
+        return list(
+            self.iter_unified_timeline(
+                lifelog_data,
+                events,
+                browser_history,
+                article_analyses,
+                deep_research,
+                limit=limit,
+                offset=offset,
             )
+        )
 
-        # イベントデータを時系列エントリに変換
-        for event in events:
-            ts = self._parse_datetime(event.get("event_timestamp"))
-            if not ts:
-                continue
-            timeline.append(
-                UnifiedTimelineEntry(
-                    timestamp=ts,
-                    source_type="event",
-                    category=event.get("category", "other"),
-                    title=f"[{event.get('event_type', 'unknown')}] {event.get('message', '')[:50]}",
-                    description=event.get("message", ""),
-                    metadata=event,
-                    importance_score=event.get("severity", 0) / 100.0,
-                )
-            )
+    def iter_unified_timeline(
+        self,
+        lifelog_data: List[Dict],
+        events: List[Dict],
+        browser_history: List[Dict],
+        article_analyses: List[Dict],
+        deep_research: List[Dict],
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> Iterator[dict]:
+        """
+        統合時系列を新しい順に 1 件ずつ返す.
 
-        # ブラウザ履歴を時系列エントリに変換
-        for history in browser_history:
-            ts = self._parse_datetime(history.get("visit_time"))
-            if not ts:
-                continue
-            timeline.append(
-                UnifiedTimelineEntry(
-                    timestamp=ts,
-                    source_type="browser",
-                    category="browsing",
-                    title=history.get("title", history.get("url", "")),
-                    description=history.get("url", ""),
-                    metadata=history,
-                    importance_score=None,
-                )
-            )
+        各ソースは取得クエリの並び順（ライフログは古い順、それ以外は新しい順）のまま
+        heapq で k-way マージするので、全件を 1 つのリストに集めてソートしない。
+        エントリは返すときに作り、metadata は元の行をコピーせずに参照する。
+        記事分析は並び順（analyzed_at）と時刻（published_at 優先）が異なるため、
+        時刻とのペアだけを並べ替える。
 
-        # 記事分析結果を時系列エントリに変換
-        for article in article_analyses:
-            ts = self._parse_datetime(
-                article.get("published_at")
-                or article.get("analyzed_at")
-                or article.get("fetched_at")
-            )
-            if not ts:
-                continue
-            timeline.append(
-                UnifiedTimelineEntry(
-                    timestamp=ts,
-                    source_type="article",
-                    category=article.get("category", "other"),
-                    title=article.get("title", ""),
-                    description=article.get("summary", ""),
-                    metadata=article,
-                    importance_score=article.get("importance_score", 0),
-                )
-            )
+        Args:
+            lifelog_data: ライフログデータ（start_ts の古い順）
+            events: イベントデータ（event_timestamp の新しい順）
+            browser_history: ブラウザ履歴（visit_time の新しい順）
+            article_analyses: 記事分析結果（順不同）
+            deep_research: 深掘り調査結果（researched_at の新しい順）
+            limit: 返す最大件数（Noneですべて）
+            offset: 先頭から読み飛ばす件数
+
+        Yields:
+            統合時系列エントリの辞書
+        """
+        streams = [
+            self._timeline_stream(
+                reversed(lifelog_data),
+                lambda row: row.get("timestamp") or row.get("start_ts"),
+                self._lifelog_entry,
+            ),
+            self._timeline_stream(
+                events, lambda row: row.get("event_timestamp"), self._event_entry
+            ),
+            self._timeline_stream(
+                browser_history, lambda row: row.get("visit_time"), self._browser_entry
+            ),
+            self._timeline_stream(
+                article_analyses,
+                lambda row: row.get("published_at")
+                or row.get("analyzed_at")
+                or row.get("fetched_at"),
+                self._article_entry,
+                presorted=False,
+            ),
+            self._timeline_stream(
+                deep_research,
+                lambda row: row.get("researched_at") or row.get("created_at"),
+                self._deep_research_entry,
+            ),
+        ]
+        merged = heapq.merge(*streams, key=itemgetter(0), reverse=True)
+        stop = None if limit is None else offset + limit
+        for _, ts, row, build in itertools.islice(merged, offset, stop):
+            entry = build(row, ts)
+            yield {name: getattr(entry, name) for name in _TIMELINE_FIELDS}
+
+    @classmethod
+    def _timeline_stream(
+        cls,
+        rows: Iterable[Dict],
+        timestamp_of: Callable[[Dict], Any],
+        build: Callable[[Dict, datetime], UnifiedTimelineEntry],
+        presorted: bool = True,
+    ) -> Iterator[Tuple[datetime, datetime, Dict, Callable]]:
+        """ソース 1 つを（並び順キー, 時刻, 行, エントリ生成関数）の新しい順の列にする。"""
+        stream = (
+            (cls._sort_key(ts), ts, row, build)
+            for row in rows
+            if (ts := cls._parse_datetime(timestamp_of(row)))
+        )
+        if presorted:
+            return stream
+        return iter(sorted(stream, key=itemgetter(0), reverse=True))
 
-        # 深掘り調査結果を時系列エントリに変換
-        for research in deep_research:
-            ts = self._parse_datetime(research.get("researched_at") or research.get("created_at"))
-            if not ts:
-                continue
-            timeline.append(
-                UnifiedTimelineEntry(
-                    timestamp=ts,
-                    source_type="deep_research",
-                    category="research",
-                    title=research.get("theme", ""),
-                    description=research.get("synthesized_content", "")[:200]
-                    if research.get("synthesized_content")
-                    else "",
-                    metadata=research,
-                    importance_score=None,
-                )
-            )
+    @staticmethod
+    def _sort_key(ts: datetime) -> datetime:
+        """
+        並び順のキー.
+        タイムゾーン付き（ブラウザ履歴は UTC）はローカル時刻に揃えて naive と比較できるようにする。
+        """
+        return ts.astimezone().replace(tzinfo=None) if ts.tzinfo else ts
 
-        # タイムスタンプでソート（降順）
-        timeline.sort(key=lambda x: x.timestamp, reverse=True)
+    @staticmethod
+    def _lifelog_entry(entry: Dict, ts: datetime) -> UnifiedTimelineEntry:
+        return UnifiedTimelineEntry(
+            timestamp=ts,
+            source_type="lifelog",
+            category="activity",
+            title=entry.get("process_name", "Unknown"),
+            description=entry.get("window_hash", "") or "",
+            metadata=entry,
+            importance_score=None,
+        )
 
-        return [asdict(entry) for entry in timeline]
+    @staticmethod
+    def _event_entry(event: Dict, ts: datetime) -> UnifiedTimelineEntry:
+        return UnifiedTimelineEntry(
+            timestamp=ts,
+            source_type="event",
+            category=event.get("category", "other"),
+            title=f"[{event.get('event_type', 'unknown')}] {event.get('message', '')[:50]}",
+            description=event.get("message", ""),
+            metadata=event,
+            importance_score=event.get("severity", 0) / 100.0,
+        )
+
+    @staticmethod
+    def _browser_entry(history: Dict, ts: datetime) -> UnifiedTimelineEntry:
+        return UnifiedTimelineEntry(
+            timestamp=ts,
+            source_type="browser",
+            category="browsing",
+            title=history.get("title", history.get("url", "")),
+            description=history.get("url", ""),
+            metadata=history,
+            importance_score=None,
+        )
+
+    @staticmethod
+    def _article_entry(article: Dict, ts: datetime) -> UnifiedTimelineEntry:
+        return UnifiedTimelineEntry(
+            timestamp=ts,
+            source_type="article",
+            category=article.get("category", "other"),
+            title=article.get("title", ""),
+            description=article.get("summary", ""),
+            metadata=article,
+            importance_score=article.get("importance_score", 0),
+        )
+
+    @staticmethod
+    def _deep_research_entry(research: Dict, ts: datetime) -> UnifiedTimelineEntry:
+        return UnifiedTimelineEntry(
+            timestamp=ts,
+            source_type="deep_research",
+            category="research",
+            title=research.get("theme", ""),
+            description=research.get("synthesized_content", "")[:200]
+            if research.get("synthesized_content")
+            else "",
+            metadata=research,
+            importance_score=None,
+        )
 
     @staticmethod
     def _parse_datetime(value: Any) -> Optional[datetime]:
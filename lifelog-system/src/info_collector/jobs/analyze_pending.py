@@ -3,12 +3,21 @@
 from __future__ import annotations
 
 import argparse
+import contextvars
 import json
 import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
 
+from src.ai_secretary.circuit_breaker import CircuitOpenError
+from src.ai_secretary.llm_gateway import llm_gateway
+from src.ai_secretary.model_routing import STAGE_TRIAGE, llm_stage
 from src.ai_secretary.ollama_client import OllamaClient
 from src.info_collector.prompts import theme_extraction
 from src.info_collector.repository import InfoCollectorRepository
@@ -18,123 +27,485 @@ logger = logging.getLogger(__name__)
 DEFAULT_DB = Path("data/ai_secretary.db")
 _SOURCE_BONUS_WEIGHT = 0.15
 _CATEGORY_BONUS_WEIGHT = 0.15
+# バッチ分析で 1 リクエストにまとめる記事数の上限（コンテキスト長と出力崩れの兼ね合い）
+_MAX_ARTICLES_PER_PROMPT = 8
+# K 記事分の本文が既定コンテキスト長に収まらないため、バッチ時だけ広げる
+_BATCH_OPTIONS = {"temperature": 0.3, "num_ctx": 8192}
 
 
 def _clamp_score(value: float) -> float:
     return max(0.0, min(1.0, value))
 
 
-def _run_ollama_json(client: OllamaClient, system: str, user: str) -> dict[str, Any] | None:
+def _run_ollama_json(
+    client: OllamaClient,
+    system: str,
+    user: str,
+    options: dict[str, Any] | None = None,
+) -> Any:
     try:
-        response = client.generate(prompt=user, system=system, options={"temperature": 0.3})
+        response = client.generate(
+            prompt=user, system=system, options=options or {"temperature": 0.3}
+        )
         if not response:
             return None
         return json.loads(response)
+    except CircuitOpenError:
+        raise
     except Exception as exc:  # noqa: BLE001
         logger.warning("Ollama JSON generation failed: %s", exc)
         return None
 
 
-def analyze_pending_articles(db_path: Path = DEFAULT_DB, batch_size: int = 10) -> int:
+def _resolve_concurrency(concurrency: int | None) -> int:
+    """明示値 → ANALYZE_CONCURRENCY → 1 の順に同時分析数を決める。"""
+    if concurrency is None:
+        concurrency = int(os.getenv("ANALYZE_CONCURRENCY", "1"))
+    return max(1, int(concurrency))
+
+
+def _resolve_articles_per_prompt(articles_per_prompt: int | None) -> int:
+    """明示値 → ANALYZE_ARTICLES_PER_PROMPT → 1 の順に 1 リクエストあたりの記事数を決める。"""
+    if articles_per_prompt is None:
+        articles_per_prompt = int(os.getenv("ANALYZE_ARTICLES_PER_PROMPT", "1"))
+    return max(1, min(int(articles_per_prompt), _MAX_ARTICLES_PER_PROMPT))
+
+
+@dataclass
+class AnalysisRunStats:
+    """Stage1 1 回分の処理件数・記事ごとのレイテンシ・スループット・トークン数。"""
+
+    concurrency: int = 1
+    articles_per_prompt: int = 1
+    processed: int = 0
+    llm_requests: int = 0
+    batch_fallbacks: int = 0
+    prompt_tokens: int = 0
+    eval_tokens: int = 0
+    latencies_ms: list[float] = field(default_factory=list)
+    wall_seconds: float = 0.0
+
+    @property
+    def articles_per_minute(self) -> float:
+        if self.wall_seconds <= 0:
+            return 0.0
+        return round(self.processed / self.wall_seconds * 60, 2)
+
+    @property
+    def prompt_tokens_per_article(self) -> float:
+        if self.processed <= 0:
+            return 0.0
+        return round(self.prompt_tokens / self.processed, 1)
+
+    @property
+    def eval_tokens_per_article(self) -> float:
+        if self.processed <= 0:
+            return 0.0
+        return round(self.eval_tokens / self.processed, 1)
+
+    def latency_percentile(self, ratio: float) -> float:
+        if not self.latencies_ms:
+            return 0.0
+        ordered = sorted(self.latencies_ms)
+        index = min(int(round(ratio * (len(ordered) - 1))), len(ordered) - 1)
+        return round(ordered[index], 3)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "concurrency": self.concurrency,
+            "articles_per_prompt": self.articles_per_prompt,
+            "processed": self.processed,
+            "llm_requests": self.llm_requests,
+            "batch_fallbacks": self.batch_fallbacks,
+            "wall_seconds": round(self.wall_seconds, 3),
+            "articles_per_minute": self.articles_per_minute,
+            "prompt_tokens_per_article": self.prompt_tokens_per_article,
+            "eval_tokens_per_article": self.eval_tokens_per_article,
+            "p50_latency_ms": self.latency_percentile(0.5),
+            "p95_latency_ms": self.latency_percentile(0.95),
+        }
+
+
+@dataclass
+class _ArticleResult:
+    """1 記事分の LLM 結果。トークン数はバッチ時には記事数で按分した値。"""
+
+    article: Any
+    parsed: dict[str, Any] | None
+    latency_ms: float
+    prompt_tokens: float = 0.0
+    eval_tokens: float = 0.0
+    requests: float = 1.0
+    batch_fallback: bool = False
+
+
+def _published_at(article: Any) -> str:
+    fetched = article["fetched_at"] if "fetched_at" in article.keys() else ""
+    return fetched or ""
+
+
+def _call_with_timings(
+    client: OllamaClient,
+    system: str,
+    user: str,
+    options: dict[str, Any] | None = None,
+) -> tuple[Any, float, int, int]:
+    """LLM を呼び、(parsed, latency_ms, prompt_tokens, eval_tokens) を返す。"""
+    if hasattr(client, "last_timings"):
+        client.last_timings = None
+    started = time.perf_counter()
+    parsed = _run_ollama_json(client, system, user, options)
+    latency_ms = (time.perf_counter() - started) * 1000
+    timings = getattr(client, "last_timings", None)
+    prompt_tokens = int(getattr(timings, "prompt_eval_count", 0) or 0)
+    eval_tokens = int(getattr(timings, "eval_count", 0) or 0)
+    return parsed, latency_ms, prompt_tokens, eval_tokens
+
+
+def _new_client() -> OllamaClient:
+    """Stage1 用のクライアント（triage ステージの小型モデルに振り分ける）。"""
+    with llm_stage(STAGE_TRIAGE):
+        return OllamaClient()
+
+
+def _analyze_one(client: OllamaClient, article: Any) -> _ArticleResult:
+    """1 記事分の LLM 呼び出し。DB には触れないのでワーカースレッドから呼んでよい。"""
+    prompts = theme_extraction.build_prompt(
+        title=article["title"],
+        content=article["content"] or "",
+        published_at=_published_at(article),
+    )
+    parsed, latency_ms, prompt_tokens, eval_tokens = _call_with_timings(
+        client, prompts["system"], prompts["user"]
+    )
+    return _ArticleResult(
+        article=article,
+        parsed=parsed if isinstance(parsed, dict) else None,
+        latency_ms=latency_ms,
+        prompt_tokens=prompt_tokens,
+        eval_tokens=eval_tokens,
+    )
+
+
+def _is_valid_analysis(item: Any) -> bool:
+    """バッチ応答の 1 要素がスコアを持つ分析結果として使えるか。"""
+    if not isinstance(item, dict):
+        return False
+    for key in ("importance_score", "relevance_score"):
+        value = item.get(key)
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return False
+        if not 0.0 <= float(value) <= 1.0:
+            return False
+    return True
+
+
+def _map_batch_results(parsed: Any, count: int) -> dict[int, dict[str, Any]]:
+    """
+    バッチ応答を 0 始まりの記事位置 → 分析結果に対応付ける.
+
+    "index"（1 始まり）があればそれを優先し、無い要素は配列上の位置で対応させる。
+    検証に失敗した要素・範囲外の index は含めない。
+    """
+    if isinstance(parsed, dict):
+        parsed = parsed.get("results") or parsed.get("articles")
+    if not isinstance(parsed, list):
+        return {}
+
+    mapped: dict[int, dict[str, Any]] = {}
+    for position, item in enumerate(parsed):
+        if not _is_valid_analysis(item):
+            continue
+        raw_index = item.get("index")
+        try:
+            slot = int(raw_index) - 1 if raw_index is not None else position
+        except (TypeError, ValueError):
+            slot = position
+        if 0 <= slot < count and slot not in mapped:
+            mapped[slot] = item
+    return mapped
+
+
+class _ChunkInterrupted(CircuitOpenError):
+    """単独呼び出しでの補完中にブレーカーが開いた。それまでに得た chunk の結果を持つ。"""
+
+    def __init__(self, message: str, results: list[_ArticleResult]) -> None:
+        super().__init__(message)
+        self.results = results
+
+
+def _analyze_chunk(client: OllamaClient, chunk: list[Any]) -> list[_ArticleResult]:
+    """
+    chunk の記事を 1 リクエストで分析し、応答から漏れた記事だけ単独呼び出しで補う.
+
+    プロンプト評価トークンは K 記事で共有されるので、記事あたりでは約 1/K になる。
+    補完中にブレーカーが開いたら、バッチ応答で得た結果を持たせた _ChunkInterrupted を送出する。
+    """
+    if len(chunk) == 1:
+        return [_analyze_one(client, chunk[0])]
+
+    prompts = theme_extraction.build_batch_prompt(
+        [
+            {
+                "title": article["title"] or "",
+                "content": article["content"] or "",
+                "published_at": _published_at(article),
+            }
+            for article in chunk
+        ]
+    )
+    parsed, latency_ms, prompt_tokens, eval_tokens = _call_with_timings(
+        client, prompts["system"], prompts["user"], _BATCH_OPTIONS
+    )
+    mapped = _map_batch_results(parsed, len(chunk))
+    share = len(chunk)
+
+    results = [
+        _ArticleResult(
+            article=article,
+            parsed=mapped[position],
+            latency_ms=latency_ms,
+            prompt_tokens=prompt_tokens / share,
+            eval_tokens=eval_tokens / share,
+            requests=1 / share,
+        )
+        for position, article in enumerate(chunk)
+        if position in mapped
+    ]
+    missing = [article for position, article in enumerate(chunk) if position not in mapped]
+    for article in missing:
+        logger.info(
+            "Batch analysis missed article_id=%s; falling back to a single-article call",
+            article["id"],
+        )
+        try:
+            single = _analyze_one(client, article)
+        except CircuitOpenError as exc:
+            raise _ChunkInterrupted(str(exc), results) from exc
+        single.latency_ms += latency_ms
+        single.prompt_tokens += prompt_tokens / share
+        single.eval_tokens += eval_tokens / share
+        single.requests += 1 / share
+        single.batch_fallback = True
+        results.append(single)
+    return results
+
+
+def _chunked(items: list[Any], size: int) -> list[list[Any]]:
+    return [items[i : i + size] for i in range(0, len(items), size)]
+
+
+def _iter_sequential(
+    client: OllamaClient, chunks: list[list[Any]]
+) -> Iterator[list[_ArticleResult]]:
+    for chunk in chunks:
+        try:
+            chunk_results = _analyze_chunk(client, chunk)
+        except _ChunkInterrupted as exc:
+            yield exc.results
+            raise
+        yield chunk_results
+
+
+def _iter_concurrent(chunks: list[list[Any]], workers: int) -> Iterator[list[_ArticleResult]]:
+    """
+    LLM 呼び出しだけを workers 並列で実行し、完了順に結果を返す.
+
+    保存は呼び出し元スレッドが 1 本で行う（SQLite の書き込み競合を避ける）。
+    ブレーカーが開いたら未着手の記事は取り消し、実行中の結果を返し切ってから
+    CircuitOpenError を送出する。
+    """
+    stop = threading.Event()
+    # last_timings を呼び出し直後に読むため、クライアントはワーカースレッドごとに持つ
+    local = threading.local()
+
+    def _task(chunk: list[Any]) -> list[_ArticleResult] | None:
+        if stop.is_set():
+            return None
+        client = getattr(local, "client", None)
+        if client is None:
+            client = local.client = _new_client()
+        return _analyze_chunk(client, chunk)
+
+    circuit_error: CircuitOpenError | None = None
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="analyze-pending")
+    try:
+        # llm_request_context（caller / 優先度）をワーカースレッドへ引き継ぐ
+        futures = [
+            executor.submit(contextvars.copy_context().run, _task, chunk) for chunk in chunks
+        ]
+        for future in as_completed(futures):
+            if future.cancelled():
+                continue
+            try:
+                result = future.result()
+            except CircuitOpenError as exc:
+                stop.set()
+                circuit_error = circuit_error or exc
+                if isinstance(exc, _ChunkInterrupted):
+                    yield exc.results
+                continue
+            if result is not None:
+                yield result
+    finally:
+        stop.set()
+        executor.shutdown(wait=True, cancel_futures=True)
+    if circuit_error is not None:
+        raise circuit_error
+
+
+def _save_result(
+    repo: InfoCollectorRepository,
+    client: OllamaClient,
+    article: Any,
+    parsed: dict[str, Any] | None,
+    source_stats: dict[str, Any],
+    category_stats: dict[str, Any],
+) -> None:
+    # フォールバック値
+    analysis = {
+        "importance_score": 0.3,
+        "relevance_score": 0.3,
+        "category": "その他",
+        "keywords": [],
+        "one_line_summary": (article["title"] or "")[:50],
+        "importance_reason": "",
+        "relevance_reason": "",
+        "model": "fallback",
+    }
+
+    if parsed:
+        analysis.update(
+            {
+                "importance_score": parsed.get("importance_score", analysis["importance_score"]),
+                "relevance_score": parsed.get("relevance_score", analysis["relevance_score"]),
+                "category": parsed.get("category", analysis["category"]),
+                "keywords": parsed.get("keywords", analysis["keywords"]) or [],
+                "one_line_summary": parsed.get("one_line_summary", analysis["one_line_summary"]),
+                "importance_reason": parsed.get("importance_reason", analysis["importance_reason"])
+                or "",
+                "relevance_reason": parsed.get("relevance_reason", analysis["relevance_reason"])
+                or "",
+                "model": client.model if hasattr(client, "model") else "ollama",
+            }
+        )
+
+    llm_importance = float(analysis["importance_score"])
+    llm_relevance = float(analysis["relevance_score"])
+    source_name = str(article["source_name"] or "不明")
+    category_name = str(analysis["category"] or "未分類")
+    source_bonus = float(source_stats.get(source_name, {}).get("bonus", 0.0)) * _SOURCE_BONUS_WEIGHT
+    category_bonus = (
+        float(category_stats.get(category_name, {}).get("bonus", 0.0)) * _CATEGORY_BONUS_WEIGHT
+    )
+    interest_summary = (
+        f"interest_profile: source={source_name} bonus={source_bonus:+.3f}, "
+        f"category={category_name} bonus={category_bonus:+.3f}, "
+        f"llm_relevance={llm_relevance:.3f}"
+    )
+
+    repo.save_analysis(
+        article_id=article["id"],
+        importance=_clamp_score(llm_importance + source_bonus + category_bonus),
+        relevance=_clamp_score(llm_relevance + source_bonus + category_bonus),
+        category=category_name,
+        keywords=[str(k) for k in analysis.get("keywords", [])],
+        summary=str(analysis["one_line_summary"]),
+        model=str(analysis.get("model", "ollama")),
+        analyzed_at=datetime.now(),
+        importance_reason=(str(analysis.get("importance_reason", "")) + f" | {interest_summary}"),
+        relevance_reason=(str(analysis.get("relevance_reason", "")) + f" | {interest_summary}"),
+        llm_importance=llm_importance,
+        llm_relevance=llm_relevance,
+        source_bonus=source_bonus,
+        category_bonus=category_bonus,
+    )
+
+
+def analyze_pending_articles(
+    db_path: Path = DEFAULT_DB,
+    batch_size: int = 10,
+    concurrency: int | None = None,
+    stats: AnalysisRunStats | None = None,
+    articles_per_prompt: int | None = None,
+) -> int:
     """
     未分析の記事をバッチ処理し、article_analysisへ保存する。
 
+    Args:
+        concurrency: 同時に投げる LLM リクエスト数（None なら ANALYZE_CONCURRENCY、既定 1）。
+            実際の並列度は LLM ゲートウェイの max_concurrency と Ollama の
+            OLLAMA_NUM_PARALLEL で頭打ちになる。
+        articles_per_prompt: 1 リクエストにまとめる記事数（None なら
+            ANALYZE_ARTICLES_PER_PROMPT、既定 1）。応答から漏れた記事は単独で再分析する。
+        stats: 渡すとレイテンシ・スループットを書き込む
+
     Returns:
         処理した件数
     """
+    run_stats = stats if stats is not None else AnalysisRunStats()
     repo = InfoCollectorRepository(str(db_path))
     pending = repo.fetch_unanalyzed(limit=batch_size)
     if not pending:
         logger.info("No pending articles to analyze.")
         return 0
 
-    ollama = OllamaClient()
+    ollama = _new_client()
     processed = 0
     feedback_stats = repo.get_feedback_stats()
     source_stats = {item["name"]: item for item in feedback_stats.get("source", [])}
     category_stats = {item["name"]: item for item in feedback_stats.get("category", [])}
 
-    for article in pending:
-        fetched = article["fetched_at"] if "fetched_at" in article.keys() else ""
-        prompts = theme_extraction.build_prompt(
-            title=article["title"],
-            content=article["content"] or "",
-            published_at=fetched or "",
-        )
-
-        parsed = _run_ollama_json(ollama, prompts["system"], prompts["user"])
-
-        # フォールバック値
-        analysis = {
-            "importance_score": 0.3,
-            "relevance_score": 0.3,
-            "category": "その他",
-            "keywords": [],
-            "one_line_summary": (article["title"] or "")[:50],
-            "importance_reason": "",
-            "relevance_reason": "",
-            "model": "fallback",
-        }
+    per_prompt = _resolve_articles_per_prompt(articles_per_prompt)
+    chunks = _chunked(list(pending), per_prompt)
+    workers = min(_resolve_concurrency(concurrency), len(chunks))
+    run_stats.concurrency = workers
+    run_stats.articles_per_prompt = per_prompt
+    results = _iter_concurrent(chunks, workers) if workers > 1 else _iter_sequential(ollama, chunks)
 
-        if parsed:
-            analysis.update(
-                {
-                    "importance_score": parsed.get(
-                        "importance_score", analysis["importance_score"]
-                    ),
-                    "relevance_score": parsed.get("relevance_score", analysis["relevance_score"]),
-                    "category": parsed.get("category", analysis["category"]),
-                    "keywords": parsed.get("keywords", analysis["keywords"]) or [],
-                    "one_line_summary": parsed.get(
-                        "one_line_summary", analysis["one_line_summary"]
-                    ),
-                    "importance_reason": parsed.get(
-                        "importance_reason", analysis["importance_reason"]
-                    )
-                    or "",
-                    "relevance_reason": parsed.get("relevance_reason", analysis["relevance_reason"])
-                    or "",
-                    "model": ollama.model if hasattr(ollama, "model") else "ollama",
-                }
-            )
-
-        llm_importance = float(analysis["importance_score"])
-        llm_relevance = float(analysis["relevance_score"])
-        source_name = str(article["source_name"] or "不明")
-        category_name = str(analysis["category"] or "未分類")
-        source_bonus = (
-            float(source_stats.get(source_name, {}).get("bonus", 0.0)) * _SOURCE_BONUS_WEIGHT
-        )
-        category_bonus = (
-            float(category_stats.get(category_name, {}).get("bonus", 0.0)) * _CATEGORY_BONUS_WEIGHT
-        )
-        interest_summary = (
-            f"interest_profile: source={source_name} bonus={source_bonus:+.3f}, "
-            f"category={category_name} bonus={category_bonus:+.3f}, "
-            f"llm_relevance={llm_relevance:.3f}"
-        )
-
-        repo.save_analysis(
-            article_id=article["id"],
-            importance=_clamp_score(llm_importance + source_bonus + category_bonus),
-            relevance=_clamp_score(llm_relevance + source_bonus + category_bonus),
-            category=category_name,
-            keywords=[str(k) for k in analysis.get("keywords", [])],
-            summary=str(analysis["one_line_summary"]),
-            model=str(analysis.get("model", "ollama")),
-            analyzed_at=datetime.now(),
-            importance_reason=(
-                str(analysis.get("importance_reason", "")) + f" | {interest_summary}"
-            ),
-            relevance_reason=(str(analysis.get("relevance_reason", "")) + f" | {interest_summary}"),
-            llm_importance=llm_importance,
-            llm_relevance=llm_relevance,
-            source_bonus=source_bonus,
-            category_bonus=category_bonus,
-        )
-        processed += 1
-        logger.info("Analyzed article_id=%s (title=%s)", article["id"], article["title"])
+    started = time.perf_counter()
+    request_share = 0.0
+    prompt_tokens = 0.0
+    eval_tokens = 0.0
+    try:
+        for chunk_results in results:
+            for result in chunk_results:
+                article = result.article
+                _save_result(repo, ollama, article, result.parsed, source_stats, category_stats)
+                processed += 1
+                request_share += result.requests
+                prompt_tokens += result.prompt_tokens
+                eval_tokens += result.eval_tokens
+                run_stats.batch_fallbacks += int(result.batch_fallback)
+                run_stats.latencies_ms.append(result.latency_ms)
+                logger.info(
+                    "Analyzed article_id=%s in %.0fms (title=%s)",
+                    article["id"],
+                    result.latency_ms,
+                    article["title"],
+                )
+    except CircuitOpenError as exc:
+        # フォールバック値で埋めず未分析のまま残し、復旧後に再分析させる
+        logger.warning("Stopping analysis early (processed=%d): %s", processed, exc)
 
+    run_stats.llm_requests = round(request_share)
+    run_stats.prompt_tokens = round(prompt_tokens)
+    run_stats.eval_tokens = round(eval_tokens)
+    run_stats.processed = processed
+    run_stats.wall_seconds = time.perf_counter() - started
+    logger.info(
+        "Stage1 analysis finished: processed=%d concurrency=%d articles_per_prompt=%d "
+        "wall=%.2fs throughput=%.1f articles/min prompt_tokens/article=%.1f "
+        "p50=%.0fms p95=%.0fms",
+        processed,
+        workers,
+        per_prompt,
+        run_stats.wall_seconds,
+        run_stats.articles_per_minute,
+        run_stats.prompt_tokens_per_article,
+        run_stats.latency_percentile(0.5),
+        run_stats.latency_percentile(0.95),
+    )
     return processed
 
 
@@ -142,10 +513,30 @@ def main() -> None:
     parser = argparse.ArgumentParser(description="Analyze pending articles with Ollama.")
     parser.add_argument("--db-path", type=str, default=str(DEFAULT_DB))
     parser.add_argument("--batch-size", type=int, default=10)
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=None,
+        help="同時に投げる LLM リクエスト数（既定: ANALYZE_CONCURRENCY または 1）",
+    )
+    parser.add_argument(
+        "--articles-per-prompt",
+        type=int,
+        default=None,
+        help="1 リクエストにまとめる記事数（既定: ANALYZE_ARTICLES_PER_PROMPT または 1、最大 8）",
+    )
     args = parser.parse_args()
 
     logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
-    analyze_pending_articles(db_path=Path(args.db_path), batch_size=args.batch_size)
+    if args.concurrency and args.concurrency > llm_gateway.max_concurrency:
+        # 単独実行時はこのジョブしかゲートウェイを使わないので、指定並列数まで枠を広げる
+        llm_gateway.configure(args.concurrency)
+    analyze_pending_articles(
+        db_path=Path(args.db_path),
+        batch_size=args.batch_size,
+        concurrency=args.concurrency,
+        articles_per_prompt=args.articles_per_prompt,
+    )
 
 
 if __name__ == "__main__":
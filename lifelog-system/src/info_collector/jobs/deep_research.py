@@ -9,10 +9,21 @@ from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+from src.ai_secretary.circuit_breaker import CircuitOpenError
+from src.ai_secretary.model_routing import STAGE_DEEP_RESEARCH, llm_stage
 from src.ai_secretary.ollama_client import OllamaClient
 from src.info_collector.prompts import search_query_gen, result_synthesis
 from src.info_collector.repository import InfoCollectorRepository
 from src.info_collector.search import DDGSearchClient, filter_search_results
+from src.info_collector.search.relevance import (
+    DEFAULT_MIN_SCORE,
+    DEFAULT_TOP_K,
+    rank_by_relevance,
+)
+from src.info_collector.topic_clustering import (
+    DEFAULT_THRESHOLD as DEFAULT_CLUSTER_THRESHOLD,
+    cluster_articles,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -27,160 +38,206 @@ def _run_ollama_json(
         if not response:
             return None
         return json.loads(response)
+    except CircuitOpenError:
+        raise
     except Exception as exc:  # noqa: BLE001
         logger.warning("Ollama JSON generation failed: %s", exc)
         return None
 
 
+def _get(row: Any, key: str, default: Any = None) -> Any:
+    return row[key] if key in row.keys() else default
+
+
+def _row_keywords(row: Any) -> List[str]:
+    try:
+        return [str(k) for k in json.loads(_get(row, "keywords") or "[]")]
+    except Exception:
+        return []
+
+
+def _research_cluster(
+    repo: InfoCollectorRepository,
+    ollama: OllamaClient,
+    ddg: DDGSearchClient,
+    cluster: List[Any],
+    result_min_score: float,
+    result_top_k: int,
+) -> int:
+    """
+    同じトピックの記事群を 1 回の検索・統合で深掘りし、全記事に同じ結果を保存する.
+
+    先頭の記事を代表としてクエリと統合プロンプトを組み立て、他の記事はタイトルと要約を
+    補足として渡す。
+
+    Returns:
+        保存した記事数（クエリや検索結果が得られなければ 0）
+
+    Raises:
+        CircuitOpenError: Ollama が遮断中（呼び出し側で処理を打ち切る）
+    """
+    leader = cluster[0]
+    leader_id = leader["article_id"]
+    summary = leader["summary"] or leader["collected_title"] or ""
+    keywords: List[str] = []
+    for row in cluster:
+        keywords.extend(k for k in _row_keywords(row) if k not in keywords)
+
+    # 判断理由を取得
+    importance_reason = _get(leader, "importance_reason", "") or ""
+    relevance_reason = _get(leader, "relevance_reason", "") or ""
+
+    # 1) 検索クエリ生成
+    prompts = search_query_gen.build_prompt(
+        theme=summary,
+        keywords=keywords,
+        category=_get(leader, "category", "その他"),
+        summary=summary,
+        importance_reason=importance_reason,
+        relevance_reason=relevance_reason,
+    )
+    query_payload = _run_ollama_json(ollama, prompts["system"], prompts["user"])
+    queries: List[str] = []
+    if query_payload and isinstance(query_payload, dict):
+        queries = [q.get("query", "") for q in query_payload.get("queries", []) if q.get("query")]
+
+    if not queries:
+        logger.warning("No queries generated for article_id=%s", leader_id)
+        return 0
+
+    # 2) DDG検索
+    search_results_map = ddg.batch_search(queries, delay=1.5)
+    combined_results: List[Dict[str, str]] = []
+    for results in search_results_map.values():
+        # 基本的なフィルタリング（スニペット長、ドメイン除外）
+        basic_filtered = filter_search_results(results, min_snippet_length=40)
+        combined_results.extend(basic_filtered)
+
+    if not combined_results:
+        logger.warning("No search results for article_id=%s", leader_id)
+        return 0
+
+    # 2-1) 関連性フィルタリング（ローカル TF-IDF）
+    # LLM による判定（filter_by_relevance）は 1 件あたり 30〜60 秒かかるため使わず、
+    # 元記事との語彙の類似度でテーマから外れた結果を落として統合プロンプトを短くする
+    article_content = _get(leader, "collected_content", "") or ""
+    article_summary = article_content[:500] if article_content else summary
+    if len(cluster) > 1:
+        related = "\n".join(
+            f"- {row['collected_title'] or ''}: {row['summary'] or ''}" for row in cluster[1:]
+        )
+        article_summary = f"{article_summary}\n\n同じ話題の関連記事:\n{related}"
+    fetched_count = len(combined_results)
+    combined_results = rank_by_relevance(
+        combined_results,
+        article_title=leader["collected_title"] or "",
+        article_summary=f"{summary}\n{article_summary}",
+        keywords=keywords,
+        min_score=result_min_score,
+        top_k=result_top_k,
+    )
+    logger.info(
+        "Kept %d/%d search results for article_id=%s",
+        len(combined_results),
+        fetched_count,
+        leader_id,
+    )
+
+    # 3) 検索結果統合
+    synthesis_prompts = result_synthesis.build_prompt(
+        theme=summary,
+        search_query=", ".join(queries),
+        search_results=combined_results,
+        article_summary=article_summary,
+        importance_score=float(_get(leader, "importance_score", 0.0) or 0.0),
+        relevance_score=float(_get(leader, "relevance_score", 0.0) or 0.0),
+        importance_reason=importance_reason,
+        relevance_reason=relevance_reason,
+    )
+    # 合成前に遮断された場合は保存せず、復旧後に改めて深掘りさせる
+    synthesis = _run_ollama_json(ollama, synthesis_prompts["system"], synthesis_prompts["user"])
+
+    synthesized_content = ""
+    sources: List[Dict[str, str]] = []
+    if synthesis:
+        synthesized_content = synthesis.get("detailed_summary", "")
+        sources = synthesis.get("sources", [])
+
+    researched_at = datetime.now()
+    for row in cluster:
+        repo.save_deep_research(
+            article_id=row["article_id"],
+            search_query=", ".join(queries),
+            search_results=combined_results,
+            synthesized_content=synthesized_content,
+            sources=sources,
+            researched_at=researched_at,
+            cluster_leader_id=leader_id if len(cluster) > 1 else None,
+        )
+    logger.info("Deep research saved for article_id=%s (cluster of %d)", leader_id, len(cluster))
+    return len(cluster)
+
+
 def deep_research_articles(
     db_path: Path = DEFAULT_DB,
     batch_size: int = 5,
     min_importance: float = 0.7,
     min_relevance: float = 0.6,
     article_id: Optional[int] = None,
+    result_min_score: float = DEFAULT_MIN_SCORE,
+    result_top_k: int = DEFAULT_TOP_K,
+    article_ids: Optional[List[int]] = None,
+    cluster_threshold: float = DEFAULT_CLUSTER_THRESHOLD,
 ) -> int:
     """重要記事を深掘りし、deep_researchに保存.
 
+    対象記事はトピックごとにクラスタへまとめ、クラスタ単位で検索と統合を 1 回だけ行う。
+
     Args:
         article_id: 指定した場合はその1記事のみ処理する（worker の記事単位ループ用）
+        result_min_score: 元記事との TF-IDF 類似度がこれ未満の検索結果を統合前に捨てる
+        result_top_k: 統合プロンプトに渡す検索結果の上限
+        article_ids: 指定した場合はこれらを 1 クラスタ（先頭が代表）として処理する
+            （worker のクラスタ単位ループ用）
+        cluster_threshold: クラスタにまとめる類似度の閾値（1.0 超でクラスタリングしない）
+
+    Returns:
+        深掘り結果を保存した記事数
     """
     repo = InfoCollectorRepository(str(db_path))
 
-    if article_id is not None:
-        row = repo.fetch_article_analysis_by_id(article_id)
-        if row is None:
-            logger.info("Article %s not found or not analyzed yet.", article_id)
-            return 0
-        targets = [row]
+    if article_ids is not None or article_id is not None:
+        rows = []
+        for target_id in article_ids if article_ids is not None else [article_id]:
+            row = repo.fetch_article_analysis_by_id(target_id)
+            if row is None:
+                logger.info("Article %s not found or not analyzed yet.", target_id)
+                continue
+            rows.append(row)
+        clusters = [rows] if rows else []
     else:
         targets = repo.fetch_deep_research_targets(
             min_importance=min_importance, min_relevance=min_relevance, limit=batch_size
         )
+        clusters = cluster_articles(targets, threshold=cluster_threshold)
 
-    if not targets:
+    if not clusters:
         logger.info("No articles eligible for deep research.")
         return 0
 
-    ollama = OllamaClient()
+    with llm_stage(STAGE_DEEP_RESEARCH):
+        ollama = OllamaClient()
     ddg = DDGSearchClient(max_results=10)
     processed = 0
 
-    for row in targets:
-        article_id = row["article_id"]
-        summary = row["summary"] or row["collected_title"] or ""
-        keywords = []
+    for cluster in clusters:
         try:
-            raw_keywords = row["keywords"] if "keywords" in row.keys() else "[]"
-            keywords = json.loads(raw_keywords or "[]")
-        except Exception:
-            keywords = []
-
-        # 判断理由を取得
-        importance_reason = (
-            row["importance_reason"] if "importance_reason" in row.keys() else ""
-        ) or ""
-        relevance_reason = (
-            row["relevance_reason"] if "relevance_reason" in row.keys() else ""
-        ) or ""
-
-        # 1) 検索クエリ生成
-        prompts = search_query_gen.build_prompt(
-            theme=summary,
-            keywords=[str(k) for k in keywords],
-            category=row["category"] if "category" in row.keys() else "その他",
-            summary=summary,
-            importance_reason=importance_reason,
-            relevance_reason=relevance_reason,
-        )
-        query_payload = _run_ollama_json(ollama, prompts["system"], prompts["user"])
-        queries: List[str] = []
-        if query_payload and isinstance(query_payload, dict):
-            queries = [
-                q.get("query", "") for q in query_payload.get("queries", []) if q.get("query")
-            ]
-
-        if not queries:
-            logger.warning("No queries generated for article_id=%s", article_id)
-            continue
-
-        # 2) DDG検索
-        search_results_map = ddg.batch_search(queries, delay=1.5)
-        combined_results: List[Dict[str, str]] = []
-        for results in search_results_map.values():
-            # 基本的なフィルタリング（スニペット長、ドメイン除外）
-            basic_filtered = filter_search_results(results, min_snippet_length=40)
-            combined_results.extend(basic_filtered)
-
-        if not combined_results:
-            logger.warning("No search results for article_id=%s", article_id)
-            continue
-
-        # 2-1) 関連性フィルタリング（LLM使用）- 現在スキップ中
-        # NOTE: search_query_gen でテーマ特化クエリを生成しているため、
-        # DDG 検索結果はすでにテーマに関連している。
-        # LLM による二重評価はコスト増（Stage2 の +30〜60秒/件）に対して効果が薄いため、
-        # 2026-03-24 時点でスキップに変更。
-        # 品質低下が顕著な場合は以下の filter_by_relevance 呼び出しを復活させること:
-        #
-        # article_content = (
-        #     row["collected_content"] if "collected_content" in row.keys() else ""
-        # ) or ""
-        # article_summary_for_filtering = article_content[:500] if article_content else summary
-        # relevant_results = filter_by_relevance(
-        #     results=combined_results,
-        #     article_theme=summary,
-        #     article_summary=article_summary_for_filtering,
-        #     keywords=[str(k) for k in keywords],
-        #     ollama_client=ollama,
-        #     min_relevance_score=0.5,
-        # )
-        # if len(relevant_results) < 3:
-        #     combined_results = combined_results[:10]
-        # else:
-        #     combined_results = relevant_results[:10]
-        article_content = (
-            row["collected_content"] if "collected_content" in row.keys() else ""
-        ) or ""
-        article_summary_for_filtering = article_content[:500] if article_content else summary
-        combined_results = combined_results[:10]
-
-        # 3) 検索結果統合
-        # 元の分析結果を取得
-        importance_score = float(
-            row["importance_score"] if "importance_score" in row.keys() else 0.0
-        )
-        relevance_score = float(row["relevance_score"] if "relevance_score" in row.keys() else 0.0)
-        # 記事内容の最初の500文字を要約として使用（既に取得済み）
-        article_summary_for_synthesis = article_summary_for_filtering
-
-        synthesis_prompts = result_synthesis.build_prompt(
-            theme=summary,
-            search_query=", ".join(queries),
-            search_results=combined_results[:10],
-            article_summary=article_summary_for_synthesis,
-            importance_score=importance_score,
-            relevance_score=relevance_score,
-            importance_reason=importance_reason,
-            relevance_reason=relevance_reason,
-        )
-        synthesis = _run_ollama_json(ollama, synthesis_prompts["system"], synthesis_prompts["user"])
-
-        synthesized_content = ""
-        sources: List[Dict[str, str]] = []
-        if synthesis:
-            synthesized_content = synthesis.get("detailed_summary", "")
-            sources = synthesis.get("sources", [])
-
-        repo.save_deep_research(
-            article_id=article_id,
-            search_query=", ".join(queries),
-            search_results=combined_results,
-            synthesized_content=synthesized_content,
-            sources=sources,
-            researched_at=datetime.now(),
-        )
-        processed += 1
-        logger.info("Deep research saved for article_id=%s", article_id)
+            processed += _research_cluster(
+                repo, ollama, ddg, cluster, result_min_score, result_top_k
+            )
+        except CircuitOpenError as exc:
+            logger.warning("Stopping deep research early (processed=%d): %s", processed, exc)
+            break
 
     return processed
 
@@ -191,6 +248,9 @@ def main() -> None:
     parser.add_argument("--batch-size", type=int, default=5)
     parser.add_argument("--min-importance", type=float, default=0.7)
     parser.add_argument("--min-relevance", type=float, default=0.6)
+    parser.add_argument("--result-min-score", type=float, default=DEFAULT_MIN_SCORE)
+    parser.add_argument("--result-top-k", type=int, default=DEFAULT_TOP_K)
+    parser.add_argument("--cluster-threshold", type=float, default=DEFAULT_CLUSTER_THRESHOLD)
     args = parser.parse_args()
 
     logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
@@ -199,6 +259,9 @@ def main() -> None:
         batch_size=args.batch_size,
         min_importance=args.min_importance,
         min_relevance=args.min_relevance,
+        result_min_score=args.result_min_score,
+        result_top_k=args.result_top_k,
+        cluster_threshold=args.cluster_threshold,
     )
 
 
@@ -16,6 +16,7 @@ from datetime import datetime
 from pathlib import Path
 from typing import Optional, Callable, Any
 
+from src.ai_secretary.model_routing import STAGE_REPORT, llm_stage
 from src.ai_secretary.ollama_client import OllamaClient
 from src.info_collector.data_aggregator import DailyReportDataAggregator
 from src.info_collector.prompts import integrated_report_generation
@@ -73,7 +74,8 @@ def generate_integrated_daily_report(
     )
 
     # 3. LLMでレポート生成
-    llm_client = llm_client_factory() if llm_client_factory else OllamaClient()
+    with llm_stage(STAGE_REPORT):
+        llm_client = llm_client_factory() if llm_client_factory else OllamaClient()
     content = llm_client.generate(
         prompt=prompts["user"], system=prompts["system"], options={"temperature": 0.5}
     )
@@ -10,6 +10,7 @@ from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Optional
 
+from src.ai_secretary.model_routing import STAGE_REPORT, llm_stage
 from src.ai_secretary.ollama_client import OllamaClient
 from src.info_collector.prompts import report_generation
 from src.info_collector.repository import InfoCollectorRepository
@@ -197,59 +198,30 @@ def generate_daily_report(
         report_date = target_date
         logger.info("Using specified target date: %s", report_date)
         target_datetime = datetime.strptime(report_date, "%Y-%m-%d")
-        target_date_start = target_datetime
-        target_date_end = target_datetime + timedelta(days=1)
-        since = target_date_start.isoformat()
+        since = target_datetime.isoformat()
+        until = (target_datetime + timedelta(days=1)).isoformat()
     else:
         # hours ベースの取得（従来挙動）を復活
         report_date = now.strftime("%Y-%m-%d")
         since = (now - timedelta(hours=hours)).isoformat()
-        target_date_start = None
-        target_date_end = None
+        until = None
         logger.info("Using recent window: past %d hours (since %s)", hours, since)
 
     repo = InfoCollectorRepository(str(db_path))
 
-    # 分析・深掘り結果を取得
-    analyses = repo.fetch_recent_analysis(since)
-    deep = repo.fetch_recent_deep_research(since)
-    if target_date_start and target_date_end:
-
-        def is_in_target_date(record: dict) -> bool:
-            """レコードが対象日の範囲内かどうかを判定"""
-            timestamp_str = record.get("analyzed_at") or record.get("researched_at")
-            if not timestamp_str:
-                return False
-            try:
-                if isinstance(timestamp_str, str):
-                    if "T" in timestamp_str:
-                        timestamp_str = timestamp_str.split("+")[0].split("Z")[0]
-                        if "." in timestamp_str:
-                            timestamp_str = timestamp_str.split(".")[0]
-                    timestamp = datetime.fromisoformat(timestamp_str)
-                else:
-                    timestamp = timestamp_str
-                if timestamp.tzinfo:
-                    timestamp = timestamp.replace(tzinfo=None)
-                return target_date_start <= timestamp < target_date_end
-            except (ValueError, AttributeError, TypeError) as e:
-                logger.debug("Failed to parse timestamp %s: %s", timestamp_str, e)
-                return False
-
-        all_analyses = analyses
-        all_deep = deep
-        analyses = [a for a in analyses if is_in_target_date(a)]
-        deep = [d for d in deep if is_in_target_date(d)]
+    # 分析・深掘り結果を取得（対象日指定時は [since, until) に絞る）
+    analyses = repo.fetch_recent_analysis(since, until)
+    deep = repo.fetch_recent_deep_research(since, until)
+    if until:
         logger.info(
-            "Filtered to %d analyses and %d deep research entries for %s (from %d total analyses, %d total deep)",
+            "Fetched %d analyses and %d deep research entries for %s",
             len(analyses),
             len(deep),
             report_date,
-            len(all_analyses),
-            len(all_deep),
         )
 
     # 記事分析データがない場合でも、ライフログデータがあればレポートを生成
+    data = None
     if not analyses:
         if include_lifelog:
             # ライフログデータを先に取得して確認
@@ -287,7 +259,8 @@ def generate_daily_report(
             logger.info("No analyzed articles for %s to include in report.", report_date)
             return None
 
-    ollama = OllamaClient()
+    with llm_stage(STAGE_REPORT):
+        ollama = OllamaClient()
 
     # ライフログデータを取得（オプション）
     lifelog_data = None
@@ -306,8 +279,10 @@ def generate_daily_report(
                     lifelog_db_path = db_path.parent / "lifelog.db"
 
             if lifelog_db_path and lifelog_db_path.exists():
-                aggregator = DailyReportDataAggregator(lifelog_db_path, db_path)
-                data = aggregator.aggregate_daily_data(report_date, detail_level="summary")
+                # ライフログの有無の確認で集約済みならそれを使う
+                if data is None:
+                    aggregator = DailyReportDataAggregator(lifelog_db_path, db_path)
+                    data = aggregator.aggregate_daily_data(report_date, detail_level="summary")
                 lifelog_data = data.lifelog_data
                 browser_history = data.browser_history
                 events = data.events
@@ -10,6 +10,8 @@ from datetime import datetime
 from pathlib import Path
 from typing import List
 
+from src.ai_secretary.circuit_breaker import CircuitOpenError
+from src.ai_secretary.model_routing import STAGE_REPORT, llm_stage
 from src.ai_secretary.ollama_client import OllamaClient
 from src.info_collector.prompts import theme_report
 from src.info_collector.repository import InfoCollectorRepository
@@ -62,6 +64,8 @@ def _generate_theme_text(ollama: OllamaClient, prompts: dict[str, str], theme: s
                 system=prompts["system"],
                 options={"temperature": 0.5},
             )
+        except CircuitOpenError:
+            raise
         except Exception as exc:  # noqa: BLE001
             logger.error(
                 "Theme report generation failed for '%s' (attempt %d/2): %s", theme, attempt, exc
@@ -120,6 +124,8 @@ def generate_theme_reports(
     """
     深掘り済み記事を記事単位でレポートを生成.
 
+    深掘りをクラスタで共有した記事は、代表記事のレポート 1 件にまとめる。
+
     Args:
         db_path: データベースパス
         output_dir: レポート出力ディレクトリ
@@ -138,18 +144,27 @@ def generate_theme_reports(
         return []
 
     report_date = datetime.now().strftime("%Y-%m-%d")
-    ollama = OllamaClient()
+    with llm_stage(STAGE_REPORT):
+        ollama = OllamaClient()
     output_dir.mkdir(parents=True, exist_ok=True)
 
     existing_article_ids = repo.get_existing_report_article_ids() if skip_existing else set()
 
     generated_paths: List[Path] = []
 
+    # 深掘りを共有したトピッククラスタは代表記事 1 件のレポートにまとめる
+    groups: dict[int, list[dict]] = {}
     for article in articles:
-        src_article_id = article.get("article_id")
-        if src_article_id is None:
+        if article.get("article_id") is None:
             logger.warning("article_id が取得できない行をスキップ")
             continue
+        leader_id = article.get("cluster_leader_id") or article["article_id"]
+        groups.setdefault(leader_id, []).append(article)
+
+    for leader_id, group in groups.items():
+        article = next((a for a in group if a["article_id"] == leader_id), group[0])
+        group = [article, *(a for a in group if a is not article)]
+        src_article_id = article["article_id"]
 
         # 既存チェック: source_article_id が DB に既にあればスキップ
         if skip_existing and src_article_id in existing_article_ids:
@@ -175,17 +190,25 @@ def generate_theme_reports(
         report_path = output_dir / report_filename
 
         theme = article.get("theme") or article_title
-        logger.info("Generating report for article_id=%s ('%s')", src_article_id, article_title)
-
-        # プロンプト構築（単一記事をリストとして渡す）
-        prompts = theme_report.build_prompt(
-            theme=theme, articles=[article], report_date=report_date
+        logger.info(
+            "Generating report for article_id=%s ('%s', %d articles)",
+            src_article_id,
+            article_title,
+            len(group),
         )
 
+        # プロンプト構築（クラスタの記事をまとめて渡す）
+        prompts = theme_report.build_prompt(theme=theme, articles=group, report_date=report_date)
+
         # LLMでレポート生成
-        content = _generate_theme_text(ollama, prompts, theme)
+        try:
+            content = _generate_theme_text(ollama, prompts, theme)
+        except CircuitOpenError as exc:
+            # 遮断中にフォールバックレポートを書くと復旧後に再生成されないため中断する
+            logger.warning("Stopping report generation early: %s", exc)
+            break
         if not content or len(content.strip()) < MIN_THEME_REPORT_CHARS:
-            content = _build_theme_fallback(theme, [article], report_date)
+            content = _build_theme_fallback(theme, group, report_date)
 
         from src.info_collector.jobs.obsidian_links import build_article_navigation_section
 
@@ -196,7 +219,7 @@ def generate_theme_reports(
             title=f"{article_title} - レポート",
             report_date=report_date,
             content=content,
-            article_count=1,
+            article_count=len(group),
             category="theme",
             source_article_id=src_article_id,
             created_at=datetime.now(),
@@ -0,0 +1,49 @@
+"""
+collected_info の全文検索インデックス（FTS5）を再構築するジョブ.
+
+通常はトリガーで同期されるため不要。SQLite を差し替えた後や、
+インデックスの破損・不整合が疑われるときに手動で実行する。
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import time
+from pathlib import Path
+
+from src.info_collector.repository import InfoCollectorRepository
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB = Path("data/ai_secretary.db")
+
+
+def rebuild_search_index(db_path: Path) -> int:
+    """全文検索インデックスを再構築し、対象記事数を返す。"""
+    repo = InfoCollectorRepository(str(db_path))
+    if not repo.has_fulltext_index():
+        logger.warning("FTS5 (trigram) is not available in this SQLite build; nothing to rebuild")
+        return 0
+
+    started = time.perf_counter()
+    count = repo.rebuild_fulltext_index()
+    logger.info(
+        "Rebuilt collected_info full-text index: %d articles in %.2fs",
+        count,
+        time.perf_counter() - started,
+    )
+    return count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild the collected_info full-text index.")
+    parser.add_argument("--db-path", type=str, default=str(DEFAULT_DB))
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    rebuild_search_index(Path(args.db_path))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+MinHash による記事の近似重複判定
+
+同じニュースが RSS / ニュース収集 / DDG 検索から URL やタイトル表記を変えて届くため、
+正規化したタイトル + 本文冒頭の文字 3-gram 集合から MinHash 署名を作り、
+推定 Jaccard 係数が閾値以上なら同一記事とみなす。
+
+署名は BAND_COUNT 個のバンドに分けて LSH 索引にする。いずれかのバンドが一致した記事だけを
+候補として取り出すので、記事数が数万件になっても 1 件あたりの照合件数は小さく保てる。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import random
+import re
+import struct
+import unicodedata
+from typing import Optional
+
+NUM_PERM = 64
+BAND_COUNT = 16
+ROWS_PER_BAND = NUM_PERM // BAND_COUNT
+# LSH の S 字カーブは (1/16)^(1/4) ≈ 0.5 付近で立ち上がる。最終判定はこの閾値で行う
+DEFAULT_THRESHOLD = 0.7
+# 短すぎる文字列は署名が不安定なので判定しない
+MIN_TEXT_LENGTH = 16
+
+_SHINGLE_SIZE = 3
+_BODY_LIMIT = 300
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_STRIP_RE = re.compile(r"[\W_]+", re.UNICODE)
+
+# 署名の互換性のため乱数列は固定シードで生成する
+_rng = random.Random(20240601)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(NUM_PERM)
+]
+
+
+def normalize_text(title: str | None, body: str | None = None) -> str:
+    """NFKC・小文字化・記号と空白の除去を行い、タイトル + 本文冒頭を連結する。"""
+    parts = [title or "", (body or "")[:_BODY_LIMIT]]
+    text = unicodedata.normalize("NFKC", " ".join(parts)).lower()
+    return _STRIP_RE.sub("", text)
+
+
+def _shingles(text: str) -> set[str]:
+    if len(text) <= _SHINGLE_SIZE:
+        return {text}
+    return {text[i : i + _SHINGLE_SIZE] for i in range(len(text) - _SHINGLE_SIZE + 1)}
+
+
+def _hash32(token: str) -> int:
+    return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=4).digest(), "big")
+
+
+def minhash(text: str) -> list[int]:
+    """文字 3-gram 集合の MinHash 署名（NUM_PERM 個の 32bit 値）を返す。"""
+    hashes = [_hash32(shingle) for shingle in _shingles(text)]
+    return [
+        min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes) for a, b in _PERMUTATIONS
+    ]
+
+
+def signature(title: str | None, body: str | None = None) -> Optional[list[int]]:
+    """記事の MinHash 署名。判定に十分な長さが無ければ None。"""
+    text = normalize_text(title, body)
+    if len(text) < MIN_TEXT_LENGTH:
+        return None
+    return minhash(text)
+
+
+def similarity(a: list[int], b: list[int]) -> float:
+    """署名の一致率（Jaccard 係数の推定値）。"""
+    if not a or len(a) != len(b):
+        return 0.0
+    return sum(1 for x, y in zip(a, b) if x == y) / len(a)
+
+
+def band_keys(sig: list[int]) -> list[int]:
+    """LSH 索引用のバンドキー（SQLite INTEGER に収まる符号付き 64bit 値）。"""
+    keys: list[int] = []
+    for band in range(BAND_COUNT):
+        rows = sig[band * ROWS_PER_BAND : (band + 1) * ROWS_PER_BAND]
+        digest = hashlib.blake2b(
+            struct.pack(f">I{ROWS_PER_BAND}I", band, *rows), digest_size=8
+        ).digest()
+        keys.append(int.from_bytes(digest, "big", signed=True))
+    return keys
+
+
+def pack_signature(sig: list[int]) -> bytes:
+    return struct.pack(f">{len(sig)}I", *sig)
+
+
+def unpack_signature(raw: bytes) -> list[int]:
+    return list(struct.unpack(f">{len(raw) // 4}I", raw))
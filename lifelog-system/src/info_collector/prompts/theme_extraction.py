@@ -61,3 +61,61 @@ def build_prompt(title: str, content: str, published_at: str) -> dict[str, str]:
             published_at=published_at,
         ),
     }
+
+
+# 複数記事を 1 リクエストで分析するバッチ版。長いシステムプロンプトの評価を K 記事で共有する。
+BATCH_CONTENT_LIMIT = 1000
+
+BATCH_SYSTEM_PROMPT = SYSTEM_PROMPT.replace(
+    "必ずJSON形式のみを出力してください。説明文は不要です。",
+    """複数の記事が番号付きで渡されます。記事ごとに上記の形式のオブジェクトを作り、
+"index" に記事番号を入れて、記事と同じ順序のJSON配列のみを出力してください。
+例: [{"index": 1, "theme": "...", ...}, {"index": 2, "theme": "...", ...}]
+
+必ずJSON配列のみを出力してください。説明文は不要です。""",
+)
+
+BATCH_USER_PROMPT_TEMPLATE = """以下の{count}件の記事をそれぞれ分析してください。
+
+【ユーザーの興味分野】
+- AI・機械学習（特にLLM、生成AI、AI活用事例）
+- 投資・暗号資産（市場動向、投資戦略）
+- ゲーム（ストーリー重視の作品、ゲーム業界動向）
+- 日本の政治・文化（政策、社会問題）
+
+{articles}
+
+上記の出力形式に従い、{count}件分のJSON配列を出力してください。"""
+
+BATCH_ARTICLE_TEMPLATE = """【記事{index}】
+タイトル: {title}
+本文: {content}
+公開日: {published_at}"""
+
+
+def build_batch_prompt(articles: list[dict[str, str]]) -> dict[str, str]:
+    """
+    複数記事のテーマ抽出プロンプトを構築.
+
+    Args:
+        articles: title / content / published_at を持つ dict のリスト。
+            出力の "index" は 1 始まりでこの順序に対応する。
+
+    Returns:
+        {"system": str, "user": str}
+    """
+    blocks = [
+        BATCH_ARTICLE_TEMPLATE.format(
+            index=i,
+            title=article.get("title") or "",
+            content=(article.get("content") or "")[:BATCH_CONTENT_LIMIT],
+            published_at=article.get("published_at") or "",
+        )
+        for i, article in enumerate(articles, start=1)
+    ]
+    return {
+        "system": BATCH_SYSTEM_PROMPT,
+        "user": BATCH_USER_PROMPT_TEMPLATE.format(
+            count=len(articles), articles="\n\n".join(blocks)
+        ),
+    }
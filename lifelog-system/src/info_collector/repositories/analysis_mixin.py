@@ -10,6 +10,8 @@ import sqlite3
 from datetime import datetime
 from typing import Any, Optional
 
+from src.common.epoch import to_epoch_ms
+
 
 class AnalysisMixin:
     """article_analysis / deep_research の操作を提供するミックスイン。"""
@@ -18,6 +20,12 @@ class AnalysisMixin:
         """
         未分析の記事を取得.
 
+        返すのは正規行のみ。URL 違いの同一記事は canonical_url で 1 行に統合済みで、
+        近似重複として正規記事に紐付いた記事は正規記事の分析を引き継ぐため対象外。
+        analysis_state（article_analysis のトリガーで更新）の部分インデックスを新しい順に
+        読むので、collected_info の件数によらず limit 行分のコストで済む（統計が無いと
+        プランナが duplicate_of の索引を選ぶため INDEXED BY で固定する）。
+
         Returns:
             collected_info行を含むRowリスト
         """
@@ -25,17 +33,27 @@ class AnalysisMixin:
             conn.row_factory = sqlite3.Row
             cursor = conn.execute(
                 """
-                SELECT c.*
-                FROM collected_info c
-                LEFT JOIN article_analysis a ON c.id = a.article_id
-                WHERE a.id IS NULL
-                ORDER BY c.fetched_at DESC
+                SELECT *
+                FROM collected_info INDEXED BY idx_info_pending_analysis
+                WHERE analysis_state = 'pending'
+                  AND duplicate_of IS NULL
+                ORDER BY fetched_at DESC
                 LIMIT ?
                 """,
                 (limit,),
             )
             return cursor.fetchall()
 
+    def count_unanalyzed(self) -> int:
+        """fetch_unanalyzed の対象になる未分析記事の件数（部分インデックスだけで数える）。"""
+        with self._connect() as conn:
+            return conn.execute(
+                """
+                SELECT COUNT(*) FROM collected_info INDEXED BY idx_info_pending_analysis
+                WHERE analysis_state = 'pending' AND duplicate_of IS NULL
+                """
+            ).fetchone()[0]
+
     def save_analysis(
         self,
         article_id: int,
@@ -100,15 +118,44 @@ class AnalysisMixin:
                         category_bonus,
                     ),
                 )
+                self._inherit_analysis(conn, article_id)
+                # カテゴリが変わるとフィードバック集計の帰属先も変わる
+                self._attribute_feedback_events(
+                    conn,
+                    "article_id = ? OR article_id IN "
+                    "(SELECT id FROM collected_info WHERE duplicate_of = ?)",
+                    (article_id, article_id),
+                )
 
         self._run_with_lock_retry(_op, retries=8, base_sleep=0.3)
 
+    def _inherit_analysis(self, conn: sqlite3.Connection, canonical_id: int) -> None:
+        """正規記事の分析結果を、紐付いた近似重複記事へコピーする。"""
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO article_analysis
+            (article_id, importance_score, relevance_score, category,
+             keywords, summary, model, analyzed_at, importance_reason, relevance_reason,
+             llm_importance_score, llm_relevance_score, source_bonus, category_bonus)
+            SELECT c.id, a.importance_score, a.relevance_score, a.category,
+                   a.keywords, a.summary, a.model, a.analyzed_at, a.importance_reason,
+                   a.relevance_reason, a.llm_importance_score, a.llm_relevance_score,
+                   a.source_bonus, a.category_bonus
+            FROM collected_info c
+            JOIN article_analysis a ON a.article_id = c.duplicate_of
+            WHERE c.duplicate_of = ?
+            """,
+            (canonical_id,),
+        )
+
     def fetch_deep_research_targets(
         self, min_importance: float = 0.7, min_relevance: float = 0.6, limit: int = 5
     ) -> list[sqlite3.Row]:
         """
         深掘り対象の記事を取得.
 
+        近似重複記事は正規記事と同じ内容なので対象外。
+
         Returns:
             article_analysis と collected_info を結合したRowリスト
             （importance_reason と relevance_reason を含む）
@@ -124,6 +171,7 @@ class AnalysisMixin:
                 WHERE a.importance_score >= ?
                   AND a.relevance_score >= ?
                   AND d.id IS NULL
+                  AND c.duplicate_of IS NULL
                 ORDER BY a.importance_score DESC, a.relevance_score DESC
                 LIMIT ?
                 """,
@@ -139,8 +187,13 @@ class AnalysisMixin:
         synthesized_content: str,
         sources: list[dict[str, str]],
         researched_at: datetime,
+        cluster_leader_id: Optional[int] = None,
     ) -> None:
-        """深掘り結果を保存."""
+        """深掘り結果を保存.
+
+        Args:
+            cluster_leader_id: トピッククラスタで深掘りを共有した場合の代表記事ID
+        """
 
         def _op() -> None:
             with self._connect() as conn:
@@ -148,8 +201,8 @@ class AnalysisMixin:
                     """
                     INSERT OR REPLACE INTO deep_research
                     (article_id, search_query, search_results,
-                     synthesized_content, sources, researched_at)
-                    VALUES (?, ?, ?, ?, ?, ?)
+                     synthesized_content, sources, researched_at, cluster_leader_id)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
                     """,
                     (
                         article_id,
@@ -158,40 +211,55 @@ class AnalysisMixin:
                         synthesized_content,
                         json.dumps(sources, ensure_ascii=False),
                         researched_at.isoformat(),
+                        cluster_leader_id,
                     ),
                 )
 
         self._run_with_lock_retry(_op)
 
-    def fetch_recent_analysis(self, since_iso: str) -> list[dict[str, Any]]:
-        """指定日時以降の分析結果を取得."""
+    def fetch_recent_analysis(
+        self, since_iso: str, until_iso: Optional[str] = None
+    ) -> list[dict[str, Any]]:
+        """指定日時以降（until_iso 指定時はその日時より前まで）の分析結果を取得."""
+        conditions = ["a.analyzed_at_ms >= ?"]
+        params = [to_epoch_ms(since_iso)]
+        if until_iso:
+            conditions.append("a.analyzed_at_ms < ?")
+            params.append(to_epoch_ms(until_iso))
         with self._connect() as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.execute(
-                """
+                f"""
                 SELECT a.*, c.title, c.url
                 FROM article_analysis a
                 JOIN collected_info c ON a.article_id = c.id
-                WHERE a.analyzed_at >= ?
-                ORDER BY a.analyzed_at DESC
+                WHERE {" AND ".join(conditions)}
+                ORDER BY a.analyzed_at_ms DESC
                 """,
-                (since_iso,),
+                params,
             )
             return [dict(r) for r in cursor.fetchall()]
 
-    def fetch_recent_deep_research(self, since_iso: str) -> list[dict[str, Any]]:
-        """指定日時以降の深掘り結果を取得."""
+    def fetch_recent_deep_research(
+        self, since_iso: str, until_iso: Optional[str] = None
+    ) -> list[dict[str, Any]]:
+        """指定日時以降（until_iso 指定時はその日時より前まで）の深掘り結果を取得."""
+        conditions = ["d.researched_at >= ?"]
+        params = [since_iso]
+        if until_iso:
+            conditions.append("d.researched_at < ?")
+            params.append(until_iso)
         with self._connect() as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.execute(
-                """
+                f"""
                 SELECT d.*, a.summary AS theme
                 FROM deep_research d
                 JOIN article_analysis a ON d.article_id = a.article_id
-                WHERE d.researched_at >= ?
+                WHERE {" AND ".join(conditions)}
                 ORDER BY d.researched_at DESC
                 """,
-                (since_iso,),
+                params,
             )
             return [dict(r) for r in cursor.fetchall()]
 
@@ -256,13 +324,14 @@ class AnalysisMixin:
         """深掘り済み記事を記事単位のフラットリストで取得.
 
         Args:
-            article_id: 指定した場合はその記事のみ返す
+            article_id: 指定した場合はその記事と、その記事を代表として深掘りを共有した
+                クラスタの記事のみ返す
         """
         params: list[Any] = []
         where_extra = ""
         if article_id is not None:
-            where_extra = "AND d.article_id = ?"
-            params.append(article_id)
+            where_extra = "AND (d.article_id = ? OR d.cluster_leader_id = ?)"
+            params.extend([article_id, article_id])
 
         with self._connect() as conn:
             conn.row_factory = sqlite3.Row
@@ -368,5 +437,6 @@ class AnalysisMixin:
                 """,
                 (article_id, now),
             )
+            self._attribute_feedback_events(conn, "article_id = ?", (article_id,))
             # deep_research が存在する場合は削除して再実行させる
             conn.execute("DELETE FROM deep_research WHERE article_id = ?", (article_id,))
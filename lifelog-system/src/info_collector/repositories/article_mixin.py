@@ -3,6 +3,9 @@
 
 collected_info テーブルと info_summaries テーブルを操作するメソッド群。
 InfoCollectorRepository に mix-in して使用する。
+
+追加時に MinHash LSH で近似重複を探し、見つかれば duplicate_of に正規記事の ID を記録する。
+重複記事は Stage1 分析の対象にならず、正規記事の分析結果を引き継ぐ。
 """
 
 import json
@@ -10,7 +13,15 @@ import sqlite3
 from datetime import datetime, timedelta
 from typing import List, Optional
 
+from src.common import fts
+from src.common.epoch import to_epoch_ms
+from src.info_collector import near_duplicate
 from src.info_collector.models import CollectedInfo, InfoSummary
+from src.info_collector.url_canonical import canonicalize_url
+
+# タイトル一致を本文・スニペットより重く評価する（bm25 は小さいほど関連度が高い）
+_FTS_RANK = "bm25(collected_info_fts, 10.0, 1.0, 2.0)"
+_FTS_FROM = "collected_info_fts JOIN collected_info c ON c.id = collected_info_fts.rowid"
 
 
 class ArticleMixin:
@@ -20,22 +31,29 @@ class ArticleMixin:
         """
         情報を追加（重複時はスキップ）
 
+        正規化した URL（canonical_url）が既存と一致する場合は、ソース種別によらずスキップする。
+        URL が異なっても内容が近似重複する場合は追加したうえで duplicate_of に正規記事の ID を記録する。
+
         Args:
             info: 追加する情報
 
         Returns:
             追加されたレコードのID（重複時はNone）
         """
+        canonical_url = canonicalize_url(info.url) or info.url
+        signature = near_duplicate.signature(info.title, info.content or info.snippet)
 
         def _op() -> Optional[int]:
             with self._connect() as conn:
+                canonical_id = self._find_near_duplicate(conn, signature)
                 try:
                     cursor = conn.execute(
                         """
                         INSERT INTO collected_info (
                             source_type, title, url, content, snippet,
-                            published_at, fetched_at, source_name, metadata_json
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                            published_at, fetched_at, source_name, metadata_json,
+                            canonical_url, duplicate_of
+                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                         """,
                         (
                             info.source_type,
@@ -49,15 +67,80 @@ class ArticleMixin:
                             json.dumps(info.metadata, ensure_ascii=False)
                             if info.metadata
                             else None,
+                            canonical_url,
+                            canonical_id,
                         ),
                     )
-                    return cursor.lastrowid
                 except sqlite3.IntegrityError:
                     # 重複時はスキップ
                     return None
+                article_id = cursor.lastrowid
+                self._index_minhash(conn, article_id, signature)
+                if canonical_id is not None:
+                    self._inherit_analysis(conn, canonical_id)
+                return article_id
 
         return self._run_with_lock_retry(_op)
 
+    def get_duplicate_ids(self, canonical_id: int) -> list[int]:
+        """正規記事に紐付いた近似重複記事の ID を返す。"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT id FROM collected_info WHERE duplicate_of = ? ORDER BY id",
+                (canonical_id,),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def _find_near_duplicate(
+        self, conn: sqlite3.Connection, signature: Optional[list[int]]
+    ) -> Optional[int]:
+        """LSH 索引から近似重複を探し、最も類似した記事の正規記事 ID を返す。"""
+        if signature is None:
+            return None
+        keys = near_duplicate.band_keys(signature)
+        placeholders = ",".join("?" * len(keys))
+        rows = conn.execute(
+            f"""
+            SELECT c.id, c.duplicate_of, m.signature
+            FROM collected_info c
+            JOIN article_minhash m ON m.article_id = c.id
+            WHERE c.id IN (
+                SELECT DISTINCT article_id FROM article_minhash_bands
+                WHERE band_key IN ({placeholders})
+            )
+            """,
+            keys,
+        ).fetchall()
+
+        best_id: Optional[int] = None
+        best_score = near_duplicate.DEFAULT_THRESHOLD
+        for article_id, duplicate_of, raw in rows:
+            if raw is None:
+                continue
+            score = near_duplicate.similarity(signature, near_duplicate.unpack_signature(raw))
+            if score >= best_score:
+                best_id = duplicate_of or article_id
+                best_score = score
+        return best_id
+
+    def _index_minhash(
+        self, conn: sqlite3.Connection, article_id: int, signature: Optional[list[int]]
+    ) -> None:
+        """記事の署名とバンドキーを LSH 索引に登録する（署名が無い記事は照合対象外）。"""
+        conn.execute(
+            "INSERT OR REPLACE INTO article_minhash (article_id, signature) VALUES (?, ?)",
+            (
+                article_id,
+                near_duplicate.pack_signature(signature) if signature is not None else None,
+            ),
+        )
+        if signature is None:
+            return
+        conn.executemany(
+            "INSERT INTO article_minhash_bands (band_key, article_id) VALUES (?, ?)",
+            [(key, article_id) for key in near_duplicate.band_keys(signature)],
+        )
+
     def get_info_by_id(self, info_id: int) -> Optional[CollectedInfo]:
         """IDで情報を取得"""
         with self._connect() as conn:
@@ -77,6 +160,10 @@ class ArticleMixin:
         """
         情報を検索
 
+        全文検索インデックスがあり query が 3 文字以上なら FTS5 で検索し BM25 順に返す
+        （順位付けは新しいヒット fts.RANK_WINDOW 件の中で行う）。
+        それ以外は LIKE の部分一致で検索し、取得日時の新しい順に返す。
+
         Args:
             source_type: ソースタイプでフィルタ
             query: タイトル・本文での検索
@@ -87,32 +174,46 @@ class ArticleMixin:
         Returns:
             検索結果のリスト
         """
+        use_fts = self._use_fulltext(query)
         conditions = []
-        params = []
+        params: list = []
+
+        if use_fts:
+            conditions.append("collected_info_fts MATCH ?")
+            params.append(fts.phrase(query))
+        elif query:
+            conditions.append("(c.title LIKE ? OR c.content LIKE ? OR c.snippet LIKE ?)")
+            params.extend([f"%{query}%", f"%{query}%", f"%{query}%"])
 
         if source_type:
-            conditions.append("source_type = ?")
+            conditions.append("c.source_type = ?")
             params.append(source_type)
 
-        if query:
-            conditions.append("(title LIKE ? OR content LIKE ? OR snippet LIKE ?)")
-            params.extend([f"%{query}%", f"%{query}%", f"%{query}%"])
-
         if start_date:
-            conditions.append("fetched_at >= ?")
-            params.append(start_date.isoformat())
+            conditions.append("c.fetched_at_ms >= ?")
+            params.append(to_epoch_ms(start_date))
 
         if end_date:
-            conditions.append("fetched_at <= ?")
-            params.append(end_date.isoformat())
+            conditions.append("c.fetched_at_ms <= ?")
+            params.append(to_epoch_ms(end_date))
 
         where_clause = " AND ".join(conditions) if conditions else "1=1"
-        sql = f"""
-            SELECT * FROM collected_info
-            WHERE {where_clause}
-            ORDER BY fetched_at DESC
-            LIMIT ?
-        """
+        if use_fts:
+            window = fts.rank_window_floor("collected_info_fts", _FTS_FROM, where_clause)
+            sql = f"""
+                SELECT c.* FROM {_FTS_FROM}
+                WHERE {where_clause} AND {window}
+                ORDER BY {_FTS_RANK}, c.fetched_at_ms DESC
+                LIMIT ?
+            """
+            params = params + params
+        else:
+            sql = f"""
+                SELECT c.* FROM collected_info c
+                WHERE {where_clause}
+                ORDER BY c.fetched_at_ms DESC
+                LIMIT ?
+            """
         params.append(limit)
 
         with self._connect() as conn:
@@ -120,6 +221,99 @@ class ArticleMixin:
             cursor = conn.execute(sql, params)
             return [self._row_to_info(row) for row in cursor.fetchall()]
 
+    def search_info_snippets(
+        self,
+        query: str,
+        source_type: Optional[str] = None,
+        limit: int = 20,
+    ) -> list[dict]:
+        """
+        全文検索して、一致箇所をハイライトしたタイトルと本文スニペット付きで返す.
+
+        一致箇所は【】で囲む。全文検索インデックスが使えない場合は search_info の結果に
+        本文冒頭をスニペットとして付けて返す（ハイライトなし）。
+
+        Returns:
+            id, title, url, source_type, source_name, fetched_at, score,
+            title_highlight, snippet_highlight を持つ辞書のリスト
+        """
+        if not self._use_fulltext(query):
+            return [
+                {
+                    "id": info.id,
+                    "title": info.title,
+                    "url": info.url,
+                    "source_type": info.source_type,
+                    "source_name": info.source_name,
+                    "fetched_at": info.fetched_at.isoformat(),
+                    "score": None,
+                    "title_highlight": info.title,
+                    "snippet_highlight": (info.content or info.snippet or "")[:120],
+                }
+                for info in self.search_info(source_type=source_type, query=query, limit=limit)
+            ]
+
+        conditions = ["collected_info_fts MATCH ?"]
+        params: list = [fts.phrase(query)]
+        if source_type:
+            conditions.append("c.source_type = ?")
+            params.append(source_type)
+        where_clause = " AND ".join(conditions)
+        window = fts.rank_window_floor("collected_info_fts", _FTS_FROM, where_clause)
+        params = params + params + [limit]
+
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute(
+                f"""
+                SELECT
+                    c.id, c.title, c.url, c.source_type, c.source_name, c.fetched_at,
+                    {_FTS_RANK} AS score,
+                    highlight(collected_info_fts, 0, '【', '】') AS title_highlight,
+                    CASE
+                        WHEN c.content IS NOT NULL AND c.content != ''
+                        THEN snippet(collected_info_fts, 1, '【', '】', '…', 24)
+                        ELSE snippet(collected_info_fts, 2, '【', '】', '…', 24)
+                    END AS snippet_highlight
+                FROM {_FTS_FROM}
+                WHERE {where_clause} AND {window}
+                ORDER BY score, c.fetched_at DESC
+                LIMIT ?
+                """,
+                params,
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def has_fulltext_index(self) -> bool:
+        """collected_info の全文検索インデックスが使えるかを返す。"""
+        cached = getattr(self, "_fulltext_available", None)
+        if cached is None:
+            with self._connect() as conn:
+                cached = fts.table_exists(conn, "collected_info_fts")
+            self._fulltext_available = cached
+        return cached
+
+    def rebuild_fulltext_index(self) -> int:
+        """
+        全文検索インデックスを collected_info から作り直す（トリガー導入前の行や破損時の復旧用）.
+
+        Returns:
+            インデックス対象の記事数（インデックスが使えない場合は 0）
+        """
+        if not self.has_fulltext_index():
+            return 0
+
+        def _op() -> int:
+            with self._connect() as conn:
+                fts.rebuild_fts(conn, "collected_info_fts")
+                return conn.execute("SELECT COUNT(*) FROM collected_info").fetchone()[0]
+
+        return self._run_with_lock_retry(_op)
+
+    def _use_fulltext(self, query: Optional[str]) -> bool:
+        # trigram は 3 文字未満の語を検索できないので LIKE に任せる
+        return fts.is_searchable(query) and self.has_fulltext_index()
+
     def delete_old_info(self, days: int = 30) -> int:
         """
         古い情報を削除
@@ -133,10 +327,31 @@ class ArticleMixin:
         cutoff_date = datetime.now() - timedelta(days=days)
         with self._connect() as conn:
             cursor = conn.execute(
-                "DELETE FROM collected_info WHERE fetched_at < ?",
-                (cutoff_date.isoformat(),),
+                "DELETE FROM collected_info WHERE fetched_at_ms < ?",
+                (to_epoch_ms(cutoff_date),),
+            )
+            deleted = cursor.rowcount
+            for table in ("article_minhash", "article_minhash_bands"):
+                conn.execute(
+                    f"""
+                    DELETE FROM {table}
+                    WHERE article_id NOT IN (SELECT id FROM collected_info)
+                    """
+                )
+            # 削除した記事のフィードバックは集計から外す
+            self._attribute_feedback_events(
+                conn,
+                "agg_window IS NOT NULL AND article_id NOT IN (SELECT id FROM collected_info)",
+            )
+            # 正規記事が消えた重複記事は独立した記事として扱う
+            conn.execute(
+                """
+                UPDATE collected_info SET duplicate_of = NULL
+                WHERE duplicate_of IS NOT NULL
+                  AND duplicate_of NOT IN (SELECT id FROM collected_info)
+                """
             )
-            return cursor.rowcount
+            return deleted
 
     def add_summary(self, summary: InfoSummary) -> int:
         """要約を追加"""
@@ -6,8 +6,24 @@ InfoCollectorRepository に mix-in して使用する。
 """
 
 import sqlite3
-from datetime import datetime
-from typing import Any
+from datetime import datetime, timedelta
+from typing import Any, Sequence
+
+# 時間減衰の窓: (名前, 最大経過日数, 重み)。最後の窓は上限なし
+DECAY_WINDOWS = (("week", 7, 1.0), ("month", 30, 0.5), ("old", None, 0.2))
+# 統計に数えるイベント種別
+_STATS_EVENT_TYPES = ("feedback_positive", "feedback_negative", "report_requested")
+# get_feedback_progress の overview に出すカウンタ（pending_articles は差分で求める）
+_OVERVIEW_COUNTERS = (
+    "feedback_articles",
+    "feedback_events",
+    "positive_events",
+    "negative_events",
+    "report_requests",
+    "analyzed_articles",
+    "analyses_with_bonus",
+    "collected_articles",
+)
 
 
 class FeedbackMixin:
@@ -18,30 +34,11 @@ class FeedbackMixin:
         with self._connect() as conn:
             conn.row_factory = sqlite3.Row
 
-            overview_row = conn.execute(
-                """
-                SELECT
-                    (SELECT COUNT(*) FROM article_feedback) AS feedback_articles,
-                    (SELECT COUNT(*) FROM article_feedback_events) AS feedback_events,
-                    (SELECT COUNT(*) FROM article_feedback_events WHERE event_type = 'feedback_positive') AS positive_events,
-                    (SELECT COUNT(*) FROM article_feedback_events WHERE event_type = 'feedback_negative') AS negative_events,
-                    (SELECT COUNT(*) FROM article_feedback_events WHERE event_type = 'report_requested') AS report_requests,
-                    (SELECT COUNT(*) FROM article_analysis) AS analyzed_articles,
-                    (
-                        SELECT COUNT(*)
-                        FROM article_analysis
-                        WHERE ABS(COALESCE(source_bonus, 0)) > 0.000001
-                           OR ABS(COALESCE(category_bonus, 0)) > 0.000001
-                    ) AS analyses_with_bonus,
-                    (SELECT COUNT(*) FROM collected_info) AS collected_articles,
-                    (
-                        SELECT COUNT(*)
-                        FROM collected_info c
-                        LEFT JOIN article_analysis a ON c.id = a.article_id
-                        WHERE a.article_id IS NULL
-                    ) AS pending_articles
-                """
-            ).fetchone()
+            counters = dict(conn.execute("SELECT name, value FROM info_counters").fetchall())
+            overview = {name: int(counters.get(name, 0)) for name in _OVERVIEW_COUNTERS}
+            overview["pending_articles"] = max(
+                overview["collected_articles"] - int(counters.get("analyzed_collected", 0)), 0
+            )
 
             recent_events = conn.execute(
                 """
@@ -85,7 +82,6 @@ class FeedbackMixin:
             ).fetchall()
 
         stats = self.get_feedback_stats()
-        overview = dict(overview_row) if overview_row else {}
         return {
             "overview": overview,
             "top_source": stats.get("source", [])[:5],
@@ -129,13 +125,14 @@ class FeedbackMixin:
         sentiment: str | None,
         created_at: str,
     ) -> None:
-        conn.execute(
+        cursor = conn.execute(
             """
             INSERT INTO article_feedback_events (article_id, event_type, sentiment, created_at)
             VALUES (?, ?, ?, ?)
             """,
             (article_id, event_type, sentiment, created_at),
         )
+        self._attribute_feedback_events(conn, "id = ?", (cursor.lastrowid,))
 
     def toggle_feedback(self, article_id: int, sentiment: str) -> dict[str, Any]:
         """positive / negative を排他的トグルで保存する。"""
@@ -297,27 +294,27 @@ class FeedbackMixin:
         }
 
     def get_feedback_stats(self) -> dict[str, Any]:
-        """source/category ごとの時間減衰つきフィードバック統計を返す。"""
-        with self._connect() as conn:
-            conn.row_factory = sqlite3.Row
-            rows = conn.execute(
-                """
-                SELECT
-                    e.article_id,
-                    e.event_type,
-                    e.sentiment,
-                    e.created_at,
-                    c.source_name,
-                    COALESCE(NULLIF(a.category, ''), '未分類') AS category
-                FROM article_feedback_events e
-                JOIN collected_info c ON e.article_id = c.id
-                LEFT JOIN article_analysis a ON e.article_id = a.article_id
-                WHERE e.event_type IN ('feedback_positive', 'feedback_negative', 'report_requested')
-                ORDER BY e.created_at DESC, e.id DESC
-                """
-            ).fetchall()
+        """
+        source/category ごとの時間減衰つきフィードバック統計を返す.
+
+        イベント書き込み時に更新している feedback_aggregates（source/category × 減衰窓の件数）を
+        読むだけなので、イベント数によらず集計単位の数だけで済む。
+        読む前に、窓の境界を越えたイベントを次の窓へ移す。
+        """
+
+        def _op() -> list[sqlite3.Row]:
+            with self._connect() as conn:
+                conn.row_factory = sqlite3.Row
+                self._roll_feedback_windows(conn)
+                return conn.execute(
+                    """
+                    SELECT kind, name, agg_window, positive, negative, report_requested
+                    FROM feedback_aggregates
+                    """
+                ).fetchall()
+
+        rows = self._run_with_lock_retry(_op)
 
-        now = datetime.now()
         groups = {
             "source": {},
             "category": {},
@@ -327,20 +324,7 @@ class FeedbackMixin:
         min_samples = 3.0
         report_requested_weight = 3.0
         negative_weight = 1.0
-
-        def _decay_weight(created_at: str | None) -> float:
-            if not created_at:
-                return 0.2
-            try:
-                ts = datetime.fromisoformat(created_at)
-            except ValueError:
-                return 0.2
-            age_days = max((now - ts).total_seconds() / 86400.0, 0.0)
-            if age_days <= 7:
-                return 1.0
-            if age_days <= 30:
-                return 0.5
-            return 0.2
+        window_weights = {name: weight for name, _, weight in DECAY_WINDOWS}
 
         def _ensure_bucket(kind: str, name: str) -> dict[str, Any]:
             bucket = groups[kind].get(name)
@@ -357,24 +341,16 @@ class FeedbackMixin:
                 groups[kind][name] = bucket
             return bucket
 
-        def _apply_event(bucket: dict[str, Any], event_type: str, weight: float) -> None:
-            if event_type == "feedback_positive":
-                bucket["positive"] += weight
-                bucket["samples"] += weight
-            elif event_type == "feedback_negative":
-                bucket["negative"] += negative_weight * weight
-                bucket["samples"] += negative_weight * weight
-            elif event_type == "report_requested":
-                bucket["positive"] += report_requested_weight * weight
-                bucket["report_requested"] += weight
-                bucket["samples"] += report_requested_weight * weight
-
         for row in rows:
-            weight = _decay_weight(row["created_at"])
-            source_name = row["source_name"] or "不明"
-            category = row["category"] or "未分類"
-            _apply_event(_ensure_bucket("source", source_name), row["event_type"], weight)
-            _apply_event(_ensure_bucket("category", category), row["event_type"], weight)
+            weight = window_weights.get(row["agg_window"], 0.0)
+            bucket = _ensure_bucket(row["kind"], row["name"])
+            positive = row["positive"] * weight
+            negative = negative_weight * row["negative"] * weight
+            reports = row["report_requested"] * weight
+            bucket["positive"] += positive + report_requested_weight * reports
+            bucket["negative"] += negative
+            bucket["report_requested"] += reports
+            bucket["samples"] += positive + negative + report_requested_weight * reports
 
         def _finalize(items: dict[str, dict[str, Any]]) -> list[dict[str, Any]]:
             result: list[dict[str, Any]] = []
@@ -407,11 +383,126 @@ class FeedbackMixin:
                 "min_samples": min_samples,
                 "report_requested_weight": report_requested_weight,
                 "decay_windows": [
-                    {"max_days": 7, "weight": 1.0},
-                    {"max_days": 30, "weight": 0.5},
-                    {"max_days": None, "weight": 0.2},
+                    {"max_days": max_days, "weight": weight}
+                    for _, max_days, weight in DECAY_WINDOWS
                 ],
             },
             "source": _finalize(groups["source"]),
             "category": _finalize(groups["category"]),
         }
+
+    def _window_cutoffs(self) -> tuple[str, str]:
+        """week / month 窓の下限時刻（これ以降に作られたイベントがその窓に入る）。"""
+        now = datetime.now()
+        return (
+            (now - timedelta(days=DECAY_WINDOWS[0][1])).isoformat(),
+            (now - timedelta(days=DECAY_WINDOWS[1][1])).isoformat(),
+        )
+
+    def _attribute_feedback_events(
+        self, conn: sqlite3.Connection, where: str, params: Sequence[Any] = ()
+    ) -> int:
+        """
+        where に該当するイベントの集計上の帰属（source / category / 減衰窓）を付け直す.
+
+        旧い帰属の件数を feedback_aggregates から引き、記事・分析の現在値から帰属を求めて
+        足し直す。記事が削除されたイベントはどこにも数えない（agg_window = NULL）。
+
+        Returns:
+            付け直したイベント数
+        """
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS feedback_refresh (id INTEGER PRIMARY KEY)")
+        conn.execute("DELETE FROM temp.feedback_refresh")
+        placeholders = ", ".join("?" for _ in _STATS_EVENT_TYPES)
+        cursor = conn.execute(
+            f"""
+            INSERT INTO temp.feedback_refresh (id)
+            SELECT id FROM article_feedback_events
+            WHERE event_type IN ({placeholders}) AND ({where})
+            """,
+            (*_STATS_EVENT_TYPES, *params),
+        )
+        if not cursor.rowcount:
+            return 0
+
+        self._apply_feedback_counts(conn, -1)
+        week_cutoff, month_cutoff = self._window_cutoffs()
+        conn.execute(
+            """
+            UPDATE article_feedback_events
+            SET agg_source = (
+                    SELECT COALESCE(NULLIF(c.source_name, ''), '不明')
+                    FROM collected_info c WHERE c.id = article_feedback_events.article_id
+                ),
+                agg_category = COALESCE(
+                    (
+                        SELECT NULLIF(a.category, '') FROM article_analysis a
+                        WHERE a.article_id = article_feedback_events.article_id
+                    ),
+                    '未分類'
+                ),
+                agg_window = CASE
+                    WHEN NOT EXISTS (
+                        SELECT 1 FROM collected_info c
+                        WHERE c.id = article_feedback_events.article_id
+                    ) THEN NULL
+                    WHEN created_at >= ? THEN 'week'
+                    WHEN created_at >= ? THEN 'month'
+                    ELSE 'old'
+                END
+            WHERE id IN (SELECT id FROM temp.feedback_refresh)
+            """,
+            (week_cutoff, month_cutoff),
+        )
+        self._apply_feedback_counts(conn, 1)
+        return cursor.rowcount
+
+    def _apply_feedback_counts(self, conn: sqlite3.Connection, sign: int) -> None:
+        """feedback_refresh のイベントを現在の帰属で feedback_aggregates に足す（sign=-1 で引く）。"""
+        rows = conn.execute(
+            """
+            SELECT agg_source, agg_category, agg_window,
+                   SUM(event_type = 'feedback_positive'),
+                   SUM(event_type = 'feedback_negative'),
+                   SUM(event_type = 'report_requested')
+            FROM article_feedback_events
+            WHERE id IN (SELECT id FROM temp.feedback_refresh) AND agg_window IS NOT NULL
+            GROUP BY agg_source, agg_category, agg_window
+            """
+        ).fetchall()
+        for source, category, window, positive, negative, reports in rows:
+            for kind, name in (("source", source), ("category", category)):
+                conn.execute(
+                    """
+                    INSERT INTO feedback_aggregates
+                    (kind, name, agg_window, positive, negative, report_requested)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(kind, name, agg_window) DO UPDATE SET
+                        positive = positive + excluded.positive,
+                        negative = negative + excluded.negative,
+                        report_requested = report_requested + excluded.report_requested
+                    """,
+                    (kind, name, window, sign * positive, sign * negative, sign * reports),
+                )
+        if sign < 0:
+            conn.execute(
+                """
+                DELETE FROM feedback_aggregates
+                WHERE positive = 0 AND negative = 0 AND report_requested = 0
+                """
+            )
+
+    def _roll_feedback_windows(self, conn: sqlite3.Connection) -> int:
+        """窓の境界を越えたイベント（week → month → old）を次の窓へ移す。"""
+        week_cutoff, month_cutoff = self._window_cutoffs()
+        return self._attribute_feedback_events(
+            conn,
+            "(agg_window = 'week' AND created_at < ?) OR (agg_window = 'month' AND created_at < ?)",
+            (week_cutoff, month_cutoff),
+        )
+
+    def _rebuild_feedback_aggregates(self, conn: sqlite3.Connection) -> None:
+        """全イベントから feedback_aggregates を作り直す（マイグレーション用）。"""
+        conn.execute("DELETE FROM feedback_aggregates")
+        conn.execute("UPDATE article_feedback_events SET agg_window = NULL")
+        self._attribute_feedback_events(conn, "1")
@@ -0,0 +1,319 @@
+"""
+パイプラインジョブ操作ミックスイン
+
+pipeline_jobs テーブル（分析パイプラインの永続ジョブキュー）を操作するメソッド群。
+InfoCollectorRepository に mix-in して使用する。
+
+ジョブは queued → running → done / failed と遷移する。running のジョブはリース期限を持ち、
+期限切れ（worker のクラッシュや停止）のジョブは次の claim で queued に戻して再開する。
+stage と payload の意味は呼び出し側（timeline-app の analysis_pipeline_worker）が決める。
+"""
+
+import json
+import sqlite3
+from datetime import datetime, timedelta
+from typing import Any, Optional
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+
+def _job_dict(row: sqlite3.Row) -> dict[str, Any]:
+    job = dict(row)
+    job["payload"] = json.loads(job.get("payload") or "{}")
+    return job
+
+
+def _merge_payload(existing: dict[str, Any], new: dict[str, Any]) -> dict[str, Any]:
+    """payload を上書きマージする。article_ids だけは両方の記事を順序を保って残す。"""
+    merged = {**existing, **new}
+    if "article_ids" in existing and "article_ids" in new:
+        merged["article_ids"] = list(
+            dict.fromkeys([*(existing["article_ids"] or []), *(new["article_ids"] or [])])
+        )
+    return merged
+
+
+class PipelineJobMixin:
+    """pipeline_jobs の操作を提供するミックスイン。"""
+
+    def enqueue_job(
+        self,
+        stage: str,
+        article_id: Optional[int] = None,
+        payload: Optional[dict[str, Any]] = None,
+        priority: int = 0,
+        max_attempts: int = 3,
+    ) -> int:
+        """
+        ジョブを登録する.
+
+        同じ stage / article_id のジョブが queued / running で既にあれば新しく作らず、
+        priority を高い方に引き上げて payload を上書きマージする（article_ids は和集合に
+        する。running のジョブは実行側が get_job で読み直したときに反映される）。
+
+        Returns:
+            登録済み（または既存）のジョブID
+        """
+        now = datetime.now().isoformat()
+
+        def _op() -> int:
+            with self._connect() as conn:
+                conn.row_factory = sqlite3.Row
+                cursor = conn.execute(
+                    """
+                    INSERT OR IGNORE INTO pipeline_jobs
+                    (stage, article_id, payload, state, priority, attempts, max_attempts,
+                     available_at, created_at, updated_at)
+                    VALUES (?, ?, ?, ?, ?, 0, ?, ?, ?, ?)
+                    """,
+                    (
+                        stage,
+                        article_id,
+                        json.dumps(payload or {}, ensure_ascii=False),
+                        JOB_QUEUED,
+                        priority,
+                        max_attempts,
+                        now,
+                        now,
+                        now,
+                    ),
+                )
+                if cursor.rowcount:
+                    return int(cursor.lastrowid)
+
+                existing = conn.execute(
+                    """
+                    SELECT id, state, payload FROM pipeline_jobs
+                    WHERE stage = ? AND COALESCE(article_id, 0) = COALESCE(?, 0)
+                      AND state IN (?, ?)
+                    """,
+                    (stage, article_id, JOB_QUEUED, JOB_RUNNING),
+                ).fetchone()
+                merged = _merge_payload(json.loads(existing["payload"] or "{}"), payload or {})
+                conn.execute(
+                    """
+                    UPDATE pipeline_jobs
+                    SET priority = MAX(priority, ?), payload = ?, updated_at = ?
+                    WHERE id = ?
+                    """,
+                    (priority, json.dumps(merged, ensure_ascii=False), now, existing["id"]),
+                )
+                return int(existing["id"])
+
+        return self._run_with_lock_retry(_op)
+
+    def claim_job(
+        self,
+        worker_id: str,
+        lease_seconds: float = 1800,
+        stages: Optional[list[str]] = None,
+    ) -> Optional[dict[str, Any]]:
+        """
+        実行可能なジョブを 1 件リースして running にする.
+
+        リース期限切れの running ジョブは先に queued へ戻す（試行回数を使い切っていれば failed）。
+        優先度の高い順、同じ優先度では登録の古い順に取り出す。複数 worker が同時に呼んでも
+        状態を条件にした UPDATE で 1 件を 1 worker だけが取得する。
+
+        Returns:
+            ジョブの辞書（payload はデコード済み）。実行可能なジョブが無ければ None
+        """
+
+        def _op() -> Optional[dict[str, Any]]:
+            with self._connect() as conn:
+                conn.row_factory = sqlite3.Row
+                now = datetime.now()
+                self._expire_job_leases(conn, now.isoformat())
+
+                query = """
+                    SELECT id FROM pipeline_jobs
+                    WHERE state = ? AND available_at <= ?
+                """
+                params: list[Any] = [JOB_QUEUED, now.isoformat()]
+                if stages:
+                    query += f" AND stage IN ({', '.join('?' for _ in stages)})"
+                    params.extend(stages)
+                query += " ORDER BY priority DESC, id ASC LIMIT 8"
+
+                lease_until = (now + timedelta(seconds=lease_seconds)).isoformat()
+                for row in conn.execute(query, params).fetchall():
+                    cursor = conn.execute(
+                        """
+                        UPDATE pipeline_jobs
+                        SET state = ?, lease_owner = ?, lease_until = ?,
+                            attempts = attempts + 1, updated_at = ?
+                        WHERE id = ? AND state = ?
+                        """,
+                        (
+                            JOB_RUNNING,
+                            worker_id,
+                            lease_until,
+                            now.isoformat(),
+                            row["id"],
+                            JOB_QUEUED,
+                        ),
+                    )
+                    if cursor.rowcount:
+                        claimed = conn.execute(
+                            "SELECT * FROM pipeline_jobs WHERE id = ?", (row["id"],)
+                        ).fetchone()
+                        return _job_dict(claimed)
+                return None
+
+        return self._run_with_lock_retry(_op)
+
+    def _expire_job_leases(self, conn: sqlite3.Connection, now: str) -> None:
+        conn.execute(
+            """
+            UPDATE pipeline_jobs
+            SET state = CASE WHEN attempts >= max_attempts THEN ? ELSE ? END,
+                lease_owner = NULL,
+                lease_until = NULL,
+                last_error = 'lease expired',
+                updated_at = ?
+            WHERE state = ? AND lease_until < ?
+            """,
+            (JOB_FAILED, JOB_QUEUED, now, JOB_RUNNING, now),
+        )
+
+    def complete_job(self, job_id: int, worker_id: str) -> bool:
+        """
+        worker_id がリース中のジョブを完了にする.
+
+        リース期限切れで別の worker に取り直されたジョブは更新しない。
+
+        Returns:
+            完了にできたら True
+        """
+
+        def _op() -> bool:
+            with self._connect() as conn:
+                cursor = conn.execute(
+                    """
+                    UPDATE pipeline_jobs
+                    SET state = ?, last_error = NULL, lease_owner = NULL, lease_until = NULL,
+                        updated_at = ?
+                    WHERE id = ? AND lease_owner = ? AND state = ?
+                    """,
+                    (JOB_DONE, datetime.now().isoformat(), job_id, worker_id, JOB_RUNNING),
+                )
+                return cursor.rowcount > 0
+
+        return self._run_with_lock_retry(_op)
+
+    def fail_job(
+        self, job_id: int, worker_id: str, error: str, retry_delay_seconds: float = 300
+    ) -> Optional[str]:
+        """
+        worker_id がリース中のジョブの失敗を記録する.
+
+        試行回数が残っていれば retry_delay_seconds × 2^(試行回数-1) 後に再実行できるよう
+        queued に戻し、使い切っていれば failed にする。
+
+        Returns:
+            更新後の状態（queued / failed）。リースを失っていて更新しなかったら None
+        """
+
+        def _op() -> Optional[str]:
+            with self._connect() as conn:
+                row = conn.execute(
+                    """
+                    SELECT attempts, max_attempts FROM pipeline_jobs
+                    WHERE id = ? AND lease_owner = ? AND state = ?
+                    """,
+                    (job_id, worker_id, JOB_RUNNING),
+                ).fetchone()
+                if row is None:
+                    return None
+                attempts, max_attempts = row
+                now = datetime.now()
+                state = JOB_QUEUED if attempts < max_attempts else JOB_FAILED
+                delay = retry_delay_seconds * (2 ** max(attempts - 1, 0))
+                conn.execute(
+                    """
+                    UPDATE pipeline_jobs
+                    SET state = ?, last_error = ?, available_at = ?,
+                        lease_owner = NULL, lease_until = NULL, updated_at = ?
+                    WHERE id = ? AND lease_owner = ? AND state = ?
+                    """,
+                    (
+                        state,
+                        error[:2000],
+                        (now + timedelta(seconds=delay)).isoformat(),
+                        now.isoformat(),
+                        job_id,
+                        worker_id,
+                        JOB_RUNNING,
+                    ),
+                )
+                return state
+
+        return self._run_with_lock_retry(_op)
+
+    def release_job(self, job_id: int, worker_id: str) -> bool:
+        """
+        worker_id がリース中の実行できなかったジョブを試行回数を消費せずに queued へ戻す.
+        停止指示や LLM のサーキットブレーカーで中断した場合に使う。
+
+        Returns:
+            戻せたら True（リースを失っていれば更新しない）
+        """
+
+        def _op() -> bool:
+            with self._connect() as conn:
+                cursor = conn.execute(
+                    """
+                    UPDATE pipeline_jobs
+                    SET state = ?, attempts = MAX(attempts - 1, 0),
+                        lease_owner = NULL, lease_until = NULL, updated_at = ?
+                    WHERE id = ? AND lease_owner = ? AND state = ?
+                    """,
+                    (JOB_QUEUED, datetime.now().isoformat(), job_id, worker_id, JOB_RUNNING),
+                )
+                return cursor.rowcount > 0
+
+        return self._run_with_lock_retry(_op)
+
+    def get_job(self, job_id: int) -> Optional[dict[str, Any]]:
+        """ジョブを 1 件取得する。"""
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            row = conn.execute("SELECT * FROM pipeline_jobs WHERE id = ?", (job_id,)).fetchone()
+            return _job_dict(row) if row else None
+
+    def fetch_active_jobs(self, stage: Optional[str] = None) -> list[dict[str, Any]]:
+        """queued / running のジョブを優先度順に取得する。"""
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            query = "SELECT * FROM pipeline_jobs WHERE state IN (?, ?)"
+            params: list[Any] = [JOB_QUEUED, JOB_RUNNING]
+            if stage:
+                query += " AND stage = ?"
+                params.append(stage)
+            query += " ORDER BY priority DESC, id ASC"
+            return [_job_dict(row) for row in conn.execute(query, params).fetchall()]
+
+    def count_jobs_by_state(self) -> dict[str, int]:
+        """状態ごとのジョブ数を返す。"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT state, COUNT(*) FROM pipeline_jobs GROUP BY state"
+            ).fetchall()
+            return {state: count for state, count in rows}
+
+    def purge_finished_jobs(self, older_than_days: int = 7) -> int:
+        """完了・失敗から older_than_days 日以上経ったジョブを削除する。"""
+        cutoff = (datetime.now() - timedelta(days=older_than_days)).isoformat()
+
+        def _op() -> int:
+            with self._connect() as conn:
+                cursor = conn.execute(
+                    "DELETE FROM pipeline_jobs WHERE state IN (?, ?) AND updated_at < ?",
+                    (JOB_DONE, JOB_FAILED, cutoff),
+                )
+                return cursor.rowcount
+
+        return self._run_with_lock_retry(_op)
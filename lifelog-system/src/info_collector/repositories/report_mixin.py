@@ -125,16 +125,21 @@ class ReportMixin:
             row = conn.execute("SELECT COALESCE(MAX(id), 0) FROM reports").fetchone()
         return int(row[0] or 0)
 
-    def get_reports_after_id(self, last_report_id: int) -> list[dict[str, Any]]:
+    def get_reports_after_id(
+        self, last_report_id: int, source_article_id: Optional[int] = None
+    ) -> list[dict[str, Any]]:
+        """last_report_id より後のレポート（source_article_id を指定するとその記事の分だけ）。"""
+        query = """
+            SELECT id, title, content, category, created_at
+            FROM reports
+            WHERE id > ?
+        """
+        params: list[Any] = [last_report_id]
+        if source_article_id is not None:
+            query += " AND source_article_id = ?"
+            params.append(source_article_id)
+        query += " ORDER BY id ASC"
         with self._connect() as conn:
             conn.row_factory = sqlite3.Row
-            rows = conn.execute(
-                """
-                SELECT id, title, content, category, created_at
-                FROM reports
-                WHERE id > ?
-                ORDER BY id ASC
-                """,
-                (last_report_id,),
-            ).fetchall()
+            rows = conn.execute(query, params).fetchall()
         return [dict(row) for row in rows]
@@ -0,0 +1,110 @@
+"""
+デイリースナップショット操作ミックスイン
+
+daily_report_snapshots テーブル（締まった日の集約データのキャッシュ）を操作するメソッド群。
+InfoCollectorRepository に mix-in して使用する。
+
+スナップショットは日付ごとに 1 行で、DailyReportDataAggregator が取得したソースごとの行を
+zlib 圧縮した JSON と、取得時点のソーステーブルごとの最大 ID と UPDATE / DELETE の
+累計回数（ウォーターマーク）を持つ。
+有効かどうかの判定（遅れて届いたデータや書き換え・削除の検出）は集約側が行う。
+"""
+
+import json
+import sqlite3
+import zlib
+from datetime import datetime
+from typing import Any, Optional
+
+
+def _encode(sources: dict[str, list[dict[str, Any]]]) -> bytes:
+    payload = json.dumps(sources, ensure_ascii=False, separators=(",", ":"), default=str)
+    return zlib.compress(payload.encode("utf-8"))
+
+
+class DailySnapshotMixin:
+    """daily_report_snapshots の操作を提供するミックスイン。"""
+
+    def save_daily_snapshot(
+        self,
+        report_date: str,
+        watermarks: dict[str, int],
+        sources: dict[str, list[dict[str, Any]]],
+    ) -> None:
+        """
+        指定日のスナップショットを保存する（既存は置き換える）.
+
+        Args:
+            report_date: 日付（YYYY-MM-DD）
+            watermarks: ソースごとのソーステーブルの最大 ID と UPDATE / DELETE の累計回数
+            sources: ソースごとの行のリスト（JSON にできない値は文字列にする）
+        """
+        payload = _encode(sources)
+        now = datetime.now().isoformat()
+
+        def _op() -> None:
+            with self._connect() as conn:
+                conn.execute(
+                    """
+                    INSERT INTO daily_report_snapshots
+                    (report_date, watermarks, payload, created_at, updated_at)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT(report_date) DO UPDATE SET
+                        watermarks = excluded.watermarks,
+                        payload = excluded.payload,
+                        created_at = excluded.created_at,
+                        updated_at = excluded.updated_at
+                    """,
+                    (report_date, json.dumps(watermarks), payload, now, now),
+                )
+
+        self._run_with_lock_retry(_op)
+
+    def get_daily_snapshot(self, report_date: str) -> Optional[dict[str, Any]]:
+        """
+        指定日のスナップショットを取得する.
+
+        Returns:
+            {"watermarks": ウォーターマーク, "sources": ソースごとの行のリスト}。
+            無ければ None
+        """
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            row = conn.execute(
+                "SELECT watermarks, payload FROM daily_report_snapshots WHERE report_date = ?",
+                (report_date,),
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "watermarks": json.loads(row["watermarks"]),
+            "sources": json.loads(zlib.decompress(row["payload"]).decode("utf-8")),
+        }
+
+    def advance_daily_snapshot(self, report_date: str, watermarks: dict[str, int]) -> None:
+        """その日のデータが増えていないと確認できたウォーターマークまで進める。"""
+
+        def _op() -> None:
+            with self._connect() as conn:
+                conn.execute(
+                    """
+                    UPDATE daily_report_snapshots
+                    SET watermarks = ?, updated_at = ?
+                    WHERE report_date = ?
+                    """,
+                    (json.dumps(watermarks), datetime.now().isoformat(), report_date),
+                )
+
+        self._run_with_lock_retry(_op)
+
+    def delete_daily_snapshot(self, report_date: str) -> bool:
+        """指定日のスナップショットを削除する。削除したら True。"""
+
+        def _op() -> bool:
+            with self._connect() as conn:
+                cursor = conn.execute(
+                    "DELETE FROM daily_report_snapshots WHERE report_date = ?", (report_date,)
+                )
+                return cursor.rowcount > 0
+
+        return self._run_with_lock_retry(_op)
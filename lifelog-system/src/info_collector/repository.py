@@ -8,10 +8,12 @@
 - src/info_collector/repositories/ - ドメイン別操作ミックスイン
 
 クラス構成（ミックスイン）:
-- ArticleMixin  : collected_info / info_summaries の CRUD
+- ArticleMixin  : collected_info / info_summaries の CRUD（近似重複の紐付けを含む）
 - AnalysisMixin : article_analysis / deep_research の操作
 - ReportMixin   : reports の操作
 - FeedbackMixin : article_feedback / article_feedback_events の操作
+- PipelineJobMixin : pipeline_jobs（分析パイプラインの永続ジョブキュー）の操作
+- DailySnapshotMixin : daily_report_snapshots（締まった日の集約データのキャッシュ）の操作
 """
 
 import sqlite3
@@ -20,12 +22,154 @@ from datetime import datetime
 from pathlib import Path
 from typing import Generator
 
+from src.common import fts
+from src.common.change_counter import ensure_change_counter
 from src.common.db_mixin import SqliteLockRetryMixin, apply_wal_pragmas
+from src.common.epoch import ensure_epoch_ms_column
 
+from . import near_duplicate
+from .url_canonical import canonicalize_url
 from .repositories.analysis_mixin import AnalysisMixin
 from .repositories.article_mixin import ArticleMixin
 from .repositories.feedback_mixin import FeedbackMixin
+from .repositories.job_mixin import PipelineJobMixin
 from .repositories.report_mixin import ReportMixin
+from .repositories.snapshot_mixin import DailySnapshotMixin
+
+
+# info_counters の各カウンタの初期値（= トリガーが維持する値）を求めるクエリ
+_COUNTER_QUERIES = {
+    "collected_articles": "SELECT COUNT(*) FROM collected_info",
+    "analyzed_articles": "SELECT COUNT(*) FROM article_analysis",
+    # 記事が残っている分析の件数（未分析件数 = collected_articles - これ）
+    "analyzed_collected": (
+        "SELECT COUNT(*) FROM article_analysis a JOIN collected_info c ON a.article_id = c.id"
+    ),
+    "analyses_with_bonus": (
+        "SELECT COUNT(*) FROM article_analysis "
+        "WHERE ABS(COALESCE(source_bonus, 0)) > 0.000001 "
+        "OR ABS(COALESCE(category_bonus, 0)) > 0.000001"
+    ),
+    "feedback_articles": "SELECT COUNT(*) FROM article_feedback",
+    "feedback_events": "SELECT COUNT(*) FROM article_feedback_events",
+    "positive_events": (
+        "SELECT COUNT(*) FROM article_feedback_events WHERE event_type = 'feedback_positive'"
+    ),
+    "negative_events": (
+        "SELECT COUNT(*) FROM article_feedback_events WHERE event_type = 'feedback_negative'"
+    ),
+    "report_requests": (
+        "SELECT COUNT(*) FROM article_feedback_events WHERE event_type = 'report_requested'"
+    ),
+}
+
+
+def _bump(deltas: dict[str, str]) -> str:
+    """info_counters の複数カウンタを 1 文で増減する UPDATE（トリガー本体用）。"""
+    cases = " ".join(f"WHEN '{name}' THEN {delta}" for name, delta in deltas.items())
+    names = ", ".join(f"'{name}'" for name in deltas)
+    return (
+        f"UPDATE info_counters SET value = value + CASE name {cases} END "
+        f"WHERE name IN ({names});"
+    )
+
+
+def _has_bonus(row: str) -> str:
+    return (
+        f"(ABS(COALESCE({row}.source_bonus, 0)) > 0.000001 "
+        f"OR ABS(COALESCE({row}.category_bonus, 0)) > 0.000001)"
+    )
+
+
+def _article_exists(article_id: str) -> str:
+    return f"EXISTS (SELECT 1 FROM collected_info WHERE id = {article_id})"
+
+
+def _analysis_exists(article_id: str) -> str:
+    return f"EXISTS (SELECT 1 FROM article_analysis WHERE article_id = {article_id})"
+
+
+def _event_deltas(row: str, sign: str) -> dict[str, str]:
+    return {
+        "feedback_events": f"{sign}1",
+        "positive_events": f"{sign}({row}.event_type = 'feedback_positive')",
+        "negative_events": f"{sign}({row}.event_type = 'feedback_negative')",
+        "report_requests": f"{sign}({row}.event_type = 'report_requested')",
+    }
+
+
+_COUNTER_TRIGGERS = {
+    "info_counters_collected_ai": "AFTER INSERT ON collected_info BEGIN "
+    + _bump({"collected_articles": "1", "analyzed_collected": _analysis_exists("new.id")})
+    + " END",
+    "info_counters_collected_ad": "AFTER DELETE ON collected_info BEGIN "
+    + _bump({"collected_articles": "-1", "analyzed_collected": f"-{_analysis_exists('old.id')}"})
+    + " END",
+    "info_counters_analysis_ai": "AFTER INSERT ON article_analysis BEGIN "
+    + _bump(
+        {
+            "analyzed_articles": "1",
+            "analyzed_collected": _article_exists("new.article_id"),
+            "analyses_with_bonus": _has_bonus("new"),
+        }
+    )
+    + " END",
+    "info_counters_analysis_ad": "AFTER DELETE ON article_analysis BEGIN "
+    + _bump(
+        {
+            "analyzed_articles": "-1",
+            "analyzed_collected": f"-{_article_exists('old.article_id')}",
+            "analyses_with_bonus": f"-{_has_bonus('old')}",
+        }
+    )
+    + " END",
+    "info_counters_analysis_au": (
+        "AFTER UPDATE OF article_id, source_bonus, category_bonus ON article_analysis BEGIN "
+    )
+    + _bump(
+        {
+            "analyzed_collected": (
+                f"{_article_exists('new.article_id')} - {_article_exists('old.article_id')}"
+            ),
+            "analyses_with_bonus": f"{_has_bonus('new')} - {_has_bonus('old')}",
+        }
+    )
+    + " END",
+    "info_counters_feedback_ai": "AFTER INSERT ON article_feedback BEGIN "
+    + _bump({"feedback_articles": "1"})
+    + " END",
+    "info_counters_feedback_ad": "AFTER DELETE ON article_feedback BEGIN "
+    + _bump({"feedback_articles": "-1"})
+    + " END",
+    "info_counters_events_ai": "AFTER INSERT ON article_feedback_events BEGIN "
+    + _bump(_event_deltas("new", "+"))
+    + " END",
+    "info_counters_events_ad": "AFTER DELETE ON article_feedback_events BEGIN "
+    + _bump(_event_deltas("old", "-"))
+    + " END",
+}
+
+
+# article_analysis の追加・削除に合わせて collected_info.analysis_state を更新する
+_ANALYSIS_STATE_TRIGGERS = {
+    "analysis_state_ai": """
+        AFTER INSERT ON article_analysis BEGIN
+            UPDATE collected_info SET analysis_state = 'done'
+            WHERE id = new.article_id AND analysis_state <> 'done';
+        END
+    """,
+    "analysis_state_ad": """
+        AFTER DELETE ON article_analysis BEGIN
+            UPDATE collected_info SET analysis_state = 'pending' WHERE id = old.article_id;
+        END
+    """,
+    "analysis_state_au": """
+        AFTER UPDATE OF article_id ON article_analysis BEGIN
+            UPDATE collected_info SET analysis_state = 'pending' WHERE id = old.article_id;
+            UPDATE collected_info SET analysis_state = 'done' WHERE id = new.article_id;
+        END
+    """,
+}
 
 
 class InfoCollectorRepository(
@@ -33,6 +177,8 @@ class InfoCollectorRepository(
     AnalysisMixin,
     ReportMixin,
     FeedbackMixin,
+    PipelineJobMixin,
+    DailySnapshotMixin,
     SqliteLockRetryMixin,
 ):
     """情報収集データのCRUD操作を提供するリポジトリ。
@@ -54,6 +200,8 @@ class InfoCollectorRepository(
         """
         conn = sqlite3.connect(self.db_path, timeout=30.0)
         apply_wal_pragmas(conn)
+        # INSERT OR REPLACE で消える行にも件数カウンタの DELETE トリガーを発火させる
+        conn.execute("PRAGMA recursive_triggers = ON")
         try:
             yield conn
             conn.commit()
@@ -102,6 +250,38 @@ class InfoCollectorRepository(
                 """
             )
 
+            # 近似重複判定用の MinHash 署名と LSH バンド索引
+            # （既存記事の登録は索引を作った初回だけ行う）
+            backfill_minhash = not fts.table_exists(conn, "article_minhash")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS article_minhash (
+                    article_id INTEGER PRIMARY KEY REFERENCES collected_info(id),
+                    signature BLOB
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS article_minhash_bands (
+                    band_key INTEGER NOT NULL,
+                    article_id INTEGER NOT NULL REFERENCES collected_info(id)
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE INDEX IF NOT EXISTS idx_minhash_bands_key
+                ON article_minhash_bands(band_key)
+                """
+            )
+            conn.execute(
+                """
+                CREATE INDEX IF NOT EXISTS idx_minhash_bands_article
+                ON article_minhash_bands(article_id)
+                """
+            )
+
             conn.execute(
                 """
                 CREATE TABLE IF NOT EXISTS info_summaries (
@@ -231,7 +411,77 @@ class InfoCollectorRepository(
                 """
             )
 
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS feedback_aggregates (
+                    kind TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    agg_window TEXT NOT NULL,
+                    positive INTEGER NOT NULL DEFAULT 0,
+                    negative INTEGER NOT NULL DEFAULT 0,
+                    report_requested INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (kind, name, agg_window)
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS info_counters (
+                    name TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL DEFAULT 0
+                )
+                """
+            )
+
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS pipeline_jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    stage TEXT NOT NULL,
+                    article_id INTEGER,
+                    payload TEXT NOT NULL DEFAULT '{}',
+                    state TEXT NOT NULL DEFAULT 'queued',
+                    priority INTEGER NOT NULL DEFAULT 0,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    max_attempts INTEGER NOT NULL DEFAULT 3,
+                    lease_owner TEXT,
+                    lease_until TEXT,
+                    available_at TEXT NOT NULL,
+                    last_error TEXT,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                )
+                """
+            )
+            # 同じ stage / 記事の未完了ジョブは 1 件だけ（enqueue の重複防止）
+            conn.execute(
+                """
+                CREATE UNIQUE INDEX IF NOT EXISTS idx_pipeline_jobs_active
+                ON pipeline_jobs(stage, COALESCE(article_id, 0))
+                WHERE state IN ('queued', 'running')
+                """
+            )
+            conn.execute(
+                """
+                CREATE INDEX IF NOT EXISTS idx_pipeline_jobs_claim
+                ON pipeline_jobs(state, priority DESC, id)
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS daily_report_snapshots (
+                    report_date TEXT PRIMARY KEY,
+                    watermarks TEXT NOT NULL,
+                    payload BLOB NOT NULL,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                )
+                """
+            )
+
             self._migrate_schema(conn)
+            if backfill_minhash:
+                self._backfill_minhash(conn)
 
             conn.execute(
                 """
@@ -261,6 +511,56 @@ class InfoCollectorRepository(
             cursor.execute(f"PRAGMA table_info({table})")
             return any(row[1] == column for row in cursor.fetchall())
 
+        # collected_info.duplicate_of がなければ追加（近似重複の正規記事ID）
+        if not has_column("collected_info", "duplicate_of"):
+            try:
+                conn.execute("ALTER TABLE collected_info ADD COLUMN duplicate_of INTEGER")
+            except sqlite3.OperationalError:
+                pass
+        conn.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_info_duplicate_of
+            ON collected_info(duplicate_of)
+            """
+        )
+
+        # collected_info.analysis_state がなければ追加（未分析 = 'pending'、分析済み = 'done'）
+        if not has_column("collected_info", "analysis_state"):
+            try:
+                conn.execute(
+                    "ALTER TABLE collected_info "
+                    "ADD COLUMN analysis_state TEXT NOT NULL DEFAULT 'pending'"
+                )
+                conn.execute(
+                    """
+                    UPDATE collected_info SET analysis_state = 'done'
+                    WHERE id IN (SELECT article_id FROM article_analysis)
+                    """
+                )
+            except sqlite3.OperationalError:
+                pass
+        for name, body in _ANALYSIS_STATE_TRIGGERS.items():
+            conn.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {body}")
+        # 未分析の正規記事だけを新しい順に持つ部分インデックス（fetch_unanalyzed / 件数用）
+        conn.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_info_pending_analysis
+            ON collected_info(fetched_at DESC)
+            WHERE analysis_state = 'pending' AND duplicate_of IS NULL
+            """
+        )
+
+        # 期間の絞り込み用の UTC epoch ミリ秒列（INSERT / UPDATE 時にトリガーが埋める）
+        ensure_epoch_ms_column(conn, "collected_info", "fetched_at")
+        ensure_epoch_ms_column(conn, "article_analysis", "analyzed_at")
+
+        # collected_info.canonical_url がなければ追加（ソース横断の重複判定キー）
+        if not has_column("collected_info", "canonical_url"):
+            try:
+                conn.execute("ALTER TABLE collected_info ADD COLUMN canonical_url TEXT")
+            except sqlite3.OperationalError:
+                pass
+
         # reports.article_ids_hash がなければ追加
         if not has_column("reports", "article_ids_hash"):
             try:
@@ -275,6 +575,13 @@ class InfoCollectorRepository(
             except sqlite3.OperationalError:
                 pass
 
+        # deep_research.cluster_leader_id がなければ追加（クラスタ単位で共有した深掘りの代表記事）
+        if not has_column("deep_research", "cluster_leader_id"):
+            try:
+                conn.execute("ALTER TABLE deep_research ADD COLUMN cluster_leader_id INTEGER")
+            except sqlite3.OperationalError:
+                pass
+
         # article_analysis の判断理由カラムを追加
         for col in (
             "importance_reason",
@@ -350,18 +657,137 @@ class InfoCollectorRepository(
             ON article_feedback_events(created_at DESC)
             """
         )
-        self._backfill_feedback_events(conn)
+        # フィードバック集計の帰属先（source / category / 減衰窓）。追加時は集計を作り直す
+        rebuild_aggregates = False
+        for col in ("agg_source", "agg_category", "agg_window"):
+            if not has_column("article_feedback_events", col):
+                try:
+                    conn.execute(f"ALTER TABLE article_feedback_events ADD COLUMN {col} TEXT")
+                    rebuild_aggregates = True
+                except sqlite3.OperationalError:
+                    pass
+        conn.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_feedback_events_window
+            ON article_feedback_events(agg_window, created_at)
+            """
+        )
+        if self._backfill_feedback_events(conn) or rebuild_aggregates:
+            self._rebuild_feedback_aggregates(conn)
+        self._init_counters(conn)
+        self._backfill_canonical_urls(conn)
+        conn.execute(
+            """
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_info_canonical_url
+            ON collected_info(canonical_url)
+            """
+        )
+        self._init_fulltext_index(conn)
+        # 締まった日のスナップショットの無効化判定用（再分析・統合・削除を数える）
+        for table, day_column in (
+            ("article_analysis", "analyzed_at_ms"),
+            ("deep_research", "researched_at"),
+            ("reports", "report_date"),
+        ):
+            ensure_change_counter(conn, table, day_column)
 
-    def _backfill_feedback_events(self, conn: sqlite3.Connection) -> None:
-        """既存 article_feedback から履歴イベントを最低限復元する。"""
+    def _init_fulltext_index(self, conn: sqlite3.Connection) -> None:
+        """
+        collected_info の全文検索インデックス（FTS5 trigram）を作成する.
+        FTS5 / trigram が使えない SQLite では作成せず、search_info は LIKE 検索にフォールバックする。
+        """
+        fts.create_external_fts(
+            conn, "collected_info_fts", "collected_info", ("title", "content", "snippet")
+        )
+
+    def _backfill_canonical_urls(self, conn: sqlite3.Connection) -> None:
+        """
+        canonical_url 未設定の記事に正規 URL を埋め、同じ正規 URL の記事を最古の行へ統合する.
+        統合される行の分析・深掘り・フィードバックは、統合先に無いものだけ引き継ぐ。
+        """
+        rows = conn.execute(
+            "SELECT id, url FROM collected_info WHERE canonical_url IS NULL ORDER BY id"
+        ).fetchall()
+        if not rows:
+            return
+
+        keepers = dict(
+            conn.execute(
+                "SELECT canonical_url, id FROM collected_info WHERE canonical_url IS NOT NULL"
+            ).fetchall()
+        )
+        for article_id, url in rows:
+            canonical_url = canonicalize_url(url) or url
+            keeper_id = keepers.get(canonical_url)
+            if keeper_id is None:
+                keepers[canonical_url] = article_id
+                conn.execute(
+                    "UPDATE collected_info SET canonical_url = ? WHERE id = ?",
+                    (canonical_url, article_id),
+                )
+            else:
+                self._merge_article(conn, article_id, keeper_id)
+
+    def _merge_article(self, conn: sqlite3.Connection, source_id: int, target_id: int) -> None:
+        """記事 source_id の関連行を target_id へ付け替えて source_id を削除する。"""
+        # article_id が UNIQUE のテーブルは統合先に既にあれば統合元を捨てる
+        for table in ("article_analysis", "deep_research", "article_feedback"):
+            conn.execute(
+                f"UPDATE OR IGNORE {table} SET article_id = ? WHERE article_id = ?",
+                (target_id, source_id),
+            )
+            conn.execute(f"DELETE FROM {table} WHERE article_id = ?", (source_id,))
+        conn.execute(
+            "UPDATE article_feedback_events SET article_id = ? WHERE article_id = ?",
+            (target_id, source_id),
+        )
+        self._attribute_feedback_events(conn, "article_id = ?", (target_id,))
+        conn.execute(
+            "UPDATE reports SET source_article_id = ? WHERE source_article_id = ?",
+            (target_id, source_id),
+        )
+        conn.execute(
+            "UPDATE deep_research SET cluster_leader_id = ? WHERE cluster_leader_id = ?",
+            (target_id, source_id),
+        )
+        conn.execute(
+            "UPDATE collected_info SET duplicate_of = ? WHERE duplicate_of = ?",
+            (target_id, source_id),
+        )
+        conn.execute(
+            "UPDATE collected_info SET duplicate_of = NULL WHERE id = ? AND duplicate_of = id",
+            (target_id,),
+        )
+        conn.execute("DELETE FROM article_minhash WHERE article_id = ?", (source_id,))
+        conn.execute("DELETE FROM article_minhash_bands WHERE article_id = ?", (source_id,))
+        conn.execute("DELETE FROM collected_info WHERE id = ?", (source_id,))
+
+    def _backfill_minhash(self, conn: sqlite3.Connection) -> None:
+        """
+        署名の無い既存記事を LSH 索引に登録する（article_minhash を作成した初回だけ呼ぶ）.
+        既存記事同士の紐付けは行わず、以降に届く記事の照合相手としてだけ使う。
+        """
+        rows = conn.execute(
+            """
+            SELECT c.id, c.title, COALESCE(c.content, c.snippet) AS body
+            FROM collected_info c
+            LEFT JOIN article_minhash m ON c.id = m.article_id
+            WHERE m.article_id IS NULL
+            """
+        ).fetchall()
+        for article_id, title, body in rows:
+            self._index_minhash(conn, article_id, near_duplicate.signature(title, body))
+
+    def _backfill_feedback_events(self, conn: sqlite3.Connection) -> bool:
+        """既存 article_feedback から履歴イベントを最低限復元する。復元したら True を返す。"""
         cursor = conn.cursor()
         feedback_count = cursor.execute("SELECT COUNT(*) FROM article_feedback").fetchone()[0]
         if feedback_count == 0:
-            return
+            return False
 
         event_count = cursor.execute("SELECT COUNT(*) FROM article_feedback_events").fetchone()[0]
         if event_count > 0:
-            return
+            return False
 
         cursor.execute(
             """
@@ -399,3 +825,22 @@ class InfoCollectorRepository(
                     """,
                     (article_id, event_time),
                 )
+        return True
+
+    def _init_counters(self, conn: sqlite3.Connection) -> None:
+        """
+        get_feedback_progress 用の件数カウンタとトリガーを作成する.
+
+        カウンタは info_counters の行で、行の追加・削除・更新時にトリガーが増減する。
+        未作成のカウンタだけ現在の件数で初期化する（以降は数え直さない）。
+        """
+        for name, body in _COUNTER_TRIGGERS.items():
+            conn.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {body}")
+        seeded = {row[0] for row in conn.execute("SELECT name FROM info_counters")}
+        for name, query in _COUNTER_QUERIES.items():
+            if name in seeded:
+                continue
+            conn.execute(
+                f"INSERT INTO info_counters (name, value) VALUES (?, ({query}))",
+                (name,),
+            )
@@ -1,3 +1,4 @@
 from .ddg_client import DDGSearchClient, filter_search_results, filter_by_relevance
+from .relevance import rank_by_relevance
 
-__all__ = ["DDGSearchClient", "filter_search_results", "filter_by_relevance"]
+__all__ = ["DDGSearchClient", "filter_search_results", "filter_by_relevance", "rank_by_relevance"]
@@ -0,0 +1,127 @@
+"""
+検索結果の関連性プレフィルタ（ローカル TF-IDF コサイン類似度）.
+
+深掘りで集めた DDG 検索結果を、元記事（タイトル・要約・キーワード）との
+TF-IDF コサイン類似度で並べ替え、テーマから外れた結果を統合プロンプトに入れる前に落とす。
+LLM による関連性判定（filter_by_relevance）の代わりに使い、数十件ならミリ秒で終わる。
+"""
+
+from __future__ import annotations
+
+import math
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Sequence
+
+# 元記事との類似度がこれ未満の検索結果は捨てる
+DEFAULT_MIN_SCORE = 0.05
+# 統合プロンプトに渡す検索結果の上限
+DEFAULT_TOP_K = 8
+# 閾値を超える結果が少なすぎるときも、類似度の高い順にこの件数までは残す
+DEFAULT_MIN_KEEP = 3
+
+_ASCII_WORD_RE = re.compile(r"[a-z0-9][a-z0-9+#.\-]*")
+_CJK_RUN_RE = re.compile(r"[^\x00-\x7f\s、。・「」『』（）()【】！？!?,.:;\"'|/]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """英数字は単語、日本語など非 ASCII の連続は文字 bigram に分割する。"""
+    lowered = text.lower()
+    tokens = [word.strip(".-") for word in _ASCII_WORD_RE.findall(lowered)]
+    tokens = [word for word in tokens if len(word) >= 2]
+    for run in _CJK_RUN_RE.findall(lowered):
+        if len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i : i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+def _tfidf(counts: Counter, idf: Dict[str, float]) -> Dict[str, float]:
+    vector = {term: (1 + math.log(tf)) * idf[term] for term, tf in counts.items()}
+    norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+    return {term: weight / norm for term, weight in vector.items()} if norm else {}
+
+
+def tfidf_vectors(texts: Sequence[str]) -> List[Dict[str, float]]:
+    """texts を L2 正規化した疎な TF-IDF ベクトルにする（IDF は texts 全体から求める）。"""
+    counts = [Counter(tokenize(text)) for text in texts]
+    df: Counter = Counter()
+    for item in counts:
+        df.update(item.keys())
+    idf = {term: math.log((len(counts) + 1) / (freq + 1)) + 1 for term, freq in df.items()}
+    return [_tfidf(item, idf) for item in counts]
+
+
+def cosine(a: Dict[str, float], b: Dict[str, float]) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(weight * b.get(term, 0.0) for term, weight in a.items())
+
+
+def relevance_scores(reference: str, documents: Sequence[str]) -> List[float]:
+    """
+    reference と各 document の TF-IDF コサイン類似度（0.0-1.0）を返す.
+
+    IDF は reference と documents を合わせた集合から求める。全結果に共通する語
+    （検索クエリそのものなど）の重みが下がり、記事固有の語の一致が効く。
+    """
+    query, *vectors = tfidf_vectors([reference, *documents])
+    return [cosine(query, vector) for vector in vectors]
+
+
+def _result_text(result: Dict[str, str]) -> str:
+    return f"{result.get('title', '')}\n{result.get('snippet', '')}"
+
+
+def _dedupe_by_url(results: Iterable[Dict[str, str]]) -> List[Dict[str, str]]:
+    seen = set()
+    unique = []
+    for result in results:
+        url = result.get("url", "")
+        if url and url in seen:
+            continue
+        seen.add(url)
+        unique.append(result)
+    return unique
+
+
+def rank_by_relevance(
+    results: List[Dict[str, str]],
+    article_title: str,
+    article_summary: str,
+    keywords: Sequence[str] = (),
+    min_score: float = DEFAULT_MIN_SCORE,
+    top_k: int = DEFAULT_TOP_K,
+    min_keep: int = DEFAULT_MIN_KEEP,
+) -> List[Dict[str, str]]:
+    """
+    検索結果を元記事との関連性が高い順に並べ、閾値未満と top_k 超過分を落とす.
+
+    同じ URL の結果（複数クエリでの重複ヒット）は 1 件にまとめる。
+    返す各結果には relevance_score を付ける（元の dict は変更しない）。
+
+    Args:
+        results: 検索結果のリスト [{"title": str, "snippet": str, "url": str}, ...]
+        article_title: 元記事のタイトル
+        article_summary: 元記事の要約または本文冒頭
+        keywords: 元記事のキーワード（タイトルと同じく 2 倍の重みで扱う）
+        min_score: 残す結果の最小類似度
+        top_k: 返す結果の上限
+        min_keep: 閾値を超える結果がこれより少ないときに補う件数
+    """
+    unique = _dedupe_by_url(results)
+    if not unique:
+        return []
+    keyword_text = " ".join(str(keyword) for keyword in keywords)
+    # タイトルとキーワードは記事の主題を端的に表すので 2 回数える
+    reference = "\n".join(
+        [article_title, article_title, keyword_text, keyword_text, article_summary]
+    )
+    scores = relevance_scores(reference, [_result_text(result) for result in unique])
+
+    ranked = sorted(zip(unique, scores), key=lambda pair: pair[1], reverse=True)
+    kept = [pair for pair in ranked if pair[1] >= min_score]
+    if len(kept) < min_keep:
+        kept = ranked[:min_keep]
+    return [{**result, "relevance_score": round(score, 4)} for result, score in kept[:top_k]]
@@ -0,0 +1,92 @@
+"""
+深掘り候補のトピッククラスタリング
+
+同じ出来事を扱う重要記事が複数あると、記事ごとに検索クエリ生成・DDG 検索・統合を
+繰り返すことになる。キーワードの Jaccard 係数とタイトル + 要約の TF-IDF ベクトルの
+コサイン類似度を合わせた類似度で候補をまとめ、クラスタ単位で 1 回だけ深掘りする。
+
+重要度の高い順に見て、既存クラスタの代表記事（最初の記事）との類似度が閾値以上なら
+そのクラスタに入れ、そうでなければ新しいクラスタを作る（代表との比較なので連鎖的に
+無関係な記事がつながることはない）。
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Mapping, Sequence, TypeVar
+
+from .search.relevance import cosine, tfidf_vectors
+
+# クラスタにまとめる類似度の閾値
+DEFAULT_THRESHOLD = 0.35
+# 1 クラスタの記事数の上限（統合プロンプトが長くなりすぎないようにする）
+DEFAULT_MAX_CLUSTER_SIZE = 5
+# 類似度に占めるキーワード一致の重み（残りは本文ベクトルのコサイン類似度）
+KEYWORD_WEIGHT = 0.5
+
+Row = TypeVar("Row", bound=Mapping[str, Any])
+
+
+def _get(row: Mapping[str, Any], key: str) -> Any:
+    # sqlite3.Row は .get を持たない
+    return row[key] if key in row.keys() else None
+
+
+def article_keywords(row: Mapping[str, Any]) -> set[str]:
+    """分析結果の keywords（JSON 文字列またはリスト）を正規化した集合で返す。"""
+    raw = _get(row, "keywords")
+    if isinstance(raw, str):
+        try:
+            raw = json.loads(raw or "[]")
+        except json.JSONDecodeError:
+            raw = []
+    return {str(keyword).strip().lower() for keyword in raw or [] if str(keyword).strip()}
+
+
+def _article_text(row: Mapping[str, Any]) -> str:
+    title = _get(row, "collected_title") or _get(row, "article_title") or ""
+    return f"{title}\n{_get(row, 'summary') or ''}"
+
+
+def _jaccard(a: set[str], b: set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def cluster_articles(
+    rows: Sequence[Row],
+    threshold: float = DEFAULT_THRESHOLD,
+    max_cluster_size: int = DEFAULT_MAX_CLUSTER_SIZE,
+) -> list[list[Row]]:
+    """
+    深掘り候補を同じトピックのクラスタに分ける.
+
+    Args:
+        rows: fetch_deep_research_targets の結果（重要度の高い順）
+        threshold: 代表記事との類似度がこれ以上ならクラスタに加える
+        max_cluster_size: 1 クラスタの記事数の上限
+
+    Returns:
+        クラスタのリスト。各クラスタの先頭が代表記事で、入力の順序を保つ
+    """
+    keywords = [article_keywords(row) for row in rows]
+    vectors = tfidf_vectors([_article_text(row) for row in rows])
+
+    clusters: list[list[int]] = []
+    for index in range(len(rows)):
+        best, best_score = None, threshold
+        for cluster in clusters:
+            if len(cluster) >= max_cluster_size:
+                continue
+            leader = cluster[0]
+            score = KEYWORD_WEIGHT * _jaccard(keywords[index], keywords[leader]) + (
+                1 - KEYWORD_WEIGHT
+            ) * cosine(vectors[index], vectors[leader])
+            if score >= best_score:
+                best, best_score = cluster, score
+        if best is None:
+            clusters.append([index])
+        else:
+            best.append(index)
+    return [[rows[index] for index in cluster] for cluster in clusters]
@@ -0,0 +1,106 @@
+"""
+記事 URL の正規化
+
+同じ記事が RSS / ニュース検索 / DDG 検索から、トラッキングパラメータ付き・AMP 版・
+モバイル版・末尾スラッシュ違いなどの URL で届くため、比較用の正規 URL を作る。
+collected_info.canonical_url の一意制約でソースをまたいだ重複を弾くのに使う。
+"""
+
+from __future__ import annotations
+
+import re
+from urllib.parse import parse_qsl, unquote, urlencode, urlsplit, urlunsplit
+
+# 記事の同一性に関係しないクエリパラメータ
+_TRACKING_PARAMS = {
+    "fbclid",
+    "gclid",
+    "dclid",
+    "yclid",
+    "msclkid",
+    "igshid",
+    "mc_cid",
+    "mc_eid",
+    "_ga",
+    "_gl",
+    "ref",
+    "ref_src",
+    "ref_url",
+    "referrer",
+    "source",
+    "spm",
+    "ocid",
+    "cmpid",
+    "amp",
+    "outputtype",
+}
+_TRACKING_PREFIXES = ("utm_", "ga_", "hmb_", "mkt_", "pk_", "at_")
+
+# AMP / モバイル版のホスト接頭辞
+_HOST_VARIANT_PREFIXES = ("www.", "amp.", "m.", "mobile.", "sp.")
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# Google AMP キャッシュ: https://<host>.cdn.ampproject.org/c/s/<元URL>
+_AMP_CACHE_RE = re.compile(r"^/[cv]/(?:s/)?(.+)$")
+_AMP_SUFFIX_RE = re.compile(r"(?:/amp|\.amp)(?=/?$)")
+_AMP_HTML_RE = re.compile(r"\.amp\.html?$")
+
+
+def _is_tracking(name: str) -> bool:
+    lowered = name.lower()
+    return lowered in _TRACKING_PARAMS or lowered.startswith(_TRACKING_PREFIXES)
+
+
+def _strip_host_variants(host: str) -> str:
+    changed = True
+    while changed:
+        changed = False
+        for prefix in _HOST_VARIANT_PREFIXES:
+            # "m.example" のようにドメイン本体しか残らない場合は外さない
+            if host.startswith(prefix) and host.count(".") >= 2:
+                host = host[len(prefix) :]
+                changed = True
+    return host
+
+
+def canonicalize_url(url: str | None) -> str | None:
+    """
+    比較用の正規 URL を返す（http/https 以外や解釈できない URL は None）.
+
+    - スキームは https、ホストは小文字・www/AMP/モバイル接頭辞なし・既定ポートなし
+    - utm_* などのトラッキングパラメータとフラグメントを除去し、残りのクエリはソート
+    - AMP キャッシュ URL・/amp 付きパス・.amp.html を元記事のパスに戻す
+    - 末尾スラッシュを除去
+    """
+    if not url:
+        return None
+    try:
+        parts = urlsplit(url.strip())
+        port = parts.port
+    except ValueError:
+        return None
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower().rstrip(".")
+    if scheme not in _DEFAULT_PORTS or not host:
+        return None
+
+    path = parts.path
+    if host.endswith(".cdn.ampproject.org"):
+        match = _AMP_CACHE_RE.match(path)
+        if match:
+            return canonicalize_url(f"https://{unquote(match.group(1))}")
+
+    host = _strip_host_variants(host)
+    netloc = host if port in (None, *_DEFAULT_PORTS.values()) else f"{host}:{port}"
+
+    path = re.sub(r"/{2,}", "/", path)
+    path = _AMP_HTML_RE.sub(".html", path)
+    path = _AMP_SUFFIX_RE.sub("", path)
+    path = path.rstrip("/")
+
+    query = sorted(
+        (name, value)
+        for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not _is_tracking(name)
+    )
+    return urlunsplit(("https", netloc, path, urlencode(query), ""))
@@ -17,6 +17,7 @@ from pathlib import Path
 
 from src.lifelog.database.db_manager import DatabaseManager
 from src.browser_history.repository import BrowserHistoryRepository
+from src.common.epoch import to_epoch_ms
 
 
 def format_duration(seconds: int) -> str:
@@ -140,11 +141,11 @@ def show_timeline(db: DatabaseManager, hours: int = 2) -> None:
             i.duration_seconds
         FROM activity_intervals i
         JOIN apps a ON i.app_id = a.app_id
-        WHERE i.start_ts >= ?
-        ORDER BY i.start_ts DESC
+        WHERE i.start_ts_ms >= ?
+        ORDER BY i.start_ts_ms DESC
         LIMIT 50
     """,
-        (start_time,),
+        (to_epoch_ms(start_time),),
     )
 
     rows = cursor.fetchall()
@@ -258,72 +259,34 @@ def show_browser_stats(date: str = None) -> None:
     """ブラウザ統計を表示."""
     repo = BrowserHistoryRepository()
 
-    conn = repo._connect()
-    cursor = conn.cursor()
-
-    # 日付フィルタ
-    date_filter = ""
-    params = []
     if date:
-        date_filter = "WHERE date(visit_time) = ?"
-        params.append(date)
         print(f"\n=== Browser Statistics for {date} ===\n")
+        hourly = repo.count_by_hour(date)
+        total = sum(count for _, count in hourly)
     else:
         print("\n=== Browser Statistics (All Time) ===\n")
-
-    # 総件数
-    cursor.execute(f"SELECT COUNT(*) FROM browser_history {date_filter}", params)
-    total = cursor.fetchone()[0]
+        hourly = []
+        with repo._connect() as conn:
+            total = conn.execute("SELECT COUNT(*) FROM browser_visits").fetchone()[0]
 
     # ドメイン別集計
-    query = f"""
-        SELECT
-            CASE
-                WHEN url LIKE 'https://%' THEN substr(url, 9, instr(substr(url, 9), '/') - 1)
-                WHEN url LIKE 'http://%' THEN substr(url, 8, instr(substr(url, 8), '/') - 1)
-                ELSE 'other'
-            END as domain,
-            COUNT(*) as count
-        FROM browser_history
-        {date_filter}
-        GROUP BY domain
-        ORDER BY count DESC
-        LIMIT 20
-    """
-    try:
-        cursor.execute(query, params)
-        domains = cursor.fetchall()
-
-        print(f"Total Visits: {total}")
-        print(f"\n{'Domain':<40} {'Visits':<10}")
-        print("-" * 50)
-
-        for domain, count in domains:
-            # ドメインがNoneまたは空の場合の処理
-            domain_clean = domain if domain and domain.strip() else "(unknown)"
-            print(f"{domain_clean:<40} {count:<10}")
-
-        # 時間帯別集計
-        if date:
-            query = """
-                SELECT
-                    strftime('%H', visit_time) as hour,
-                    COUNT(*) as count
-                FROM browser_history
-                WHERE date(visit_time) = ?
-                GROUP BY hour
-                ORDER BY hour
-            """
-            cursor.execute(query, [date])
-            hourly = cursor.fetchall()
-
-            if hourly:
-                print(f"\n{'Hour':<8} {'Visits':<10}")
-                print("-" * 20)
-                for hour, count in hourly:
-                    print(f"{hour}:00   {count:<10}")
-    finally:
-        conn.close()
+    domains = repo.count_by_domain(start_date=date, end_date=date, limit=20)
+
+    print(f"Total Visits: {total}")
+    print(f"\n{'Domain':<40} {'Visits':<10}")
+    print("-" * 50)
+
+    for domain, count in domains:
+        # ドメインがNoneまたは空の場合の処理
+        domain_clean = domain if domain and domain.strip() else "(unknown)"
+        print(f"{domain_clean:<40} {count:<10}")
+
+    # 時間帯別集計
+    if hourly:
+        print(f"\n{'Hour':<8} {'Visits':<10}")
+        print("-" * 20)
+        for hour, count in hourly:
+            print(f"{hour}:00   {count:<10}")
 
 
 def show_reports(limit: int = 5) -> None:
@@ -13,15 +13,60 @@ from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Any, List, Optional
 
+from src.common.change_counter import ensure_change_counter
 from src.common.db_mixin import SqliteLockRetryMixin
+from src.common.epoch import ensure_epoch_ms_column, epoch_ms_sql, to_epoch_ms
 
-from .schema import CREATE_TABLES_SQL, MIGRATION_ADD_EVENTS_SQL, get_pragma_settings
+from .schema import (
+    CREATE_TABLES_SQL,
+    MIGRATION_ADD_EVENTS_SQL,
+    UNIFIED_TIMELINE_VIEW_SQL,
+    get_pragma_settings,
+)
 
 logger = logging.getLogger(__name__)
 
 # 明示的にdatetimeを文字列へアダプトして、sqlite3のデフォルト警告を避ける
 sqlite3.register_adapter(datetime, lambda d: d.isoformat())
 
+# compact_intervals が既定で詰める隙間（秒）。サンプリング間隔（12秒）より十分短くする
+DEFAULT_COMPACTION_GAP_SECONDS = 5.0
+
+
+def _plan_interval_runs(
+    rows: list[sqlite3.Row], gap_ms: int, end_ms: int
+) -> list[list[sqlite3.Row]]:
+    """
+    開始時刻順の区間を、1 行にまとめられる連続（ラン）に分ける.
+
+    直前の区間と app_id / window_hash / domain / is_idle が同じで、隙間が gap_ms 以下
+    （重なりを含む）なら同じランに入れる。時間帯別の集計は開始時刻の時間帯に数えるので、
+    開始時刻の時間帯（保存値の壁時計）が変わるところでは切る。end_ms より後に終わる区間は
+    まだ閉じていないので、どのランにも入れない。
+    """
+    runs: list[list[sqlite3.Row]] = []
+    current: list[sqlite3.Row] = []
+    current_key: Optional[tuple] = None
+    current_end = 0
+    for row in rows:
+        if row["end_ts_ms"] is None or row["end_ts_ms"] > end_ms:
+            current, current_key = [], None
+            continue
+        key = (
+            row["app_id"],
+            row["window_hash"],
+            row["domain"],
+            row["is_idle"],
+            str(row["start_ts"])[:13],
+        )
+        if current and key == current_key and row["start_ts_ms"] - current_end <= gap_ms:
+            current.append(row)
+            current_end = max(current_end, row["end_ts_ms"])
+            continue
+        current, current_key, current_end = [row], key, row["end_ts_ms"]
+        runs.append(current)
+    return [run for run in runs if len(run) > 1]
+
 
 class DatabaseManager(SqliteLockRetryMixin):
     """
@@ -61,10 +106,28 @@ class DatabaseManager(SqliteLockRetryMixin):
 
             # テーブル作成
             conn.executescript(CREATE_TABLES_SQL)
+            # 範囲検索用の UTC epoch ミリ秒列（既存DBは初回に埋める）
+            ensure_epoch_ms_column(conn, "activity_intervals", "start_ts")
+            ensure_epoch_ms_column(conn, "system_events", "event_timestamp")
+            self._ensure_unified_timeline_view(conn)
+            # 締まった日のスナップショットの無効化判定用（コンパクション・保持期間の削除を数える）
+            ensure_change_counter(conn, "activity_intervals", "start_ts_ms")
+            ensure_change_counter(conn, "system_events", "event_timestamp_ms")
             conn.commit()
 
         logger.info(f"Database initialized: {self.db_path}")
 
+    @staticmethod
+    def _ensure_unified_timeline_view(conn: sqlite3.Connection) -> None:
+        """unified_timeline ビューが現在の定義と異なれば作り直す（_ms 列の無い旧定義に追従する）。"""
+        row = conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'view' AND name = 'unified_timeline'"
+        ).fetchone()
+        if row is not None and row[0] == UNIFIED_TIMELINE_VIEW_SQL:
+            return
+        conn.execute("DROP VIEW IF EXISTS unified_timeline")
+        conn.execute(UNIFIED_TIMELINE_VIEW_SQL)
+
     def migrate_if_needed(self) -> None:
         """
         既存DBへのマイグレーションを実行.
@@ -292,9 +355,9 @@ class DatabaseManager(SqliteLockRetryMixin):
 
         cursor.execute(
             """
-            DELETE FROM activity_intervals WHERE start_ts < ?
+            DELETE FROM activity_intervals WHERE start_ts_ms < ?
         """,
-            (cutoff_date,),
+            (to_epoch_ms(cutoff_date),),
         )
 
         cursor.execute(
@@ -314,9 +377,9 @@ class DatabaseManager(SqliteLockRetryMixin):
         if cursor.fetchone():
             cursor.execute(
                 """
-                DELETE FROM system_events WHERE event_timestamp < ?
+                DELETE FROM system_events WHERE event_timestamp_ms < ?
             """,
-                (event_cutoff,),
+                (to_epoch_ms(event_cutoff),),
             )
             deleted_events = cursor.rowcount
             if deleted_events > 0:
@@ -335,6 +398,90 @@ class DatabaseManager(SqliteLockRetryMixin):
         conn.commit()
         logger.info(f"Cleaned up data older than {retention_days} days")
 
+    def compact_intervals(
+        self,
+        start: datetime,
+        end: datetime,
+        gap_seconds: float = DEFAULT_COMPACTION_GAP_SECONDS,
+    ) -> dict[str, Any]:
+        """
+        閉じた期間の細切れの活動区間を 1 行にまとめる.
+
+        同じアプリ・ウィンドウ・ドメイン・アイドル状態の区間が gap_seconds 以下の隙間で
+        続くとき、先頭の行の end_ts をランの最後まで延ばし、残りの行を削除する。
+        区間は開始時刻の時間帯をまたいでまとめないので、時間帯別・日別の集計
+        （hourly_activity / daily_app_usage 等）の合計は absorbed_seconds だけしか変わらない。
+
+        end は現在の時間帯の開始時刻までに切り詰める（書き込み中の区間は触らない）。
+
+        Args:
+            start: 対象期間の開始（区間の開始時刻で判定）
+            end: 対象期間の終了（この時刻より後に終わる区間はまとめない）
+            gap_seconds: 同じランとみなす隙間の上限（秒）
+
+        Returns:
+            rows_before / rows_after（期間内の行数）、merged_runs（まとめたラン数）、
+            compaction_ratio（rows_after / rows_before）、absorbed_seconds（取り込んだ隙間の
+            合計秒数。重なっていた区間の分は差し引く）
+        """
+        end = min(end, datetime.now().replace(minute=0, second=0, microsecond=0))
+        start_ms, end_ms = to_epoch_ms(start), to_epoch_ms(end)
+        gap_ms = round(gap_seconds * 1000)
+
+        def _op() -> dict[str, Any]:
+            conn = self._get_connection()
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                rows = cursor.execute(
+                    f"""
+                    SELECT
+                        id, start_ts, end_ts, app_id, window_hash, domain, is_idle,
+                        start_ts_ms, {epoch_ms_sql("end_ts")} AS end_ts_ms
+                    FROM activity_intervals
+                    WHERE start_ts_ms >= ? AND start_ts_ms < ?
+                    ORDER BY start_ts_ms, id
+                    """,
+                    (start_ms, end_ms),
+                ).fetchall()
+                runs = _plan_interval_runs(rows, gap_ms, end_ms)
+
+                updates, deletes = [], []
+                absorbed_ms = 0
+                for run in runs:
+                    last = max(run, key=lambda row: row["end_ts_ms"])
+                    covered = sum(row["end_ts_ms"] - row["start_ts_ms"] for row in run)
+                    absorbed_ms += last["end_ts_ms"] - run[0]["start_ts_ms"] - covered
+                    updates.append((last["end_ts"], run[0]["id"]))
+                    deletes.extend((row["id"],) for row in run[1:])
+                cursor.executemany("UPDATE activity_intervals SET end_ts = ? WHERE id = ?", updates)
+                cursor.executemany("DELETE FROM activity_intervals WHERE id = ?", deletes)
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+
+            rows_after = len(rows) - len(deletes)
+            return {
+                "rows_before": len(rows),
+                "rows_after": rows_after,
+                "merged_runs": len(runs),
+                "compaction_ratio": rows_after / len(rows) if rows else 1.0,
+                "absorbed_seconds": absorbed_ms / 1000,
+            }
+
+        result = self._run_with_lock_retry(_op)
+        logger.info(
+            "Compacted intervals %s - %s: %d -> %d rows (ratio %.3f, %d runs)",
+            start.isoformat(),
+            end.isoformat(),
+            result["rows_before"],
+            result["rows_after"],
+            result["compaction_ratio"],
+            result["merged_runs"],
+        )
+        return result
+
     def bulk_insert_events(self, events: list[dict[str, Any]]) -> None:
         """
         イベントデータのバルク挿入.
@@ -414,9 +561,9 @@ class DatabaseManager(SqliteLockRetryMixin):
 
         query = """
             SELECT * FROM system_events
-            WHERE event_timestamp >= ? AND event_timestamp < ?
+            WHERE event_timestamp_ms >= ? AND event_timestamp_ms < ?
         """
-        params = [start, end]
+        params: list[Any] = [to_epoch_ms(start), to_epoch_ms(end)]
 
         if event_types:
             placeholders = ",".join(["?"] * len(event_types))
@@ -427,7 +574,7 @@ class DatabaseManager(SqliteLockRetryMixin):
             query += " AND severity >= ?"
             params.append(min_severity)
 
-        query += " ORDER BY event_timestamp DESC"
+        query += " ORDER BY event_timestamp_ms DESC"
 
         cursor.execute(query, params)
         rows = cursor.fetchall()
@@ -452,13 +599,16 @@ class DatabaseManager(SqliteLockRetryMixin):
         conn = self._get_connection()
         cursor = conn.cursor()
 
+        # timestamp_ms の条件は両テーブルの _ms 列のインデックスまで押し下げられる
         cursor.execute(
             """
-            SELECT * FROM unified_timeline
-            WHERE timestamp >= ? AND timestamp < ?
-            ORDER BY timestamp DESC
+            SELECT event_source, timestamp, event_type, severity,
+                   process_name, window_hash, message, category
+            FROM unified_timeline
+            WHERE timestamp_ms >= ? AND timestamp_ms < ?
+            ORDER BY timestamp_ms DESC
         """,
-            (start, end),
+            (to_epoch_ms(start), to_epoch_ms(end)),
         )
 
         rows = cursor.fetchall()
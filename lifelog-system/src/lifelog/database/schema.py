@@ -84,36 +84,8 @@ CREATE INDEX IF NOT EXISTS idx_events_category ON system_events(category);
 CREATE INDEX IF NOT EXISTS idx_events_date ON system_events(date(event_timestamp));
 CREATE INDEX IF NOT EXISTS idx_events_process ON system_events(process_name);
 
--- ========================================
--- 統合時系列ビュー（activity_intervals + system_events）
--- ========================================
--- 注意: SQLiteではビュー内のORDER BYは保証されないため、
--- 使用時には必ず ORDER BY timestamp DESC を指定すること
-CREATE VIEW IF NOT EXISTS unified_timeline AS
-SELECT
-    'activity' AS event_source,
-    start_ts AS timestamp,
-    NULL AS event_type,
-    NULL AS severity,
-    a.process_name AS process_name,
-    i.window_hash AS window_hash,
-    NULL AS message,
-    NULL AS category
-FROM activity_intervals i
-JOIN apps a ON i.app_id = a.app_id
-
-UNION ALL
-
-SELECT
-    'system_event' AS event_source,
-    event_timestamp AS timestamp,
-    event_type,
-    severity,
-    process_name,
-    NULL AS window_hash,
-    message,
-    category
-FROM system_events;
+-- 統合時系列ビュー（unified_timeline）は _ms 列を参照するので、_ms 列を追加した後に
+-- UNIFIED_TIMELINE_VIEW_SQL で作成する
 
 -- ========================================
 -- 日次イベントサマリービュー
@@ -155,8 +127,41 @@ GROUP BY datetime(start_ts, 'start of hour');
 """
 
 
+# 統合時系列ビュー（activity_intervals + system_events）
+# 注意: SQLiteではビュー内のORDER BYは保証されないため、使用時には必ず ORDER BY を指定すること。
+# timestamp_ms（UTC epoch ミリ秒）で範囲を絞ると、条件が両テーブルの _ms 列のインデックスに届く
+UNIFIED_TIMELINE_VIEW_SQL = """CREATE VIEW unified_timeline AS
+SELECT
+    'activity' AS event_source,
+    start_ts AS timestamp,
+    NULL AS event_type,
+    NULL AS severity,
+    a.process_name AS process_name,
+    i.window_hash AS window_hash,
+    NULL AS message,
+    NULL AS category,
+    i.start_ts_ms AS timestamp_ms
+FROM activity_intervals i
+JOIN apps a ON i.app_id = a.app_id
+
+UNION ALL
+
+SELECT
+    'system_event' AS event_source,
+    event_timestamp AS timestamp,
+    event_type,
+    severity,
+    process_name,
+    NULL AS window_hash,
+    message,
+    category,
+    event_timestamp_ms AS timestamp_ms
+FROM system_events"""
+
+
 # 既存DBへのマイグレーション用SQL（system_eventsテーブルとビューを追加）
-MIGRATION_ADD_EVENTS_SQL = """
+MIGRATION_ADD_EVENTS_SQL = (
+    """
 -- ========================================
 -- system_events: システムイベントテーブル（マイグレーション）
 -- ========================================
@@ -191,31 +196,9 @@ CREATE INDEX IF NOT EXISTS idx_events_process ON system_events(process_name);
 -- 既存のビューを削除して再作成（ビュー定義が変更された場合に対応）
 DROP VIEW IF EXISTS unified_timeline;
 
-CREATE VIEW unified_timeline AS
-SELECT
-    'activity' AS event_source,
-    start_ts AS timestamp,
-    NULL AS event_type,
-    NULL AS severity,
-    a.process_name AS process_name,
-    i.window_hash AS window_hash,
-    NULL AS message,
-    NULL AS category
-FROM activity_intervals i
-JOIN apps a ON i.app_id = a.app_id
-
-UNION ALL
-
-SELECT
-    'system_event' AS event_source,
-    event_timestamp AS timestamp,
-    event_type,
-    severity,
-    process_name,
-    NULL AS window_hash,
-    message,
-    category
-FROM system_events;
+"""
+    + UNIFIED_TIMELINE_VIEW_SQL
+    + """;
 
 -- ========================================
 -- 日次イベントサマリービュー（マイグレーション）
@@ -234,6 +217,7 @@ SELECT
 FROM system_events
 GROUP BY date(event_timestamp), event_type, category;
 """
+)
 
 
 def get_pragma_settings() -> list[str]:
@@ -0,0 +1,20 @@
+"""ローカルベクトルインデックス（記事・タイムラインエントリの意味検索）。NumPy が必要。"""
+
+from .embedders import Embedder, HashingEmbedder, OllamaEmbedder, get_embedder
+from .store import VectorHit, VectorItem, VectorStore
+from .sync import ARTICLE_KIND, ENTRY_KIND, compose_text, open_store, sync_collected_info
+
+__all__ = [
+    "Embedder",
+    "HashingEmbedder",
+    "OllamaEmbedder",
+    "get_embedder",
+    "VectorHit",
+    "VectorItem",
+    "VectorStore",
+    "ARTICLE_KIND",
+    "ENTRY_KIND",
+    "compose_text",
+    "open_store",
+    "sync_collected_info",
+]
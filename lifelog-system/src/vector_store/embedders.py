@@ -0,0 +1,155 @@
+"""
+埋め込みプロバイダ
+
+VectorStore はテキストを埋め込む Embedder を差し替えられる。
+- HashingEmbedder: 単語と文字 2/3-gram を特徴ハッシュで固定次元へ落とす。決定的で外部依存がなく、
+  オフラインのテストや Ollama が止まっているときに使う
+- OllamaEmbedder: Ollama の /api/embed を呼ぶ
+  （共有セッション・サーキットブレーカー・LLM ゲートウェイ経由）
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+from typing import Protocol, Sequence
+
+import numpy as np
+
+from src.ai_secretary.circuit_breaker import get_breaker
+from src.ai_secretary.llm_gateway import LLMPriority, current_caller, llm_gateway
+from src.ai_secretary.ollama_transport import get_session, resolve_keep_alive
+
+DEFAULT_HASHING_DIM = 256
+DEFAULT_EMBED_MODEL = "nomic-embed-text"
+
+_WORD_RE = re.compile(r"\w+")
+_SPACE_RE = re.compile(r"\s+")
+
+
+class Embedder(Protocol):
+    """テキスト列を (len(texts), dim) の float32 配列へ変換する。"""
+
+    name: str
+
+    @property
+    def dim(self) -> int:
+        ...
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        ...
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """各行を L2 正規化する（内積がそのままコサイン類似度になる）。ゼロ行はそのまま。"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class HashingEmbedder:
+    """単語と文字 2/3-gram の符号付き特徴ハッシュによる決定的な埋め込み。"""
+
+    def __init__(self, dim: int = DEFAULT_HASHING_DIM) -> None:
+        self._dim = dim
+        self.name = f"hashing-{dim}"
+
+    @property
+    def dim(self) -> int:
+        return self._dim
+
+    def _features(self, text: str) -> list[str]:
+        normalized = _SPACE_RE.sub(" ", text.lower()).strip()
+        # 日本語は空白で区切られないので、単語に加えて文字 2-gram / 3-gram も特徴にする
+        features = [f"w:{word}" for word in _WORD_RE.findall(normalized)]
+        for size in (2, 3):
+            features.extend(
+                f"c:{normalized[i:i + size]}" for i in range(len(normalized) - size + 1)
+            )
+        return features
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self._dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text or ""):
+                digest = int.from_bytes(
+                    hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big"
+                )
+                sign = 1.0 if digest & 1 else -1.0
+                vectors[row, (digest >> 1) % self._dim] += sign
+        return normalize_rows(vectors)
+
+
+class OllamaEmbedder:
+    """Ollama の /api/embed で埋め込みを求める。次元は初回呼び出しで確定する。"""
+
+    def __init__(
+        self,
+        base_url: str | None = None,
+        model: str | None = None,
+        timeout: int | None = None,
+        batch_size: int = 32,
+    ) -> None:
+        self.base_url = (base_url or os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")).rstrip(
+            "/"
+        )
+        self.model = model or os.getenv("OLLAMA_EMBED_MODEL", DEFAULT_EMBED_MODEL)
+        self.timeout = timeout or int(os.getenv("OLLAMA_TIMEOUT", "180"))
+        self.batch_size = batch_size
+        self.keep_alive = resolve_keep_alive()
+        self.session = get_session(self.base_url)
+        self.breaker = get_breaker(self.base_url)
+        self.name = f"ollama:{self.model}"
+        self._dim: int | None = None
+
+    @property
+    def dim(self) -> int:
+        if self._dim is None:
+            self.embed(["次元確認"])
+        assert self._dim is not None
+        return self._dim
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        chunks = [
+            self._embed_batch(list(texts[start : start + self.batch_size]))
+            for start in range(0, len(texts), self.batch_size)
+        ]
+        if not chunks:
+            return np.zeros((0, self._dim or 0), dtype=np.float32)
+        vectors = np.vstack(chunks)
+        self._dim = int(vectors.shape[1])
+        return normalize_rows(vectors)
+
+    def _embed_batch(self, texts: list[str]) -> np.ndarray:
+        payload = {"model": self.model, "input": texts, "keep_alive": self.keep_alive}
+        caller = current_caller() or os.getenv("TIMELINE_LLM_CALLER", "vector_store")
+        self.breaker.check()
+        with llm_gateway.slot(caller, LLMPriority.BACKGROUND):
+            try:
+                resp = self.session.post(
+                    f"{self.base_url}/api/embed", json=payload, timeout=self.timeout
+                )
+                resp.raise_for_status()
+                embeddings = resp.json()["embeddings"]
+            except Exception as exc:
+                self.breaker.record_exception(exc)
+                raise
+            self.breaker.record_success()
+        return np.asarray(embeddings, dtype=np.float32)
+
+
+def get_embedder(kind: str | None = None) -> Embedder:
+    """
+    名前から Embedder を作る.
+
+    Args:
+        kind: "hashing" / "ollama"。未指定なら VECTOR_EMBEDDER 環境変数（既定は hashing）
+    """
+    kind = (kind or os.getenv("VECTOR_EMBEDDER", "hashing")).lower()
+    if kind == "ollama":
+        return OllamaEmbedder()
+    if kind == "hashing":
+        return HashingEmbedder()
+    raise ValueError(f"Unknown embedder: {kind}")
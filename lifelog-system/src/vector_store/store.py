@@ -0,0 +1,451 @@
+"""
+メモリマップ型のローカルベクトルインデックス
+
+ディレクトリ構成:
+- vectors.f32: 正規化済み float32 ベクトルを行優先で連続配置したファイル（np.memmap）
+- index.db: 行番号と (kind, ref) の対応・本文ハッシュ・削除フラグ・IVF クラスタ（SQLite）
+- centroids.npy: IVF のクラスタ中心（build_ivf() 実行時のみ）
+
+検索は全行との内積（NumPy の行列積）から上位 k 件を argpartition で取る総当たり方式。
+件数が増えたら build_ivf() で k-means による分割を作り、クエリに近い nprobe 個の
+クラスタの行だけを走査する近似検索に切り替えられる。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Sequence
+
+import numpy as np
+
+from .embedders import Embedder
+
+_INITIAL_CAPACITY = 1024
+# IVF のクラスタ中心を求めるときに使う標本数と反復回数
+_IVF_SAMPLE = 20000
+_IVF_ITERATIONS = 10
+_DEFAULT_NPROBE = 8
+# 全件の割り当てを行列積で行うときの 1 回あたりの行数（メモリ使用量の上限）
+_ASSIGN_CHUNK = 8192
+
+
+@dataclass
+class VectorItem:
+    """インデックスへ登録する 1 件分のテキスト。"""
+
+    kind: str
+    ref: str
+    text: str
+    title: Optional[str] = None
+
+
+@dataclass
+class VectorHit:
+    """検索結果 1 件（score はコサイン類似度）。"""
+
+    kind: str
+    ref: str
+    score: float
+    title: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        return {"kind": self.kind, "ref": self.ref, "score": self.score, "title": self.title}
+
+
+def _text_hash(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class VectorStore:
+    """(kind, ref) をキーにテキストの埋め込みを保持し、類似検索する。スレッドセーフ。"""
+
+    def __init__(self, directory: str | Path, embedder: Embedder) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.embedder = embedder
+        self.nprobe = _DEFAULT_NPROBE
+        self._db_path = self.directory / "index.db"
+        self._vectors_path = self.directory / "vectors.f32"
+        self._centroids_path = self.directory / "centroids.npy"
+        self._lock = threading.RLock()
+        self._init_db()
+        self.dim = self._check_embedder()
+        self._load()
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self._db_path)
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def _init_db(self) -> None:
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS items (
+                    rowno INTEGER PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    ref TEXT NOT NULL,
+                    title TEXT,
+                    text_hash TEXT NOT NULL,
+                    deleted INTEGER NOT NULL DEFAULT 0,
+                    cluster INTEGER NOT NULL DEFAULT -1,
+                    updated_at TEXT NOT NULL,
+                    UNIQUE(kind, ref)
+                )
+                """
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+            )
+
+    def _check_embedder(self) -> int:
+        """インデックスを作った Embedder と同じものか確認し、次元を返す。"""
+        name = self.get_meta("embedder")
+        if name is None:
+            dim = self.embedder.dim
+            self.set_meta("embedder", self.embedder.name)
+            self.set_meta("dim", str(dim))
+            return dim
+        if name != self.embedder.name:
+            raise ValueError(
+                f"Vector index at {self.directory} was built with {name}, "
+                f"not {self.embedder.name}; remove the directory to rebuild it"
+            )
+        return int(self.get_meta("dim") or 0)
+
+    def _load(self) -> None:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT rowno, kind, ref, deleted, cluster FROM items ORDER BY rowno"
+            ).fetchall()
+        self._count = rows[-1][0] + 1 if rows else 0
+        self._capacity = 0
+        self._vectors: Optional[np.memmap] = None
+        self._alive = np.zeros(0, dtype=bool)
+        self._kind_codes = np.zeros(0, dtype=np.int16)
+        self._cluster = np.zeros(0, dtype=np.int32)
+        self._refs: list[Optional[tuple[str, str]]] = []
+        self._slots: dict[tuple[str, str], int] = {}
+        self._kinds: dict[str, int] = {}
+
+        existing = 0
+        if self._vectors_path.exists():
+            existing = self._vectors_path.stat().st_size // (4 * self.dim)
+        self._ensure_capacity(max(self._count, existing, _INITIAL_CAPACITY))
+        self._refs = [None] * self._count
+        for rowno, kind, ref, deleted, cluster in rows:
+            self._refs[rowno] = (kind, ref)
+            self._slots[(kind, ref)] = rowno
+            self._alive[rowno] = not deleted
+            self._kind_codes[rowno] = self._kind_code(kind)
+            self._cluster[rowno] = cluster
+
+        self._centroids: Optional[np.ndarray] = None
+        if self._centroids_path.exists():
+            self._centroids = np.load(self._centroids_path)
+            self.nprobe = int(self.get_meta("nprobe") or _DEFAULT_NPROBE)
+
+    def _kind_code(self, kind: str) -> int:
+        return self._kinds.setdefault(kind, len(self._kinds))
+
+    def _ensure_capacity(self, rows: int) -> None:
+        """ベクトルファイルを rows 行以上に広げる（足りないときは倍々で確保する）。"""
+        if rows <= self._capacity:
+            return
+        capacity = max(rows, self._capacity * 2)
+        if self._vectors is not None:
+            self._vectors.flush()
+            self._vectors = None
+        with open(self._vectors_path, "ab") as f:
+            f.truncate(capacity * self.dim * 4)
+        self._vectors = np.memmap(
+            self._vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim)
+        )
+        grow = capacity - self._capacity
+        self._alive = np.concatenate([self._alive, np.zeros(grow, dtype=bool)])
+        self._kind_codes = np.concatenate([self._kind_codes, np.zeros(grow, dtype=np.int16)])
+        self._cluster = np.concatenate([self._cluster, np.full(grow, -1, dtype=np.int32)])
+        self._capacity = capacity
+
+    # ------------------------------------------------------------------
+    # メタ情報
+    # ------------------------------------------------------------------
+
+    def get_meta(self, key: str) -> Optional[str]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO meta (key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (key, value),
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return int(self._alive[: self._count].sum())
+
+    def __contains__(self, key: tuple[str, str]) -> bool:
+        with self._lock:
+            rowno = self._slots.get(key)
+            return rowno is not None and bool(self._alive[rowno])
+
+    def refs(self, kind: str) -> list[str]:
+        """kind の登録済み（削除されていない）ref 一覧。"""
+        with self._lock:
+            return [
+                ref
+                for (item_kind, ref), rowno in self._slots.items()
+                if item_kind == kind and self._alive[rowno]
+            ]
+
+    # ------------------------------------------------------------------
+    # 更新
+    # ------------------------------------------------------------------
+
+    def upsert(self, kind: str, ref: str, text: str, title: Optional[str] = None) -> bool:
+        return self.upsert_many([VectorItem(kind, ref, text, title)]) > 0
+
+    def upsert_many(self, items: Iterable[VectorItem]) -> int:
+        """
+        テキストを埋め込んで登録する。本文が前回と同じ項目は埋め込みを省く.
+
+        既存の (kind, ref) は同じ行を上書きするので、ファイルは項目数以上に伸びない。
+
+        Returns:
+            埋め込みを書き込んだ件数
+        """
+        pending: dict[tuple[str, str], tuple[VectorItem, str]] = {}
+        with self._connect() as conn:
+            for item in items:
+                digest = _text_hash(item.text)
+                row = conn.execute(
+                    "SELECT text_hash, deleted FROM items WHERE kind = ? AND ref = ?",
+                    (item.kind, item.ref),
+                ).fetchone()
+                if row and row[0] == digest and not row[1]:
+                    continue
+                pending[(item.kind, item.ref)] = (item, digest)
+        if not pending:
+            return 0
+
+        # Ollama の埋め込みは遅いのでロックの外で求める
+        vectors = self.embedder.embed([item.text for item, _ in pending.values()])
+        if vectors.shape[1] != self.dim:
+            raise ValueError(
+                f"Embedding dimension {vectors.shape[1]} != index dimension {self.dim}"
+            )
+        clusters = self._assign(vectors) if self._centroids is not None else None
+
+        now = datetime.now().isoformat()
+        with self._lock, self._connect() as conn:
+            for i, (key, (item, digest)) in enumerate(pending.items()):
+                rowno = self._slots.get(key)
+                if rowno is None:
+                    rowno = self._count
+                    self._ensure_capacity(rowno + 1)
+                    self._count += 1
+                    self._refs.append(key)
+                    self._slots[key] = rowno
+                cluster = int(clusters[i]) if clusters is not None else -1
+                self._vectors[rowno] = vectors[i]
+                self._alive[rowno] = True
+                self._kind_codes[rowno] = self._kind_code(item.kind)
+                self._cluster[rowno] = cluster
+                conn.execute(
+                    """
+                    INSERT INTO items (rowno, kind, ref, title, text_hash, deleted, cluster,
+                                       updated_at)
+                    VALUES (?, ?, ?, ?, ?, 0, ?, ?)
+                    ON CONFLICT(rowno) DO UPDATE SET
+                        title = excluded.title,
+                        text_hash = excluded.text_hash,
+                        deleted = 0,
+                        cluster = excluded.cluster,
+                        updated_at = excluded.updated_at
+                    """,
+                    (rowno, item.kind, item.ref, item.title, digest, cluster, now),
+                )
+            self._vectors.flush()
+        return len(pending)
+
+    def delete(self, kind: str, ref: str) -> bool:
+        """項目を検索対象から外す（行は同じ (kind, ref) の再登録時に再利用する）。"""
+        with self._lock, self._connect() as conn:
+            rowno = self._slots.get((kind, ref))
+            if rowno is None or not self._alive[rowno]:
+                return False
+            self._alive[rowno] = False
+            conn.execute("UPDATE items SET deleted = 1 WHERE rowno = ?", (rowno,))
+            return True
+
+    # ------------------------------------------------------------------
+    # 検索
+    # ------------------------------------------------------------------
+
+    def search(
+        self,
+        query: str,
+        k: int = 10,
+        kinds: Optional[Sequence[str]] = None,
+        nprobe: Optional[int] = None,
+        exact: bool = False,
+    ) -> list[VectorHit]:
+        """
+        query に意味的に近い項目を類似度の高い順に返す.
+
+        Args:
+            kinds: 対象の kind（未指定ならすべて）
+            nprobe: IVF 使用時に走査するクラスタ数（既定は self.nprobe）
+            exact: True なら IVF があっても総当たりで検索する
+        """
+        if not query.strip() or k <= 0:
+            return []
+        return self.search_vector(self.embedder.embed([query])[0], k, kinds, nprobe, exact)
+
+    def search_vector(
+        self,
+        vector: np.ndarray,
+        k: int = 10,
+        kinds: Optional[Sequence[str]] = None,
+        nprobe: Optional[int] = None,
+        exact: bool = False,
+    ) -> list[VectorHit]:
+        vector = np.asarray(vector, dtype=np.float32)
+        with self._lock:
+            n = self._count
+            if n == 0:
+                return []
+            mask = self._alive[:n]
+            if kinds is not None:
+                codes = [self._kinds[kind] for kind in kinds if kind in self._kinds]
+                mask = mask & np.isin(self._kind_codes[:n], codes)
+
+            if self._centroids is not None and not exact:
+                probe = min(nprobe or self.nprobe, len(self._centroids))
+                near = np.argpartition(self._centroids @ vector, -probe)[-probe:]
+                candidates = np.flatnonzero(mask & np.isin(self._cluster[:n], near))
+                scores = self._vectors[candidates] @ vector
+            elif mask.all():
+                candidates = np.arange(n)
+                scores = np.asarray(self._vectors[:n]) @ vector
+            else:
+                candidates = np.flatnonzero(mask)
+                scores = (np.asarray(self._vectors[:n]) @ vector)[candidates]
+
+            if candidates.size == 0:
+                return []
+            k = min(k, candidates.size)
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top], kind="stable")]
+            ranked = [(int(candidates[i]), float(scores[i])) for i in top]
+
+        with self._connect() as conn:
+            placeholders = ",".join("?" * len(ranked))
+            titles = dict(
+                conn.execute(
+                    f"SELECT rowno, title FROM items WHERE rowno IN ({placeholders})",
+                    [rowno for rowno, _ in ranked],
+                ).fetchall()
+            )
+        hits = []
+        for rowno, score in ranked:
+            kind, ref = self._refs[rowno]
+            hits.append(VectorHit(kind=kind, ref=ref, score=score, title=titles.get(rowno)))
+        return hits
+
+    # ------------------------------------------------------------------
+    # IVF
+    # ------------------------------------------------------------------
+
+    def _assign(self, vectors: np.ndarray) -> np.ndarray:
+        """各ベクトルを最も近いクラスタ中心へ割り当てる。"""
+        return np.argmax(vectors @ self._centroids.T, axis=1).astype(np.int32)
+
+    def build_ivf(
+        self, nlist: Optional[int] = None, nprobe: Optional[int] = None, seed: int = 0
+    ) -> int:
+        """
+        登録済みベクトルを球面 k-means で nlist 個のクラスタに分け、IVF 検索を有効にする.
+
+        以降に追加された項目は既存のクラスタ中心へ割り当てる。分布が大きく変わったら
+        もう一度呼んで作り直す。
+
+        Returns:
+            作成したクラスタ数（項目が少なすぎる場合は 0 で、総当たり検索のまま）
+        """
+        with self._lock:
+            rows = np.flatnonzero(self._alive[: self._count])
+            nlist = nlist or max(int(np.sqrt(rows.size)), 1)
+            if rows.size < nlist * 4:
+                return 0
+            rng = np.random.default_rng(seed)
+            sample = np.asarray(
+                self._vectors[np.sort(rng.choice(rows, min(rows.size, _IVF_SAMPLE), False))]
+            )
+
+        centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+        for _ in range(_IVF_ITERATIONS):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            counts = np.bincount(labels, minlength=nlist)
+            empty = counts == 0
+            # 空になったクラスタは標本から選び直す
+            sums[empty] = sample[rng.choice(len(sample), int(empty.sum()), replace=False)]
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            centroids = (sums / norms).astype(np.float32)
+
+        with self._lock, self._connect() as conn:
+            self._centroids = centroids
+            rows = np.flatnonzero(self._alive[: self._count])
+            for start in range(0, rows.size, _ASSIGN_CHUNK):
+                chunk = rows[start : start + _ASSIGN_CHUNK]
+                self._cluster[chunk] = self._assign(np.asarray(self._vectors[chunk]))
+            conn.executemany(
+                "UPDATE items SET cluster = ? WHERE rowno = ?",
+                [(int(self._cluster[rowno]), int(rowno)) for rowno in rows],
+            )
+            np.save(self._centroids_path, centroids)
+            self.nprobe = nprobe or max(_DEFAULT_NPROBE, nlist // 16)
+            conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('nprobe', ?)",
+                (str(self.nprobe),),
+            )
+        return nlist
+
+    def drop_ivf(self) -> None:
+        """IVF を破棄して総当たり検索に戻す。"""
+        with self._lock, self._connect() as conn:
+            self._centroids = None
+            self._cluster[:] = -1
+            conn.execute("UPDATE items SET cluster = -1")
+            self._centroids_path.unlink(missing_ok=True)
+
+    @property
+    def has_ivf(self) -> bool:
+        return self._centroids is not None
+
+    def close(self) -> None:
+        with self._lock:
+            if self._vectors is not None:
+                self._vectors.flush()
+                self._vectors = None
@@ -0,0 +1,117 @@
+"""
+collected_info をベクトルインデックスへ取り込む同期処理.
+
+前回取り込んだ最大 id を VectorStore のメタ情報に記録し、それより新しい記事だけを
+埋め込む（収集のたびに呼べば差分だけが処理される）。近似重複として canonical に
+リンクされた記事は検索結果が重なるだけなので取り込まない。
+
+Usage (from lifelog-system/):
+    uv run python -m src.vector_store.sync
+    uv run python -m src.vector_store.sync --build-ivf
+    uv run python -m src.vector_store.sync --query "ローカルLLMの高速化"
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import logging
+import sqlite3
+import time
+from pathlib import Path
+from typing import Optional
+
+from .embedders import get_embedder
+from .store import VectorItem, VectorStore
+
+logger = logging.getLogger(__name__)
+
+ARTICLE_KIND = "article"
+ENTRY_KIND = "entry"
+
+DEFAULT_DB = Path("data/ai_secretary.db")
+DEFAULT_INDEX_DIR = Path("data/vector_index")
+
+# 埋め込む本文の最大文字数（長文は冒頭だけで主題が分かる）
+MAX_TEXT_CHARS = 2000
+_LAST_ID_KEY = "collected_info_last_id"
+
+
+def compose_text(title: Optional[str], *parts: Optional[str]) -> str:
+    """タイトルと本文断片を 1 つの埋め込み対象テキストにまとめる。"""
+    body = "\n".join(part.strip() for part in parts if part and part.strip())
+    return f"{title or ''}\n{body}".strip()[:MAX_TEXT_CHARS]
+
+
+def sync_collected_info(store: VectorStore, db_path: Path | str, batch_size: int = 256) -> int:
+    """
+    前回以降に追加された collected_info を埋め込み、削除済みの記事をインデックスから外す.
+
+    Returns:
+        新たに埋め込んだ記事数
+    """
+    last_id = int(store.get_meta(_LAST_ID_KEY) or 0)
+    indexed = 0
+    with contextlib.closing(sqlite3.connect(db_path)) as conn:
+        while True:
+            rows = conn.execute(
+                """
+                SELECT id, title, snippet, content, duplicate_of
+                FROM collected_info
+                WHERE id > ?
+                ORDER BY id
+                LIMIT ?
+                """,
+                (last_id, batch_size),
+            ).fetchall()
+            if not rows:
+                break
+            indexed += store.upsert_many(
+                VectorItem(ARTICLE_KIND, str(row[0]), compose_text(row[1], row[2], row[3]), row[1])
+                for row in rows
+                if row[4] is None
+            )
+            last_id = rows[-1][0]
+            store.set_meta(_LAST_ID_KEY, str(last_id))
+
+        existing = {str(row[0]) for row in conn.execute("SELECT id FROM collected_info")}
+    for ref in set(store.refs(ARTICLE_KIND)) - existing:
+        store.delete(ARTICLE_KIND, ref)
+    return indexed
+
+
+def open_store(index_dir: Path | str, embedder: Optional[str] = None) -> VectorStore:
+    return VectorStore(index_dir, get_embedder(embedder))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Sync collected_info into the vector index.")
+    parser.add_argument("--db-path", type=str, default=str(DEFAULT_DB))
+    parser.add_argument("--index-dir", type=str, default=str(DEFAULT_INDEX_DIR))
+    parser.add_argument("--embedder", choices=["hashing", "ollama"], default=None)
+    parser.add_argument("--build-ivf", action="store_true", help="Rebuild the IVF partitions")
+    parser.add_argument("--query", type=str, default=None, help="Search after syncing")
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    store = open_store(args.index_dir, args.embedder)
+    started = time.perf_counter()
+    indexed = sync_collected_info(store, args.db_path)
+    logger.info(
+        "Indexed %d articles in %.2fs (%d items total)",
+        indexed,
+        time.perf_counter() - started,
+        len(store),
+    )
+    if args.build_ivf:
+        nlist = store.build_ivf()
+        logger.info("Built IVF with %d lists (nprobe=%d)", nlist, store.nprobe)
+    if args.query:
+        for hit in store.search(args.query, k=args.limit):
+            print(f"{hit.score:.3f}  {hit.kind}:{hit.ref}  {hit.title or ''}")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import time
+from unittest.mock import patch
+
+import pytest
+import requests
+
+from src.ai_secretary.circuit_breaker import (
+    STATE_CLOSED,
+    STATE_HALF_OPEN,
+    STATE_OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+    reset_breakers,
+)
+from src.ai_secretary.ollama_client import OllamaClient
+
+
+@pytest.fixture(autouse=True)
+def _closed_breakers():
+    reset_breakers()
+    yield
+    reset_breakers()
+
+
+def test_opens_after_threshold_and_fails_fast():
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=60)
+    breaker.record_failure(requests.ConnectionError("down"))
+    assert breaker.state == STATE_CLOSED
+    breaker.record_failure(requests.ConnectionError("down"))
+
+    assert breaker.state == STATE_OPEN
+    assert breaker.is_open() is True
+    with pytest.raises(CircuitOpenError, match="down"):
+        breaker.check()
+
+
+def test_half_open_allows_single_trial_and_closes_on_success():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0.01)
+    breaker.record_failure(requests.Timeout("stalled"))
+    time.sleep(0.02)
+
+    assert breaker.allow_request() is True
+    assert breaker.state == STATE_HALF_OPEN
+    assert breaker.allow_request() is False
+
+    breaker.record_success()
+    assert breaker.state == STATE_CLOSED
+    assert breaker.allow_request() is True
+
+
+def test_failed_trial_reopens_immediately():
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_timeout=0.01)
+    for _ in range(3):
+        breaker.record_failure(requests.ConnectionError("down"))
+    time.sleep(0.02)
+    assert breaker.allow_request() is True
+
+    breaker.record_failure(requests.ConnectionError("still down"))
+    assert breaker.state == STATE_OPEN
+
+
+def test_background_probe_closes_breaker():
+    healthy = {"value": False}
+    breaker = CircuitBreaker(
+        "test",
+        failure_threshold=1,
+        reset_timeout=60,
+        probe=lambda: healthy["value"],
+        probe_interval=0.01,
+    )
+    breaker.record_failure(requests.ConnectionError("down"))
+    assert breaker.is_open() is True
+
+    healthy["value"] = True
+    deadline = time.monotonic() + 2
+    while breaker.state != STATE_CLOSED and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert breaker.state == STATE_CLOSED
+
+
+def test_client_error_responses_do_not_count_as_outage():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=60)
+    response = requests.Response()
+    response.status_code = 404
+    breaker.record_exception(requests.HTTPError("model not found", response=response))
+    assert breaker.state == STATE_CLOSED
+
+
+def test_client_stops_calling_ollama_once_open():
+    client = OllamaClient(base_url="http://breaker-test:11434", model="test-model", timeout=1)
+    client.breaker.failure_threshold = 2
+
+    with patch("requests.Session.post", side_effect=requests.ConnectionError("refused")) as post:
+        for _ in range(2):
+            with pytest.raises(requests.ConnectionError):
+                client.generate("prompt")
+        with pytest.raises(CircuitOpenError):
+            client.generate("prompt")
+
+    assert post.call_count == 2
+    assert client.is_available() is False
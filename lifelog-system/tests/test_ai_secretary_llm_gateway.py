@@ -0,0 +1,127 @@
+import json
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+from src.ai_secretary.llm_gateway import (
+    LLMGateway,
+    LLMPriority,
+    llm_request_context,
+    resolve_priority,
+)
+from src.ai_secretary.ollama_client import OllamaClient
+
+
+def _wait_until(predicate, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met in time")
+        time.sleep(0.005)
+
+
+def test_resolve_priority_uses_context_then_caller_defaults():
+    assert resolve_priority("chat_api") is LLMPriority.INTERACTIVE
+    assert resolve_priority("analysis_pipeline_worker") is LLMPriority.BACKGROUND
+    with llm_request_context(priority=LLMPriority.ON_DEMAND):
+        assert resolve_priority("analysis_pipeline_worker") is LLMPriority.ON_DEMAND
+        assert resolve_priority("x", LLMPriority.INTERACTIVE) is LLMPriority.INTERACTIVE
+    assert resolve_priority("unknown") is LLMPriority.BACKGROUND
+
+
+def test_waiters_are_served_by_priority_then_fifo():
+    gateway = LLMGateway(max_concurrency=1)
+    holder = gateway.acquire("holder", LLMPriority.BACKGROUND)
+    order: list[str] = []
+
+    def _worker(caller: str, priority: LLMPriority) -> None:
+        with gateway.slot(caller, priority):
+            order.append(caller)
+
+    threads = []
+    for caller, priority in [
+        ("bg-1", LLMPriority.BACKGROUND),
+        ("report", LLMPriority.ON_DEMAND),
+        ("bg-2", LLMPriority.BACKGROUND),
+        ("chat", LLMPriority.INTERACTIVE),
+    ]:
+        thread = threading.Thread(target=_worker, args=(caller, priority))
+        thread.start()
+        threads.append(thread)
+        _wait_until(lambda n=len(threads): len(gateway.snapshot()["waiting"]) == n)
+
+    gateway.release(holder)
+    for thread in threads:
+        thread.join(timeout=2)
+
+    assert order == ["chat", "report", "bg-1", "bg-2"]
+    stats = gateway.snapshot()["callers"]
+    assert stats["chat"]["calls"] == 1
+    assert stats["holder"]["calls"] == 1
+    assert stats["bg-2"]["p95_wait_ms"] >= stats["chat"]["p95_wait_ms"]
+
+
+def test_should_yield_only_when_higher_priority_is_blocked():
+    gateway = LLMGateway(max_concurrency=2)
+    background = gateway.acquire("bg", LLMPriority.BACKGROUND)
+    assert gateway.should_yield(background) is False
+
+    other = gateway.acquire("bg-2", LLMPriority.BACKGROUND)
+    chat_done = threading.Event()
+
+    def _chat() -> None:
+        with gateway.slot("chat_api"):
+            chat_done.set()
+
+    thread = threading.Thread(target=_chat)
+    thread.start()
+    _wait_until(lambda: len(gateway.snapshot()["waiting"]) == 1)
+
+    assert gateway.should_yield(background) is True
+    gateway.release(other)
+    thread.join(timeout=2)
+    assert chat_done.is_set()
+    assert gateway.should_yield(background) is False
+    gateway.release(background)
+
+
+def test_background_generate_yields_to_waiting_chat(monkeypatch):
+    gateway = LLMGateway(max_concurrency=1)
+    monkeypatch.setattr("src.ai_secretary.ollama_client.llm_gateway", gateway)
+    chat_order: list[str] = []
+
+    def _chat() -> None:
+        with gateway.slot("chat_api"):
+            chat_order.append("chat")
+
+    chat_thread = threading.Thread(target=_chat)
+
+    def _interrupted_lines(decode_unicode=True):
+        yield json.dumps({"response": "partial", "done": False})
+        chat_thread.start()
+        _wait_until(lambda: len(gateway.snapshot()["waiting"]) == 1)
+        yield json.dumps({"response": " never", "done": False})
+        yield json.dumps({"done": True})
+
+    first = MagicMock()
+    first.raise_for_status.return_value = None
+    first.iter_lines.side_effect = _interrupted_lines
+    second = MagicMock()
+    second.raise_for_status.return_value = None
+    second.iter_lines.return_value = [
+        json.dumps({"response": "full answer", "done": False}),
+        json.dumps({"done": True}),
+    ]
+
+    client = OllamaClient(base_url="http://localhost:11434", model="test-model", timeout=5)
+    with patch("requests.Session.post", side_effect=[first, second]) as post:
+        result = client.generate("prompt", caller="analysis_pipeline_worker")
+
+    chat_thread.join(timeout=2)
+    assert result == "full answer"
+    assert post.call_count == 2
+    assert first.close.called
+    assert chat_order == ["chat"]
+    stats = gateway.snapshot()["callers"]["analysis_pipeline_worker"]
+    assert stats["calls"] == 2
+    assert stats["preemptions"] == 1
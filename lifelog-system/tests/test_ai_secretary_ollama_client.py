@@ -17,7 +17,7 @@ def test_generate_logs_model_and_env_caller(monkeypatch):
 
     client = OllamaClient(base_url="http://localhost:11434", model="test-model", timeout=5)
     with (
-        patch("src.ai_secretary.ollama_client.requests.post", return_value=response),
+        patch("requests.Session.post", return_value=response),
         patch("src.ai_secretary.ollama_client.server_logger.info") as log_info,
     ):
         result = client.generate("test prompt")
@@ -29,3 +29,112 @@ def test_generate_logs_model_and_env_caller(monkeypatch):
     assert '"caller": "analysis_pipeline_worker"' in payload
     assert '"purpose": "info_pipeline"' in payload
     assert '"model": "test-model"' in payload
+
+
+def _final_chunk(**overrides):
+    chunk = {
+        "done": True,
+        "model": "test-model",
+        "total_duration": 2_500_000_000,
+        "load_duration": 1_800_000_000,
+        "prompt_eval_count": 120,
+        "prompt_eval_duration": 300_000_000,
+        "eval_count": 40,
+        "eval_duration": 400_000_000,
+    }
+    chunk.update(overrides)
+    return chunk
+
+
+def test_generate_sends_keep_alive_and_records_timings(monkeypatch):
+    from src.ai_secretary.ollama_transport import timing_recorder
+
+    monkeypatch.setenv("OLLAMA_KEEP_ALIVE", "45m")
+    timing_recorder.reset()
+
+    response = MagicMock()
+    response.raise_for_status.return_value = None
+    response.iter_lines.return_value = [
+        json.dumps({"response": "hi", "done": False}),
+        json.dumps(_final_chunk()),
+    ]
+
+    client = OllamaClient(base_url="http://localhost:11434", model="test-model", timeout=5)
+    with patch("requests.Session.post", return_value=response) as post:
+        client.generate("prompt", caller="unit_test")
+
+    assert post.call_args.kwargs["json"]["keep_alive"] == "45m"
+    assert client.last_timings is not None
+    assert client.last_timings.load_ms == 1800.0
+    assert client.last_timings.eval_count == 40
+    assert client.last_timings.cold_start is True
+    assert client.last_timings.eval_tokens_per_second == 100.0
+
+    snapshot = timing_recorder.snapshot()
+    assert snapshot["callers"]["unit_test"]["calls"] == 1
+    assert snapshot["callers"]["unit_test"]["cold_starts"] == 1
+
+
+def test_clients_share_pooled_session_per_base_url():
+    first = OllamaClient(base_url="http://localhost:11434/", model="a", timeout=5)
+    second = OllamaClient(base_url="http://localhost:11434", model="b", timeout=5)
+    other = OllamaClient(base_url="http://127.0.0.1:11434", model="a", timeout=5)
+
+    assert first.session is second.session
+    assert first.session is not other.session
+
+
+def test_warmup_posts_empty_prompt_and_returns_timings():
+    response = MagicMock()
+    response.raise_for_status.return_value = None
+    response.json.return_value = _final_chunk(load_duration=50_000_000)
+
+    client = OllamaClient(
+        base_url="http://localhost:11434", model="test-model", timeout=5, keep_alive="1h"
+    )
+    with patch("requests.Session.post", return_value=response) as post:
+        timings = client.warmup()
+
+    payload = post.call_args.kwargs["json"]
+    assert payload == {"model": "test-model", "prompt": "", "stream": False, "keep_alive": "1h"}
+    assert timings is not None
+    assert timings.cold_start is False
+
+
+def test_warmup_failure_is_swallowed():
+    import requests
+
+    client = OllamaClient(base_url="http://localhost:11434", model="test-model", timeout=5)
+    with patch("requests.Session.post", side_effect=requests.ConnectionError("down")):
+        assert client.warmup() is None
+
+
+def test_stage_routes_model_and_records_stage_usage(monkeypatch):
+    from src.ai_secretary.model_routing import llm_stage, resolve_model, stage_usage
+
+    monkeypatch.setenv("OLLAMA_MODEL", "large-model")
+    monkeypatch.setenv("OLLAMA_MODEL_TRIAGE", "small-model")
+    monkeypatch.delenv("OLLAMA_MODEL_REPORT", raising=False)
+    stage_usage.reset()
+
+    assert resolve_model("report") == "large-model"
+    assert resolve_model("triage", "explicit") == "explicit"
+    with llm_stage("triage"):
+        triage_client = OllamaClient(base_url="http://localhost:11434")
+    default_client = OllamaClient(base_url="http://localhost:11434")
+    assert triage_client.model == "small-model"
+    assert default_client.model == "large-model"
+
+    response = MagicMock()
+    response.raise_for_status.return_value = None
+    response.iter_lines.return_value = [
+        json.dumps({"response": "ok", "done": False}),
+        json.dumps({"done": True}),
+    ]
+    with patch("requests.Session.post", return_value=response) as post:
+        triage_client.generate("prompt")
+
+    assert post.call_args.kwargs["json"]["model"] == "small-model"
+    stages = stage_usage.snapshot()
+    assert stages["triage"]["calls"] == 1
+    assert stages["triage"]["models"] == {"small-model": 1}
@@ -0,0 +1,95 @@
+"""Tests for the read-only analytics connection over lifelog.db and ai_secretary.db."""
+
+import sqlite3
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+from src.browser_history.models import BrowserHistoryEntry
+from src.browser_history.repository import BrowserHistoryRepository
+from src.common.analytics import analytics_connection, hourly_overview
+from src.lifelog.database.db_manager import DatabaseManager
+
+
+def _interval(start: datetime, minutes: int, is_idle: int = 0) -> dict:
+    return {
+        "start_ts": start,
+        "end_ts": start + timedelta(minutes=minutes),
+        "process_name": "editor.exe",
+        "process_path_hash": "hash_editor",
+        "window_hash": "win",
+        "domain": None,
+        "is_idle": is_idle,
+    }
+
+
+@pytest.fixture
+def databases(tmp_path: Path) -> tuple[Path, Path]:
+    lifelog_db = tmp_path / "lifelog.db"
+    info_db = tmp_path / "ai_secretary.db"
+    nine = datetime(2024, 1, 1, 9, 0)
+
+    db = DatabaseManager(str(lifelog_db))
+    db.bulk_insert_intervals(
+        [
+            _interval(nine, 10),
+            _interval(nine + timedelta(minutes=10), 5, is_idle=1),
+            _interval(nine + timedelta(hours=2), 20),
+        ]
+    )
+    db.close()
+
+    repo = BrowserHistoryRepository(info_db)
+    # ブラウザ履歴は UTC で保存される
+    for minute, url in ((5, "https://example.com/a"), (6, "https://example.com/a")):
+        repo.add_entry(
+            BrowserHistoryEntry(
+                url=url,
+                title="A",
+                visit_time=(nine + timedelta(minutes=minute)).astimezone(),
+            )
+        )
+    repo.add_entry(
+        BrowserHistoryEntry(
+            url="https://other.example.org/",
+            title="B",
+            visit_time=(nine + timedelta(hours=1)).astimezone(),
+        )
+    )
+    return lifelog_db, info_db
+
+
+def test_hourly_overview_joins_activity_and_browsing(databases: tuple[Path, Path]):
+    with analytics_connection(*databases) as conn:
+        rows = hourly_overview(conn, datetime(2024, 1, 1), datetime(2024, 1, 2))
+        assert [
+            (row["hour"], row["intervals"], row["visits"], row["urls"], row["domains"])
+            for row in rows
+        ] == [
+            ("2024-01-01 09:00", 2, 2, 1, 1),
+            ("2024-01-01 10:00", 0, 1, 1, 1),
+            ("2024-01-01 11:00", 1, 0, 0, 0),
+        ]
+        # duration_seconds は julianday の差から求めるので 1 秒切り捨てることがある
+        assert [row["active_seconds"] for row in rows] == pytest.approx([600, 0, 1200], abs=1)
+        assert [row["idle_seconds"] for row in rows] == pytest.approx([300, 0, 0], abs=1)
+        # 全期間のビューも同じ集計を返す
+        assert [
+            dict(row) for row in conn.execute("SELECT * FROM hourly_overview ORDER BY hour")
+        ] == rows
+        assert hourly_overview(conn, datetime(2024, 1, 1, 10), datetime(2024, 1, 1, 11)) == [
+            rows[1]
+        ]
+
+
+def test_analytics_connection_is_read_only(databases: tuple[Path, Path], tmp_path: Path):
+    with analytics_connection(*databases) as conn:
+        # スキーマ名なしでもどちらの DB のテーブルも参照できる
+        assert conn.execute("SELECT COUNT(*) FROM activity_intervals").fetchone()[0] == 3
+        assert conn.execute("SELECT COUNT(*) FROM browser_history").fetchone()[0] == 3
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("DELETE FROM info.browser_visits")
+
+    with pytest.raises(sqlite3.OperationalError):
+        analytics_connection(tmp_path / "missing.db", databases[1]).__enter__()
@@ -0,0 +1,245 @@
+"""Tests for incremental, multi-profile browser history import."""
+
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+from src.browser_history.importer import BraveHistoryImporter, BrowserHistoryImporter
+from src.browser_history.repository import BrowserHistoryRepository
+from src.browser_history.sources import UNIX_EPOCH, discover_profiles, to_microseconds
+
+
+def _chromium(value: str) -> int:
+    return BraveHistoryImporter.datetime_to_chromium(datetime.fromisoformat(value))
+
+
+def _add_visit(history: Path, visit_id: int, url: str, title: str, visit_time: str) -> None:
+    with sqlite3.connect(history) as conn:
+        conn.execute(
+            "INSERT OR IGNORE INTO urls (id, url, title, visit_count) VALUES (?, ?, ?, 1)",
+            (visit_id, url, title),
+        )
+        conn.execute(
+            "INSERT INTO visits (id, url, visit_time, transition) VALUES (?, ?, ?, 0)",
+            (visit_id, visit_id, _chromium(visit_time)),
+        )
+
+
+def _create_chromium_history(path: Path) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with sqlite3.connect(path) as conn:
+        conn.executescript(
+            """
+            CREATE TABLE urls (id INTEGER PRIMARY KEY, url TEXT, title TEXT, visit_count INTEGER);
+            CREATE TABLE visits (
+                id INTEGER PRIMARY KEY, url INTEGER, visit_time INTEGER, transition INTEGER
+            );
+            CREATE INDEX visits_time_index ON visits (visit_time);
+            """
+        )
+    return path
+
+
+def _create_firefox_places(path: Path) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with sqlite3.connect(path) as conn:
+        conn.executescript(
+            """
+            CREATE TABLE moz_places (
+                id INTEGER PRIMARY KEY, url TEXT, title TEXT, visit_count INTEGER
+            );
+            CREATE TABLE moz_historyvisits (
+                id INTEGER PRIMARY KEY, place_id INTEGER, visit_date INTEGER, visit_type INTEGER
+            );
+            """
+        )
+        conn.execute("INSERT INTO moz_places VALUES (1, 'https://www.mozilla.org/', 'Mozilla', 1)")
+        conn.execute(
+            "INSERT INTO moz_historyvisits VALUES (1, 1, ?, 1)",
+            (to_microseconds(datetime.fromisoformat("2026-03-01T12:00:00+00:00"), UNIX_EPOCH),),
+        )
+    return path
+
+
+@pytest.fixture
+def history(tmp_path: Path) -> Path:
+    path = _create_chromium_history(tmp_path / "History")
+    _add_visit(path, 1, "https://example.com/a", "記事A", "2026-03-01T09:00:00+00:00")
+    _add_visit(path, 2, "https://example.com/b", "Just a moment...", "2026-03-01T10:00:00+00:00")
+    _add_visit(path, 3, "https://example.com/c", "記事C", "2026-03-02T09:00:00+00:00")
+    return path
+
+
+@pytest.fixture
+def importer(tmp_path: Path) -> BraveHistoryImporter:
+    return BraveHistoryImporter(BrowserHistoryRepository(tmp_path / "ai_secretary.db"))
+
+
+def test_chromium_timestamp_round_trip():
+    value = datetime(2026, 3, 1, 9, 0, 0, 123456, tzinfo=timezone.utc)
+    assert (
+        BraveHistoryImporter.chromium_to_datetime(BraveHistoryImporter.datetime_to_chromium(value))
+        == value
+    )
+    # naive は UTC とみなす
+    assert BraveHistoryImporter.datetime_to_chromium(
+        value.replace(tzinfo=None)
+    ) == BraveHistoryImporter.datetime_to_chromium(value)
+
+
+def test_import_reads_only_visits_after_watermark(importer: BraveHistoryImporter, history: Path):
+    # ノイズタイトルは取り込まない
+    assert importer.import_history(history) == 2
+    latest = importer.repository.get_latest_visit_time()
+    assert latest == datetime.fromisoformat("2026-03-02T09:00:00+00:00")
+
+    # 新しい訪問が無ければ何も書き込まない（基準時刻の訪問は重複として無視）
+    assert importer.import_history(history, since=latest) == 0
+
+    _add_visit(history, 4, "https://example.com/d", "記事D", "2026-03-03T09:00:00+00:00")
+    batches = list(importer._iter_brave_history(history, since=latest))
+    assert [[entry.brave_visit_id for entry in batch] for batch in batches] == [[3, 4]]
+    assert importer.import_history(history, since=latest) == 1
+
+    entries = importer.repository.list_history(limit=10)
+    assert [entry.brave_visit_id for entry in entries] == [4, 3, 1]
+    assert entries[0].domain == "example.com"
+
+
+def test_import_batches_and_limit(importer: BraveHistoryImporter, history: Path):
+    batches = list(importer._iter_brave_history(history, batch_size=1))
+    assert [[entry.brave_visit_id for entry in batch] for batch in batches] == [[1], [3]]
+
+    # limit は古い方から数え、残りは次回の基準時刻以降として読む
+    assert importer.import_history(history, limit=1) == 1
+    watermark = importer.repository.get_import_watermark(str(history))
+    assert watermark == datetime.fromisoformat("2026-03-01T09:00:00+00:00")
+    assert importer.import_history(history, since=watermark) == 1
+    assert importer.repository.add_entries(batches[0] + batches[1]) == 0
+    assert importer.repository.add_entries([]) == 0
+
+
+def test_skipped_batch_keeps_watermark_before_the_gap(
+    importer: BraveHistoryImporter, history: Path, monkeypatch: pytest.MonkeyPatch
+):
+    repo = importer.repository
+    original_add = BrowserHistoryRepository.add_entries
+    calls = {"count": 0}
+
+    def _locked_once(self, entries):
+        calls["count"] += 1
+        if calls["count"] == 1:
+            raise sqlite3.OperationalError("database is locked")
+        return original_add(self, entries)
+
+    monkeypatch.setattr(BrowserHistoryRepository, "add_entries", _locked_once)
+    batches = importer._iter_brave_history(history, batch_size=1)
+    monkeypatch.setattr(importer, "_iter_brave_history", lambda *args: batches)
+
+    # 1 件目のバッチがロックで書けず、2 件目だけ書けた
+    assert importer.import_history(history) == 1
+    assert repo.get_import_watermark(str(history)) is None
+    assert [entry.brave_visit_id for entry in repo.list_history(limit=10)] == [3]
+
+
+def test_import_all_profiles_with_per_profile_watermarks(tmp_path: Path):
+    home = tmp_path / "home"
+    brave_root = home / ".config/BraveSoftware/Brave-Browser"
+    default = _create_chromium_history(brave_root / "Default/History")
+    work = _create_chromium_history(brave_root / "Profile 1/History")
+    _create_chromium_history(brave_root / "System Profile/History")
+    chrome = _create_chromium_history(home / ".config/google-chrome/Default/History")
+    _create_firefox_places(home / ".mozilla/firefox/abc.default-release/places.sqlite")
+    # プロファイルごとに visits.id は重なる
+    _add_visit(default, 1, "https://example.com/a", "記事A", "2026-03-01T09:00:00+00:00")
+    _add_visit(work, 1, "https://example.com/w", "社内", "2026-03-01T09:30:00+00:00")
+    _add_visit(chrome, 1, "https://example.com/c", "記事C", "2026-03-01T10:00:00+00:00")
+
+    profiles = discover_profiles(home_dirs=[home])
+    assert sorted(profile.key for profile in profiles) == [
+        "brave/Default",
+        "brave/Profile 1",
+        "chrome/Default",
+        "firefox/abc.default-release",
+    ]
+
+    repo = BrowserHistoryRepository(tmp_path / "ai_secretary.db")
+    importer = BrowserHistoryImporter(repo, max_workers=2)
+    counts = importer.import_all(profiles=profiles)
+    assert counts == {
+        "brave/Default": 1,
+        "brave/Profile 1": 1,
+        "chrome/Default": 1,
+        "firefox/abc.default-release": 1,
+    }
+    assert importer.errors == {}
+    assert repo.get_import_watermark(str(work)) == datetime.fromisoformat(
+        "2026-03-01T09:30:00+00:00"
+    )
+    firefox = repo.list_history(domain="mozilla.org")[0]
+    assert (firefox.source_browser, firefox.visit_time.hour) == ("firefox", 12)
+
+    # 変更の無いプロファイルは基準時刻以降の訪問しか読まない
+    _add_visit(work, 2, "https://example.com/w2", "社内2", "2026-03-02T09:00:00+00:00")
+    counts = importer.import_all(profiles=profiles)
+    assert counts["brave/Profile 1"] == 1
+    assert sum(counts.values()) == 1
+    assert {
+        (entry.source_profile, entry.brave_visit_id)
+        for entry in repo.list_history(domain="example.com", limit=10)
+        if entry.source_browser == "brave"
+    } == {("Default", 1), ("Profile 1", 1), ("Profile 1", 2)}
+
+
+def test_import_all_keeps_watermark_of_profile_with_skipped_batch(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    home = tmp_path / "home"
+    brave_root = home / ".config/BraveSoftware/Brave-Browser"
+    default = _create_chromium_history(brave_root / "Default/History")
+    work = _create_chromium_history(brave_root / "Profile 1/History")
+    _add_visit(default, 1, "https://example.com/a", "記事A", "2026-03-01T09:00:00+00:00")
+    _add_visit(work, 1, "https://example.com/w", "社内", "2026-03-01T09:30:00+00:00")
+    _add_visit(work, 2, "https://example.com/w2", "社内2", "2026-03-02T09:30:00+00:00")
+
+    repo = BrowserHistoryRepository(tmp_path / "ai_secretary.db")
+    original_add = BrowserHistoryRepository.add_entries
+
+    def _lock_work_profile(self, entries):
+        if entries[0].source_profile == "Profile 1":
+            raise sqlite3.OperationalError("database is locked")
+        return original_add(self, entries)
+
+    monkeypatch.setattr(BrowserHistoryRepository, "add_entries", _lock_work_profile)
+    importer = BrowserHistoryImporter(repo, max_workers=2)
+    profiles = discover_profiles(home_dirs=[home])
+
+    assert importer.import_all(profiles=profiles) == {"brave/Default": 1, "brave/Profile 1": 0}
+    assert list(importer.errors) == ["brave/Profile 1"]
+    assert repo.get_import_watermark(str(default)) == datetime.fromisoformat(
+        "2026-03-01T09:00:00+00:00"
+    )
+    # 書けなかったプロファイルの基準時刻は進めない
+    assert repo.get_import_watermark(str(work)) is None
+
+    monkeypatch.setattr(BrowserHistoryRepository, "add_entries", original_add)
+    assert importer.import_all(profiles=profiles) == {"brave/Default": 0, "brave/Profile 1": 2}
+    assert importer.errors == {}
+    assert repo.get_import_watermark(str(work)) == datetime.fromisoformat(
+        "2026-03-02T09:30:00+00:00"
+    )
+
+
+def test_import_all_records_unreadable_profile(tmp_path: Path):
+    home = tmp_path / "home"
+    broken = home / ".config/chromium/Default/History"
+    broken.parent.mkdir(parents=True)
+    broken.write_bytes(b"not a database")
+
+    importer = BrowserHistoryImporter(BrowserHistoryRepository(tmp_path / "ai_secretary.db"))
+    assert importer.import_all(profiles=discover_profiles(home_dirs=[home])) == {
+        "chromium/Default": 0
+    }
+    assert "chromium/Default" in importer.errors
@@ -0,0 +1,155 @@
+"""Tests for BrowserHistoryRepository search, domain filters and the normalized layout."""
+
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from src.browser_history.models import BrowserHistoryEntry
+from src.browser_history.repository import BrowserHistoryRepository, extract_domain
+
+
+def _add(repo: BrowserHistoryRepository, url: str, title: str, visit_time: str, visit_id: int):
+    return repo.add_entry(
+        BrowserHistoryEntry(
+            url=url,
+            title=title,
+            visit_time=datetime.fromisoformat(visit_time),
+            brave_visit_id=visit_id,
+        )
+    )
+
+
+@pytest.fixture
+def repo(tmp_path: Path) -> BrowserHistoryRepository:
+    repo = BrowserHistoryRepository(tmp_path / "ai_secretary.db")
+    _add(repo, "https://www.github.com/org/sqlite-tools", "sqlite-tools", "2026-03-01T09:00:00", 1)
+    _add(repo, "https://docs.python.org/3/library/sqlite3.html", "SQLite 入門", "2026-03-01T10:00", 2)
+    _add(repo, "https://github.com/org/other", "別のリポジトリ", "2026-03-02T09:00:00", 3)
+    _add(repo, "https://news.example.jp/ai", "生成AIの最新動向", "2026-03-03T09:00:00", 4)
+    return repo
+
+
+def test_extract_domain_normalizes_host():
+    assert extract_domain("https://WWW.GitHub.com:443/a?b=1") == "github.com"
+    assert extract_domain("chrome://settings") == "settings"
+    assert extract_domain("about:blank") is None
+    assert extract_domain("") is None
+
+
+def test_search_history_ranks_title_matches_first(repo: BrowserHistoryRepository):
+    if not repo.has_fulltext_index():
+        pytest.skip("SQLite build without FTS5 trigram tokenizer")
+
+    _add(repo, "https://example.com/sqlite", "無関係なページ", "2026-03-04T09:00:00", 5)
+
+    results = repo.search_history("sqlite")
+
+    # タイトルにも一致する 2 件が、新しくても URL だけ一致する記録より上位になる
+    assert {entry.brave_visit_id for entry in results[:2]} == {1, 2}
+    assert results[2].brave_visit_id == 5
+    assert [entry.brave_visit_id for entry in repo.search_history("最新動向")] == [4]
+
+
+def test_domain_filtered_time_range_queries(repo: BrowserHistoryRepository):
+    entries = repo.list_history(domain="www.github.com", start_date="2026-03-01", limit=10)
+    assert [entry.brave_visit_id for entry in entries] == [3, 1]
+    assert entries[0].domain == "github.com"
+
+    entries = repo.list_history(domain="github.com", end_date="2026-03-01")
+    assert [entry.brave_visit_id for entry in entries] == [1]
+
+    assert [e.brave_visit_id for e in repo.search_history("org/", domain="github.com")] == [3, 1]
+
+
+def test_url_pattern_matches_url_column_only(repo: BrowserHistoryRepository):
+    # "sqlite" はタイトルにも含まれるが url_pattern は URL だけを対象にする
+    entries = repo.list_history(url_pattern="sqlite3")
+    assert [entry.brave_visit_id for entry in entries] == [2]
+    assert [e.brave_visit_id for e in repo.list_history(url_pattern="入門")] == []
+
+
+def test_existing_rows_get_domain_and_index(tmp_path: Path):
+    """既存 DB の行にも domain が埋まり、検索インデックスに取り込まれることを確認."""
+    db_path = tmp_path / "ai_secretary.db"
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(
+            """
+            CREATE TABLE browser_history (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                url TEXT NOT NULL,
+                title TEXT,
+                visit_time TEXT NOT NULL,
+                visit_count INTEGER DEFAULT 1,
+                transition_type INTEGER,
+                source_browser TEXT DEFAULT 'brave',
+                imported_at TEXT NOT NULL,
+                brave_url_id INTEGER,
+                brave_visit_id INTEGER
+            )
+            """
+        )
+        conn.execute(
+            """
+            INSERT INTO browser_history (url, title, visit_time, imported_at)
+            VALUES ('https://www.example.com/page', 'Example ページ', '2026-03-01T09:00:00',
+                    '2026-03-01T09:00:00')
+            """
+        )
+
+        conn.execute(
+            """
+            CREATE UNIQUE INDEX idx_browser_history_unique_visit
+            ON browser_history(source_browser, brave_visit_id)
+            WHERE brave_visit_id IS NOT NULL
+            """
+        )
+
+    repo = BrowserHistoryRepository(db_path)
+
+    entry = repo.list_history(domain="example.com")[0]
+    assert (entry.domain, entry.source_profile) == ("example.com", "Default")
+    assert [entry.title for entry in repo.search_history("Example")] == ["Example ページ"]
+
+    # 重複排除はプロファイル単位になる
+    assert _add(repo, "https://example.com/a", "A", "2026-03-02T09:00:00", 7) is not None
+    other = BrowserHistoryEntry(
+        url="https://example.com/a",
+        title="A",
+        visit_time=datetime.fromisoformat("2026-03-02T09:00:00"),
+        source_profile="Profile 1",
+        brave_visit_id=7,
+    )
+    assert repo.add_entry(other) is not None
+    assert _add(repo, "https://example.com/a", "A", "2026-03-02T09:00:00", 7) is None
+
+
+def test_visits_share_one_url_row(repo: BrowserHistoryRepository):
+    _add(repo, "https://github.com/org/other", "別のリポジトリ（更新）", "2026-03-05T09:00:00", 6)
+    # 古い訪問の取り込みでは最新のタイトルを上書きしない
+    _add(repo, "https://github.com/org/other", "古いタイトル", "2026-02-01T09:00:00", 7)
+
+    with sqlite3.connect(repo.db_path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM browser_urls").fetchone()[0] == 4
+        assert conn.execute("SELECT COUNT(*) FROM browser_visits").fetchone()[0] == 6
+        # 互換ビューは訪問ごとの行を URL 表の最新タイトル付きで返す
+        titles = conn.execute(
+            "SELECT title FROM browser_history WHERE url = ? ORDER BY id",
+            ("https://github.com/org/other",),
+        ).fetchall()
+    assert titles == [("別のリポジトリ（更新）",)] * 3
+
+    domains = repo.count_by_domain()
+    assert domains[0] == ("github.com", 4)
+    assert sorted(domains[1:]) == [("docs.python.org", 1), ("news.example.jp", 1)]
+    assert sorted(repo.count_by_domain(start_date="2026-03-01", end_date="2026-03-01")) == [
+        ("docs.python.org", 1),
+        ("github.com", 1),
+    ]
+    assert repo.count_by_hour("2026-03-01") == [("09", 1), ("10", 1)]
+
+    assert repo.delete_old_entries("2026-03-02") == 3
+    with sqlite3.connect(repo.db_path) as conn:
+        urls = [row[0] for row in conn.execute("SELECT url FROM browser_urls ORDER BY id")]
+    assert urls == ["https://github.com/org/other", "https://news.example.jp/ai"]
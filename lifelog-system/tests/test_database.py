@@ -301,3 +301,79 @@ def test_migration_adds_events_table_and_views(tmp_path):
 
     manager.close()
     Path(db_path).unlink(missing_ok=True)
+
+
+def test_compact_intervals_merges_runs_within_hour(db_manager):
+    """同じ区間の細切れを隙間の許容範囲内でまとめ、時間帯は跨がないテスト."""
+    base = datetime(2024, 3, 1, 9, 50)
+
+    def interval(start_s, end_s, process="editor.exe", is_idle=0):
+        return {
+            "start_ts": base + timedelta(seconds=start_s),
+            "end_ts": base + timedelta(seconds=end_s),
+            "process_name": process,
+            "process_path_hash": f"hash_{process}",
+            "window_hash": "win",
+            "domain": None,
+            "is_idle": is_idle,
+        }
+
+    db_manager.bulk_insert_intervals(
+        [
+            interval(0, 10),
+            interval(12, 20),  # 2秒の隙間 → まとめる
+            interval(20, 60),
+            interval(60, 120, process="browser.exe"),  # 別アプリで区切られる
+            interval(120, 180),
+            interval(210, 240),  # 30秒の隙間 → まとめない
+            interval(240, 300, is_idle=1),  # アイドル状態が違う
+            interval(598, 600),
+            interval(601, 660),  # 10時台に入るのでまとめない
+        ]
+    )
+    conn = db_manager._get_connection()
+    hourly = "SELECT hour, active_seconds, idle_seconds FROM hourly_activity ORDER BY hour"
+    before = conn.execute(hourly).fetchall()
+
+    result = db_manager.compact_intervals(base.replace(minute=0), base + timedelta(hours=2))
+    assert result["rows_before"] == 9
+    assert result["rows_after"] == 7
+    assert result["merged_runs"] == 1
+    assert result["compaction_ratio"] == pytest.approx(7 / 9)
+    assert result["absorbed_seconds"] == pytest.approx(2.0)
+
+    first = conn.execute(
+        "SELECT start_ts, end_ts FROM activity_intervals ORDER BY start_ts_ms LIMIT 1"
+    ).fetchone()
+    assert tuple(first) == (base.isoformat(), (base + timedelta(seconds=60)).isoformat())
+    # 時間帯別の集計は取り込んだ隙間の分だけ増える
+    after = conn.execute(hourly).fetchall()
+    assert [row[0] for row in after] == [row[0] for row in before]
+    assert after[0][1] - before[0][1] == pytest.approx(2, abs=1)
+    assert after[1:] == before[1:]
+
+    # 2回目は何もしない
+    assert db_manager.compact_intervals(base, base + timedelta(hours=2))["merged_runs"] == 0
+
+
+def test_compact_intervals_skips_open_intervals(db_manager):
+    """期間の終わりより後に終わる区間はまとめないテスト."""
+    base = datetime(2024, 3, 1, 9, 0)
+    db_manager.bulk_insert_intervals(
+        [
+            {
+                "start_ts": base + timedelta(minutes=minute),
+                "end_ts": base + timedelta(minutes=minute + 1),
+                "process_name": "editor.exe",
+                "process_path_hash": "hash_editor",
+                "window_hash": "win",
+                "domain": None,
+                "is_idle": 0,
+            }
+            for minute in (0, 1, 2)
+        ]
+    )
+
+    result = db_manager.compact_intervals(base, base + timedelta(minutes=2, seconds=30))
+    assert (result["rows_before"], result["rows_after"]) == (3, 2)
+    assert db_manager.compact_intervals(base, base + timedelta(hours=1))["rows_after"] == 1
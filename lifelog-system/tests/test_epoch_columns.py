@@ -0,0 +1,169 @@
+"""Tests for the UTC epoch-millisecond columns next to the ISO timestamp columns."""
+
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from src.browser_history.models import BrowserHistoryEntry
+from src.browser_history.repository import BrowserHistoryRepository
+from src.common.epoch import ensure_epoch_ms_column, from_epoch_ms, to_epoch_ms
+from src.info_collector.repository import InfoCollectorRepository
+from src.lifelog.database.db_manager import DatabaseManager
+
+UTC_NOON_MS = to_epoch_ms(datetime(2026, 3, 1, 12, 0, tzinfo=timezone.utc))
+
+
+def test_to_epoch_ms_accepts_mixed_formats():
+    local_noon = datetime(2026, 3, 1, 12, 0).astimezone()
+    assert to_epoch_ms("2026-03-01T12:00:00+00:00") == UTC_NOON_MS
+    assert to_epoch_ms("2026-03-01T12:00:00Z") == UTC_NOON_MS
+    assert to_epoch_ms("2026-03-01T12:00:00.250+00:00") == UTC_NOON_MS + 250
+    # naive はローカル時刻とみなす
+    assert to_epoch_ms("2026-03-01T12:00:00") == to_epoch_ms(local_noon)
+    assert from_epoch_ms(UTC_NOON_MS) == datetime(2026, 3, 1, 12, 0, tzinfo=timezone.utc)
+    assert from_epoch_ms(None) is None
+
+
+def test_ensure_epoch_ms_column_backfills_and_tracks_writes(tmp_path: Path):
+    conn = sqlite3.connect(tmp_path / "events.db")
+    conn.execute("CREATE TABLE events (id INTEGER PRIMARY KEY, ts TEXT)")
+    conn.executemany(
+        "INSERT INTO events (ts) VALUES (?)",
+        [("2026-03-01T12:00:00+00:00",), ("2026-03-01 12:00:00.500Z",), ("not a time",)],
+    )
+
+    assert ensure_epoch_ms_column(conn, "events", "ts") == "ts_ms"
+    # 2 回目は何もしない
+    ensure_epoch_ms_column(conn, "events", "ts")
+    assert conn.execute("SELECT ts_ms FROM events ORDER BY id").fetchall() == [
+        (UTC_NOON_MS,),
+        (UTC_NOON_MS + 500,),
+        (None,),
+    ]
+
+    conn.execute("INSERT INTO events (ts) VALUES ('2026-03-01T21:00:00+09:00')")
+    conn.execute("UPDATE events SET ts = '2026-03-01T12:00:01+00:00' WHERE id = 3")
+    assert conn.execute("SELECT ts_ms FROM events WHERE id IN (3, 4) ORDER BY id").fetchall() == [
+        (UTC_NOON_MS + 1000,),
+        (UTC_NOON_MS,),
+    ]
+    plan = conn.execute("EXPLAIN QUERY PLAN SELECT * FROM events WHERE ts_ms >= 0").fetchall()
+    assert "idx_events_ts_ms" in plan[0][3]
+
+
+def test_lifelog_range_queries_use_epoch_columns(tmp_path: Path):
+    db = DatabaseManager(str(tmp_path / "lifelog.db"))
+    nine = datetime(2026, 3, 1, 9, 0)
+    db.bulk_insert_intervals(
+        [
+            {
+                "start_ts": nine + timedelta(hours=offset),
+                "end_ts": nine + timedelta(hours=offset, minutes=10),
+                "process_name": "editor.exe",
+                "process_path_hash": "hash_editor",
+                "window_hash": "win",
+                "domain": None,
+                "is_idle": 0,
+            }
+            for offset in (0, 1, 24)
+        ]
+    )
+    conn = db._get_connection()
+    conn.execute(
+        """
+        INSERT INTO system_events (event_timestamp, event_type, severity, source, message)
+        VALUES (?, 'error', 80, 'journal', 'disk full')
+        """,
+        # オフセット付きで書かれたイベントも同じ時刻軸で比べられる
+        ((nine + timedelta(minutes=30)).astimezone(timezone.utc).isoformat(),),
+    )
+    conn.commit()
+
+    events = db.get_events_by_date_range(nine, nine + timedelta(hours=1))
+    assert [event["message"] for event in events] == ["disk full"]
+    timeline = db.get_events_with_activity(nine, nine + timedelta(hours=2))
+    assert [row["event_source"] for row in timeline] == ["activity", "system_event", "activity"]
+    # 行の列は unified_timeline ビューの元の列のまま（timestamp_ms は絞り込みと並べ替えだけに使う）
+    assert "timestamp_ms" not in timeline[0]
+    stamps = [to_epoch_ms(row["timestamp"]) for row in timeline]
+    assert stamps == sorted(stamps, reverse=True)
+    db.close()
+
+    # timestamp_ms の無い旧定義のビューは開き直したときに作り直す
+    with sqlite3.connect(tmp_path / "lifelog.db") as conn:
+        conn.execute("DROP VIEW unified_timeline")
+        conn.execute(
+            "CREATE VIEW unified_timeline AS "
+            "SELECT 'system_event' AS event_source, event_timestamp AS timestamp FROM system_events"
+        )
+    db = DatabaseManager(str(tmp_path / "lifelog.db"))
+    assert len(db.get_events_with_activity(nine, nine + timedelta(hours=2))) == 3
+    db.close()
+
+
+def test_existing_browser_history_gets_visit_time_ms(tmp_path: Path):
+    db_path = tmp_path / "ai_secretary.db"
+    repo = BrowserHistoryRepository(db_path)
+    repo.add_entry(
+        BrowserHistoryEntry(
+            url="https://example.com/a",
+            title="A",
+            visit_time=datetime(2026, 3, 1, 12, 0, tzinfo=timezone.utc),
+        )
+    )
+    # _ms 列の無い古い DB を再現する
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("DROP VIEW browser_history")
+        conn.execute("DROP INDEX idx_browser_visits_visit_time_ms")
+        conn.execute("DROP TRIGGER browser_visits_visit_time_ms_ai")
+        conn.execute("DROP TRIGGER browser_visits_visit_time_ms_au")
+        conn.execute("DROP TRIGGER browser_visits_changes_au")
+        conn.execute("DROP TRIGGER browser_visits_changes_ad")
+        conn.execute("ALTER TABLE browser_visits DROP COLUMN visit_time_ms")
+        conn.execute(
+            """
+            CREATE VIEW browser_history AS
+            SELECT v.id, u.url, u.title, v.visit_time FROM browser_visits v
+            JOIN browser_urls u ON u.id = v.url_id
+            """
+        )
+
+    repo = BrowserHistoryRepository(db_path)
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT visit_time_ms FROM browser_history").fetchall() == [
+            (UTC_NOON_MS,)
+        ]
+    repo.add_entry(
+        BrowserHistoryEntry(
+            url="https://example.com/b",
+            title="B",
+            visit_time=datetime(2026, 3, 2, 0, 30, tzinfo=timezone.utc),
+        )
+    )
+    # 日付の境界は UTC
+    assert [entry.title for entry in repo.list_history("2026-03-01", "2026-03-01")] == ["A"]
+    assert [entry.title for entry in repo.list_history(start_date="2026-03-02")] == ["B"]
+    assert repo.count_by_domain("2026-03-01", "2026-03-02") == [("example.com", 2)]
+    assert repo.get_latest_visit_time() == datetime(2026, 3, 2, 0, 30, tzinfo=timezone.utc)
+    assert repo.delete_old_entries("2026-03-02") == 1
+
+
+def test_analysis_range_uses_analyzed_at_ms(tmp_path: Path):
+    repo = InfoCollectorRepository(str(tmp_path / "ai_secretary.db"))
+    with repo._connect() as conn:
+        conn.execute(
+            """
+            INSERT INTO collected_info (id, source_type, title, url, fetched_at)
+            VALUES (1, 'news', 'T', 'https://example.com/t', '2026-03-01T08:00:00')
+            """
+        )
+    for analyzed_at in ("2026-03-01T09:00:00", "2026-03-02T09:00:00"):
+        analyzed = datetime.fromisoformat(analyzed_at)
+        repo.save_analysis(1, 0.5, 0.5, "AI", [], "summary", "model", analyzed)
+        with repo._connect() as conn:
+            assert conn.execute(
+                "SELECT analyzed_at_ms FROM article_analysis WHERE article_id = 1"
+            ).fetchone()[0] == to_epoch_ms(analyzed_at)
+
+    assert len(repo.fetch_recent_analysis("2026-03-02T00:00:00")) == 1
+    assert repo.fetch_recent_analysis("2026-03-01T00:00:00", "2026-03-02T00:00:00") == []
@@ -1,8 +1,12 @@
-from datetime import datetime, timedelta
+import sqlite3
+from contextlib import closing
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
 from src.browser_history.models import BrowserHistoryEntry
 from src.browser_history.repository import BrowserHistoryRepository
+from src.common.change_counter import change_count
+from src.common.epoch import to_epoch_ms
 from src.info_collector.data_aggregator import DailyReportDataAggregator
 from src.info_collector.jobs.generate_integrated_report import generate_integrated_daily_report
 from src.info_collector.repository import InfoCollectorRepository
@@ -121,3 +125,232 @@ def test_unified_timeline_skips_invalid_entries(tmp_path):
     # invalid lifelog timestamp should be skipped; event should remain
     assert len(timeline) == 1
     assert timeline[0]["source_type"] == "event"
+
+
+def test_aggregate_daily_data_uses_half_open_day_range(tmp_path):
+    lifelog_db, info_db, db_manager, repo = _setup_databases(tmp_path)
+    day = datetime.fromisoformat("2024-01-01T00:00:00")
+
+    db_manager.bulk_insert_intervals(
+        [
+            {
+                "start_ts": start,
+                "end_ts": start + timedelta(minutes=5),
+                "process_name": "editor.exe",
+                "process_path_hash": "hash_editor",
+                "window_hash": f"win_{i}",
+                "domain": None,
+                "is_idle": 0,
+            }
+            for i, start in enumerate(
+                [day - timedelta(seconds=1), day, day + timedelta(hours=23, minutes=59)]
+            )
+        ]
+    )
+    browser_repo = BrowserHistoryRepository(info_db)
+    for i, visit_time in enumerate([day, day + timedelta(days=1)]):
+        browser_repo.add_entry(
+            BrowserHistoryEntry(
+                url=f"https://example.com/{i}", title=f"page {i}", visit_time=visit_time
+            )
+        )
+
+    aggregator = DailyReportDataAggregator(lifelog_db, info_db, max_workers=3)
+    data = aggregator.aggregate_daily_data("2024-01-01")
+    aggregator.close()
+
+    # 前日の最終秒と翌日 0 時は含めない
+    assert [entry["window_hash"] for entry in data.lifelog_data] == ["win_1", "win_2"]
+    assert [entry["url"] for entry in data.browser_history] == ["https://example.com/0"]
+    assert set(data.timings) == {
+        "lifelog_data",
+        "events",
+        "browser_history",
+        "article_analyses",
+        "deep_research",
+        "theme_reports",
+    }
+    assert len(data.timeline) == 3
+
+
+def test_iter_unified_timeline_merges_sorted_sources(tmp_path):
+    lifelog_db, info_db, _, _ = _setup_databases(tmp_path)
+    aggregator = DailyReportDataAggregator(lifelog_db, info_db)
+    local_noon = datetime.fromisoformat("2024-01-01T12:00:00")
+    utc_noon = local_noon.astimezone().astimezone(timezone.utc)
+
+    lifelog = [
+        {"start_ts": "2024-01-01T09:00:00", "process_name": "a"},
+        {"start_ts": "2024-01-01T15:00:00", "process_name": "b"},
+    ]
+    events = [
+        {"event_timestamp": "2024-01-01T13:00:00", "message": "e2", "severity": 50},
+        {"event_timestamp": "2024-01-01T08:00:00", "message": "e1", "severity": 50},
+    ]
+    # UTC のブラウザ履歴も naive なローカル時刻と並べられる
+    browser = [{"visit_time": utc_noon.isoformat(), "url": "https://example.com"}]
+    articles = [
+        {"published_at": "2024-01-01T10:00:00", "title": "old"},
+        {"published_at": "2024-01-01T14:00:00", "title": "new"},
+    ]
+
+    timeline = list(aggregator.iter_unified_timeline(lifelog, events, browser, articles, []))
+    assert [entry["source_type"] for entry in timeline] == [
+        "lifelog",
+        "article",
+        "event",
+        "browser",
+        "article",
+        "lifelog",
+        "event",
+    ]
+    # metadata は元の行をそのまま参照する
+    assert timeline[0]["metadata"] is lifelog[1]
+
+    page = aggregator._build_unified_timeline(
+        lifelog, events, browser, articles, [], "2024-01-01", limit=2, offset=2
+    )
+    assert [entry["title"] for entry in page] == ["[unknown] e2", "https://example.com"]
+
+
+def test_closed_day_snapshot_is_reused_until_late_data(tmp_path, monkeypatch):
+    lifelog_db, info_db, _, repo = _setup_databases(tmp_path)
+    browser_repo = BrowserHistoryRepository(info_db)
+    day = datetime.fromisoformat("2024-01-01T10:00:00")
+
+    def visit(i: int, visit_time: datetime) -> None:
+        browser_repo.add_entry(
+            BrowserHistoryEntry(
+                url=f"https://example.com/{i}", title=f"p{i}", visit_time=visit_time
+            )
+        )
+
+    visit(0, day)
+    aggregator = DailyReportDataAggregator(lifelog_db, info_db)
+    fetches = []
+    original = aggregator._fetch_sources
+    monkeypatch.setattr(
+        aggregator, "_fetch_sources", lambda date: fetches.append(date) or original(date)
+    )
+
+    first = aggregator.aggregate_daily_data("2024-01-01")
+    assert "browser_history" in first.timings
+    assert repo.get_daily_snapshot("2024-01-01")["watermarks"]["browser_history"] == 1
+
+    # 別の日のデータが増えてもスナップショットはそのまま使い、ウォーターマークだけ進める
+    visit(1, day + timedelta(days=3))
+    cached = aggregator.aggregate_daily_data("2024-01-01")
+    assert fetches == ["2024-01-01"]
+    assert set(cached.timings) == {"snapshot"}
+    assert cached.browser_history == first.browser_history
+    assert [entry["title"] for entry in cached.timeline] == ["p0"]
+    assert repo.get_daily_snapshot("2024-01-01")["watermarks"]["browser_history"] == 2
+
+    # その日の訪問が遅れて届いたら取得し直す
+    visit(2, day + timedelta(hours=1))
+    rebuilt = aggregator.aggregate_daily_data("2024-01-01")
+    assert fetches == ["2024-01-01", "2024-01-01"]
+    assert len(rebuilt.browser_history) == 2
+
+    # 当日分と use_snapshot=False は常に取得する
+    aggregator.aggregate_daily_data("2024-01-01", use_snapshot=False)
+    aggregator.aggregate_daily_data(datetime.now().strftime("%Y-%m-%d"))
+    assert len(fetches) == 4
+    assert repo.get_daily_snapshot(datetime.now().strftime("%Y-%m-%d")) is None
+    aggregator.close()
+
+
+def test_closed_day_snapshot_is_rebuilt_after_updates_and_deletes(tmp_path, monkeypatch):
+    lifelog_db, info_db, db_manager, repo = _setup_databases(tmp_path)
+    nine = datetime.fromisoformat("2024-01-01T09:00:00")
+    db_manager.bulk_insert_intervals(
+        [
+            {
+                "start_ts": nine + timedelta(minutes=offset),
+                "end_ts": nine + timedelta(minutes=offset + 1),
+                "process_name": "editor.exe",
+                "process_path_hash": "hash_editor",
+                "window_hash": "win",
+                "domain": None,
+                "is_idle": 0,
+            }
+            for offset in (0, 1)
+        ]
+    )
+    aggregator = DailyReportDataAggregator(lifelog_db, info_db)
+    fetches = []
+    original = aggregator._fetch_sources
+    monkeypatch.setattr(
+        aggregator, "_fetch_sources", lambda date: fetches.append(date) or original(date)
+    )
+
+    aggregator.aggregate_daily_data("2024-01-01")
+    # INSERT 直後に _ms 列を埋める UPDATE は書き換えとして数えない
+    watermarks = repo.get_daily_snapshot("2024-01-01")["watermarks"]
+    assert watermarks["lifelog_data.changes"] == 0
+    aggregator.aggregate_daily_data("2024-01-01")
+    assert len(fetches) == 1
+
+    # ほかの日の行の書き換え・削除ではこの日のスナップショットを作り直さない
+    next_day = nine + timedelta(days=1)
+    db_manager.bulk_insert_intervals(
+        [
+            {
+                "start_ts": next_day + timedelta(minutes=offset),
+                "end_ts": next_day + timedelta(minutes=offset + 1),
+                "process_name": "editor.exe",
+                "process_path_hash": "hash_editor",
+                "window_hash": "win",
+                "domain": None,
+                "is_idle": 0,
+            }
+            for offset in (0, 1)
+        ]
+    )
+    db_manager.compact_intervals(next_day, next_day + timedelta(days=1))
+    aggregator.aggregate_daily_data("2024-01-01")
+    assert len(fetches) == 1
+    with closing(sqlite3.connect(lifelog_db)) as conn:
+        assert change_count(conn, "activity_intervals", "2024-01-01") == 0
+        moved = change_count(conn, "activity_intervals", "2024-01-02")
+        assert moved > 0
+        # 日をまたいで動いた行は変更前後の両方の日に数える
+        conn.execute(
+            "UPDATE activity_intervals SET start_ts = ? WHERE start_ts_ms >= ?",
+            ((next_day + timedelta(days=1)).isoformat(), to_epoch_ms(next_day)),
+        )
+        conn.commit()
+        assert change_count(conn, "activity_intervals", "2024-01-02") > moved
+        assert change_count(conn, "activity_intervals", "2024-01-03") > 0
+        assert change_count(conn, "activity_intervals", "2024-01-01") == 0
+
+    # コンパクションは ID を増やさずに行を書き換え・削除する
+    db_manager.compact_intervals(nine, nine + timedelta(days=1))
+    rebuilt = aggregator.aggregate_daily_data("2024-01-01")
+    assert len(fetches) == 2
+    assert len(rebuilt.lifelog_data) == 1
+
+    # 記事の分析の書き換え（ON CONFLICT DO UPDATE）も検出する
+    with repo._connect() as conn:
+        conn.execute(
+            """
+            INSERT INTO collected_info (id, source_type, title, url, fetched_at)
+            VALUES (1, 'news', 'T', 'https://example.com/t', '2024-01-01T08:00:00')
+            """
+        )
+    repo.save_analysis(1, 0.5, 0.5, "AI", [], "summary", "model", nine)
+    aggregator.aggregate_daily_data("2024-01-01")
+    aggregator.aggregate_daily_data("2024-01-01")
+    assert len(fetches) == 3
+    repo.force_article_for_research(1)
+    aggregator.aggregate_daily_data("2024-01-01")
+    assert len(fetches) == 4
+
+    # カウンタを持たない古いスナップショットは作り直す
+    snapshot = repo.get_daily_snapshot("2024-01-01")
+    old = {k: v for k, v in snapshot["watermarks"].items() if not k.endswith(".changes")}
+    repo.save_daily_snapshot("2024-01-01", old, snapshot["sources"])
+    aggregator.aggregate_daily_data("2024-01-01")
+    assert len(fetches) == 5
+    aggregator.close()
+    db_manager.close()
@@ -1,4 +1,5 @@
 import json
+import re
 import sqlite3
 from datetime import datetime
 from pathlib import Path
@@ -329,3 +330,248 @@ def test_generate_report_creates_markdown(tmp_path: Path, monkeypatch: pytest.Mo
         assert cur.fetchone()[0] == 1
     finally:
         conn.close()
+
+
+def test_analyze_pending_stops_without_fallback_when_circuit_open(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    """ブレーカーが開いたら残りの記事をフォールバックで埋めず未分析のまま残す."""
+    from src.ai_secretary.circuit_breaker import CircuitOpenError
+
+    db_path = tmp_path / "ai_secretary.db"
+    InfoCollectorRepository(str(db_path))
+    conn = sqlite3.connect(db_path)
+    for idx in range(3):
+        _insert_collected(conn, title=f"記事{idx}")
+
+    class OpenCircuitClient:
+        model = "stub-model"
+
+        def generate(self, prompt, system=None, options=None):
+            raise CircuitOpenError("Ollama circuit is open")
+
+    monkeypatch.setattr(analyze_pending, "OllamaClient", lambda: OpenCircuitClient())
+
+    processed = analyze_pending.analyze_pending_articles(db_path=db_path, batch_size=5)
+
+    assert processed == 0
+    try:
+        assert conn.execute("SELECT COUNT(*) FROM article_analysis").fetchone()[0] == 0
+    finally:
+        conn.close()
+
+
+def test_analyze_pending_concurrent_overlaps_llm_calls_and_saves_all(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    """並列モードでは LLM 呼び出しが重なり、保存は呼び出し元スレッドだけで行う."""
+    import threading
+    import time
+
+    db_path = tmp_path / "ai_secretary.db"
+    repo = InfoCollectorRepository(str(db_path))
+    conn = sqlite3.connect(db_path)
+    for idx in range(6):
+        _insert_collected(conn, title=f"並列記事{idx}")
+
+    lock = threading.Lock()
+    state = {"in_flight": 0, "peak": 0}
+
+    class SlowClient:
+        model = "stub-model"
+
+        def generate(self, prompt, system=None, options=None):
+            with lock:
+                state["in_flight"] += 1
+                state["peak"] = max(state["peak"], state["in_flight"])
+            time.sleep(0.05)
+            with lock:
+                state["in_flight"] -= 1
+            return json.dumps({"importance_score": 0.7, "relevance_score": 0.6, "category": "AI"})
+
+    save_threads: set[int] = set()
+    original_save = InfoCollectorRepository.save_analysis
+
+    def _tracking_save(self, **kwargs):
+        save_threads.add(threading.get_ident())
+        return original_save(self, **kwargs)
+
+    monkeypatch.setattr(analyze_pending, "OllamaClient", lambda: SlowClient())
+    monkeypatch.setattr(InfoCollectorRepository, "save_analysis", _tracking_save)
+
+    stats = analyze_pending.AnalysisRunStats()
+    processed = analyze_pending.analyze_pending_articles(
+        db_path=db_path, batch_size=10, concurrency=3, stats=stats
+    )
+
+    assert processed == 6
+    assert state["peak"] >= 2
+    assert save_threads == {threading.get_ident()}
+    assert stats.concurrency == 3
+    assert len(stats.latencies_ms) == 6
+    assert stats.articles_per_minute > 0
+    assert repo.fetch_unanalyzed(limit=10) == []
+    conn.close()
+
+
+def test_analyze_pending_concurrent_stops_when_circuit_opens(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    """並列モードでもブレーカーが開いたら未着手の記事は未分析のまま残す."""
+    import threading
+
+    from src.ai_secretary.circuit_breaker import CircuitOpenError
+
+    db_path = tmp_path / "ai_secretary.db"
+    InfoCollectorRepository(str(db_path))
+    conn = sqlite3.connect(db_path)
+    for idx in range(8):
+        _insert_collected(conn, title=f"記事{idx}")
+
+    lock = threading.Lock()
+    calls = {"count": 0}
+
+    class FlakyClient:
+        model = "stub-model"
+
+        def generate(self, prompt, system=None, options=None):
+            with lock:
+                calls["count"] += 1
+                first = calls["count"] == 1
+            if first:
+                return json.dumps({"importance_score": 0.5, "relevance_score": 0.5})
+            raise CircuitOpenError("Ollama circuit is open")
+
+    monkeypatch.setattr(analyze_pending, "OllamaClient", lambda: FlakyClient())
+
+    processed = analyze_pending.analyze_pending_articles(
+        db_path=db_path, batch_size=10, concurrency=2
+    )
+
+    assert processed == 1
+    try:
+        assert conn.execute("SELECT COUNT(*) FROM article_analysis").fetchone()[0] == 1
+    finally:
+        conn.close()
+
+
+def test_analyze_pending_batched_prompt_maps_by_index_and_falls_back(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    """バッチ応答は index で記事に対応付け、欠けた・不正な要素だけ単独呼び出しで補う."""
+    db_path = tmp_path / "ai_secretary.db"
+    InfoCollectorRepository(str(db_path))
+    conn = sqlite3.connect(db_path)
+    ids = [_insert_collected(conn, title=f"バッチ記事{idx}") for idx in range(4)]
+
+    prompts: list[str] = []
+
+    class BatchClient:
+        model = "stub-model"
+
+        def generate(self, prompt, system=None, options=None):
+            prompts.append(prompt)
+            if "以下の4件の記事" in prompt:
+                # 逆順で返し、記事2は欠落、記事3はスコア範囲外にする
+                numbers = [int(n) for n in re.findall(r"タイトル: バッチ記事(\d)", prompt)]
+                items = []
+                for index, number in enumerate(numbers, start=1):
+                    if number == 2:
+                        continue
+                    score = 7 if number == 3 else 0.1 * (number + 1)
+                    items.append(
+                        {"index": index, "importance_score": score, "relevance_score": 0.5}
+                    )
+                return json.dumps(list(reversed(items)))
+            return json.dumps({"importance_score": 0.5, "relevance_score": 0.5})
+
+    monkeypatch.setattr(analyze_pending, "OllamaClient", lambda: BatchClient())
+
+    stats = analyze_pending.AnalysisRunStats()
+    processed = analyze_pending.analyze_pending_articles(
+        db_path=db_path, batch_size=10, articles_per_prompt=4, stats=stats
+    )
+
+    assert processed == 4
+    assert len(prompts) == 3
+    assert stats.batch_fallbacks == 2
+    assert stats.llm_requests == 3
+    try:
+        rows = dict(
+            conn.execute("SELECT article_id, llm_importance_score FROM article_analysis").fetchall()
+        )
+    finally:
+        conn.close()
+    assert rows[ids[0]] == pytest.approx(0.1)
+    assert rows[ids[1]] == pytest.approx(0.2)
+    assert rows[ids[2]] == pytest.approx(0.5)
+    assert rows[ids[3]] == pytest.approx(0.5)
+
+
+def test_analyze_pending_batched_prompt_falls_back_when_response_unusable(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    """バッチ応答が配列でなければ全記事を単独呼び出しで分析する."""
+    db_path = tmp_path / "ai_secretary.db"
+    InfoCollectorRepository(str(db_path))
+    conn = sqlite3.connect(db_path)
+    for idx in range(3):
+        _insert_collected(conn, title=f"記事{idx}")
+    conn.close()
+
+    calls = {"batch": 0, "single": 0}
+
+    class BrokenBatchClient:
+        model = "stub-model"
+
+        def generate(self, prompt, system=None, options=None):
+            if "件の記事をそれぞれ分析" in prompt:
+                calls["batch"] += 1
+                return "not json"
+            calls["single"] += 1
+            return json.dumps({"importance_score": 0.6, "relevance_score": 0.6})
+
+    monkeypatch.setattr(analyze_pending, "OllamaClient", lambda: BrokenBatchClient())
+
+    processed = analyze_pending.analyze_pending_articles(
+        db_path=db_path, batch_size=10, articles_per_prompt=8
+    )
+
+    assert processed == 3
+    assert calls == {"batch": 1, "single": 3}
+
+
+def test_analyze_pending_batched_prompt_keeps_results_when_circuit_opens_in_fallback(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    """単独呼び出しでの補完中にブレーカーが開いても、バッチ応答で得た分は保存する."""
+    from src.ai_secretary.circuit_breaker import CircuitOpenError
+
+    db_path = tmp_path / "ai_secretary.db"
+    repo = InfoCollectorRepository(str(db_path))
+    conn = sqlite3.connect(db_path)
+    ids = [_insert_collected(conn, title=f"記事{idx}") for idx in range(3)]
+    conn.close()
+
+    class PartialBatchClient:
+        model = "stub-model"
+
+        def generate(self, prompt, system=None, options=None):
+            if "件の記事をそれぞれ分析" in prompt:
+                # 2 件目だけ欠落させる
+                return json.dumps(
+                    [
+                        {"index": 1, "importance_score": 0.4, "relevance_score": 0.4},
+                        {"index": 3, "importance_score": 0.6, "relevance_score": 0.6},
+                    ]
+                )
+            raise CircuitOpenError("Ollama circuit is open")
+
+    monkeypatch.setattr(analyze_pending, "OllamaClient", lambda: PartialBatchClient())
+
+    processed = analyze_pending.analyze_pending_articles(
+        db_path=db_path, batch_size=10, articles_per_prompt=3
+    )
+
+    assert processed == 2
+    assert [row["id"] for row in repo.fetch_unanalyzed(limit=10)] == [ids[1]]
@@ -0,0 +1,114 @@
+"""Tests for the durable pipeline job queue."""
+
+import sqlite3
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+from src.info_collector.repository import InfoCollectorRepository
+
+
+@pytest.fixture
+def repo(tmp_path: Path) -> InfoCollectorRepository:
+    return InfoCollectorRepository(str(tmp_path / "ai_secretary.db"))
+
+
+def test_enqueue_dedupes_active_jobs_and_raises_priority(repo: InfoCollectorRepository):
+    first = repo.enqueue_job("deep_research", 5, payload={"article_ids": [5, 6]})
+    again = repo.enqueue_job(
+        "deep_research", 5, payload={"article_ids": [5, 7], "report_request": {}}, priority=100
+    )
+    assert again == first
+
+    # クラスタの記事はオンデマンド要求で上書きされず、和集合になる
+    job = repo.get_job(first)
+    assert job["priority"] == 100
+    assert job["payload"] == {"article_ids": [5, 6, 7], "report_request": {}}
+
+    # 記事を持たないジョブも stage ごとに 1 件だけ
+    assert repo.enqueue_job("triage") == repo.enqueue_job("triage")
+    assert repo.count_jobs_by_state() == {"queued": 2}
+
+    assert repo.claim_job("w1")["id"] == first
+    assert repo.complete_job(first, "w1")
+    assert repo.enqueue_job("deep_research", 5) != first
+
+
+def test_claim_orders_by_priority_and_resumes_expired_leases(repo: InfoCollectorRepository):
+    scheduled = repo.enqueue_job("deep_research", 1)
+    on_demand = repo.enqueue_job("deep_research", 2, priority=100)
+
+    assert repo.claim_job("w1")["id"] == on_demand
+    job = repo.claim_job("w2", lease_seconds=60)
+    assert job["id"] == scheduled
+    assert job["state"] == "running"
+    assert job["attempts"] == 1
+    assert repo.claim_job("w3") is None
+
+    # worker が落ちてリースが切れたジョブは次の claim で再開される
+    with sqlite3.connect(repo.db_path) as conn:
+        conn.execute(
+            "UPDATE pipeline_jobs SET lease_until = ? WHERE id = ?",
+            ((datetime.now() - timedelta(seconds=1)).isoformat(), scheduled),
+        )
+    resumed = repo.claim_job("w3")
+    assert resumed["id"] == scheduled
+    assert resumed["lease_owner"] == "w3"
+    assert resumed["attempts"] == 2
+    assert [job["id"] for job in repo.fetch_active_jobs("deep_research")] == [
+        on_demand,
+        scheduled,
+    ]
+
+
+def test_fail_retries_with_backoff_until_attempts_run_out(repo: InfoCollectorRepository):
+    job_id = repo.enqueue_job("report", 3, max_attempts=2)
+
+    repo.claim_job("w1")
+    assert repo.fail_job(job_id, "w1", "timeout", retry_delay_seconds=60) == "queued"
+    # バックオフ中は取り出せない
+    assert repo.claim_job("w1") is None
+
+    with sqlite3.connect(repo.db_path) as conn:
+        conn.execute("UPDATE pipeline_jobs SET available_at = ? WHERE id = ?", ("", job_id))
+    repo.claim_job("w1")
+    assert repo.fail_job(job_id, "w1", "timeout again") == "failed"
+    assert repo.get_job(job_id)["last_error"] == "timeout again"
+
+    # 中断したジョブは試行回数を消費せずに戻る
+    other = repo.enqueue_job("report", 4, max_attempts=1)
+    repo.claim_job("w1")
+    assert repo.release_job(other, "w1")
+    assert repo.get_job(other)["state"] == "queued"
+    assert repo.get_job(other)["attempts"] == 0
+    assert repo.purge_finished_jobs(older_than_days=0) == 1
+
+
+def test_complete_and_fail_require_the_current_lease(repo: InfoCollectorRepository):
+    job_id = repo.enqueue_job("report", 3)
+    repo.claim_job("w1", lease_seconds=60)
+
+    # リースが切れて w2 が取り直したジョブを w1 は完了・失敗にできない
+    with sqlite3.connect(repo.db_path) as conn:
+        conn.execute(
+            "UPDATE pipeline_jobs SET lease_until = ? WHERE id = ?",
+            ((datetime.now() - timedelta(seconds=1)).isoformat(), job_id),
+        )
+    assert repo.claim_job("w2")["id"] == job_id
+    assert not repo.complete_job(job_id, "w1")
+    assert repo.fail_job(job_id, "w1", "late failure") is None
+    assert not repo.release_job(job_id, "w1")
+    job = repo.get_job(job_id)
+    assert (job["state"], job["lease_owner"], job["last_error"], job["attempts"]) == (
+        "running",
+        "w2",
+        "lease expired",
+        2,
+    )
+
+    assert repo.complete_job(job_id, "w2")
+    # 完了済みのジョブは二重に完了・失敗にならない
+    assert not repo.complete_job(job_id, "w2")
+    assert repo.fail_job(job_id, "w2", "after done") is None
+    assert repo.get_job(job_id)["state"] == "done"
@@ -208,3 +208,142 @@ def test_get_feedback_progress_returns_overview_and_recent_items(tmp_path: Path)
     assert progress["overview"]["analyses_with_bonus"] == 1
     assert progress["recent_events"][0]["title"] == "Progress article"
     assert progress["recent_analyses"][0]["source_bonus"] == pytest.approx(0.05)
+
+
+def test_feedback_stats_roll_windows_and_follow_category_changes(tmp_path: Path):
+    db_path = tmp_path / "info.db"
+    repo = InfoCollectorRepository(str(db_path))
+    now = datetime.now()
+    article_id = _add_article(
+        repo,
+        title="Rolling article",
+        url="https://example.com/rolling",
+        source_name="RollSource",
+        fetched_at=now,
+    )
+    repo.toggle_feedback(article_id, "positive")
+
+    def _source():
+        stats = repo.get_feedback_stats()
+        return next(item for item in stats["source"] if item["name"] == "RollSource")
+
+    assert _source()["positive"] == 1.0
+    assert [item["name"] for item in repo.get_feedback_stats()["category"]] == ["未分類"]
+
+    # 10 日前のイベントは読み出し時に month 窓（重み 0.5）へ移る
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(
+            "UPDATE article_feedback_events SET created_at = ?",
+            ((now - timedelta(days=10)).isoformat(),),
+        )
+    assert _source()["positive"] == 0.5
+
+    # 分析でカテゴリが付くと集計もそのカテゴリへ移る
+    repo.save_analysis(
+        article_id=article_id,
+        importance=0.5,
+        relevance=0.5,
+        category="AI",
+        keywords=[],
+        summary="",
+        model="test",
+        analyzed_at=now,
+    )
+    categories = repo.get_feedback_stats()["category"]
+    assert [(item["name"], item["positive"]) for item in categories] == [("AI", 0.5)]
+
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(
+            "UPDATE collected_info SET fetched_at = ?",
+            ((now - timedelta(days=60)).isoformat(),),
+        )
+    repo.delete_old_info(days=30)
+    assert repo.get_feedback_stats()["source"] == []
+
+
+def test_progress_counters_match_full_counts(tmp_path: Path):
+    from src.info_collector.repository import _COUNTER_QUERIES
+
+    db_path = tmp_path / "info.db"
+    repo = InfoCollectorRepository(str(db_path))
+    now = datetime.now()
+    ids = [
+        _add_article(
+            repo,
+            title=f"Counter article {i}",
+            url=f"https://example.com/counter/{i}",
+            source_name="CounterSource",
+            fetched_at=now - timedelta(days=60 if i == 0 else 0),
+        )
+        for i in range(4)
+    ]
+    for article_id, bonus in zip(ids[:3], (0.0, 0.05, 0.0)):
+        repo.save_analysis(
+            article_id=article_id,
+            importance=0.5,
+            relevance=0.5,
+            category="AI",
+            keywords=[],
+            summary="",
+            model="test",
+            analyzed_at=now,
+            source_bonus=bonus,
+        )
+    # INSERT OR REPLACE で上書きしても二重に数えない
+    repo.save_analysis(
+        article_id=ids[1],
+        importance=0.6,
+        relevance=0.6,
+        category="AI",
+        keywords=[],
+        summary="",
+        model="test",
+        analyzed_at=now,
+    )
+    repo.force_article_for_research(ids[3])
+    repo.toggle_feedback(ids[1], "positive")
+    repo.toggle_feedback(ids[2], "negative")
+    repo.request_report(ids[2])
+    repo.delete_old_info(days=30)
+
+    overview = repo.get_feedback_progress()["overview"]
+    with sqlite3.connect(db_path) as conn:
+        expected = {
+            name: conn.execute(query).fetchone()[0] for name, query in _COUNTER_QUERIES.items()
+        }
+        pending = conn.execute(
+            """
+            SELECT COUNT(*) FROM collected_info c
+            LEFT JOIN article_analysis a ON c.id = a.article_id
+            WHERE a.article_id IS NULL
+            """
+        ).fetchone()[0]
+
+    assert {name: overview[name] for name in overview if name in expected} == {
+        name: value for name, value in expected.items() if name in overview
+    }
+    assert overview["analyzed_articles"] == 4
+    assert overview["analyses_with_bonus"] == 0
+    assert overview["collected_articles"] == 3
+    assert overview["pending_articles"] == pending == 0
+    assert overview["feedback_events"] == 3
+
+
+def test_counters_are_seeded_only_when_missing(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    from src.info_collector import repository
+
+    db_path = tmp_path / "info.db"
+    InfoCollectorRepository(str(db_path))
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("DELETE FROM info_counters WHERE name = 'feedback_events'")
+
+    # 既にあるカウンタの初期化クエリは実行されない（実行されれば OperationalError）
+    queries = {name: "SELECT COUNT(*) FROM no_such_table" for name in repository._COUNTER_QUERIES}
+    queries["feedback_events"] = repository._COUNTER_QUERIES["feedback_events"]
+    monkeypatch.setattr(repository, "_COUNTER_QUERIES", queries)
+    InfoCollectorRepository(str(db_path))
+
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute(
+            "SELECT value FROM info_counters WHERE name = 'feedback_events'"
+        ).fetchone() == (0,)
@@ -4,6 +4,7 @@ import sqlite3
 from datetime import datetime
 from pathlib import Path
 
+from src.info_collector.models import CollectedInfo
 from src.info_collector.repository import InfoCollectorRepository
 
 
@@ -167,3 +168,199 @@ def test_repository_backfills_feedback_events_from_feedback_table(tmp_path: Path
         ("feedback_positive", "positive"),
         ("report_requested", "positive"),
     ]
+
+
+def test_repository_merges_rows_with_same_canonical_url(tmp_path: Path):
+    """URL 表記違いの既存記事が最古の行へ統合され、関連行も引き継がれることを確認."""
+    db_path = tmp_path / "info.db"
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        """
+        CREATE TABLE collected_info (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            source_type TEXT NOT NULL,
+            title TEXT NOT NULL,
+            url TEXT NOT NULL,
+            content TEXT,
+            snippet TEXT,
+            published_at TEXT,
+            fetched_at TEXT NOT NULL,
+            source_name TEXT,
+            metadata_json TEXT,
+            UNIQUE(source_type, url)
+        )
+        """
+    )
+    now = datetime.now().isoformat()
+    conn.executemany(
+        """
+        INSERT INTO collected_info (id, source_type, title, url, fetched_at, source_name)
+        VALUES (?, ?, 'title', ?, ?, 'Source')
+        """,
+        [
+            (1, "rss", "https://www.example.com/news/1/?utm_source=rss", now),
+            (2, "news", "https://example.com/news/1", now),
+            (3, "search", "https://m.example.com/news/1/amp", now),
+            (4, "rss", "https://example.com/news/2", now),
+        ],
+    )
+    conn.execute(
+        """
+        CREATE TABLE article_analysis (
+            article_id INTEGER PRIMARY KEY,
+            importance_score REAL,
+            relevance_score REAL,
+            category TEXT,
+            keywords TEXT,
+            summary TEXT,
+            model TEXT,
+            analyzed_at TEXT
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE article_feedback (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            article_id INTEGER NOT NULL UNIQUE,
+            feedback_type TEXT NOT NULL,
+            created_at TEXT NOT NULL
+        )
+        """
+    )
+    conn.execute(
+        """
+        INSERT INTO article_analysis (article_id, importance_score, analyzed_at)
+        VALUES (2, 0.9, ?)
+        """,
+        (now,),
+    )
+    conn.execute(
+        """
+        INSERT INTO article_feedback (article_id, feedback_type, created_at)
+        VALUES (3, 'positive', ?)
+        """,
+        (now,),
+    )
+    conn.commit()
+    conn.close()
+
+    repo = InfoCollectorRepository(str(db_path))
+
+    with sqlite3.connect(db_path) as conn:
+        rows = conn.execute("SELECT id, canonical_url FROM collected_info ORDER BY id").fetchall()
+        analysis_ids = [r[0] for r in conn.execute("SELECT article_id FROM article_analysis")]
+        feedback_ids = [r[0] for r in conn.execute("SELECT article_id FROM article_feedback")]
+
+    assert rows == [
+        (1, "https://example.com/news/1"),
+        (4, "https://example.com/news/2"),
+    ]
+    assert analysis_ids == [1]
+    assert feedback_ids == [1]
+    assert [row["id"] for row in repo.fetch_unanalyzed(limit=10)] == [4]
+    assert (
+        repo.add_info(
+            CollectedInfo(
+                source_type="search",
+                title="title",
+                url="http://EXAMPLE.com/news/2#comments",
+                source_name="Source",
+            )
+        )
+        is None
+    )
+
+
+def test_analysis_state_follows_article_analysis(tmp_path: Path):
+    db_path = tmp_path / "info.db"
+    repo = InfoCollectorRepository(str(db_path))
+    ids = [
+        repo.add_info(
+            CollectedInfo(
+                source_type="rss",
+                title=f"Pending {i}",
+                url=f"https://example.com/pending/{i}",
+                content=f"body {i}",
+                fetched_at=datetime(2026, 1, 1 + i),
+            )
+        )
+        for i in range(3)
+    ]
+    assert [row["id"] for row in repo.fetch_unanalyzed(limit=10)] == ids[::-1]
+    assert repo.count_unanalyzed() == 3
+
+    for _ in range(2):  # INSERT OR REPLACE で上書きしても分析済みのまま
+        repo.save_analysis(
+            article_id=ids[2],
+            importance=0.5,
+            relevance=0.5,
+            category="AI",
+            keywords=[],
+            summary="",
+            model="test",
+            analyzed_at=datetime.now(),
+        )
+    assert [row["id"] for row in repo.fetch_unanalyzed(limit=10)] == ids[1::-1]
+    assert repo.count_unanalyzed() == 2
+
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("DELETE FROM article_analysis WHERE article_id = ?", (ids[2],))
+        plan = conn.execute(
+            "EXPLAIN QUERY PLAN SELECT COUNT(*) FROM collected_info "
+            "INDEXED BY idx_info_pending_analysis "
+            "WHERE analysis_state = 'pending' AND duplicate_of IS NULL"
+        ).fetchall()
+    assert repo.count_unanalyzed() == 3
+    assert "idx_info_pending_analysis" in plan[0][-1]
+
+
+def test_repository_backfills_analysis_state(tmp_path: Path):
+    db_path = tmp_path / "info.db"
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        """
+        CREATE TABLE collected_info (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            source_type TEXT NOT NULL,
+            title TEXT NOT NULL,
+            url TEXT NOT NULL,
+            content TEXT,
+            snippet TEXT,
+            published_at TEXT,
+            fetched_at TEXT NOT NULL,
+            source_name TEXT,
+            metadata_json TEXT,
+            UNIQUE(source_type, url)
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE article_analysis (
+            article_id INTEGER PRIMARY KEY,
+            importance_score REAL,
+            relevance_score REAL,
+            category TEXT,
+            keywords TEXT,
+            summary TEXT,
+            model TEXT,
+            analyzed_at TEXT
+        )
+        """
+    )
+    now = datetime.now().isoformat()
+    for i in (1, 2):
+        conn.execute(
+            "INSERT INTO collected_info (source_type, title, url, fetched_at) VALUES (?, ?, ?, ?)",
+            ("rss", f"t{i}", f"https://example.com/{i}", now),
+        )
+    conn.execute("INSERT INTO article_analysis (article_id, analyzed_at) VALUES (1, ?)", (now,))
+    conn.commit()
+    conn.close()
+
+    repo = InfoCollectorRepository(str(db_path))
+
+    assert [row["id"] for row in repo.fetch_unanalyzed(limit=10)] == [2]
+    assert repo.count_unanalyzed() == 1
+    assert repo.get_feedback_progress()["overview"]["pending_articles"] == 1
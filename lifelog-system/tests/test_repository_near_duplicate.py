@@ -0,0 +1,119 @@
+"""Tests for near-duplicate linking in InfoCollectorRepository."""
+
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+
+from src.info_collector import near_duplicate
+from src.info_collector.models import CollectedInfo
+from src.info_collector.repository import InfoCollectorRepository
+
+BODY = "OpenAIは本日、新しい大規模言語モデルGPT-5を発表した。推論性能が大幅に向上している。"
+
+
+def _info(title: str, url: str, content: str = BODY, source_type: str = "rss") -> CollectedInfo:
+    return CollectedInfo(
+        source_type=source_type,
+        title=title,
+        url=url,
+        content=content,
+        source_name="test",
+    )
+
+
+def _save(repo: InfoCollectorRepository, article_id: int, importance: float = 0.8) -> None:
+    repo.save_analysis(
+        article_id=article_id,
+        importance=importance,
+        relevance=0.7,
+        category="テクノロジー",
+        keywords=["GPT-5"],
+        summary="新モデル発表",
+        model="test-model",
+        analyzed_at=datetime.now(),
+    )
+
+
+def test_similarity_separates_rewrites_from_other_stories():
+    """表記揺れは閾値以上、同じ定型文の別ニュースは閾値未満になることを確認."""
+    a = near_duplicate.signature("OpenAIが新モデルGPT-5を発表、推論性能が大幅向上", BODY)
+    b = near_duplicate.signature("OpenAI、新モデル「GPT-5」を発表　推論性能が大幅向上", BODY)
+    c = near_duplicate.signature("日銀が金利据え置きを決定", "日本銀行は金融政策決定会合で政策金利の据え置きを決めた。")
+    d = near_duplicate.signature("日銀が金利引き上げを決定", "日本銀行は金融政策決定会合で政策金利の引き上げを決めた。")
+
+    assert near_duplicate.similarity(a, b) >= near_duplicate.DEFAULT_THRESHOLD
+    assert near_duplicate.similarity(c, d) < near_duplicate.DEFAULT_THRESHOLD
+    assert set(near_duplicate.band_keys(a)) & set(near_duplicate.band_keys(b))
+    assert near_duplicate.signature("短い", None) is None
+
+
+def test_near_duplicate_is_linked_and_skipped_by_fetch_unanalyzed(tmp_path: Path):
+    """別 URL の近似重複は正規記事に紐付き、Stage1 の対象から外れることを確認."""
+    repo = InfoCollectorRepository(str(tmp_path / "info.db"))
+    canonical = repo.add_info(_info("OpenAIが新モデルGPT-5を発表、推論性能が大幅向上", "https://a.example.com/1"))
+    duplicate = repo.add_info(
+        _info(
+            "OpenAI、新モデル「GPT-5」を発表　推論性能が大幅向上",
+            "https://b.example.com/2",
+            source_type="news",
+        )
+    )
+    other = repo.add_info(
+        _info(
+            "日銀が金利据え置きを決定",
+            "https://c.example.com/3",
+            content="日本銀行は金融政策決定会合で政策金利の据え置きを決めた。",
+        )
+    )
+
+    assert repo.get_duplicate_ids(canonical) == [duplicate]
+    pending_ids = {row["id"] for row in repo.fetch_unanalyzed(limit=10)}
+    assert pending_ids == {canonical, other}
+
+
+def test_duplicate_inherits_analysis_before_and_after_arrival(tmp_path: Path):
+    """正規記事の分析は、後から届いた重複にも再分析後の既存重複にも引き継がれる."""
+    db_path = tmp_path / "info.db"
+    repo = InfoCollectorRepository(str(db_path))
+    canonical = repo.add_info(_info("OpenAIが新モデルGPT-5を発表、推論性能が大幅向上", "https://a.example.com/1"))
+    _save(repo, canonical, importance=0.8)
+
+    duplicate = repo.add_info(_info("OpenAI、新モデル「GPT-5」を発表　推論性能が大幅向上", "https://b.example.com/2"))
+    assert repo.get_article_analysis_map([duplicate])[duplicate]["importance_score"] == 0.8
+
+    _save(repo, canonical, importance=0.9)
+    assert repo.get_article_analysis_map([duplicate])[duplicate]["importance_score"] == 0.9
+
+    # 重複記事は深掘り対象に重ねて出てこない
+    targets = repo.fetch_deep_research_targets(min_importance=0.5, min_relevance=0.5)
+    assert [row["article_id"] for row in targets] == [canonical]
+
+
+def test_existing_articles_are_backfilled_into_index(tmp_path: Path):
+    """索引の無い DB の既存記事は初期化時に索引へ登録され、照合相手になることを確認."""
+    db_path = tmp_path / "info.db"
+    repo = InfoCollectorRepository(str(db_path))
+    canonical = repo.add_info(_info("OpenAIが新モデルGPT-5を発表、推論性能が大幅向上", "https://a.example.com/1"))
+    # MinHash 索引の無い古い DB を再現する
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("DROP TABLE article_minhash")
+        conn.execute("DROP TABLE article_minhash_bands")
+
+    repo = InfoCollectorRepository(str(db_path))
+    duplicate = repo.add_info(_info("OpenAI、新モデル「GPT-5」を発表　推論性能が大幅向上", "https://b.example.com/2"))
+
+    assert repo.get_duplicate_ids(canonical) == [duplicate]
+
+
+def test_minhash_backfill_runs_only_when_index_is_created(tmp_path: Path):
+    """索引が既にあれば、再初期化のたびに署名の無い記事を探し直さないことを確認."""
+    db_path = tmp_path / "info.db"
+    repo = InfoCollectorRepository(str(db_path))
+    repo.add_info(_info("OpenAIが新モデルGPT-5を発表、推論性能が大幅向上", "https://a.example.com/1"))
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("DELETE FROM article_minhash")
+
+    InfoCollectorRepository(str(db_path))
+
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM article_minhash").fetchone()[0] == 0
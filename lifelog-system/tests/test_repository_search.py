@@ -0,0 +1,73 @@
+"""Tests for collected_info full-text search."""
+
+from pathlib import Path
+
+import pytest
+
+from src.info_collector.models import CollectedInfo
+from src.info_collector.repository import InfoCollectorRepository
+
+
+@pytest.fixture
+def repo(tmp_path: Path) -> InfoCollectorRepository:
+    repo = InfoCollectorRepository(str(tmp_path / "info.db"))
+    if not repo.has_fulltext_index():
+        pytest.skip("SQLite build without FTS5 trigram tokenizer")
+    return repo
+
+
+def _add(repo: InfoCollectorRepository, title: str, content: str, url: str) -> int:
+    return repo.add_info(
+        CollectedInfo(source_type="rss", title=title, url=url, content=content, source_name="t")
+    )
+
+
+def test_search_info_ranks_title_matches_first(repo: InfoCollectorRepository):
+    """日本語の部分一致で検索でき、タイトル一致が本文一致より上位になることを確認."""
+    body_hit = _add(repo, "今週のテック動向まとめ", "量子コンピュータの実用化に向けた研究が進む。", "https://a/1")
+    title_hit = _add(repo, "量子コンピュータの新方式を発表", "国内の研究機関が新しい方式を発表した。", "https://a/2")
+    _add(repo, "日銀が金利据え置き", "金融政策決定会合の結果。", "https://a/3")
+
+    results = repo.search_info(query="量子コンピュータ")
+
+    assert [info.id for info in results] == [title_hit, body_hit]
+
+
+def test_index_follows_updates_and_deletes(repo: InfoCollectorRepository):
+    """トリガーで更新・削除がインデックスへ反映されることを確認."""
+    article_id = _add(repo, "SQLite の新機能", "FTS5 の改善が含まれる。", "https://a/1")
+    with repo._connect() as conn:
+        conn.execute(
+            "UPDATE collected_info SET title = ? WHERE id = ?", ("PostgreSQL の新機能", article_id)
+        )
+
+    assert repo.search_info(query="SQLite") == []
+    assert [info.id for info in repo.search_info(query="PostgreSQL")] == [article_id]
+
+    with repo._connect() as conn:
+        conn.execute("DELETE FROM collected_info WHERE id = ?", (article_id,))
+    assert repo.search_info(query="PostgreSQL") == []
+
+
+def test_snippets_highlight_matches_and_rebuild_restores_index(repo: InfoCollectorRepository):
+    article_id = _add(repo, "生成AIの規制案", "欧州で生成AIの透明性を求める規制案がまとまった。", "https://a/1")
+
+    hits = repo.search_info_snippets("生成AI")
+    assert hits[0]["id"] == article_id
+    assert "【生成AI】" in hits[0]["title_highlight"]
+    assert "【生成AI】" in hits[0]["snippet_highlight"]
+
+    with repo._connect() as conn:
+        conn.execute("INSERT INTO collected_info_fts (collected_info_fts) VALUES ('delete-all')")
+    assert repo.search_info(query="生成AI") == []
+
+    assert repo.rebuild_fulltext_index() == 1
+    assert [info.id for info in repo.search_info(query="生成AI")] == [article_id]
+
+
+def test_short_query_falls_back_to_like(repo: InfoCollectorRepository):
+    """trigram で引けない 2 文字以下の検索語は LIKE で検索されることを確認."""
+    article_id = _add(repo, "AI 規制の行方", "各国の動きをまとめる。", "https://a/1")
+
+    assert [info.id for info in repo.search_info(query="AI")] == [article_id]
+    assert repo.search_info_snippets("AI")[0]["score"] is None
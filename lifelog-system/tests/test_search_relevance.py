@@ -0,0 +1,68 @@
+"""Tests for the local relevance pre-filter used by deep research."""
+
+from src.info_collector.search.relevance import rank_by_relevance, relevance_scores, tokenize
+
+_RESULTS = [
+    {
+        "title": "今日の天気 東京は晴れ",
+        "snippet": "東京地方は一日晴れ、最高気温は25度の見込みです。",
+        "url": "https://weather.example.com",
+    },
+    {
+        "title": "OpenAIが新しい推論モデルを発表",
+        "snippet": "OpenAIは推論性能を高めた新モデルを公開した。",
+        "url": "https://news.example.com/a",
+    },
+    {
+        "title": "おすすめレシピ10選",
+        "snippet": "簡単に作れる夕食のレシピを紹介します。",
+        "url": "https://recipe.example.com",
+    },
+    {
+        "title": "推論モデルの API 価格比較",
+        "snippet": "各社の推論モデルの価格を比較。OpenAI の新モデルも掲載。",
+        "url": "https://blog.example.com/b",
+    },
+    {
+        "title": "OpenAIが新しい推論モデルを発表（転載）",
+        "snippet": "同じ記事",
+        "url": "https://news.example.com/a",
+    },
+]
+
+
+def test_tokenize_mixes_words_and_bigrams():
+    assert tokenize("OpenAI の推論API") == ["openai", "api", "の推", "推論"]
+    assert tokenize("AI と x") == ["ai", "と"]
+
+
+def test_relevance_scores_are_cosine_similarities():
+    scores = relevance_scores("推論モデル", ["推論モデル", "天気予報", ""])
+    assert scores[0] > 0.99
+    assert scores[1] == 0.0
+    assert scores[2] == 0.0
+
+
+def test_rank_by_relevance_drops_off_topic_results():
+    ranked = rank_by_relevance(
+        _RESULTS,
+        article_title="OpenAI、新推論モデルを公開",
+        article_summary="OpenAIが推論能力を強化した新しいモデルを発表した",
+        keywords=["OpenAI", "推論モデル"],
+        min_keep=0,
+    )
+
+    assert [result["url"] for result in ranked] == [
+        "https://news.example.com/a",
+        "https://blog.example.com/b",
+    ]
+    assert ranked[0]["relevance_score"] > ranked[1]["relevance_score"] > 0.05
+    assert "relevance_score" not in _RESULTS[1]
+
+
+def test_rank_by_relevance_respects_top_k_and_min_keep():
+    kwargs = {"article_title": "量子コンピュータ", "article_summary": "誤り訂正の進展"}
+    assert len(rank_by_relevance(_RESULTS, top_k=1, min_score=0.0, **kwargs)) == 1
+    # どれも関連しない場合も統合に渡す最低件数は残す
+    assert len(rank_by_relevance(_RESULTS, min_keep=2, **kwargs)) == 2
+    assert rank_by_relevance([], **kwargs) == []
@@ -0,0 +1,133 @@
+"""Tests for topic clustering of deep-research candidates."""
+
+import json
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from src.info_collector.jobs import deep_research, generate_theme_report
+from src.info_collector.models import CollectedInfo
+from src.info_collector.repository import InfoCollectorRepository
+from src.info_collector.topic_clustering import cluster_articles
+
+_ARTICLES = [
+    ("OpenAI、新しい推論モデル「o5」を発表", "OpenAIが推論能力を高めた新モデルo5を発表", ["OpenAI", "o5"]),
+    ("日銀、政策金利を引き上げ", "日本銀行が金融政策決定会合で利上げを決定", ["日銀", "利上げ"]),
+    ("OpenAIのo5、ベンチマークで首位", "OpenAIの新推論モデルo5が各種ベンチマークで首位", ["OpenAI", "o5"]),
+]
+
+
+def _rows():
+    return [
+        {
+            "article_id": i,
+            "collected_title": title,
+            "summary": summary,
+            "keywords": json.dumps(keywords, ensure_ascii=False),
+        }
+        for i, (title, summary, keywords) in enumerate(_ARTICLES, 1)
+    ]
+
+
+def test_cluster_articles_groups_same_story_under_leader():
+    clusters = cluster_articles(_rows())
+    assert [[row["article_id"] for row in cluster] for cluster in clusters] == [[1, 3], [2]]
+
+    # 上限を超える記事や閾値を満たさない記事は別クラスタになる
+    assert len(cluster_articles(_rows(), max_cluster_size=1)) == 3
+    assert len(cluster_articles(_rows(), threshold=1.01)) == 3
+
+
+@pytest.fixture
+def seeded_repo(tmp_path: Path) -> InfoCollectorRepository:
+    repo = InfoCollectorRepository(str(tmp_path / "ai_secretary.db"))
+    for i, (title, summary, keywords) in enumerate(_ARTICLES, 1):
+        repo.add_info(
+            CollectedInfo(
+                source_type="rss",
+                title=title,
+                url=f"https://example.com/{i}",
+                content=f"{summary}。詳細は本文を参照。",
+            )
+        )
+        repo.save_analysis(
+            article_id=i,
+            importance=0.9 - i * 0.01,
+            relevance=0.9,
+            category="テクノロジー",
+            keywords=keywords,
+            summary=summary,
+            model="test",
+            analyzed_at=datetime.now(),
+        )
+    return repo
+
+
+def test_deep_research_runs_once_per_cluster(
+    seeded_repo: InfoCollectorRepository, monkeypatch: pytest.MonkeyPatch
+):
+    class StubClient:
+        def __init__(self):
+            self.prompts = []
+
+        def generate(self, prompt, system=None, options=None):
+            self.prompts.append(prompt)
+            if "detailed_summary" not in (system or ""):
+                return json.dumps({"queries": [{"query": f"q{len(self.prompts)}"}]})
+            return json.dumps({"detailed_summary": f"統合{len(self.prompts)}", "sources": []})
+
+    class StubDDG:
+        searches = []
+
+        def __init__(self, max_results=10):
+            pass
+
+        def batch_search(self, queries, delay=1.5):
+            StubDDG.searches.extend(queries)
+            return {q: [{"title": q, "snippet": "検索結果のスニペット" * 5, "url": q}] for q in queries}
+
+    client = StubClient()
+    monkeypatch.setattr(deep_research, "OllamaClient", lambda: client)
+    monkeypatch.setattr(deep_research, "DDGSearchClient", StubDDG)
+
+    db_path = Path(seeded_repo.db_path)
+    processed = deep_research.deep_research_articles(
+        db_path=db_path, batch_size=5, min_importance=0.0, min_relevance=0.0
+    )
+
+    # 3 記事を 2 クラスタで処理: クエリ生成と統合がそれぞれ 2 回、検索も 2 回
+    assert processed == 3
+    assert len(client.prompts) == 4
+    assert len(StubDDG.searches) == 2
+    assert "OpenAIのo5、ベンチマークで首位" in client.prompts[1]
+
+    with sqlite3.connect(db_path) as conn:
+        rows = conn.execute(
+            "SELECT article_id, synthesized_content, cluster_leader_id FROM deep_research "
+            "ORDER BY article_id"
+        ).fetchall()
+    assert rows[0][1] == rows[2][1]
+    assert [(row[0], row[2]) for row in rows] == [(1, 1), (2, None), (3, 1)]
+
+    class StubReportClient:
+        def __init__(self):
+            self.calls = 0
+
+        def generate(self, prompt, system=None, options=None):
+            self.calls += 1
+            return "レポート本文" * 200
+
+    report_client = StubReportClient()
+    monkeypatch.setattr(generate_theme_report, "OllamaClient", lambda: report_client)
+    paths = generate_theme_report.generate_theme_reports(
+        db_path=db_path, output_dir=db_path.parent / "reports", article_id=1
+    )
+
+    assert len(paths) == 1
+    assert report_client.calls == 1
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT source_article_id, article_count FROM reports").fetchall() == [
+            (1, 2)
+        ]
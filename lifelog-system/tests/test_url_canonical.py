@@ -0,0 +1,35 @@
+"""Tests for article URL canonicalization."""
+
+import pytest
+
+from src.info_collector.url_canonical import canonicalize_url
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "https://example.com/news/123",
+        "HTTP://WWW.Example.com:80/news/123/",
+        "https://example.com/news/123?utm_source=rss&utm_medium=feed#top",
+        "https://example.com/news/123?fbclid=abc",
+        "https://m.example.com/news/123/amp",
+        "https://amp.example.com/news/123",
+        "https://example-com.cdn.ampproject.org/c/s/www.example.com/news/123/amp/",
+    ],
+)
+def test_variants_share_canonical_url(url: str):
+    assert canonicalize_url(url) == "https://example.com/news/123"
+
+
+def test_meaningful_query_is_kept_and_sorted():
+    assert (
+        canonicalize_url("https://example.com/article?id=2&utm_campaign=x&page=1")
+        == "https://example.com/article?id=2&page=1"
+    )
+    assert canonicalize_url("https://example.com/a.amp.html") == "https://example.com/a.html"
+
+
+def test_unsupported_urls_return_none():
+    assert canonicalize_url("") is None
+    assert canonicalize_url("mailto:someone@example.com") is None
+    assert canonicalize_url("not a url") is None
@@ -0,0 +1,124 @@
+"""Tests for the local vector index."""
+
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from src.info_collector.models import CollectedInfo  # noqa: E402
+from src.info_collector.repository import InfoCollectorRepository  # noqa: E402
+from src.vector_store import (  # noqa: E402
+    ARTICLE_KIND,
+    HashingEmbedder,
+    VectorItem,
+    VectorStore,
+    sync_collected_info,
+)
+
+_DOCS = [
+    VectorItem("article", "1", "ローカルLLMの推論を高速化する量子化の手法", "量子化"),
+    VectorItem("article", "2", "日銀の金融政策と円相場の見通し", "金融政策"),
+    VectorItem("entry", "e1", "今日はOllamaでローカルLLMの量子化モデルを試した", "日記"),
+    VectorItem("entry", "e2", "夕食は鍋。週末は買い物に行く予定", "メモ"),
+]
+
+
+@pytest.fixture
+def store(tmp_path: Path) -> VectorStore:
+    store = VectorStore(tmp_path / "index", HashingEmbedder())
+    store.upsert_many(_DOCS)
+    return store
+
+
+def test_search_ranks_semantically_close_items(store: VectorStore):
+    hits = store.search("LLMの量子化", k=2)
+    assert {hit.ref for hit in hits} == {"1", "e1"}
+    assert hits[0].score >= hits[1].score
+
+    entries = store.search("LLMの量子化", k=5, kinds=["entry"])
+    assert entries[0].ref == "e1"
+    assert {hit.kind for hit in entries} == {"entry"}
+    assert store.search("円相場", k=1)[0].title == "金融政策"
+
+
+def test_upsert_skips_unchanged_text_and_reuses_rows(store: VectorStore):
+    assert store.upsert_many(_DOCS) == 0
+    assert store.upsert("entry", "e2", "円相場が急変して為替介入の観測が出た")
+    assert len(store) == 4
+    assert store.search("為替介入", k=1, kinds=["entry"])[0].ref == "e2"
+
+    assert store.delete("article", "2")
+    assert ("article", "2") not in store
+    assert all(hit.ref != "2" for hit in store.search("金融政策", k=4))
+
+
+def test_index_persists_and_grows_beyond_initial_capacity(tmp_path: Path):
+    store = VectorStore(tmp_path / "index", HashingEmbedder(dim=32))
+    store.upsert_many(VectorItem("article", str(i), f"記事 {i} の本文") for i in range(1500))
+    store.upsert("entry", "last", "最後に追加したエントリ")
+    store.close()
+
+    reopened = VectorStore(tmp_path / "index", HashingEmbedder(dim=32))
+    assert len(reopened) == 1501
+    assert reopened.search("最後に追加したエントリ", k=1)[0].ref == "last"
+
+    with pytest.raises(ValueError):
+        VectorStore(tmp_path / "index", HashingEmbedder(dim=64))
+
+
+def test_ivf_search_matches_brute_force_on_clustered_data(tmp_path: Path):
+    rng = np.random.default_rng(0)
+    centers = rng.standard_normal((8, 16)).astype(np.float32)
+
+    class _FixedEmbedder:
+        name = "fixed-16"
+        dim = 16
+
+        def embed(self, texts):
+            vectors = np.stack([centers[int(t.split()[0])] for t in texts])
+            vectors += rng.standard_normal(vectors.shape).astype(np.float32) * 0.05
+            return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    store = VectorStore(tmp_path / "index", _FixedEmbedder())
+    store.upsert_many(VectorItem("article", str(i), f"{i % 8} item") for i in range(400))
+    assert store.build_ivf(nlist=8, nprobe=2) == 8
+    assert store.has_ivf
+
+    query = centers[3] / np.linalg.norm(centers[3])
+    approx = {hit.ref for hit in store.search_vector(query, k=10)}
+    exact = {hit.ref for hit in store.search_vector(query, k=10, exact=True)}
+    assert approx == exact
+
+    # IVF 構築後に追加した項目も既存のクラスタへ割り当てられて検索できる
+    store.upsert("entry", "new", "3 new")
+    assert "new" in {hit.ref for hit in store.search_vector(query, k=401)}
+
+
+def test_sync_collected_info_is_incremental(tmp_path: Path):
+    db_path = tmp_path / "ai_secretary.db"
+    repo = InfoCollectorRepository(str(db_path))
+    repo.add_info(
+        CollectedInfo(
+            source_type="rss",
+            title="量子化でローカルLLMを高速化",
+            url="https://example.com/quant",
+            content="4bit 量子化で推論が速くなる。",
+        )
+    )
+    store = VectorStore(tmp_path / "index", HashingEmbedder())
+
+    assert sync_collected_info(store, db_path) == 1
+    assert sync_collected_info(store, db_path) == 0
+
+    repo.add_info(
+        CollectedInfo(
+            source_type="rss",
+            title="日銀が政策金利を据え置き",
+            url="https://example.com/boj",
+            content="円相場への影響が注目される。",
+        )
+    )
+    assert sync_collected_info(store, db_path) == 1
+    assert store.search("政策金利", k=1)[0].title == "日銀が政策金利を据え置き"
+    assert sorted(store.refs(ARTICLE_KIND)) == ["1", "2"]
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+browser_history の検索・ドメイン絞り込み・集計のレイテンシを計測する.
+
+FTS5 インデックス使用時と LIKE フォールバック時を同じデータで比較する。
+
+Usage:
+    uv run python scripts/browser/bench_history_search.py
+    uv run python scripts/browser/bench_history_search.py --visits 1000000 --repeat 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# プロジェクトルートをパスに追加
+project_root = Path(__file__).resolve().parent.parent.parent
+lifelog_system_path = project_root / "lifelog-system"
+sys.path.insert(0, str(lifelog_system_path))
+
+# ruff: noqa: E402
+from src.browser_history.models import BrowserHistoryEntry
+from src.browser_history.repository import BrowserHistoryRepository
+
+_WORDS = [
+    "python",
+    "sqlite",
+    "rust",
+    "docker",
+    "kubernetes",
+    "ollama",
+    "release",
+    "issue",
+    "pull",
+    "設定",
+    "使い方",
+    "まとめ",
+    "ニュース",
+    "天気",
+    "レシピ",
+    "動画",
+    "地図",
+    "翻訳",
+    "検索",
+    "pricing",
+    "login",
+    "dashboard",
+    "settings",
+    "blog",
+    "docs",
+    "api",
+    "guide",
+    "tutorial",
+]
+
+# ホストごとのページ数（訪問はこの中から選ぶので同じ URL への再訪問が多くなる）
+_PAGES_PER_HOST = 50
+
+
+def _seed(db_path: Path, visits: int, domains: int) -> None:
+    # 実際の履歴に近づけるため、ホストごとに固定のページ群を用意して再訪問させる
+    repo = BrowserHistoryRepository(db_path)
+    rng = random.Random(0)
+    hosts = [f"site{i}.example.com" for i in range(domains - 3)] + [
+        "www.github.com",
+        "www.google.com",
+        "www.youtube.com",
+    ]
+    weights = [1 / (rank + 1) for rank in range(len(hosts))]
+    weights.reverse()
+    pages = {}
+    for host in hosts:
+        pages[host] = []
+        for page in range(_PAGES_PER_HOST):
+            words = rng.sample(_WORDS, 3)
+            pages[host].append(
+                (f"https://{host}/{words[0]}/{words[1]}/{page}", f"{words[2]} {words[0]} - {host}")
+            )
+    base = datetime(2026, 1, 1)
+
+    batch: list[BrowserHistoryEntry] = []
+    for i, host in enumerate(rng.choices(hosts, weights, k=visits)):
+        url, title = rng.choice(pages[host])
+        batch.append(
+            BrowserHistoryEntry(
+                url=url,
+                title=title,
+                visit_time=base + timedelta(seconds=30 * i),
+                brave_visit_id=i,
+            )
+        )
+        if len(batch) >= 10_000:
+            repo.add_entries(batch)
+            batch = []
+    repo.add_entries(batch)
+
+
+def _measure(fn, repeat: int) -> tuple[int, float, float]:
+    hits = len(fn())
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return hits, statistics.median(samples), samples[int(0.95 * (len(samples) - 1))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark browser history search latency.")
+    parser.add_argument("--visits", type=int, default=1_000_000)
+    parser.add_argument("--domains", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "ai_secretary.db"
+        started = time.perf_counter()
+        _seed(db_path, args.visits, args.domains)
+        print(f"seeded {args.visits} visits in {time.perf_counter() - started:.1f}s")
+        print(f"db size: {db_path.stat().st_size / 1024 / 1024:.0f} MiB")
+
+        repo = BrowserHistoryRepository(db_path)
+        cases = {
+            "search 'kubernetes'": lambda: repo.search_history("kubernetes"),
+            "search 'レシピ'": lambda: repo.search_history("レシピ"),
+            "search 'not-found-xyz'": lambda: repo.search_history("not-found-xyz"),
+            "search 'docs' @github": lambda: repo.search_history("docs", domain="github.com"),
+            "url_pattern 'ollama/'": lambda: repo.list_history(url_pattern="ollama/"),
+            "url_pattern 'site7.'": lambda: repo.list_history(url_pattern="site7."),
+            "domain github, 1 day": lambda: repo.list_history(
+                domain="github.com", start_date="2026-03-01", end_date="2026-03-01", limit=1000
+            ),
+            "domain site5, all": lambda: repo.list_history(domain="site5.example.com", limit=1000),
+            "count by domain, all": lambda: repo.count_by_domain(),
+            "count by hour, 1 day": lambda: repo.count_by_hour("2026-03-01"),
+        }
+        print(f"{'case':<28} {'mode':<5} {'hits':>5} {'p50_ms':>8} {'p95_ms':>8}")
+        for name, fn in cases.items():
+            for mode in ("fts", "like"):
+                repo._fulltext_available = mode == "fts"
+                hits, p50, p95 = _measure(fn, args.repeat)
+                print(f"{name:<28} {mode:<5} {hits:>5} {p50:>8.1f} {p95:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
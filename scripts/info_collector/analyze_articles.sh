@@ -1,6 +1,6 @@
 #!/usr/bin/env bash
 # 未分析記事をOllamaで分析
-# 例: ./scripts/info_collector/analyze_articles.sh --batch-size 30
+# 例: ./scripts/info_collector/analyze_articles.sh --batch-size 30 --concurrency 2
 
 set -euo pipefail
 
@@ -17,6 +17,7 @@ cd "$LIFELOG_DIR" || exit 1
 # デフォルト値（分析・深掘りの比率向上のため増加）
 BATCH_SIZE=20  # 50 → 20 に削減（RSS削減に合わせて負荷低減）
 DB_PATH="data/ai_secretary.db"
+CONCURRENCY=1  # OLLAMA_NUM_PARALLEL を上げている場合のみ増やす
 
 # 引数解析
 while [[ $# -gt 0 ]]; do
@@ -29,9 +30,13 @@ while [[ $# -gt 0 ]]; do
       DB_PATH="$2"
       shift 2
       ;;
+    --concurrency)
+      CONCURRENCY="$2"
+      shift 2
+      ;;
     *)
       echo "Unknown option: $1" >&2
-      echo "Usage: $0 [--batch-size N] [--db-path PATH]" >&2
+      echo "Usage: $0 [--batch-size N] [--db-path PATH] [--concurrency N]" >&2
       exit 1
       ;;
   esac
@@ -39,12 +44,13 @@ done
 
 LOG_FILE="$LOG_DIR/analyze_articles_$(date '+%Y%m%d').log"
 
-echo "[$(date '+%Y-%m-%d %H:%M:%S')] Starting article analysis (batch_size=$BATCH_SIZE)..." | tee -a "$LOG_FILE"
+echo "[$(date '+%Y-%m-%d %H:%M:%S')] Starting article analysis (batch_size=$BATCH_SIZE, concurrency=$CONCURRENCY)..." | tee -a "$LOG_FILE"
 
 # 標準出力とエラー出力の両方をログファイルに追記
 uv run python -m src.info_collector.jobs.analyze_pending \
   --db-path "$DB_PATH" \
-  --batch-size "$BATCH_SIZE" 2>&1 | tee -a "$LOG_FILE"
+  --batch-size "$BATCH_SIZE" \
+  --concurrency "$CONCURRENCY" 2>&1 | tee -a "$LOG_FILE"
 
 EXIT_CODE=${PIPESTATUS[0]}
 
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Stage1（analyze_pending）の並列度・バッチ記事数ごとのスループットをフェイク Ollama で計測する.
+
+Usage:
+    uv run python scripts/info_collector/bench_analyze_concurrency.py
+    uv run python scripts/info_collector/bench_analyze_concurrency.py \
+        --articles 40 --latency 0.5 --parallel 4 --concurrency 1,2,4,8
+    uv run python scripts/info_collector/bench_analyze_concurrency.py \
+        --concurrency 1 --articles-per-prompt 1,4,8 --prompt-token-latency 0.002
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# プロジェクトルートをパスに追加
+project_root = Path(__file__).resolve().parent.parent.parent
+lifelog_system_path = project_root / "lifelog-system"
+sys.path.insert(0, str(lifelog_system_path))
+
+# ruff: noqa: E402
+from fake_ollama_server import FakeOllamaServer
+from src.ai_secretary.llm_gateway import llm_gateway
+from src.info_collector.jobs.analyze_pending import AnalysisRunStats, analyze_pending_articles
+from src.info_collector.models import CollectedInfo
+from src.info_collector.repository import InfoCollectorRepository
+
+
+def _seed_articles(db_path: Path, count: int) -> None:
+    repo = InfoCollectorRepository(str(db_path))
+    for i in range(count):
+        repo.add_info(
+            CollectedInfo(
+                source_type="rss",
+                title=f"ベンチマーク記事 {i}",
+                url=f"https://bench.example.com/articles/{i}",
+                content="ローカル LLM の推論スループットを測るためのダミー本文。" * 20,
+                source_name="bench",
+            )
+        )
+
+
+def run(
+    articles: int,
+    concurrency_levels: list[int],
+    per_prompt_levels: list[int],
+    server: FakeOllamaServer,
+) -> None:
+    os.environ["OLLAMA_BASE_URL"] = server.base_url
+    os.environ["OLLAMA_MODEL"] = server.model
+    llm_gateway.configure(max(concurrency_levels))
+
+    print(
+        f"{'concurrency':>11} {'per_prompt':>10} {'processed':>9} {'requests':>8} "
+        f"{'wall_s':>8} {'art/min':>9} {'prompt_tok/art':>14} {'eval_tok/art':>12} "
+        f"{'p50_ms':>8} {'p95_ms':>8} {'server_peak':>11}"
+    )
+    for level in concurrency_levels:
+        for per_prompt in per_prompt_levels:
+            with tempfile.TemporaryDirectory() as tmp:
+                db_path = Path(tmp) / "ai_secretary.db"
+                _seed_articles(db_path, articles)
+                server.reset_stats()
+                stats = AnalysisRunStats()
+                analyze_pending_articles(
+                    db_path=db_path,
+                    batch_size=articles,
+                    concurrency=level,
+                    stats=stats,
+                    articles_per_prompt=per_prompt,
+                )
+                summary = stats.to_dict()
+                print(
+                    f"{level:>11} {per_prompt:>10} {summary['processed']:>9} "
+                    f"{summary['llm_requests']:>8} {summary['wall_seconds']:>8.2f} "
+                    f"{summary['articles_per_minute']:>9.1f} "
+                    f"{summary['prompt_tokens_per_article']:>14.1f} "
+                    f"{summary['eval_tokens_per_article']:>12.1f} "
+                    f"{summary['p50_latency_ms']:>8.0f} {summary['p95_latency_ms']:>8.0f} "
+                    f"{server.max_in_flight:>11}"
+                )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark Stage1 analysis concurrency.")
+    parser.add_argument("--articles", type=int, default=24)
+    parser.add_argument("--latency", type=float, default=0.3, help="フェイク応答の遅延（秒）")
+    parser.add_argument("--jitter", type=float, default=0.1)
+    parser.add_argument("--parallel", type=int, default=4, help="OLLAMA_NUM_PARALLEL 相当")
+    parser.add_argument(
+        "--prompt-token-latency",
+        type=float,
+        default=0.0,
+        help="入力トークン 1 つあたりの遅延（秒）。CPU 推論ではプロンプト評価が支配的",
+    )
+    parser.add_argument("--concurrency", type=str, default="1,2,4,8")
+    parser.add_argument("--articles-per-prompt", type=str, default="1")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    levels = [int(v) for v in args.concurrency.split(",") if v.strip()]
+    per_prompt_levels = [int(v) for v in args.articles_per_prompt.split(",") if v.strip()]
+    with FakeOllamaServer(
+        latency=args.latency,
+        jitter=args.jitter,
+        prompt_token_latency=args.prompt_token_latency,
+        parallel=args.parallel,
+    ) as server:
+        run(args.articles, levels, per_prompt_levels, server)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+collected_info の検索（FTS5 trigram と LIKE フォールバック）のレイテンシを計測する.
+
+Usage:
+    uv run python scripts/info_collector/bench_search_info.py
+    uv run python scripts/info_collector/bench_search_info.py --articles 100000 --repeat 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# プロジェクトルートをパスに追加
+project_root = Path(__file__).resolve().parent.parent.parent
+lifelog_system_path = project_root / "lifelog-system"
+sys.path.insert(0, str(lifelog_system_path))
+
+# ruff: noqa: E402
+from src.info_collector.repository import InfoCollectorRepository
+
+# トピック語は Zipf 分布で出現させ、上位の語ほど多くの記事に含まれるようにする
+_TOPICS = [
+    "生成AI",
+    "半導体",
+    "金融政策",
+    "為替",
+    "量子コンピュータ",
+    "電気自動車",
+    "サイバー攻撃",
+    "気候変動",
+    "宇宙開発",
+    "ロボット",
+    "OpenAI",
+    "Ollama",
+    "Kubernetes",
+    "Rust",
+    "SQLite",
+]
+_KANA = "アイウエオカキクケコサシスセソタチツテトナニヌネノハヒフヘホマミムメモラリルレロ"
+QUERIES = ["生成AI", "量子コンピュータ", "SQLite", "存在しない語句"]
+
+
+def _filler(rng: random.Random, count: int) -> str:
+    return "、".join(
+        "".join(rng.choice(_KANA) for _ in range(rng.randint(2, 5))) for _ in range(count)
+    )
+
+
+def _seed(db_path: Path, count: int) -> None:
+    # add_info は近似重複判定を伴うので、ベンチ用のデータは直接投入する（FTS はトリガーで同期）
+    InfoCollectorRepository(str(db_path))
+    rng = random.Random(0)
+    weights = [1 / (rank + 1) for rank in range(len(_TOPICS))]
+    base = datetime(2026, 1, 1)
+    rows = []
+    for i in range(count):
+        topic = rng.choices(_TOPICS, weights)[0]
+        rows.append(
+            (
+                rng.choice(["rss", "news", "search"]),
+                f"{topic}の{_filler(rng, 2)}",
+                f"https://bench.example.com/{i}",
+                f"https://bench.example.com/{i}",
+                f"{_filler(rng, 30)}。{topic}について{_filler(rng, 30)}と報じた。",
+                (base + timedelta(minutes=i)).isoformat(),
+            )
+        )
+    with sqlite3.connect(db_path) as conn:
+        conn.executemany(
+            """
+            INSERT INTO collected_info
+                (source_type, title, url, canonical_url, content, fetched_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            rows,
+        )
+        # 近似重複索引のバックフィルを走らせないよう、署名なしとして登録しておく
+        conn.execute("INSERT INTO article_minhash (article_id) SELECT id FROM collected_info")
+
+
+def _measure(fn, repeat: int) -> tuple[float, float]:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(0.95 * (len(samples) - 1))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark collected_info search latency.")
+    parser.add_argument("--articles", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--limit", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "ai_secretary.db"
+        started = time.perf_counter()
+        _seed(db_path, args.articles)
+        print(f"seeded {args.articles} articles in {time.perf_counter() - started:.1f}s")
+
+        repo = InfoCollectorRepository(str(db_path))
+        print(f"{'query':<20} {'mode':<5} {'hits':>5} {'p50_ms':>8} {'p95_ms':>8}")
+        for query in QUERIES:
+            for mode in ("fts", "like"):
+                repo._fulltext_available = mode == "fts"
+                hits = len(repo.search_info(query=query, limit=args.limit))
+                p50, p95 = _measure(
+                    lambda: repo.search_info(query=query, limit=args.limit), args.repeat
+                )
+                print(f"{query:<20} {mode:<5} {hits:>5} {p50:>8.1f} {p95:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+ベクトルインデックスの意味検索レイテンシを計測する（総当たりと IVF の比較）.
+
+埋め込みの計算時間を除くため、クラスタ構造を持たせた乱数の単位ベクトルを直接登録する。
+IVF の recall@k は総当たりの結果を正解として求める。
+
+Usage:
+    uv run python scripts/info_collector/bench_vector_search.py
+    uv run python scripts/info_collector/bench_vector_search.py --items 100000 --dim 768
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# プロジェクトルートをパスに追加
+project_root = Path(__file__).resolve().parent.parent.parent
+lifelog_system_path = project_root / "lifelog-system"
+sys.path.insert(0, str(lifelog_system_path))
+
+# ruff: noqa: E402
+from src.vector_store.embedders import normalize_rows
+from src.vector_store.store import VectorItem, VectorStore
+
+
+class _QueueEmbedder:
+    """事前に用意したベクトルを順に返す（テキストは無視する）。"""
+
+    def __init__(self, dim: int) -> None:
+        self.name = f"bench-{dim}"
+        self.dim = dim
+        self.pending: np.ndarray = np.zeros((0, dim), dtype=np.float32)
+
+    def embed(self, texts):
+        vectors, self.pending = self.pending[: len(texts)], self.pending[len(texts) :]
+        return vectors
+
+
+def _clustered(rng: np.random.Generator, count: int, centers: np.ndarray) -> np.ndarray:
+    labels = rng.integers(0, len(centers), count)
+    noise = rng.standard_normal((count, centers.shape[1])).astype(np.float32) * 0.08
+    return normalize_rows(centers[labels] + noise)
+
+
+def _measure(fn, repeat: int) -> tuple[float, float]:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(0.95 * (len(samples) - 1))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark vector index search latency.")
+    parser.add_argument("--items", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    centers = normalize_rows(rng.standard_normal((500, args.dim)).astype(np.float32))
+    queries = _clustered(rng, args.queries, centers)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        embedder = _QueueEmbedder(args.dim)
+        store = VectorStore(tmp, embedder)
+        started = time.perf_counter()
+        for start in range(0, args.items, 10_000):
+            count = min(10_000, args.items - start)
+            embedder.pending = _clustered(rng, count, centers)
+            store.upsert_many(
+                VectorItem("article", str(start + i), f"item {start + i}") for i in range(count)
+            )
+        print(f"indexed {args.items} x {args.dim} in {time.perf_counter() - started:.1f}s")
+
+        exact = [store.search_vector(q, args.k, exact=True) for q in queries]
+        per_query = _measure(lambda: store.search_vector(queries[0], args.k), args.queries)
+        print(f"{'mode':<16} {'p50_ms':>8} {'p95_ms':>8} {'recall':>7}")
+        print(f"{'brute-force':<16} {per_query[0]:>8.1f} {per_query[1]:>8.1f} {1.0:>7.2f}")
+
+        started = time.perf_counter()
+        nlist = store.build_ivf()
+        print(f"built IVF ({nlist} lists) in {time.perf_counter() - started:.1f}s")
+        for nprobe in (store.nprobe, store.nprobe * 2):
+            hits = [store.search_vector(q, args.k, nprobe=nprobe) for q in queries]
+            recall = statistics.mean(
+                len({h.ref for h in got} & {h.ref for h in want}) / args.k
+                for got, want in zip(hits, exact)
+            )
+            p50, p95 = _measure(
+                lambda: store.search_vector(queries[0], args.k, nprobe=nprobe), args.queries
+            )
+            print(f"{f'ivf nprobe={nprobe}':<16} {p50:>8.1f} {p95:>8.1f} {recall:>7.2f}")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
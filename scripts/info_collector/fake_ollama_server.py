@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+ベンチマーク用のフェイク Ollama サーバー.
+
+/api/generate と /api/tags だけを実装し、応答までの遅延と同時処理数
+（OLLAMA_NUM_PARALLEL 相当）を指定できる。実モデルを使わずに
+パイプラインの並列度・バッチ化の効果を測るために使う。
+
+Usage:
+    uv run python scripts/info_collector/fake_ollama_server.py --latency 0.5 --parallel 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Optional
+
+DEFAULT_RESPONSE = {
+    "theme": "ベンチマーク",
+    "keywords": ["bench", "ollama"],
+    "category": "テクノロジー",
+    "importance_score": 0.6,
+    "relevance_score": 0.5,
+    "one_line_summary": "フェイクサーバーの応答",
+    "should_deep_research": False,
+}
+
+Responder = Callable[[Dict[str, Any]], str]
+
+
+def _approx_tokens(text: str) -> int:
+    # 日本語混じりのテキストをおおまかにトークン数へ換算する（ベンチ用の目安）
+    return max(1, len(text) // 2)
+
+
+_BATCH_COUNT_RE = re.compile(r"以下の(\d+)件の記事")
+
+
+def default_responder(payload: Dict[str, Any]) -> str:
+    """テーマ抽出の応答を返す。バッチプロンプトなら件数分の JSON 配列にする。"""
+    match = _BATCH_COUNT_RE.search(str(payload.get("prompt") or ""))
+    if match:
+        items = [{"index": i, **DEFAULT_RESPONSE} for i in range(1, int(match.group(1)) + 1)]
+        return json.dumps(items, ensure_ascii=False)
+    return json.dumps(DEFAULT_RESPONSE, ensure_ascii=False)
+
+
+class FakeOllamaServer:
+    """スレッドで動くフェイク Ollama。with 文で起動・停止する。"""
+
+    def __init__(
+        self,
+        *,
+        latency: float = 0.5,
+        jitter: float = 0.0,
+        token_latency: float = 0.0,
+        prompt_token_latency: float = 0.0,
+        parallel: int = 1,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        model: str = "fake-model",
+        responder: Optional[Responder] = None,
+    ) -> None:
+        self.latency = latency
+        self.jitter = jitter
+        self.token_latency = token_latency
+        self.prompt_token_latency = prompt_token_latency
+        self.model = model
+        self.responder = responder or default_responder
+        self._slots = threading.Semaphore(max(1, parallel))
+        self._lock = threading.Lock()
+        self.request_count = 0
+        self.prompt_tokens = 0
+        self.eval_tokens = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeOllamaServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeOllamaServer":
+        return self.start()
+
+    def __exit__(self, *exc: object) -> None:
+        self.stop()
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.request_count = 0
+            self.prompt_tokens = 0
+            self.eval_tokens = 0
+            self.max_in_flight = 0
+
+    def _generate(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        prompt = f"{payload.get('system') or ''}{payload.get('prompt') or ''}"
+        text = self.responder(payload) if payload.get("prompt") else ""
+        prompt_tokens = _approx_tokens(prompt)
+        eval_tokens = _approx_tokens(text) if text else 0
+
+        with self._slots:
+            with self._lock:
+                self.in_flight += 1
+                self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            started = time.perf_counter()
+            delay = (
+                self.latency
+                + random.uniform(0, self.jitter)
+                + prompt_tokens * self.prompt_token_latency
+                + eval_tokens * self.token_latency
+            )
+            time.sleep(max(0.0, delay))
+            elapsed_ns = int((time.perf_counter() - started) * 1e9)
+            with self._lock:
+                self.in_flight -= 1
+                self.request_count += 1
+                self.prompt_tokens += prompt_tokens
+                self.eval_tokens += eval_tokens
+
+        return {
+            "model": payload.get("model") or self.model,
+            "response": text,
+            "done": True,
+            "total_duration": elapsed_ns,
+            "load_duration": 0,
+            "prompt_eval_count": prompt_tokens,
+            "prompt_eval_duration": elapsed_ns // 10,
+            "eval_count": eval_tokens,
+            "eval_duration": elapsed_ns - elapsed_ns // 10,
+        }
+
+    def _handler_class(self) -> type[BaseHTTPRequestHandler]:
+        server = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+                return
+
+            def _send_json(self, body: Dict[str, Any], status: int = 200) -> None:
+                raw = json.dumps(body, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(raw)))
+                self.end_headers()
+                self.wfile.write(raw)
+
+            def do_GET(self) -> None:  # noqa: N802
+                if self.path.rstrip("/") == "/api/tags":
+                    self._send_json({"models": [{"name": server.model}]})
+                else:
+                    self._send_json({"error": "not found"}, status=404)
+
+            def do_POST(self) -> None:  # noqa: N802
+                length = int(self.headers.get("Content-Length") or 0)
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                if self.path.rstrip("/") != "/api/generate":
+                    self._send_json({"error": "not found"}, status=404)
+                    return
+
+                final = server._generate(payload)
+                if payload.get("stream") is False:
+                    self._send_json(final)
+                    return
+
+                # stream=true は NDJSON（本文チャンク → done チャンク）で返す
+                chunks = [
+                    {"model": final["model"], "response": final["response"], "done": False},
+                    {**final, "response": ""},
+                ]
+                raw = "".join(json.dumps(c, ensure_ascii=False) + "\n" for c in chunks).encode(
+                    "utf-8"
+                )
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Content-Length", str(len(raw)))
+                self.end_headers()
+                self.wfile.write(raw)
+
+        return _Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a fake Ollama server for benchmarks.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11500)
+    parser.add_argument("--latency", type=float, default=0.5, help="1 リクエストの基本遅延（秒）")
+    parser.add_argument("--jitter", type=float, default=0.0, help="遅延に加える揺らぎの上限（秒）")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="出力トークン 1 つあたりの遅延（秒）")
+    parser.add_argument(
+        "--prompt-token-latency",
+        type=float,
+        default=0.0,
+        help="入力トークン 1 つあたりの遅延（秒）。CPU 推論のプロンプト評価を模す",
+    )
+    parser.add_argument("--parallel", type=int, default=1, help="OLLAMA_NUM_PARALLEL 相当")
+    args = parser.parse_args()
+
+    server = FakeOllamaServer(
+        latency=args.latency,
+        jitter=args.jitter,
+        token_latency=args.token_latency,
+        prompt_token_latency=args.prompt_token_latency,
+        parallel=args.parallel,
+        host=args.host,
+        port=args.port,
+    )
+    print(f"Fake Ollama listening on {server.base_url} (parallel={args.parallel})")
+    server.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
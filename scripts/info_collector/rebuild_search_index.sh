@@ -0,0 +1,11 @@
+#!/usr/bin/env bash
+# collected_info の全文検索インデックス（FTS5）を再構築
+
+set -euo pipefail
+
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+PROJECT_ROOT="$(cd "$SCRIPT_DIR/../.." && pwd)"
+LIFELOG_DIR="$PROJECT_ROOT/lifelog-system"
+
+cd "$LIFELOG_DIR" || exit 1
+uv run python -m src.info_collector.jobs.rebuild_search_index "$@"
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+閉じた期間の細切れの activity_intervals をまとめるスクリプト.
+
+前景ウィンドウやアイドル状態が変わるたびに区間が分かれ、merge_windows_logs でも短い区間が
+大量に入るため、同じアプリ・ウィンドウの区間が数秒の隙間で続く。まとめると時間別サマリーの
+集計やインデックスが小さくなり、保持期間の削除も軽くなる。
+
+Usage:
+    uv run python scripts/lifelog/compact_intervals.py
+    uv run python scripts/lifelog/compact_intervals.py --date 2026-03-01 --days 7 --gap-seconds 10
+"""
+
+import argparse
+import logging
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# プロジェクトルートをパスに追加
+project_root = Path(__file__).resolve().parent.parent.parent
+lifelog_system_path = project_root / "lifelog-system"
+sys.path.insert(0, str(lifelog_system_path))
+
+# ruff: noqa: E402
+from src.lifelog.database.db_manager import DEFAULT_COMPACTION_GAP_SECONDS, DatabaseManager
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+
+def compact_intervals(
+    db_path: Path,
+    start_date: str,
+    days: int = 1,
+    gap_seconds: float = DEFAULT_COMPACTION_GAP_SECONDS,
+) -> dict:
+    """
+    start_date から days 日分の区間をまとめる.
+
+    Args:
+        db_path: SQLiteデータベースファイル
+        start_date: 開始日（YYYY-MM-DD、ローカル時刻）
+        days: 対象日数
+        gap_seconds: 同じ区間とみなす隙間の上限（秒）
+
+    Returns:
+        DatabaseManager.compact_intervals の結果
+    """
+    start = datetime.strptime(start_date, "%Y-%m-%d")
+    with DatabaseManager(str(db_path)) as db:
+        return db.compact_intervals(start, start + timedelta(days=days), gap_seconds)
+
+
+def main() -> None:
+    """メインエントリーポイント."""
+    yesterday = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
+    parser = argparse.ArgumentParser(description="Compact fragmented activity intervals")
+    parser.add_argument(
+        "--db",
+        type=str,
+        default=str(project_root / "lifelog-system" / "data" / "lifelog.db"),
+        help="SQLite database file (default: lifelog-system/data/lifelog.db)",
+    )
+    parser.add_argument(
+        "--date",
+        type=str,
+        default=yesterday,
+        help="First day to compact, YYYY-MM-DD (default: yesterday)",
+    )
+    parser.add_argument("--days", type=int, default=1, help="Number of days (default: 1)")
+    parser.add_argument(
+        "--gap-seconds",
+        type=float,
+        default=DEFAULT_COMPACTION_GAP_SECONDS,
+        help=f"Max gap between merged intervals (default: {DEFAULT_COMPACTION_GAP_SECONDS})",
+    )
+
+    args = parser.parse_args()
+    result = compact_intervals(Path(args.db), args.date, args.days, args.gap_seconds)
+    logger.info(
+        "Compaction completed: %d -> %d rows (ratio %.3f, %d runs, %.1fs of gaps absorbed)",
+        result["rows_before"],
+        result["rows_after"],
+        result["compaction_ratio"],
+        result["merged_runs"],
+        result["absorbed_seconds"],
+    )
+
+
+if __name__ == "__main__":
+    main()
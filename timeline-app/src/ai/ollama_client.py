@@ -9,15 +9,20 @@ from __future__ import annotations
 import json
 import logging
 import re
+import time
 from dataclasses import dataclass
 from typing import Any
 
 import requests
 
 from ..config import AIConfig
+from ..workers.paths import ensure_lifelog_import_paths
 
 logger = logging.getLogger("uvicorn.error")
 
+# 優先度の高いリクエストに譲って生成をやり直す回数の上限（バックグラウンド処理の飢餓防止）
+_MAX_PREEMPTIONS = 3
+
 _TOOL_DEF = {
     "type": "function",
     "function": {
@@ -78,9 +83,51 @@ class OllamaSummaryResult:
     should_create: bool
 
 
+def _load_shared_llm_layer():
+    """lifelog-system と共有する Ollama 接続層・LLM ゲートウェイ・ブレーカーをロードする。"""
+    ensure_lifelog_import_paths()
+    from src.ai_secretary import circuit_breaker, llm_gateway, ollama_transport
+
+    return ollama_transport, llm_gateway, circuit_breaker
+
+
+def _load_stage_usage():
+    ensure_lifelog_import_paths()
+    from src.ai_secretary.model_routing import stage_usage
+
+    return stage_usage
+
+
+def configure_llm_gateway(settings: AIConfig) -> None:
+    """プロセス共有の LLM ゲートウェイに同時実行数の上限を反映する。"""
+    _, llm_gateway, _ = _load_shared_llm_layer()
+    llm_gateway.llm_gateway.configure(settings.max_concurrency)
+
+
+def get_llm_gateway_stats() -> dict[str, Any]:
+    """LLM ゲートウェイ・Ollama タイミング・ブレーカー・ステージ別利用状況をまとめて返す。"""
+    ollama_transport, llm_gateway, circuit_breaker = _load_shared_llm_layer()
+    return {
+        "gateway": llm_gateway.llm_gateway.snapshot(),
+        "timings": ollama_transport.timing_recorder.snapshot(),
+        "breakers": circuit_breaker.breaker_snapshots(),
+        "stages": _load_stage_usage().snapshot(),
+    }
+
+
 class OllamaClient:
-    def __init__(self, settings: AIConfig):
+    def __init__(self, settings: AIConfig, *, stage: str | None = None):
         self._settings = settings
+        # stage を指定すると ai.stage_models のモデルに振り分ける（hourly_summary など）
+        self._stage = stage
+        self._model = settings.model_for(stage)
+        self._stage_usage = _load_stage_usage()
+        self._transport, gateway_module, breaker_module = _load_shared_llm_layer()
+        self._gateway_module = gateway_module
+        self._gateway = gateway_module.llm_gateway
+        self._breaker = breaker_module.get_breaker(settings.ollama_base_url)
+        self._session = self._transport.get_session(settings.ollama_base_url)
+        self.last_timings = None
 
     def generate_chat_reply(
         self,
@@ -261,8 +308,9 @@ class OllamaClient:
 
     def check_health(self) -> dict:
         """Ollama の到達性と利用モデル設定を返す。"""
+        timings = self._transport.timing_recorder.snapshot()
         try:
-            response = requests.get(
+            response = self._session.get(
                 f"{self._settings.ollama_base_url.rstrip('/')}/api/tags",
                 timeout=min(self._settings.timeout_seconds, 5),
             )
@@ -273,6 +321,8 @@ class OllamaClient:
                 "base_url": self._settings.ollama_base_url,
                 "model": self._settings.ollama_model,
                 "detail": str(exc),
+                "timings": timings,
+                "circuit": self._breaker.snapshot(),
             }
 
         models = response.json().get("models", [])
@@ -284,8 +334,24 @@ class OllamaClient:
             "base_url": self._settings.ollama_base_url,
             "model": self._settings.ollama_model,
             "model_available": self._settings.ollama_model in available,
+            "stage_models": {
+                stage: {"model": model, "available": model in available}
+                for stage, model in self._settings.stage_models.items()
+            },
+            "timings": timings,
+            "circuit": self._breaker.snapshot(),
         }
 
+    def warmup(self):
+        """設定モデルを事前ロードし、keep_alive の間メモリに保持させる。"""
+        return self._transport.warmup_model(
+            self._settings.ollama_base_url,
+            self._settings.ollama_model,
+            keep_alive=self._settings.keep_alive,
+            timeout=self._settings.timeout_seconds,
+            caller="timeline_warmup",
+        )
+
     def _chat_with_tools(
         self,
         messages: list[dict[str, str]],
@@ -295,25 +361,69 @@ class OllamaClient:
         purpose: str = "chat_with_tools",
         context: dict[str, Any] | None = None,
     ) -> tuple[dict, str]:
+        """
+        /api/chat を tools 付きで呼び、(tool の arguments, 本文) を返す.
+
+        chat などの INTERACTIVE な呼び出しは非ストリーミングで 1 回だけ送る。
+        それ以外（hourly summary / daily digest などの worker）はストリーミングで受け取り、
+        より優先度の高いリクエストが実行枠を待っていれば接続を閉じて枠を譲り、
+        空いてから最初からやり直す（_MAX_PREEMPTIONS 回まで）。
+
+        譲るかどうかはストリームの行を受け取るたびに判定するので、Ollama がまだ 1 行も
+        返していないプロンプト評価中は譲れない（長いプロンプトはその分だけ待たせる）。
+        """
         self._log_llm_call(caller=caller, purpose=purpose, context=context)
+        priority = self._gateway_module.resolve_priority(caller)
+        stream = priority > self._gateway_module.LLMPriority.INTERACTIVE
         payload = {
-            "model": self._settings.ollama_model,
-            "stream": False,
+            "model": self._model,
+            "stream": stream,
             "messages": messages,
             "tools": tools,
+            "keep_alive": self._settings.keep_alive,
         }
+        post_kwargs: dict[str, Any] = {"stream": True} if stream else {}
 
+        if not self._breaker.allow_request():
+            raise OllamaClientError("Ollama が連続して応答しなかったため、復旧するまで呼び出しを停止しています")
+        stage = self._stage or "default"
+        started = time.perf_counter()
+        body: dict | None = None
         try:
-            response = requests.post(
-                f"{self._settings.ollama_base_url.rstrip('/')}/api/chat",
-                json=payload,
-                timeout=self._settings.timeout_seconds,
-            )
-            response.raise_for_status()
+            for attempt in range(_MAX_PREEMPTIONS + 1):
+                with self._gateway.slot(caller, priority) as ticket:
+                    response = self._session.post(
+                        f"{self._settings.ollama_base_url.rstrip('/')}/api/chat",
+                        json=payload,
+                        timeout=self._settings.timeout_seconds,
+                        **post_kwargs,
+                    )
+                    response.raise_for_status()
+                    if not stream:
+                        body = response.json()
+                        break
+                    body = self._read_chat_stream(
+                        response, ticket, allow_yield=attempt < _MAX_PREEMPTIONS
+                    )
+                if body is not None:
+                    break
+                logger.info(
+                    "Yielded Ollama slot to higher-priority request (caller=%s, attempt=%d)",
+                    caller,
+                    attempt + 1,
+                )
         except requests.RequestException as exc:
+            self._breaker.record_exception(exc)
+            self._stage_usage.record(
+                stage, self._model, (time.perf_counter() - started) * 1000, ok=False
+            )
             raise OllamaClientError(f"Ollama への接続に失敗しました: {exc}") from exc
+        self._breaker.record_success()
+        self._stage_usage.record(stage, self._model, (time.perf_counter() - started) * 1000)
 
-        message = response.json().get("message", {})
+        body = body or {}
+        self.last_timings = self._transport.record_timings(body, model=self._model, caller=caller)
+        message = body.get("message", {})
         tool_calls = message.get("tool_calls") or []
         if tool_calls:
             args = tool_calls[0].get("function", {}).get("arguments", {})
@@ -323,6 +433,44 @@ class OllamaClient:
         parsed = self._parse_tool_markup(fallback_content)
         return parsed, fallback_content
 
+    def _read_chat_stream(self, response, ticket, *, allow_yield: bool) -> dict | None:
+        """
+        /api/chat のストリームを非ストリーミング時と同じ形の応答にまとめる.
+
+        allow_yield のとき、より優先度の高いリクエストが待っていれば接続を閉じて None を返す
+        （接続を閉じると Ollama 側の生成も打ち切られる）。
+        """
+        content_parts: list[str] = []
+        tool_calls: list[dict] = []
+        final: dict = {}
+        try:
+            for line in response.iter_lines(decode_unicode=True):
+                if allow_yield and self._gateway.should_yield(ticket):
+                    ticket.preempted = True
+                    return None
+                if not line:
+                    continue
+                try:
+                    chunk = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                message = chunk.get("message") or {}
+                content_parts.append(str(message.get("content") or ""))
+                tool_calls.extend(message.get("tool_calls") or [])
+                if chunk.get("done"):
+                    final = chunk
+                    break
+        finally:
+            response.close()
+        return {
+            **final,
+            "message": {
+                "role": "assistant",
+                "content": "".join(content_parts),
+                "tool_calls": tool_calls,
+            },
+        }
+
     def _log_llm_call(
         self,
         *,
@@ -334,7 +482,7 @@ class OllamaClient:
             "event": "llm_call",
             "caller": caller,
             "purpose": purpose,
-            "model": self._settings.ollama_model,
+            "model": self._model,
             "base_url": self._settings.ollama_base_url,
         }
         if context:
@@ -21,11 +21,29 @@ class ServerConfig(BaseModel):
     port: int = 8100
 
 
+# ステージ別モデルを指定できる LLM ステージ（lifelog-system の model_routing と対応）
+LLM_STAGES = ("triage", "hourly_summary", "deep_research", "report")
+
+
 class AIConfig(BaseModel):
     ollama_base_url: str = "http://127.0.0.1:11434"
     ollama_model: str = "qwen2.5:7b"
     timeout_seconds: int = 60
     personality: str = ""
+    keep_alive: str = "30m"
+    max_concurrency: int = 1
+    warmup_on_start: bool = True
+    # ステージ → モデル名。未指定のステージは ollama_model を使う
+    stage_models: dict[str, str] = {}
+
+    def model_for(self, stage: str | None) -> str:
+        if stage and self.stage_models.get(stage):
+            return self.stage_models[stage]
+        return self.ollama_model
+
+    def stage_model_env(self) -> dict[str, str]:
+        """lifelog-system のジョブへ渡す OLLAMA_MODEL_<STAGE> 環境変数。"""
+        return {f"OLLAMA_MODEL_{stage.upper()}": self.model_for(stage) for stage in LLM_STAGES}
 
 
 class WorkspaceDirsConfig(BaseModel):
@@ -80,16 +98,31 @@ class LifelogConfig(BaseModel):
     activity_sync_seconds: int = 15
     info_db_path: str = "lifelog-system/data/ai_secretary.db"
     browser_import_seconds: int = 3600
+    # 取り込むブラウザ（空なら登録済みの全ブラウザ）と同時に読み取るプロファイル数
+    browser_sources: list[str] = []
+    browser_import_workers: int = 4
     info_config_dir: str = "lifelog-system/config/info_collector"
     info_collect_seconds: int = 3600
     info_limit: int = 10
     info_use_ollama: bool = True
     analysis_pipeline_seconds: int = 1800
+    # pipeline_jobs を並行処理する worker 数、リース期限、試行回数、再試行までの基準秒数
+    pipeline_workers: int = 2
+    pipeline_lease_seconds: int = 1800
+    pipeline_max_attempts: int = 3
+    pipeline_retry_seconds: int = 300
     analyze_batch_size: int = 20
+    analyze_concurrency: int = 1
+    analyze_articles_per_prompt: int = 1
     deep_batch_size: int = 3
     deep_limit: int = 5
     deep_min_importance: float = 0.5
     deep_min_relevance: float = 0.5
+    # 深掘りの検索結果のうち、元記事との TF-IDF 類似度が閾値以上の上位件数だけを統合に使う
+    deep_result_min_score: float = 0.05
+    deep_result_top_k: int = 8
+    # 深掘り候補をまとめるトピック類似度の閾値（1.0 を超えるとクラスタリングしない）
+    deep_cluster_threshold: float = 0.35
     theme_min_articles: int = 1
     theme_skip_existing: bool = True
     report_output_dir: str = "/mnt/c/YellowMable/00_Raw"
@@ -103,6 +136,14 @@ class LifelogConfig(BaseModel):
     windows_foreground_merge_seconds: int = 900
 
 
+class VectorConfig(BaseModel):
+    enabled: bool = False
+    # "hashing"（外部依存なし）または "ollama"（/api/embed）
+    embedder: str = "hashing"
+    embed_model: str = "nomic-embed-text"
+    index_dir: str = "lifelog-system/data/vector_index"
+
+
 class AppConfig(BaseModel):
     environment: str = "dev"
     server: ServerConfig = ServerConfig()
@@ -111,6 +152,7 @@ class AppConfig(BaseModel):
     vrm: VrmConfig = VrmConfig()
     behavior: BehaviorConfig = BehaviorConfig()
     lifelog: LifelogConfig = LifelogConfig()
+    vector: VectorConfig = VectorConfig()
 
 
 def load_config(path: Optional[Path] = None) -> AppConfig:
@@ -135,6 +177,7 @@ def load_config(path: Optional[Path] = None) -> AppConfig:
         vrm=VrmConfig(**raw.get("vrm", {})),
         behavior=BehaviorConfig(**raw.get("behavior", {})),
         lifelog=LifelogConfig(**raw.get("lifelog", {})),
+        vector=VectorConfig(**raw.get("vector", {})),
     )
 
 
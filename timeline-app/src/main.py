@@ -12,6 +12,8 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse
 from fastapi.staticfiles import StaticFiles
 
+from .ai.ollama_client import configure_llm_gateway
+from .config import config
 from .routers import (
     ai_control,
     health,
@@ -22,6 +24,7 @@ from .routers import (
     settings,
     news,
     reviews,
+    search,
     vrm,
 )
 from .workers.activity_worker import activity_worker
@@ -35,6 +38,7 @@ logging.getLogger("primp").setLevel(logging.WARNING)
 @asynccontextmanager
 async def lifespan(_: FastAPI):
     """FastAPI 起動時に scheduler を開始し、終了時に停止する。"""
+    configure_llm_gateway(config.ai)
     start_scheduler()
     await activity_worker.start()
     try:
@@ -64,6 +68,7 @@ app.include_router(chat.router, prefix="/api")
 app.include_router(settings.router, prefix="/api")
 app.include_router(news.router, prefix="/api")
 app.include_router(reviews.router, prefix="/api")
+app.include_router(search.router, prefix="/api")
 app.include_router(vrm.router, prefix="/api")
 
 if _FRONTEND_DIR.exists():
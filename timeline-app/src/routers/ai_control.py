@@ -5,6 +5,7 @@ import logging
 
 from fastapi import APIRouter
 
+from ..ai.ollama_client import get_llm_gateway_stats
 from ..services.ai_control import ai_control_service
 from ..workers.analysis_pipeline_worker import analysis_pipeline_worker
 from ..workers.daily_digest_worker import daily_digest_worker
@@ -25,6 +26,12 @@ async def ai_status():
     return ai_control_service.get_status()
 
 
+@router.get("/ai/llm/stats")
+async def ai_llm_stats():
+    """LLM ゲートウェイの caller 別待ち時間・実行時間と Ollama タイミングを返す。"""
+    return get_llm_gateway_stats()
+
+
 @router.post("/ai/pause")
 async def ai_pause():
     result = ai_control_service.pause()
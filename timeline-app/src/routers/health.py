@@ -4,6 +4,7 @@ from ..ai.ollama_client import OllamaClient
 from ..config import config
 from ..routers.workspace import peek_workspace
 from ..services.ai_control import ai_control_service
+from ..services.vector_index import vector_index_service
 from ..workers.activity_worker import activity_worker
 from ..workers.analysis_pipeline_worker import analysis_pipeline_worker
 from ..workers.browser_worker import browser_worker
@@ -42,4 +43,5 @@ async def health():
             "daily_digest": daily_digest_worker.get_status(),
             "windows_foreground": windows_foreground_worker.get_status(),
         },
+        "vector_index": vector_index_service.get_status(),
     }
@@ -3,8 +3,6 @@
 from __future__ import annotations
 
 import logging
-import os
-from datetime import UTC, datetime
 from pathlib import Path
 from typing import Literal
 
@@ -12,9 +10,7 @@ from fastapi import APIRouter, BackgroundTasks
 from pydantic import BaseModel
 
 from ..config import config, to_local_path
-from ..models.entry import Entry, EntryMeta, EntrySource, EntryStatus, EntryType
-from ..routers.workspace import resolve_workspace_path
-from ..storage.persistence import persist_entry
+from ..workers.analysis_pipeline_worker import analysis_pipeline_worker
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -56,14 +52,6 @@ def _load_repo():
     return InfoCollectorRepository(str(db_path))
 
 
-def _load_pipeline_functions():
-    from src.info_collector.jobs.analyze_pending import analyze_pending_articles
-    from src.info_collector.jobs.deep_research import deep_research_articles
-    from src.info_collector.jobs.generate_theme_report import generate_theme_reports
-
-    return analyze_pending_articles, deep_research_articles, generate_theme_reports
-
-
 # ---------------------------------------------------------------------------
 # スキーマ
 # ---------------------------------------------------------------------------
@@ -101,42 +89,6 @@ def _analysis_payload(state: dict | None) -> dict | None:
     }
 
 
-def _persist_report_entries(report_rows: list[dict]) -> list[str]:
-    workspace_path = resolve_workspace_path()
-    if not workspace_path:
-        logger.warning("workspace 未設定のため report entry の timeline 反映をスキップ")
-        return []
-
-    entry_ids: list[str] = []
-    for report in report_rows:
-        body = str(report.get("content") or "").strip()
-        if not body:
-            continue
-        created_at = datetime.fromisoformat(str(report["created_at"]))
-        if created_at.tzinfo is None:
-            created_at = created_at.astimezone(UTC)
-        else:
-            created_at = created_at.astimezone(UTC)
-        entry_id = f"report-{report['id']}"
-        persist_entry(
-            workspace_path,
-            Entry(
-                id=entry_id,
-                type=EntryType.news,
-                title=str(report.get("title") or "レポート")[:120],
-                summary=f"{str(report.get('category') or 'report').strip()} レポート",
-                content=body,
-                timestamp=created_at,
-                status=EntryStatus.active,
-                source=EntrySource.imported,
-                workspace_path=workspace_path,
-                meta=EntryMeta(source_path="lifelog-system/data/ai_secretary.db"),
-            ),
-        )
-        entry_ids.append(entry_id)
-    return entry_ids
-
-
 # ---------------------------------------------------------------------------
 # エンドポイント
 # ---------------------------------------------------------------------------
@@ -207,7 +159,7 @@ async def generate_report(article_id: int, background_tasks: BackgroundTasks) ->
     - sentiment=positive / report_status=requested を記録
     - requested/running/done は多重実行しない
     - article_analysis に importance=1.0 を設定（Stage1 閾値を通過させる）
-    - バックグラウンドで Stage2（深掘り）+ Stage3（レポート生成）を実行
+    - Stage2（深掘り）を高優先度の pipeline_jobs として登録し、完了後に Stage3（レポート生成）が続く
     """
     repo = _load_repo()
     queued, state = repo.request_report(article_id)
@@ -221,57 +173,7 @@ async def generate_report(article_id: int, background_tasks: BackgroundTasks) ->
     repo.force_article_for_research(article_id)
     last_report_id = repo.get_latest_report_id()
 
-    background_tasks.add_task(_run_pipeline_for_article, article_id, last_report_id)
+    analysis_pipeline_worker.request_report(repo, article_id, last_report_id)
+    background_tasks.add_task(analysis_pipeline_worker.drain_once)
 
     return {"status": "queued", "article_id": article_id, "feedback": _feedback_payload(state)}
-
-
-def _run_pipeline_for_article(article_id: int, last_report_id: int) -> None:
-    """Stage2+Stage3 をバックグラウンドで実行する。"""
-    db_path = _resolve_path(config.lifelog.info_db_path)
-    output_dir = _resolve_path(config.lifelog.report_output_dir)
-
-    # lifelog-system のパイプライン関数をロード
-    repo = _load_repo()  # sys.path を通す
-    repo.mark_report_running(article_id)
-    _, deep_research_articles, generate_theme_reports = _load_pipeline_functions()
-
-    previous_env = {
-        "OLLAMA_BASE_URL": os.environ.get("OLLAMA_BASE_URL"),
-        "OLLAMA_MODEL": os.environ.get("OLLAMA_MODEL"),
-        "OLLAMA_TIMEOUT": os.environ.get("OLLAMA_TIMEOUT"),
-        "YELLOWMABLE_DIR": os.environ.get("YELLOWMABLE_DIR"),
-    }
-    os.environ["OLLAMA_BASE_URL"] = config.ai.ollama_base_url
-    os.environ["OLLAMA_MODEL"] = config.ai.ollama_model
-    os.environ["OLLAMA_TIMEOUT"] = str(config.ai.timeout_seconds)
-    os.environ["YELLOWMABLE_DIR"] = str(output_dir.parent)
-
-    try:
-        # force_article_for_research で importance=1.0 にしてあるので
-        # min_importance=0.0 で確実にこの記事が Stage2 対象になる
-        deep_research_articles(
-            db_path=db_path,
-            batch_size=1,
-            min_importance=0.0,
-            min_relevance=0.0,
-        )
-        generate_theme_reports(
-            db_path=db_path,
-            output_dir=output_dir,
-            min_articles=1,
-            skip_existing=False,
-        )
-        new_reports = repo.get_reports_after_id(last_report_id)
-        entry_ids = _persist_report_entries(new_reports)
-        repo.mark_report_done(article_id, entry_ids[0] if entry_ids else None)
-        logger.info("Report generation completed for article_id=%d", article_id)
-    except Exception:
-        repo.mark_report_failed(article_id)
-        logger.exception("Report generation failed for article_id=%d", article_id)
-    finally:
-        for key, value in previous_env.items():
-            if value is None:
-                os.environ.pop(key, None)
-            else:
-                os.environ[key] = value
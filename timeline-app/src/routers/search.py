@@ -0,0 +1,26 @@
+"""記事・タイムラインエントリの意味検索 API。"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Literal
+
+from fastapi import APIRouter, HTTPException, Query
+
+from ..config import config
+from ..services.vector_index import vector_index_service
+
+router = APIRouter()
+
+
+@router.get("/search/semantic")
+async def semantic_search(
+    q: str = Query(..., min_length=1, description="検索文"),
+    limit: int = Query(default=10, ge=1, le=100),
+    kind: Literal["article", "entry"] | None = Query(default=None, description="対象の種類"),
+):
+    if not config.vector.enabled:
+        raise HTTPException(status_code=503, detail="vector index is disabled")
+    kinds = [kind] if kind else None
+    hits = await asyncio.to_thread(vector_index_service.search, q, limit, kinds)
+    return {"query": q, "results": hits}
@@ -2,8 +2,8 @@
 
 from __future__ import annotations
 
-import contextlib
 import sqlite3
+from contextlib import AbstractContextManager
 from dataclasses import dataclass
 from datetime import UTC, date, datetime, time, timedelta
 from pathlib import Path
@@ -13,6 +13,7 @@ from ..config import config, to_local_path
 from ..models.entry import Entry, EntryMeta, EntrySource, EntryType
 from ..storage.daily_reader import read_daily_entries
 from ..storage.persistence import persist_entry
+from ..workers.paths import ensure_lifelog_import_paths
 
 HOURLY_SUFFIXES = ("activity", "browser", "news", "search", "system")
 SOURCE_LIMIT_PER_GROUP = 5
@@ -44,16 +45,33 @@ def get_sqlite_localtime_modifier() -> str:
     return f"{total_minutes:+d} minutes"
 
 
+def hour_range_ms(target_date: date, hour: int) -> tuple[int, int]:
+    """ローカル時刻の target_date hour 時台 [hour, hour+1) を UTC epoch ミリ秒で返す。"""
+    start = datetime.combine(target_date, time(hour=hour)).astimezone()
+    end = (start + timedelta(hours=1)).astimezone()
+    return round(start.timestamp() * 1000), round(end.timestamp() * 1000)
+
+
+def open_source_connection(ctx: ImportContext) -> AbstractContextManager[sqlite3.Connection]:
+    """
+    lifelog.db と ai_secretary.db を読み取り専用で ATTACH した 1 本の接続を開く。
+    テーブル名は ATTACH した DB から解決されるので、build_entries_for_hour の
+    lifelog_conn / info_conn の両方にそのまま渡せる。
+    """
+    ensure_lifelog_import_paths()
+    from src.common.analytics import analytics_connection
+
+    return analytics_connection(ctx.lifelog_db, ctx.info_db)
+
+
 def import_range(ctx: ImportContext, start_date: date, end_date: date) -> int:
     total = 0
-    client = OllamaClient(config.ai)
-    with contextlib.closing(sqlite3.connect(ctx.lifelog_db)) as lifelog_conn, contextlib.closing(
-        sqlite3.connect(ctx.info_db)
-    ) as info_conn:
+    client = OllamaClient(config.ai, stage="hourly_summary")
+    with open_source_connection(ctx) as conn:
         current = start_date
         while current <= end_date:
             for hour in range(24):
-                for entry in build_entries_for_hour(lifelog_conn, info_conn, current, hour, client):
+                for entry in build_entries_for_hour(conn, conn, current, hour, client):
                     persist_entry(str(ctx.workspace_path), entry)
                     total += 1
             current += timedelta(days=1)
@@ -66,13 +84,11 @@ def import_missing_hours(ctx: ImportContext, start_hour: datetime, end_hour: dat
 
     start_hour = _normalize_hour(start_hour)
     end_hour = _normalize_hour(end_hour)
-    client = OllamaClient(config.ai)
+    client = OllamaClient(config.ai, stage="hourly_summary")
     total = 0
     cached_ids: dict[date, set[str]] = {}
 
-    with contextlib.closing(sqlite3.connect(ctx.lifelog_db)) as lifelog_conn, contextlib.closing(
-        sqlite3.connect(ctx.info_db)
-    ) as info_conn:
+    with open_source_connection(ctx) as conn:
         current = start_hour
         while current <= end_hour:
             target_date = current.date()
@@ -93,8 +109,8 @@ def import_missing_hours(ctx: ImportContext, start_hour: datetime, end_hour: dat
             ]
             if missing_suffixes:
                 for entry in build_entries_for_hour(
-                    lifelog_conn,
-                    info_conn,
+                    conn,
+                    conn,
                     target_date,
                     hour,
                     client,
@@ -151,18 +167,12 @@ def summarize_activity(
 ) -> Entry | None:
     rows = conn.execute(
         """
-        SELECT COALESCE(process_name, '') AS process_name
-        FROM unified_timeline
-        WHERE date(datetime(timestamp, ?)) = ?
-          AND strftime('%H', datetime(timestamp, ?)) = ?
-          AND event_source = 'activity'
+        SELECT COALESCE(a.process_name, '') AS process_name
+        FROM activity_intervals i
+        JOIN apps a ON a.app_id = i.app_id
+        WHERE i.start_ts_ms >= ? AND i.start_ts_ms < ?
         """,
-        (
-            get_sqlite_localtime_modifier(),
-            target_date.isoformat(),
-            get_sqlite_localtime_modifier(),
-            f"{hour:02d}",
-        ),
+        hour_range_ms(target_date, hour),
     ).fetchall()
 
     if not rows:
@@ -219,16 +229,10 @@ def summarize_system(
                COALESCE(process_name, '') AS process_name,
                COALESCE(message, '') AS message
         FROM system_events
-        WHERE date(datetime(event_timestamp, ?)) = ?
-          AND strftime('%H', datetime(event_timestamp, ?)) = ?
-        ORDER BY event_timestamp DESC
+        WHERE event_timestamp_ms >= ? AND event_timestamp_ms < ?
+        ORDER BY event_timestamp_ms DESC
         """,
-        (
-            get_sqlite_localtime_modifier(),
-            target_date.isoformat(),
-            get_sqlite_localtime_modifier(),
-            f"{hour:02d}",
-        ),
+        hour_range_ms(target_date, hour),
     ).fetchall()
     important_rows = filter_important_system_rows(rows)
     if not important_rows:
@@ -288,23 +292,17 @@ def summarize_browser(
         """
         SELECT COALESCE(title, ''), url
         FROM browser_history
-        WHERE date(datetime(visit_time, ?)) = ?
-          AND strftime('%H', datetime(visit_time, ?)) = ?
+        WHERE visit_time_ms >= ? AND visit_time_ms < ?
           AND COALESCE(title, '') <> ''
           AND COALESCE(title, '') NOT LIKE '%しばらくお待ちください%'
           AND COALESCE(title, '') NOT LIKE '%Just a moment%'
           AND COALESCE(title, '') NOT LIKE '%Attention Required%'
           AND COALESCE(title, '') NOT LIKE '%Checking your browser%'
         GROUP BY url
-        ORDER BY MAX(visit_time) DESC
+        ORDER BY MAX(visit_time_ms) DESC
         LIMIT 12
         """,
-        (
-            get_sqlite_localtime_modifier(),
-            target_date.isoformat(),
-            get_sqlite_localtime_modifier(),
-            f"{hour:02d}",
-        ),
+        hour_range_ms(target_date, hour),
     ).fetchall()
     if not rows:
         return None
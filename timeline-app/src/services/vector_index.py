@@ -0,0 +1,134 @@
+"""
+記事・タイムラインエントリの意味検索インデックス（lifelog-system の vector_store）を管理する。
+
+entry の保存は呼び出し元を待たせないよう、キューに積んでバックグラウンドスレッドで埋め込む。
+vector.enabled が false、または NumPy が入っていない環境ではすべて何もしない。
+"""
+
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+from typing import Any
+
+from ..config import config
+from ..models.entry import Entry
+from ..workers.paths import ensure_lifelog_import_paths, resolve_lifelog_path
+
+logger = logging.getLogger(__name__)
+
+# バックグラウンドスレッドが 1 回にまとめて埋め込む entry 数
+_ENTRY_BATCH = 32
+
+
+class VectorIndexService:
+    def __init__(self) -> None:
+        self._store: Any = None
+        self._unavailable = False
+        self._open_lock = threading.Lock()
+        self._queue: queue.Queue[Entry] = queue.Queue()
+        self._thread: threading.Thread | None = None
+
+    def _open(self) -> Any:
+        """VectorStore を初回アクセス時に開く。使えない場合は None。"""
+        if not config.vector.enabled or self._unavailable:
+            return None
+        with self._open_lock:
+            if self._store is not None or self._unavailable:
+                return self._store
+            ensure_lifelog_import_paths()
+            try:
+                from src.vector_store import HashingEmbedder, OllamaEmbedder, VectorStore
+            except ImportError as exc:
+                logger.warning("Vector index disabled (%s); install the 'vector' extra", exc)
+                self._unavailable = True
+                return None
+            if config.vector.embedder == "ollama":
+                embedder = OllamaEmbedder(
+                    base_url=config.ai.ollama_base_url, model=config.vector.embed_model
+                )
+            else:
+                embedder = HashingEmbedder()
+            try:
+                self._store = VectorStore(resolve_lifelog_path(config.vector.index_dir), embedder)
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Failed to open vector index: %s", exc)
+                self._unavailable = True
+            return self._store
+
+    def enqueue_entry(self, entry: Entry) -> None:
+        """entry を埋め込み待ちキューに積む（保存処理から呼ぶ）。"""
+        if not config.vector.enabled or self._unavailable:
+            return
+        self._queue.put(entry)
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._drain_loop, name="vector-index", daemon=True
+            )
+            self._thread.start()
+
+    def _drain_loop(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < _ENTRY_BATCH:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self.index_entries(batch)
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Failed to index %d entries: %s", len(batch), exc)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def index_entries(self, entries: list[Entry]) -> int:
+        store = self._open()
+        if store is None:
+            return 0
+        from src.vector_store import ENTRY_KIND, VectorItem, compose_text
+
+        # 同じ entry が続けて保存された場合は最後の内容だけを埋め込む
+        latest = {entry.id: entry for entry in entries}
+        return store.upsert_many(
+            VectorItem(
+                ENTRY_KIND,
+                entry.id,
+                compose_text(entry.title, entry.summary, entry.content),
+                entry.title or entry.summary,
+            )
+            for entry in latest.values()
+        )
+
+    def wait_idle(self) -> None:
+        """キューに積まれた entry の埋め込みが終わるまで待つ。"""
+        self._queue.join()
+
+    def sync_articles(self) -> int:
+        """collected_info の新着記事を取り込む（情報収集のたびに呼ぶ）。"""
+        store = self._open()
+        if store is None:
+            return 0
+        from src.vector_store import sync_collected_info
+
+        return sync_collected_info(store, resolve_lifelog_path(config.lifelog.info_db_path))
+
+    def search(self, query: str, limit: int = 10, kinds: list[str] | None = None) -> list[dict]:
+        store = self._open()
+        if store is None:
+            return []
+        return [hit.to_dict() for hit in store.search(query, k=limit, kinds=kinds)]
+
+    def get_status(self) -> dict[str, Any]:
+        store = self._store
+        return {
+            "enabled": config.vector.enabled and not self._unavailable,
+            "items": len(store) if store is not None else 0,
+            "ivf": store.has_ivf if store is not None else False,
+            "pending": self._queue.qsize(),
+        }
+
+
+vector_index_service = VectorIndexService()
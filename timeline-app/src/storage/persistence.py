@@ -4,11 +4,13 @@ from __future__ import annotations
 
 from ..config import config
 from ..models.entry import Entry
+from ..services.vector_index import vector_index_service
 from .daily_writer import upsert_entry_in_daily
 from .entry_writer import write_entry
 
 
 def persist_entry(workspace_path: str, entry: Entry) -> None:
-    """entry を articles/ と daily/ の両方へ保存する。"""
+    """entry を articles/ と daily/ の両方へ保存し、意味検索インデックスの更新を予約する。"""
     write_entry(workspace_path, config.workspace.dirs.articles, entry)
     upsert_entry_in_daily(workspace_path, config.workspace.dirs.daily, entry)
+    vector_index_service.enqueue_entry(entry)
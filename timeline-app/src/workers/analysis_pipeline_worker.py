@@ -3,14 +3,24 @@
 from __future__ import annotations
 
 import asyncio
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from datetime import UTC, datetime
+import logging
 import os
+import socket
+import threading
+import time
 from pathlib import Path
 from typing import Any
 
 from ..config import config, to_local_path
+from ..models.entry import Entry, EntryMeta, EntrySource, EntryStatus, EntryType
+from ..routers.workspace import resolve_workspace_path
 from ..services.ai_control import ai_control_service
+from ..storage.persistence import persist_entry
+
+logger = logging.getLogger(__name__)
 
 
 def _repo_root() -> Path:
@@ -59,6 +69,73 @@ def _load_pipeline_functions():
     )
 
 
+def _load_cluster_articles():
+    from src.info_collector.topic_clustering import cluster_articles
+
+    return cluster_articles
+
+
+def _ollama_circuit_open() -> bool:
+    """共有ブレーカーが開いていれば True（LLM ステージを丸ごとスキップする判定用）。"""
+    from src.ai_secretary.circuit_breaker import get_breaker
+
+    return get_breaker(config.ai.ollama_base_url).is_open()
+
+
+# pipeline_jobs の stage 名と優先度
+STAGE_TRIAGE = "triage"
+STAGE_DEEP_RESEARCH = "deep_research"
+STAGE_REPORT = "report"
+PRIORITY_SCHEDULED = 0
+PRIORITY_ON_DEMAND = 100
+
+# 空きの worker が他の worker の後続ジョブ登録を待つ間隔（秒）
+_IDLE_POLL_SECONDS = 0.5
+# 完了・失敗したジョブを残す日数
+_FINISHED_JOB_RETENTION_DAYS = 7
+
+
+class _JobDeferred(Exception):
+    """停止指示やサーキットブレーカーでジョブを実行できず、後で再開する場合に送出する。"""
+
+
+def persist_report_entries(report_rows: list[dict]) -> list[str]:
+    """reports の行を timeline の news entry として保存し、entry ID を返す。"""
+    workspace_path = resolve_workspace_path()
+    if not workspace_path:
+        logger.warning("workspace 未設定のため report entry の timeline 反映をスキップ")
+        return []
+
+    entry_ids: list[str] = []
+    for report in report_rows:
+        body = str(report.get("content") or "").strip()
+        if not body:
+            continue
+        created_at = datetime.fromisoformat(str(report["created_at"]))
+        if created_at.tzinfo is None:
+            created_at = created_at.astimezone(UTC)
+        else:
+            created_at = created_at.astimezone(UTC)
+        entry_id = f"report-{report['id']}"
+        persist_entry(
+            workspace_path,
+            Entry(
+                id=entry_id,
+                type=EntryType.news,
+                title=str(report.get("title") or "レポート")[:120],
+                summary=f"{str(report.get('category') or 'report').strip()} レポート",
+                content=body,
+                timestamp=created_at,
+                status=EntryStatus.active,
+                source=EntrySource.imported,
+                workspace_path=workspace_path,
+                meta=EntryMeta(source_path="lifelog-system/data/ai_secretary.db"),
+            ),
+        )
+        entry_ids.append(entry_id)
+    return entry_ids
+
+
 @dataclass
 class AnalysisPipelineWorkerStatus:
     running: bool = False
@@ -69,12 +146,37 @@ class AnalysisPipelineWorkerStatus:
     last_reports_generated: int = 0
     last_run_at: str | None = None
     last_error: str | None = None
+    last_skipped_reason: str | None = None
+    last_stage_seconds: dict[str, float] = field(default_factory=dict)
+    jobs: dict[str, int] = field(default_factory=dict)
+    pending_articles: int | None = None
+
+
+@dataclass
+class _PipelineContext:
+    repo: Any
+    db_path: Path
+    output_dir: Path
+    analyze_pending_articles: Any
+    deep_research_articles: Any
+    generate_theme_reports: Any
 
 
 class AnalysisPipelineWorker:
+    """
+    pipeline_jobs を worker プールで処理する。
+
+    定期実行（sync_once）は Stage1 のジョブと既存の深掘り候補のジョブを登録してから
+    キューを空にする。Stage1 が終わると新しい候補の深掘りジョブが追加され、深掘りが
+    終わるとレポートジョブが追加されるので、Stage1 と別記事の Stage2/3 が並行して進む。
+    ジョブは DB に残るため、停止・クラッシュで中断した分は次回の実行で再開する。
+    """
+
     def __init__(self) -> None:
         self._status = AnalysisPipelineWorkerStatus()
         self._lock = asyncio.Lock()
+        self._status_lock = threading.Lock()
+        self._active_jobs = 0
 
     def get_status(self) -> dict[str, Any]:
         return {
@@ -86,6 +188,10 @@ class AnalysisPipelineWorker:
             "last_reports_generated": self._status.last_reports_generated,
             "last_run_at": self._status.last_run_at,
             "last_error": self._status.last_error,
+            "last_skipped_reason": self._status.last_skipped_reason,
+            "last_stage_seconds": dict(self._status.last_stage_seconds),
+            "jobs": dict(self._status.jobs),
+            "pending_articles": self._status.pending_articles,
         }
 
     async def sync_once(self) -> int:
@@ -96,11 +202,38 @@ class AnalysisPipelineWorker:
             finally:
                 self._status.running = False
 
-    def _sync_once_blocking(self) -> int:
+    async def drain_once(self) -> int:
+        """新しいジョブを計画せず、登録済みのジョブだけを処理する（オンデマンド要求用）。"""
+        async with self._lock:
+            self._status.running = True
+            try:
+                return await asyncio.to_thread(self._sync_once_blocking, False)
+            finally:
+                self._status.running = False
+
+    def request_report(self, repo: Any, article_id: int, last_report_id: int) -> int:
+        """
+        記事のオンデマンドレポート生成を高優先度の深掘りジョブとして登録する.
+        レポートが完了すると last_report_id より新しいレポートを timeline に反映する。
+        """
+        return repo.enqueue_job(
+            STAGE_DEEP_RESEARCH,
+            article_id,
+            payload={
+                "article_ids": [article_id],
+                "report_request": {"last_report_id": last_report_id},
+            },
+            priority=PRIORITY_ON_DEMAND,
+            max_attempts=config.lifelog.pipeline_max_attempts,
+        )
+
+    def _sync_once_blocking(self, plan: bool = True) -> int:
         self._status.last_error = None
+        self._status.last_skipped_reason = None
         self._status.last_analyzed = 0
         self._status.last_deep_researched = 0
         self._status.last_reports_generated = 0
+        self._status.last_stage_seconds = {}
 
         if ai_control_service.is_paused():
             return 0
@@ -121,68 +254,51 @@ class AnalysisPipelineWorker:
             "OLLAMA_BASE_URL": os.environ.get("OLLAMA_BASE_URL"),
             "OLLAMA_MODEL": os.environ.get("OLLAMA_MODEL"),
             "OLLAMA_TIMEOUT": os.environ.get("OLLAMA_TIMEOUT"),
+            "OLLAMA_KEEP_ALIVE": os.environ.get("OLLAMA_KEEP_ALIVE"),
             "YELLOWMABLE_DIR": os.environ.get("YELLOWMABLE_DIR"),
             "TIMELINE_LLM_CALLER": os.environ.get("TIMELINE_LLM_CALLER"),
             "TIMELINE_LLM_PURPOSE": os.environ.get("TIMELINE_LLM_PURPOSE"),
         }
+        stage_model_env = config.ai.stage_model_env()
+        previous_env.update({key: os.environ.get(key) for key in stage_model_env})
 
         os.environ["OLLAMA_BASE_URL"] = config.ai.ollama_base_url
         os.environ["OLLAMA_MODEL"] = config.ai.ollama_model
         os.environ["OLLAMA_TIMEOUT"] = str(config.ai.timeout_seconds)
+        os.environ["OLLAMA_KEEP_ALIVE"] = config.ai.keep_alive
         os.environ["YELLOWMABLE_DIR"] = str(output_dir.parent)
         os.environ["TIMELINE_LLM_CALLER"] = "analysis_pipeline_worker"
         os.environ["TIMELINE_LLM_PURPOSE"] = "info_pipeline"
+        os.environ.update(stage_model_env)
 
         try:
-            # Stage1: 未分析記事を全件処理
-            analyzed = analyze_pending_articles(
-                db_path=db_path,
-                batch_size=config.lifelog.analyze_batch_size,
-            )
-            self._status.last_analyzed = int(analyzed)
-
-            if ai_control_service.is_paused():
+            if _ollama_circuit_open():
+                # Ollama 停止中は各記事でタイムアウトを待たず、次回スケジュールに回す
+                self._status.last_skipped_reason = "ollama_circuit_open"
                 self._status.last_run_at = datetime.now(UTC).isoformat()
-                return int(analyzed)
+                return 0
 
-            # Stage2+3: 重要度上位 deep_limit 件を記事単位でループ
-            repo = InfoCollectorRepository(str(db_path))
-            candidates = repo.fetch_deep_research_targets(
-                min_importance=config.lifelog.deep_min_importance,
-                min_relevance=config.lifelog.deep_min_relevance,
-                limit=config.lifelog.deep_limit,
+            ctx = _PipelineContext(
+                repo=InfoCollectorRepository(str(db_path)),
+                db_path=db_path,
+                output_dir=output_dir,
+                analyze_pending_articles=analyze_pending_articles,
+                deep_research_articles=deep_research_articles,
+                generate_theme_reports=generate_theme_reports,
             )
-
-            deep_count = 0
-            report_count = 0
-
-            for row in candidates:
-                article_id = row["article_id"]
-
-                # Stage2: この記事を深掘り
-                deep_count += int(
-                    deep_research_articles(
-                        db_path=db_path,
-                        article_id=article_id,
-                    )
-                )
-
-                # Stage3: この記事のレポートを生成
-                reports = generate_theme_reports(
-                    db_path=db_path,
-                    output_dir=output_dir,
-                    min_articles=config.lifelog.theme_min_articles,
-                    skip_existing=config.lifelog.theme_skip_existing,
-                    article_id=article_id,
+            if plan:
+                ctx.repo.purge_finished_jobs(older_than_days=_FINISHED_JOB_RETENTION_DAYS)
+                ctx.repo.enqueue_job(
+                    STAGE_TRIAGE,
+                    priority=PRIORITY_SCHEDULED,
+                    max_attempts=config.lifelog.pipeline_max_attempts,
                 )
-                report_count += len(reports)
+                # 分析済みの候補は Stage1 の完了を待たずに深掘りを始める
+                self._plan_deep_research(ctx)
 
-                if ai_control_service.is_paused():
-                    break
-
-        except Exception as exc:  # noqa: BLE001
-            self._status.last_error = str(exc)
-            raise
+            self._drain(ctx)
+            self._status.jobs = ctx.repo.count_jobs_by_state()
+            self._status.pending_articles = ctx.repo.count_unanalyzed()
         finally:
             for key, value in previous_env.items():
                 if value is None:
@@ -190,10 +306,204 @@ class AnalysisPipelineWorker:
                 else:
                     os.environ[key] = value
 
-        self._status.last_deep_researched = deep_count
-        self._status.last_reports_generated = report_count
         self._status.last_run_at = datetime.now(UTC).isoformat()
-        return int(analyzed) + deep_count + report_count
+        return (
+            self._status.last_analyzed
+            + self._status.last_deep_researched
+            + self._status.last_reports_generated
+        )
+
+    def _plan_deep_research(self, ctx: _PipelineContext) -> int:
+        """深掘り候補をトピックでクラスタにまとめ、クラスタごとに深掘りジョブを登録する。"""
+        active = ctx.repo.fetch_active_jobs(STAGE_DEEP_RESEARCH)
+        queued_ids = {
+            article_id for job in active for article_id in job["payload"].get("article_ids", [])
+        }
+        # キューに積む定期の深掘りは deep_limit クラスタまで（処理が追いつかなくても溜めすぎない）
+        slots = config.lifelog.deep_limit - sum(
+            1 for job in active if job["priority"] < PRIORITY_ON_DEMAND
+        )
+        if slots <= 0:
+            return 0
+
+        candidates = [
+            row
+            for row in ctx.repo.fetch_deep_research_targets(
+                min_importance=config.lifelog.deep_min_importance,
+                min_relevance=config.lifelog.deep_min_relevance,
+                limit=config.lifelog.deep_limit,
+            )
+            if row["article_id"] not in queued_ids
+        ]
+        clusters = _load_cluster_articles()(
+            candidates, threshold=config.lifelog.deep_cluster_threshold
+        )
+        for cluster in clusters[:slots]:
+            # 先頭が代表記事。検索と統合は 1 回だけ行い、結果を全記事に保存する
+            article_ids = [row["article_id"] for row in cluster]
+            ctx.repo.enqueue_job(
+                STAGE_DEEP_RESEARCH,
+                article_ids[0],
+                payload={"article_ids": article_ids},
+                priority=PRIORITY_SCHEDULED,
+                max_attempts=config.lifelog.pipeline_max_attempts,
+            )
+        return len(clusters[:slots])
+
+    def _drain(self, ctx: _PipelineContext) -> None:
+        workers = max(1, config.lifelog.pipeline_workers)
+        if workers == 1:
+            self._work_loop(ctx, 0)
+            return
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="analysis-job") as pool:
+            for future in [pool.submit(self._work_loop, ctx, index) for index in range(workers)]:
+                future.result()
+
+    def _work_loop(self, ctx: _PipelineContext, index: int) -> None:
+        worker_id = f"{socket.gethostname()}:{os.getpid()}:{index}"
+        while not ai_control_service.is_paused() and not _ollama_circuit_open():
+            job = ctx.repo.claim_job(worker_id, lease_seconds=config.lifelog.pipeline_lease_seconds)
+            if job is None:
+                # 実行中のジョブが後続ジョブを登録するかもしれないので、全員が空くまで待つ
+                with self._status_lock:
+                    idle = self._active_jobs == 0
+                if idle:
+                    return
+                time.sleep(_IDLE_POLL_SECONDS)
+                continue
+
+            with self._status_lock:
+                self._active_jobs += 1
+            try:
+                self._run_job(ctx, job)
+                if not ctx.repo.complete_job(job["id"], worker_id):
+                    logger.warning(
+                        "pipeline job %s (%s) finished after its lease was lost",
+                        job["id"],
+                        job["stage"],
+                    )
+            except _JobDeferred:
+                ctx.repo.release_job(job["id"], worker_id)
+            except Exception as exc:  # noqa: BLE001
+                logger.exception("pipeline job %s (%s) failed", job["id"], job["stage"])
+                self._status.last_error = str(exc)
+                state = ctx.repo.fail_job(
+                    job["id"],
+                    worker_id,
+                    str(exc),
+                    retry_delay_seconds=config.lifelog.pipeline_retry_seconds,
+                )
+                report_request = job["payload"].get("report_request")
+                if state == "failed" and report_request is not None:
+                    ctx.repo.mark_report_failed(job["article_id"])
+            finally:
+                with self._status_lock:
+                    self._active_jobs -= 1
+
+    def _run_job(self, ctx: _PipelineContext, job: dict[str, Any]) -> None:
+        handler = {
+            STAGE_TRIAGE: self._run_triage,
+            STAGE_DEEP_RESEARCH: self._run_deep_research,
+            STAGE_REPORT: self._run_report,
+        }.get(job["stage"])
+        if handler is None:
+            raise ValueError(f"unknown pipeline stage: {job['stage']}")
+        if job["priority"] < PRIORITY_ON_DEMAND:
+            handler(ctx, job)
+            return
+
+        from src.ai_secretary.llm_gateway import LLMPriority, llm_request_context
+
+        # ユーザー操作起点なので scheduled worker より先に LLM 枠を確保する
+        with llm_request_context(caller="news_generate_report", priority=LLMPriority.ON_DEMAND):
+            handler(ctx, job)
+
+    def _run_triage(self, ctx: _PipelineContext, job: dict[str, Any]) -> None:
+        # Stage1: 未分析記事を全件処理
+        stage_started = time.perf_counter()
+        analyzed = ctx.analyze_pending_articles(
+            db_path=ctx.db_path,
+            batch_size=config.lifelog.analyze_batch_size,
+            concurrency=config.lifelog.analyze_concurrency,
+            articles_per_prompt=config.lifelog.analyze_articles_per_prompt,
+        )
+        self._add_count("last_analyzed", int(analyzed))
+        self._record_stage("triage", stage_started)
+        self._plan_deep_research(ctx)
+
+    def _run_deep_research(self, ctx: _PipelineContext, job: dict[str, Any]) -> None:
+        # Stage2: クラスタを深掘り（payload の先頭が代表記事）
+        article_ids = job["payload"].get("article_ids") or [job["article_id"]]
+        report_request = job["payload"].get("report_request")
+        if report_request is not None:
+            ctx.repo.mark_report_running(job["article_id"])
+
+        stage_started = time.perf_counter()
+        researched = int(
+            ctx.deep_research_articles(
+                db_path=ctx.db_path,
+                article_ids=article_ids,
+                result_min_score=config.lifelog.deep_result_min_score,
+                result_top_k=config.lifelog.deep_result_top_k,
+            )
+        )
+        self._record_stage("deep_research", stage_started)
+        if not researched:
+            if _ollama_circuit_open():
+                raise _JobDeferred()
+            if report_request is not None:
+                raise RuntimeError(f"deep research produced no result for {job['article_id']}")
+            return
+
+        self._add_count("last_deep_researched", researched)
+        # 実行中にオンデマンド要求がマージされていれば引き継ぐ
+        latest = ctx.repo.get_job(job["id"]) or job
+        report_request = latest["payload"].get("report_request")
+        # Stage3 は同じ優先度で続けて登録する
+        payload = {"report_request": report_request} if report_request is not None else {}
+        ctx.repo.enqueue_job(
+            STAGE_REPORT,
+            job["article_id"],
+            payload=payload,
+            priority=latest["priority"],
+            max_attempts=config.lifelog.pipeline_max_attempts,
+        )
+
+    def _run_report(self, ctx: _PipelineContext, job: dict[str, Any]) -> None:
+        # Stage3: クラスタのレポートを代表記事で 1 件生成
+        report_request = job["payload"].get("report_request")
+        stage_started = time.perf_counter()
+        reports = ctx.generate_theme_reports(
+            db_path=ctx.db_path,
+            output_dir=ctx.output_dir,
+            min_articles=1 if report_request else config.lifelog.theme_min_articles,
+            skip_existing=False if report_request else config.lifelog.theme_skip_existing,
+            article_id=job["article_id"],
+        )
+        self._record_stage("report", stage_started)
+        if not reports and _ollama_circuit_open():
+            # 生成途中でブレーカーが開いた。完了扱いにせず復旧後に再実行する
+            raise _JobDeferred()
+        self._add_count("last_reports_generated", len(reports))
+
+        if report_request is not None:
+            # 並行して走る定期ジョブのレポートを拾わないよう、この記事の分に絞る
+            new_reports = ctx.repo.get_reports_after_id(
+                report_request["last_report_id"], source_article_id=job["article_id"]
+            )
+            entry_ids = persist_report_entries(new_reports)
+            ctx.repo.mark_report_done(job["article_id"], entry_ids[0] if entry_ids else None)
+            logger.info("Report generation completed for article_id=%d", job["article_id"])
+
+    def _add_count(self, name: str, value: int) -> None:
+        with self._status_lock:
+            setattr(self._status, name, getattr(self._status, name) + value)
+
+    def _record_stage(self, stage: str, started: float) -> None:
+        elapsed = time.perf_counter() - started
+        with self._status_lock:
+            seconds = self._status.last_stage_seconds
+            seconds[stage] = round(seconds.get(stage, 0.0) + elapsed, 3)
 
 
 analysis_pipeline_worker = AnalysisPipelineWorker()
@@ -4,7 +4,7 @@ from __future__ import annotations
 
 import asyncio
 import contextlib
-from dataclasses import asdict, dataclass
+from dataclasses import asdict, dataclass, field
 from datetime import UTC, datetime
 from pathlib import Path
 import sqlite3
@@ -17,10 +17,10 @@ from .paths import ensure_lifelog_import_paths, get_latest_sqlite_id, resolve_li
 def _load_browser_classes():
     ensure_lifelog_import_paths()
 
-    from browser_history.importer import BraveHistoryImporter
+    from browser_history.importer import BrowserHistoryImporter
     from browser_history.repository import BrowserHistoryRepository
 
-    return BraveHistoryImporter, BrowserHistoryRepository
+    return BrowserHistoryImporter, BrowserHistoryRepository
 
 
 @dataclass
@@ -31,6 +31,8 @@ class BrowserWorkerStatus:
     last_visit_time: str | None = None
     last_sync_at: str | None = None
     last_import_count: int = 0
+    # プロファイル（browser/profile）ごとの直近のインポート件数
+    last_import_counts: dict[str, int] = field(default_factory=dict)
     last_error: str | None = None
 
 
@@ -54,30 +56,35 @@ class BrowserWorker:
         self._status.last_error = None
         info_db_path = resolve_lifelog_path(config.lifelog.info_db_path)
         self._status.db_path = str(info_db_path)
-        BraveHistoryImporter, BrowserHistoryRepository = _load_browser_classes()
+        BrowserHistoryImporter, BrowserHistoryRepository = _load_browser_classes()
         repository = BrowserHistoryRepository(info_db_path)
 
         if self._status.last_history_id is None:
             self._status.last_history_id = get_latest_sqlite_id(info_db_path, "browser_history")
             self._status.last_visit_time = self._get_latest_visit_time(info_db_path)
 
-        importer = BraveHistoryImporter(repository)
-        imported_count = 0
-        try:
-            since = (
-                datetime.fromisoformat(self._status.last_visit_time)
-                if self._status.last_visit_time
-                else None
+        # 基準時刻はプロファイルごとに browser_import_log から引く
+        importer = BrowserHistoryImporter(
+            repository, max_workers=config.lifelog.browser_import_workers
+        )
+        counts = importer.import_all(browsers=config.lifelog.browser_sources or None)
+        if not counts:
+            self._status.last_error = "Browser history file not found"
+        elif importer.errors:
+            self._status.last_error = "; ".join(
+                f"{key}: {error}" for key, error in sorted(importer.errors.items())
             )
-            imported_count = importer.import_history(since=since)
-        except FileNotFoundError as exc:
-            self._status.last_error = str(exc)
-        self._status.last_import_count = imported_count
+        self._status.last_import_counts = counts
+        self._status.last_import_count = sum(counts.values())
 
         rows = self._fetch_new_history_rows(info_db_path, self._status.last_history_id or 0)
         for row in rows:
             self._status.last_history_id = int(row["id"])
-            self._status.last_visit_time = str(row["visit_time"])
+            # 各プロファイルは古い訪問から順に書き込むが、プロファイルは並列に取り込むので
+            # id 順の最後が最新とは限らない
+            self._status.last_visit_time = max(
+                self._status.last_visit_time or "", str(row["visit_time"])
+            )
 
         self._status.last_sync_at = datetime.now(UTC).isoformat()
         return 0
@@ -85,7 +92,7 @@ class BrowserWorker:
     def _get_latest_visit_time(self, db_path: Path) -> str | None:
         with contextlib.closing(sqlite3.connect(db_path)) as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT visit_time FROM browser_history ORDER BY id DESC LIMIT 1")
+            cursor.execute("SELECT MAX(visit_time) FROM browser_history")
             row = cursor.fetchone()
             return str(row[0]) if row and row[0] else None
 
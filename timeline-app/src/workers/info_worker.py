@@ -14,6 +14,7 @@ import subprocess
 from typing import Any
 
 from ..config import config
+from ..services.vector_index import vector_index_service
 from .paths import get_latest_sqlite_id, resolve_lifelog_path
 
 
@@ -62,6 +63,11 @@ class InfoWorker:
             summary["error"] = str(exc)
         self._status.last_collect_summary = summary
 
+        try:
+            summary["vector_indexed"] = vector_index_service.sync_articles()
+        except Exception as exc:  # noqa: BLE001
+            summary["vector_error"] = str(exc)
+
         rows = self._fetch_new_info_rows(db_path, self._status.last_info_id or 0)
         if not rows:
             self._status.last_sync_at = datetime.now(UTC).isoformat()
@@ -2,13 +2,16 @@
 
 from __future__ import annotations
 
+import asyncio
 from collections.abc import Mapping
 import logging
 from typing import Any
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
+from ..ai.ollama_client import OllamaClient
 from ..config import config
+from ..services.ai_control import ai_control_service
 from ..services.worker_control_service import worker_control_service
 from .activity_worker import activity_worker
 from .analysis_pipeline_worker import analysis_pipeline_worker
@@ -37,6 +40,13 @@ def _guarded(worker_id: str, fn: Any):
     return _inner
 
 
+async def _warmup_ollama() -> None:
+    """起動直後にモデルをロードし、最初の chat / pipeline 呼び出しのコールドロードを避ける。"""
+    if ai_control_service.is_paused():
+        return
+    await asyncio.to_thread(OllamaClient(config.ai).warmup)
+
+
 def get_scheduler() -> AsyncIOScheduler:
     """AsyncIOScheduler のシングルトンを返す。"""
     global _scheduler
@@ -132,6 +142,15 @@ def start_scheduler() -> AsyncIOScheduler:
         replace_existing=True,
         misfire_grace_time=config.lifelog.windows_foreground_merge_seconds,
     )
+    if config.ai.warmup_on_start:
+        # run_date 省略の date trigger は起動直後に 1 回だけ実行される
+        scheduler.add_job(
+            _warmup_ollama,
+            "date",
+            id="ollama-warmup",
+            replace_existing=True,
+            misfire_grace_time=None,
+        )
     if not scheduler.running:
         scheduler.start()
     return scheduler
@@ -3,6 +3,7 @@
 
 - tmp_workspace: 一時ディレクトリを workspace として設定し、テスト後にリセットする
 - client: tmp_workspace を使う FastAPI TestClient
+- Ollama ブレーカーはテストごとに閉じた状態へ戻す
 """
 
 import pytest
@@ -12,6 +13,19 @@ from src.main import app
 from src.routers import workspace as workspace_module
 
 
+@pytest.fixture(autouse=True)
+def _reset_ollama_circuit_breakers():
+    """接続失敗を扱うテストの影響でプロセス共有のブレーカーが開いたままにならないようにする。"""
+    from src.workers.paths import ensure_lifelog_import_paths
+
+    ensure_lifelog_import_paths()
+    from src.ai_secretary.circuit_breaker import reset_breakers
+
+    reset_breakers()
+    yield
+    reset_breakers()
+
+
 @pytest.fixture()
 def tmp_workspace(tmp_path):
     """一時ディレクトリを workspace として設定する。"""
@@ -1,5 +1,8 @@
 """OllamaClient のユニットテスト（requests をモック）"""
 
+import json
+import threading
+import time
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -59,7 +62,7 @@ class TestGenerateChatReply:
         client = make_client()
         messages = [{"role": "user", "content": "今日は病院に行った"}]
         with patch(
-            "requests.post",
+            "requests.Session.post",
             return_value=mock_tool_response(
                 "お疲れ様でした。",
                 [{"type": "event", "title": "病院受診", "content": "病院に行った"}],
@@ -73,14 +76,14 @@ class TestGenerateChatReply:
 
     def test_empty_candidates_ok(self):
         client = make_client()
-        with patch("requests.post", return_value=mock_tool_response("了解です。", [])):
+        with patch("requests.Session.post", return_value=mock_tool_response("了解です。", [])):
             result = client.generate_chat_reply([{"role": "user", "content": "こんにちは"}])
         assert result.reply == "了解です。"
         assert result.entry_candidates == []
 
     def test_fallback_to_content_when_no_tool_calls(self):
         client = make_client()
-        with patch("requests.post", return_value=mock_plain_response("テキスト応答です。")):
+        with patch("requests.Session.post", return_value=mock_plain_response("テキスト応答です。")):
             result = client.generate_chat_reply([{"role": "user", "content": "x"}])
         assert result.reply == "テキスト応答です。"
         assert result.entry_candidates == []
@@ -105,7 +108,7 @@ class TestGenerateChatReply:
                 ],
             }
         }
-        with patch("requests.post", return_value=resp):
+        with patch("requests.Session.post", return_value=resp):
             result = client.generate_chat_reply([{"role": "user", "content": "x"}])
         assert result.entry_candidates == []
 
@@ -113,13 +116,26 @@ class TestGenerateChatReply:
         import requests as req
 
         client = make_client()
-        with patch("requests.post", side_effect=req.RequestException("timeout")):
+        with patch("requests.Session.post", side_effect=req.RequestException("timeout")):
             with pytest.raises(OllamaClientError, match="Ollama への接続に失敗"):
                 client.generate_chat_reply([{"role": "user", "content": "x"}])
 
+    def test_open_circuit_fails_fast_without_calling_ollama(self):
+        import requests as req
+
+        client = make_client()
+        client._breaker.failure_threshold = 2
+        with patch("requests.Session.post", side_effect=req.ConnectionError("refused")) as post:
+            for _ in range(2):
+                with pytest.raises(OllamaClientError, match="接続に失敗"):
+                    client.generate_chat_reply([{"role": "user", "content": "x"}])
+            with pytest.raises(OllamaClientError, match="呼び出しを停止"):
+                client.generate_chat_reply([{"role": "user", "content": "x"}])
+        assert post.call_count == 2
+
     def test_empty_reply_raises_client_error(self):
         client = make_client()
-        with patch("requests.post", return_value=mock_tool_response("", [])):
+        with patch("requests.Session.post", return_value=mock_tool_response("", [])):
             with pytest.raises(OllamaClientError, match="reply がありません"):
                 client.generate_chat_reply([{"role": "user", "content": "x"}])
 
@@ -132,7 +148,7 @@ class TestGenerateChatReply:
             captured["payload"] = json
             return mock_tool_response("ok")
 
-        with patch("requests.post", side_effect=capture):
+        with patch("requests.Session.post", side_effect=capture):
             client.generate_chat_reply(messages)
 
         sent_messages = captured["payload"]["messages"]
@@ -150,7 +166,7 @@ class TestGenerateChatReply:
             captured["payload"] = json
             return mock_tool_response("ok")
 
-        with patch("requests.post", side_effect=capture):
+        with patch("requests.Session.post", side_effect=capture):
             client.generate_chat_reply([{"role": "user", "content": "test"}])
 
         assert "tools" in captured["payload"]
@@ -159,7 +175,7 @@ class TestGenerateChatReply:
     def test_logs_model_and_caller(self):
         client = make_client()
         with (
-            patch("requests.post", return_value=mock_tool_response("了解です。")),
+            patch("requests.Session.post", return_value=mock_tool_response("了解です。")),
             patch("src.ai.ollama_client.logger.info") as log_info,
         ):
             client.generate_chat_reply(
@@ -178,7 +194,7 @@ class TestGenerateChatReply:
     def test_logs_direct_chat_with_tools_call(self):
         client = make_client()
         with (
-            patch("requests.post", return_value=mock_tool_response("了解です。")),
+            patch("requests.Session.post", return_value=mock_tool_response("了解です。")),
             patch("src.ai.ollama_client.logger.info") as log_info,
         ):
             client._chat_with_tools(
@@ -200,6 +216,156 @@ class TestGenerateChatReply:
         assert '"purpose": "daily_digest"' in payload
         assert '"target_date": "2026-03-18"' in payload
 
+    def test_keep_alive_is_sent_and_timings_recorded(self):
+        client = make_client(keep_alive="2h")
+        resp = mock_tool_response("了解です。")
+        resp.json.return_value.update(
+            {
+                "total_duration": 900_000_000,
+                "load_duration": 10_000_000,
+                "prompt_eval_count": 80,
+                "prompt_eval_duration": 200_000_000,
+                "eval_count": 30,
+                "eval_duration": 600_000_000,
+            }
+        )
+        with patch("requests.Session.post", return_value=resp) as post:
+            client.generate_chat_reply([{"role": "user", "content": "x"}])
+
+        assert post.call_args.kwargs["json"]["keep_alive"] == "2h"
+        assert client.last_timings is not None
+        assert client.last_timings.caller == "chat_api"
+        assert client.last_timings.load_ms == 10.0
+        assert client.last_timings.cold_start is False
+
+
+class TestStageRouting:
+    def test_stage_client_uses_stage_model_and_records_usage(self):
+        from src.ai.ollama_client import get_llm_gateway_stats
+
+        settings = AIConfig(
+            ollama_base_url="http://localhost:11434",
+            ollama_model="test-model",
+            timeout_seconds=10,
+            stage_models={"hourly_summary": "small-model"},
+        )
+        client = OllamaClient(settings, stage="hourly_summary")
+        resp = MagicMock()
+        resp.raise_for_status.return_value = None
+        # バックグラウンドの worker はストリーミングで受け取る
+        resp.iter_lines.return_value = [
+            json.dumps(
+                {
+                    "message": {
+                        "content": "",
+                        "tool_calls": [
+                            {
+                                "function": {
+                                    "arguments": {
+                                        "title": "t",
+                                        "content": "c",
+                                        "should_create": True,
+                                    }
+                                }
+                            }
+                        ],
+                    },
+                    "done": False,
+                }
+            ),
+            json.dumps({"message": {"content": ""}, "done": True}),
+        ]
+        with patch("requests.Session.post", return_value=resp) as post:
+            result = client.summarize_import_source(
+                source_type="activity", target_label="10:00", raw_summary="x"
+            )
+
+        assert (result.title, result.content) == ("t", "c")
+        assert post.call_args.kwargs["json"]["model"] == "small-model"
+        assert post.call_args.kwargs["stream"] is True
+        assert settings.model_for("report") == "test-model"
+        stages = get_llm_gateway_stats()["stages"]
+        assert stages["hourly_summary"]["models"].get("small-model", 0) >= 1
+
+
+class TestGatewayPreemption:
+    def test_background_summary_yields_to_waiting_chat(self):
+        from src.ai.ollama_client import _load_shared_llm_layer
+
+        _, gateway_module, _ = _load_shared_llm_layer()
+        gateway = gateway_module.LLMGateway(max_concurrency=1)
+        client = make_client()
+        client._gateway = gateway
+        chat_done = threading.Event()
+
+        def _chat() -> None:
+            with gateway.slot("chat_api"):
+                chat_done.set()
+
+        chat_thread = threading.Thread(target=_chat)
+
+        def _interrupted_lines(decode_unicode=True):
+            yield json.dumps({"message": {"content": "途中"}, "done": False})
+            chat_thread.start()
+            deadline = time.monotonic() + 2
+            while not gateway.snapshot()["waiting"] and time.monotonic() < deadline:
+                time.sleep(0.01)
+            yield json.dumps({"message": {"content": "続き"}, "done": False})
+
+        first = MagicMock()
+        first.raise_for_status.return_value = None
+        first.iter_lines.side_effect = _interrupted_lines
+        second = MagicMock()
+        second.raise_for_status.return_value = None
+        second.iter_lines.return_value = [
+            json.dumps(
+                {
+                    "message": {
+                        "content": "",
+                        "tool_calls": [
+                            {
+                                "function": {
+                                    "arguments": {
+                                        "title": "t",
+                                        "content": "要約",
+                                        "should_create": True,
+                                    }
+                                }
+                            }
+                        ],
+                    },
+                    "done": True,
+                }
+            )
+        ]
+        with patch("requests.Session.post", side_effect=[first, second]) as post:
+            result = client.summarize_import_source(
+                source_type="activity", target_label="10:00", raw_summary="x"
+            )
+
+        chat_thread.join(timeout=2)
+        assert chat_done.is_set()
+        assert result.content == "要約"
+        assert post.call_count == 2
+        assert first.close.called
+        assert gateway.snapshot()["callers"]["hourly_summary_worker"]["preemptions"] == 1
+
+
+class TestWarmup:
+    def test_warmup_loads_configured_model(self):
+        client = make_client(keep_alive="1h")
+        resp = MagicMock()
+        resp.raise_for_status.return_value = None
+        resp.json.return_value = {"done": True, "total_duration": 1, "load_duration": 1}
+        with patch("requests.Session.post", return_value=resp) as post:
+            timings = client.warmup()
+
+        assert post.call_args.args[0] == "http://localhost:11434/api/generate"
+        assert post.call_args.kwargs["json"]["model"] == "test-model"
+        assert post.call_args.kwargs["json"]["keep_alive"] == "1h"
+        assert timings is not None
+        assert timings.caller == "timeline_warmup"
+
 
 class TestCheckHealth:
     def _tags_response(self, model_names: list[str]) -> MagicMock:
@@ -210,15 +376,18 @@ class TestCheckHealth:
 
     def test_reachable_model_available(self):
         client = make_client()
-        with patch("requests.get", return_value=self._tags_response(["test-model", "other"])):
+        with patch(
+            "requests.Session.get", return_value=self._tags_response(["test-model", "other"])
+        ):
             result = client.check_health()
         assert result["reachable"] is True
         assert result["model_available"] is True
         assert result["model"] == "test-model"
+        assert "callers" in result["timings"]
 
     def test_reachable_model_not_available(self):
         client = make_client()
-        with patch("requests.get", return_value=self._tags_response(["other-model"])):
+        with patch("requests.Session.get", return_value=self._tags_response(["other-model"])):
             result = client.check_health()
         assert result["reachable"] is True
         assert result["model_available"] is False
@@ -227,7 +396,7 @@ class TestCheckHealth:
         import requests as req
 
         client = make_client()
-        with patch("requests.get", side_effect=req.RequestException("connection refused")):
+        with patch("requests.Session.get", side_effect=req.RequestException("connection refused")):
             result = client.check_health()
         assert result["reachable"] is False
         assert "detail" in result
@@ -3,9 +3,15 @@
 from __future__ import annotations
 
 import os
+import sqlite3
+from datetime import datetime
 
 from src.config import config
-from src.workers.analysis_pipeline_worker import AnalysisPipelineWorker
+from src.workers.analysis_pipeline_worker import AnalysisPipelineWorker, _load_pipeline_functions
+
+
+def _repository_class():
+    return _load_pipeline_functions()[3]
 
 
 def test_sync_once_blocking_skips_when_ai_paused(monkeypatch):
@@ -50,35 +56,42 @@ def test_sync_once_blocking_runs_pipeline_and_updates_status(monkeypatch, tmp_pa
     monkeypatch.setattr(config.ai, "ollama_base_url", "http://127.0.0.1:11436")
     monkeypatch.setattr(config.ai, "ollama_model", "qwen3.5:9b")
     monkeypatch.setattr(config.ai, "timeout_seconds", 77)
+    monkeypatch.setattr(config.ai, "stage_models", {"triage": "qwen2.5:1.5b"})
     monkeypatch.setattr(config.lifelog, "analyze_batch_size", 12)
+    monkeypatch.setattr(config.lifelog, "analyze_concurrency", 3)
+    monkeypatch.setattr(config.lifelog, "analyze_articles_per_prompt", 4)
     monkeypatch.setattr(config.lifelog, "deep_limit", 2)
     monkeypatch.setattr(config.lifelog, "deep_min_importance", 0.55)
     monkeypatch.setattr(config.lifelog, "deep_min_relevance", 0.65)
     monkeypatch.setattr(config.lifelog, "theme_min_articles", 2)
     monkeypatch.setattr(config.lifelog, "theme_skip_existing", False)
+    monkeypatch.setattr(config.lifelog, "pipeline_workers", 1)
 
     calls: dict[str, list] = {"deep": [], "report": []}
 
-    def _analyze_pending_articles(*, db_path, batch_size):
+    def _analyze_pending_articles(*, db_path, batch_size, concurrency, articles_per_prompt):
         assert os.environ["OLLAMA_BASE_URL"] == "http://127.0.0.1:11436"
         assert os.environ["OLLAMA_MODEL"] == "qwen3.5:9b"
         assert os.environ["OLLAMA_TIMEOUT"] == "77"
+        assert os.environ["OLLAMA_MODEL_TRIAGE"] == "qwen2.5:1.5b"
+        assert os.environ["OLLAMA_MODEL_REPORT"] == "qwen3.5:9b"
         assert batch_size == 12
+        assert concurrency == 3
+        assert articles_per_prompt == 4
         return 3
 
-    def _deep_research_articles(*, db_path, article_id):
-        calls["deep"].append(article_id)
-        return 1
+    def _deep_research_articles(*, db_path, article_ids, result_min_score, result_top_k):
+        calls["deep"].append(article_ids)
+        assert result_min_score == 0.05
+        assert result_top_k == 8
+        return len(article_ids)
 
     def _generate_theme_reports(*, db_path, output_dir, min_articles, skip_existing, article_id):
         calls["report"].append(article_id)
         return [output_dir / f"r{article_id}.md"]
 
-    # InfoCollectorRepository モック: 2件の候補を返す
-    class _MockRepo:
-        def __init__(self, _db_path):
-            pass
-
+    # InfoCollectorRepository: ジョブキューは実物を使い、2件の候補を返す
+    class _MockRepo(_repository_class()):
         def fetch_deep_research_targets(self, *, min_importance, min_relevance, limit):
             assert min_importance == 0.55
             assert min_relevance == 0.65
@@ -112,17 +125,20 @@ def test_sync_once_blocking_runs_pipeline_and_updates_status(monkeypatch, tmp_pa
     assert status["last_reports_generated"] == 2
     assert status["last_run_at"] is not None
     assert status["last_error"] is None
+    assert set(status["last_stage_seconds"]) == {"triage", "deep_research", "report"}
 
-    assert calls["deep"] == [10, 20]
+    assert calls["deep"] == [[10], [20]]
     assert calls["report"] == [10, 20]
+    assert status["jobs"] == {"done": 5}
 
     assert os.environ.get("OLLAMA_BASE_URL") == old_base_url
     assert os.environ.get("OLLAMA_MODEL") == old_model
     assert os.environ.get("OLLAMA_TIMEOUT") == old_timeout
+    assert "OLLAMA_MODEL_TRIAGE" not in os.environ
     assert os.environ.get("YELLOWMABLE_DIR") == old_yellowmable
 
 
-def test_sync_once_blocking_records_error_and_reraises(monkeypatch, tmp_path):
+def test_sync_once_blocking_records_error_and_requeues_job(monkeypatch, tmp_path):
     worker = AnalysisPipelineWorker()
 
     db_path = tmp_path / "ai_secretary.db"
@@ -138,13 +154,10 @@ def test_sync_once_blocking_records_error_and_reraises(monkeypatch, tmp_path):
         lambda raw_path: db_path if "ai_secretary.db" in raw_path else output_dir,
     )
 
-    def _boom(*, db_path, batch_size):
+    def _boom(*, db_path, batch_size, concurrency, articles_per_prompt):
         raise RuntimeError("analysis failed")
 
-    class _MockRepo:
-        def __init__(self, _db_path):
-            pass
-
+    class _MockRepo(_repository_class()):
         def fetch_deep_research_targets(self, **_):
             return []
 
@@ -153,14 +166,180 @@ def test_sync_once_blocking_records_error_and_reraises(monkeypatch, tmp_path):
         lambda: (_boom, lambda **_: 0, lambda **_: [], _MockRepo),
     )
 
-    try:
-        worker._sync_once_blocking()
-        raise AssertionError("例外が再送出されるべき")
-    except RuntimeError as exc:
-        assert str(exc) == "analysis failed"
+    # 失敗したジョブは例外を外に出さず、試行回数を残して後で再実行する
+    assert worker._sync_once_blocking() == 0
 
     status = worker.get_status()
     assert status["last_error"] == "analysis failed"
     assert status["last_analyzed"] == 0
     assert status["last_deep_researched"] == 0
     assert status["last_reports_generated"] == 0
+    assert status["jobs"] == {"queued": 1}
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute(
+            "SELECT stage, state, attempts, last_error FROM pipeline_jobs"
+        ).fetchall() == [("triage", "queued", 1, "analysis failed")]
+
+
+def test_sync_once_blocking_skips_llm_stages_when_circuit_open(monkeypatch, tmp_path):
+    worker = AnalysisPipelineWorker()
+
+    monkeypatch.setattr(
+        "src.workers.analysis_pipeline_worker.ai_control_service.is_paused",
+        lambda: False,
+    )
+    monkeypatch.setattr(
+        "src.workers.analysis_pipeline_worker._resolve_path",
+        lambda raw_path: tmp_path / "ai_secretary.db",
+    )
+    monkeypatch.setattr("src.workers.analysis_pipeline_worker._ollama_circuit_open", lambda: True)
+
+    def _unexpected(**_kwargs):
+        raise AssertionError("ブレーカーが開いている間は LLM ステージを呼んではいけない")
+
+    monkeypatch.setattr(
+        "src.workers.analysis_pipeline_worker._load_pipeline_functions",
+        lambda: (_unexpected, _unexpected, _unexpected, object),
+    )
+
+    assert worker._sync_once_blocking() == 0
+    status = worker.get_status()
+    assert status["last_skipped_reason"] == "ollama_circuit_open"
+    assert status["last_error"] is None
+    assert status["last_run_at"] is not None
+
+
+def test_drain_once_runs_on_demand_report_before_scheduled_jobs(monkeypatch, tmp_path):
+    worker = AnalysisPipelineWorker()
+
+    db_path = tmp_path / "ai_secretary.db"
+    output_dir = tmp_path / "00_Raw"
+    output_dir.mkdir()
+
+    monkeypatch.setattr(
+        "src.workers.analysis_pipeline_worker.ai_control_service.is_paused",
+        lambda: False,
+    )
+    monkeypatch.setattr(
+        "src.workers.analysis_pipeline_worker._resolve_path",
+        lambda raw_path: db_path if "ai_secretary.db" in raw_path else output_dir,
+    )
+    monkeypatch.setattr("src.workers.analysis_pipeline_worker._ollama_circuit_open", lambda: False)
+    monkeypatch.setattr(config.lifelog, "pipeline_workers", 1)
+
+    calls: list[tuple] = []
+    done: dict[int, str | None] = {}
+
+    class _Repo(_repository_class()):
+        def mark_report_running(self, article_id):
+            calls.append(("running", article_id))
+
+        def get_reports_after_id(self, report_id, source_article_id=None):
+            assert (report_id, source_article_id) == (12, 7)
+            return [{"id": 13}]
+
+        def mark_report_done(self, article_id, entry_id):
+            done[article_id] = entry_id
+
+    def _deep(*, db_path, article_ids, result_min_score, result_top_k):
+        calls.append(("deep", article_ids))
+        return len(article_ids)
+
+    def _report(*, db_path, output_dir, min_articles, skip_existing, article_id):
+        calls.append(("report", article_id, min_articles, skip_existing))
+        return [output_dir / f"r{article_id}.md"]
+
+    monkeypatch.setattr(
+        "src.workers.analysis_pipeline_worker._load_pipeline_functions",
+        lambda: (None, _deep, _report, _Repo),
+    )
+    monkeypatch.setattr(
+        "src.workers.analysis_pipeline_worker.persist_report_entries",
+        lambda rows: [f"report-{row['id']}" for row in rows],
+    )
+
+    # 前回の実行で残った定期ジョブの後からオンデマンド要求が来る
+    repo = _Repo(str(db_path))
+    repo.enqueue_job("deep_research", 5, payload={"article_ids": [5, 6]})
+    worker.request_report(repo, 7, last_report_id=12)
+
+    assert worker._sync_once_blocking(plan=False) == 5
+    assert calls == [
+        ("running", 7),
+        ("deep", [7]),
+        ("report", 7, 1, False),
+        ("deep", [5, 6]),
+        ("report", 5, config.lifelog.theme_min_articles, config.lifelog.theme_skip_existing),
+    ]
+    assert done == {7: "report-13"}
+    assert worker.get_status()["jobs"] == {"done": 4}
+
+
+def test_report_stage_is_deferred_when_circuit_opens_and_filters_by_article(monkeypatch, tmp_path):
+    worker = AnalysisPipelineWorker()
+
+    db_path = tmp_path / "ai_secretary.db"
+    output_dir = tmp_path / "00_Raw"
+    output_dir.mkdir()
+
+    monkeypatch.setattr(
+        "src.workers.analysis_pipeline_worker.ai_control_service.is_paused",
+        lambda: False,
+    )
+    monkeypatch.setattr(
+        "src.workers.analysis_pipeline_worker._resolve_path",
+        lambda raw_path: db_path if "ai_secretary.db" in raw_path else output_dir,
+    )
+    circuit = {"open": False, "fail_next": True}
+    monkeypatch.setattr(
+        "src.workers.analysis_pipeline_worker._ollama_circuit_open", lambda: circuit["open"]
+    )
+    monkeypatch.setattr(config.lifelog, "pipeline_workers", 1)
+
+    done: dict[int, str | None] = {}
+
+    class _Repo(_repository_class()):
+        def mark_report_done(self, article_id, entry_id):
+            done[article_id] = entry_id
+
+    def _report(*, db_path, output_dir, min_articles, skip_existing, article_id):
+        if circuit["fail_next"]:
+            # 生成中にブレーカーが開き、generate_theme_reports は何も返さずに止まる
+            circuit.update(open=True, fail_next=False)
+            return []
+        # 別記事の定期レポートが同時に保存されていても拾わない
+        repo = _Repo(str(db_path))
+        for title, source_article_id in (("other", 9), ("mine", 7)):
+            repo.save_report(
+                title=title,
+                report_date="2026-03-01",
+                content="body",
+                article_count=1,
+                category="theme",
+                created_at=datetime(2026, 3, 1),
+                source_article_id=source_article_id,
+            )
+        return [output_dir / f"r{article_id}.md"]
+
+    monkeypatch.setattr(
+        "src.workers.analysis_pipeline_worker._load_pipeline_functions",
+        lambda: (None, None, _report, _Repo),
+    )
+    monkeypatch.setattr(
+        "src.workers.analysis_pipeline_worker.persist_report_entries",
+        lambda rows: [f"report-{row['title']}" for row in rows],
+    )
+
+    repo = _Repo(str(db_path))
+    job_id = repo.enqueue_job("report", 7, payload={"report_request": {"last_report_id": 0}})
+
+    # 完了にせず、試行回数を消費せずに queued へ戻す
+    worker._sync_once_blocking(plan=False)
+    job = repo.get_job(job_id)
+    assert (job["state"], job["attempts"]) == ("queued", 0)
+    assert done == {}
+
+    circuit["open"] = False
+    worker._sync_once_blocking(plan=False)
+    assert repo.get_job(job_id)["state"] == "done"
+    assert done == {7: "report-mine"}
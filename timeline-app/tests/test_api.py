@@ -3,6 +3,7 @@
 import asyncio
 from unittest.mock import patch
 
+import pytest
 from fastapi.testclient import TestClient
 
 from src.ai.ollama_client import OllamaChatResult
@@ -203,7 +204,7 @@ class TestEntries:
             "/api/entries",
             json={"type": "memo", "content": "元の本文", "source": "user"},
         ).json()
-        with patch("src.ai.ollama_client.requests.post", return_value=_edit_mock("編集後の本文")):
+        with patch("requests.Session.post", return_value=_edit_mock("編集後の本文")):
             resp = client.post(
                 f"/api/entries/{created['id']}/ai_edit",
                 json={"instruction": "読みやすくして"},
@@ -219,7 +220,7 @@ class TestEntries:
             "/api/entries",
             json={"type": "memo", "content": "元の本文", "source": "user"},
         ).json()
-        with patch("src.ai.ollama_client.requests.post", return_value=_edit_mock("編集後の本文")):
+        with patch("requests.Session.post", return_value=_edit_mock("編集後の本文")):
             client.post(
                 f"/api/entries/{created['id']}/ai_edit",
                 json={"instruction": "整形して"},
@@ -298,6 +299,19 @@ class TestAIControl:
         assert len(scheduled) == 1
         scheduled[0].close()
 
+    def test_llm_stats_reports_chat_wait_and_run_times(self, client: TestClient):
+        with patch("requests.Session.post", return_value=_chat_mock("了解です。")):
+            client.post("/api/chat", json={"content": "こんにちは", "save_entry": False})
+        resp = client.get("/api/ai/llm/stats")
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["gateway"]["max_concurrency"] >= 1
+        chat_stats = data["gateway"]["callers"]["chat_api"]
+        assert chat_stats["calls"] >= 1
+        assert "p95_wait_ms" in chat_stats
+        assert "p95_run_ms" in chat_stats
+        assert "callers" in data["timings"]
+
 
 def _chat_mock(reply: str, candidates: list | None = None):
     """Ollama /api/chat tool_calls 形式のモックを返す。"""
@@ -328,7 +342,7 @@ def _chat_mock(reply: str, candidates: list | None = None):
 
 class TestChat:
     def test_returns_reply(self, client: TestClient):
-        with patch("src.ai.ollama_client.requests.post", return_value=_chat_mock("了解です。")):
+        with patch("requests.Session.post", return_value=_chat_mock("了解です。")):
             resp = client.post("/api/chat", json={"content": "今日やることを整理したい"})
         assert resp.status_code == 200
         data = resp.json()
@@ -337,19 +351,19 @@ class TestChat:
         assert "entry_candidates" in data
 
     def test_thread_id_preserved(self, client: TestClient):
-        with patch("src.ai.ollama_client.requests.post", return_value=_chat_mock("続きです。")):
+        with patch("requests.Session.post", return_value=_chat_mock("続きです。")):
             resp = client.post("/api/chat", json={"content": "続き", "thread_id": "thread-test-001"})
         assert resp.json()["thread_id"] == "thread-test-001"
 
     def test_ollama_failure_returns_502(self, client: TestClient):
         import requests as req
 
-        with patch("src.ai.ollama_client.requests.post", side_effect=req.RequestException("down")):
+        with patch("requests.Session.post", side_effect=req.RequestException("down")):
             resp = client.post("/api/chat", json={"content": "テスト"})
         assert resp.status_code == 502
 
     def test_chat_saves_transcript_markdown_entry(self, client: TestClient):
-        with patch("src.ai.ollama_client.requests.post", return_value=_chat_mock("了解です。")):
+        with patch("requests.Session.post", return_value=_chat_mock("了解です。")):
             resp = client.post("/api/chat", json={"content": "今日やることを整理したい"})
         assert resp.status_code == 200
 
@@ -360,7 +374,7 @@ class TestChat:
         assert "<!-- chat-message:assistant -->" in chat_entries[-1]["content"]
 
     def test_chat_with_save_entry_false_does_not_persist_entry(self, client: TestClient):
-        with patch("src.ai.ollama_client.requests.post", return_value=_chat_mock("了解です。")):
+        with patch("requests.Session.post", return_value=_chat_mock("了解です。")):
             resp = client.post(
                 "/api/chat",
                 json={"content": "続きです", "thread_id": "thread-x", "save_entry": False},
@@ -372,7 +386,7 @@ class TestChat:
     def test_entry_candidates_returned(self, client: TestClient):
         candidates = [{"type": "todo", "title": "返信する", "content": "A社へ返信"}]
         with patch(
-            "src.ai.ollama_client.requests.post",
+            "requests.Session.post",
             return_value=_chat_mock("記録しますね。", candidates),
         ):
             resp = client.post("/api/chat", json={"content": "A社へ返信しないといけない"})
@@ -383,7 +397,7 @@ class TestChat:
     def test_invalid_candidate_type_is_filtered(self, client: TestClient):
         candidates = [{"type": "invalid_type", "content": "x"}]
         with patch(
-            "src.ai.ollama_client.requests.post",
+            "requests.Session.post",
             return_value=_chat_mock("はい。", candidates),
         ):
             resp = client.post("/api/chat", json={"content": "テスト"})
@@ -530,11 +544,16 @@ class TestNewsFeedback:
             def get_latest_report_id(self):
                 return 12
 
-        def _capture_task(article_id, last_report_id):
-            calls["task"] = (article_id, last_report_id)
+            def enqueue_job(self, stage, article_id, *, payload, priority, max_attempts):
+                calls["task"] = (stage, article_id, payload["report_request"], priority)
+                return 1
+
+        async def _drain_once():
+            calls["drained"] = True
+            return 0
 
         monkeypatch.setattr("src.routers.news._load_repo", lambda: _Repo())
-        monkeypatch.setattr("src.routers.news._run_pipeline_for_article", _capture_task)
+        monkeypatch.setattr("src.routers.news.analysis_pipeline_worker.drain_once", _drain_once)
 
         resp = client.post("/api/news/articles/77/generate_report")
         assert resp.status_code == 200
@@ -545,7 +564,8 @@ class TestNewsFeedback:
             "report_entry_id": None,
         }
         assert calls["forced"] == [77]
-        assert calls["task"] == (77, 12)
+        assert calls["task"] == ("deep_research", 77, {"last_report_id": 12}, 100)
+        assert calls["drained"] is True
 
     def test_generate_report_skips_when_already_done(self, client: TestClient, monkeypatch):
         class _Repo:
@@ -569,3 +589,32 @@ class TestNewsFeedback:
                 "report_entry_id": "report-44",
             },
         }
+
+
+class TestSemanticSearch:
+    def test_disabled_returns_503(self, client: TestClient):
+        resp = client.get("/api/search/semantic", params={"q": "天気"})
+        assert resp.status_code == 503
+
+    def test_saved_entries_are_searchable(self, client: TestClient, tmp_path, monkeypatch):
+        pytest.importorskip("numpy")
+        from src.config import config
+        from src.services.vector_index import vector_index_service
+
+        monkeypatch.setattr(config.vector, "enabled", True)
+        monkeypatch.setattr(config.vector, "index_dir", str(tmp_path / "vector_index"))
+        monkeypatch.setattr(vector_index_service, "_store", None)
+        monkeypatch.setattr(vector_index_service, "_unavailable", False)
+
+        for content in ("ローカルLLMの量子化を試した", "夕食は鍋だった"):
+            payload = {"type": "diary", "content": content, "source": "user"}
+            client.post("/api/entries", json=payload)
+        vector_index_service.wait_idle()
+
+        resp = client.get("/api/search/semantic", params={"q": "LLMの量子化", "kind": "entry"})
+        assert resp.status_code == 200
+        results = resp.json()["results"]
+        assert len(results) == 2
+        assert results[0]["kind"] == "entry"
+        assert results[0]["score"] > results[1]["score"]
+        assert client.get("/api/health").json()["vector_index"]["items"] == 2
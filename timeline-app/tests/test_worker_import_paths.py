@@ -69,9 +69,9 @@ def test_load_browser_classes_adds_required_import_paths(monkeypatch):
     _reset_modules(("browser_history.",))
     sys.modules.pop("browser_history", None)
 
-    BraveHistoryImporter, BrowserHistoryRepository = _load_browser_classes()
+    BrowserHistoryImporter, BrowserHistoryRepository = _load_browser_classes()
 
-    assert BraveHistoryImporter.__name__ == "BraveHistoryImporter"
+    assert BrowserHistoryImporter.__name__ == "BrowserHistoryImporter"
     assert BrowserHistoryRepository.__name__ == "BrowserHistoryRepository"
     assert str(lifelog_root) in sys.path
     assert lifelog_src in sys.path